@@ -10,6 +10,8 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 from config import *
+from pool_pricing import POOL_PRICER
+from v3_quoter import V3_QUOTER
 
 class AggressiveStrategy:
     def __init__(self, sniper_bot):
@@ -66,18 +68,30 @@ class AggressiveStrategy:
         
         for token_address in positions_to_remove:
             del self.current_positions[token_address]
+            self._release_pools(token_address)
             if token_address in self.position_sizes:
                 del self.position_sizes[token_address]
     
     def reset_positions(self):
         """Reset todas as posições (para debug/emergência)"""
         print(f"🔄 Resetando {len(self.current_positions)} posições")
+        for token_address in self.current_positions:
+            self._release_pools(token_address)
         self.current_positions.clear()
         self.position_sizes.clear()
+    
+    def _hold_pools(self, token_address: str):
+        """Pools do token ficam nos cotadores locais enquanto a posição estiver aberta"""
+        POOL_PRICER.pin(token_address)
+        V3_QUOTER.pin(token_address)
+    
+    def _release_pools(self, token_address: str):
+        POOL_PRICER.unpin(token_address)
+        V3_QUOTER.unpin(token_address)
         
     def calculate_dynamic_trade_amount(self) -> float:
         """Calcula valor dinâmico do trade baseado no saldo atual e performance"""
-        current_weth = self.sniper_bot._weth_balance_cache or self.current_balance
+        current_weth = self.sniper_bot.last_weth_balance or self.current_balance
         
         # Base: 20% do saldo atual
         base_amount = current_weth * 0.20
@@ -150,7 +164,7 @@ class AggressiveStrategy:
         
         # Verificar se temos saldo suficiente
         trade_amount = self.calculate_dynamic_trade_amount()
-        current_weth = self.sniper_bot._weth_balance_cache or self.current_balance
+        current_weth = self.sniper_bot.last_weth_balance or self.current_balance
         if trade_amount > current_weth * 0.9:  # Deixar 10% para gas
             return False, "Saldo insuficiente para trade"
         
@@ -188,6 +202,7 @@ class AggressiveStrategy:
                 'stop_loss': self.stop_loss,
                 'quick_exit_triggered': False
             }
+            self._hold_pools(token_address)
             
             print(f"🎯 Estratégia para {token_info.get('symbol', 'UNK')}:")
             print(f"   💰 Valor: {trade_amount:.6f} WETH")
@@ -346,6 +361,7 @@ class AggressiveStrategy:
             
             # Remover posição
             del self.current_positions[token_address]
+            self._release_pools(token_address)
             
             # Verificar se precisa pausar após muitas perdas
             if self.consecutive_losses >= self.max_consecutive_losses:
@@ -364,7 +380,7 @@ class AggressiveStrategy:
         total_profit = sum(self.profit_history)
         avg_profit = (total_profit / len(self.profit_history)) if self.profit_history else 0
         
-        current_balance = self.sniper_bot._weth_balance_cache or self.current_balance
+        current_balance = self.sniper_bot.last_weth_balance or self.current_balance
         roi = ((current_balance - self.initial_balance) / self.initial_balance * 100) if self.initial_balance > 0 else 0
         
         return {
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Cache local de allowances da carteira
+Valores lidos uma vez por (token, spender), debitados a cada swap enviado e atualizados pelos
+eventos Approval dos recibos; aprovação máxima única por (token, router) tira o approve do caminho de compra
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from eth_abi import encode
+from eth_utils import function_signature_to_4byte_selector
+from web3 import Web3, AsyncWeb3
+
+from config import WALLET_ADDRESS, APPROVE_MAX, APPROVAL_MULTIPLIER
+from multicall import Multicall3
+
+ALLOWANCE_SELECTOR = function_signature_to_4byte_selector('allowance(address,address)')
+APPROVAL_TOPIC = bytes(Web3.keccak(text='Approval(address,address,uint256)'))
+MAX_UINT256 = 2**256 - 1
+UNLIMITED_THRESHOLD = MAX_UINT256 // 2  # WETH9/OpenZeppelin não debitam a aprovação máxima no transferFrom
+
+AllowanceKey = Tuple[str, str]
+
+
+def _key(token: str, spender: str) -> AllowanceKey:
+    return token.lower(), spender.lower()
+
+
+def _topic_address(topic) -> str:
+    return '0x' + bytes(topic)[-20:].hex()
+
+
+class AllowanceManager:
+    """Allowances (token, spender) da carteira mantidas localmente"""
+
+    def __init__(self, owner: Optional[str] = WALLET_ADDRESS):
+        self.owner = owner
+        self._allowances: Dict[AllowanceKey, int] = {}
+        self._pending: Dict[AllowanceKey, str] = {}  # Aprovações enviadas e ainda não confirmadas
+
+        # Estatísticas
+        self.hits = 0
+        self.reads = 0
+        self.approvals = 0
+        self.event_updates = 0
+
+    def get(self, token: str, spender: str) -> Optional[int]:
+        """Consulta local (None = nunca lido)"""
+        return self._allowances.get(_key(token, spender))
+
+    def has(self, token: str, spender: str, amount: int) -> bool:
+        return (self.get(token, spender) or 0) >= amount
+
+    def set(self, token: str, spender: str, value: int):
+        self._allowances[_key(token, spender)] = value
+
+    def invalidate(self, token: str, spender: str):
+        """Próxima consulta relê o contrato (aprovação revertida, swap falhou...)"""
+        key = _key(token, spender)
+        self._allowances.pop(key, None)
+        self._pending.pop(key, None)
+
+    def consume(self, token: str, spender: str, amount: int):
+        """Swap enviado: transferFrom consome a aprovação (exceto a máxima)"""
+        key = _key(token, spender)
+        value = self._allowances.get(key)
+        if value is not None and value < UNLIMITED_THRESHOLD:
+            self._allowances[key] = max(value - amount, 0)
+
+    def approval_amount(self, amount: int) -> int:
+        """Valor a aprovar: máximo (uma vez por token/router) ou múltiplo do valor do trade"""
+        return MAX_UINT256 if APPROVE_MAX else amount * APPROVAL_MULTIPLIER
+
+    def mark_pending(self, token: str, spender: str, value: int, tx_hash: str):
+        """Aprovação enviada: swap seguinte sai com o nonce seguinte e executa depois dela"""
+        key = _key(token, spender)
+        self._allowances[key] = value
+        self._pending[key] = tx_hash
+        self.approvals += 1
+
+    def pending_approval(self, token: str, spender: str) -> Optional[str]:
+        """Hash da aprovação ainda não confirmada para o par (None se não houver)"""
+        return self._pending.get(_key(token, spender))
+
+    def on_approval_result(self, token: str, spender: str, success: bool):
+        """Desfecho da aprovação pendente (revert/timeout: valor otimista descartado)"""
+        if success:
+            self._pending.pop(_key(token, spender), None)
+        else:
+            self.invalidate(token, spender)
+
+    def on_receipt(self, receipt) -> int:
+        """Eventos Approval da carteira em um recibo (approve e transferFrom de tokens que emitem)"""
+        if not self.owner or receipt is None:
+            return 0
+
+        owner = self.owner.lower()
+        updates = 0
+        for log in receipt.get('logs', []):
+            topics = log.get('topics', [])
+            if len(topics) != 3 or bytes(topics[0]) != APPROVAL_TOPIC or _topic_address(topics[1]) != owner:
+                continue
+            data = log['data']
+            data = bytes.fromhex(data[2:]) if isinstance(data, str) else bytes(data)
+            key = _key(log['address'], _topic_address(topics[2]))
+            self._allowances[key] = int.from_bytes(data[:32], 'big')
+            self._pending.pop(key, None)
+            updates += 1
+
+        self.event_updates += updates
+        return updates
+
+    async def read_many(self, web3: AsyncWeb3, pairs: Iterable[Tuple[str, str]]) -> List[int]:
+        """Lê várias allowances em um único eth_call (aprovações pendentes mantêm o valor otimista)"""
+        pairs = list(pairs)
+        calls = [
+            (token, ALLOWANCE_SELECTOR + encode(['address', 'address'], [self.owner, Web3.to_checksum_address(spender)]))
+            for token, spender in pairs
+        ]
+        results = await Multicall3(web3).aggregate3(calls)
+        self.reads += len(pairs)
+
+        values = []
+        for (token, spender), (ok, data) in zip(pairs, results):
+            key = _key(token, spender)
+            if key in self._pending:
+                values.append(self._allowances[key])
+                continue
+            value = int.from_bytes(data[:32], 'big') if ok and len(data) >= 32 else 0
+            self._allowances[key] = value
+            values.append(value)
+        return values
+
+    async def fetch(self, web3: AsyncWeb3, token: str, spender: str) -> int:
+        """Allowance local ou leitura única no contrato"""
+        value = self.get(token, spender)
+        if value is not None:
+            self.hits += 1
+            return value
+        return (await self.read_many(web3, [(token, spender)]))[0]
+
+    def get_stats(self) -> Dict:
+        return {
+            'cached': len(self._allowances),
+            'unlimited': sum(1 for value in self._allowances.values() if value >= UNLIMITED_THRESHOLD),
+            'pending': len(self._pending),
+            'hits': self.hits,
+            'reads': self.reads,
+            'approvals': self.approvals,
+            'event_updates': self.event_updates
+        }
+
+
+# Instância global compartilhada (WETH pré-aprovado para os routers em SniperBot.initialize)
+ALLOWANCES = AllowanceManager()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Extração de seletores do dispatcher a partir do bytecode EVM
+Uma varredura linear pulando os dados dos PUSH: só PUSH4 comparados com EQ contam como seletor
+(constantes e seções de dados não geram falso positivo); resultado memorizado por hash do bytecode.
+Também normaliza o bytecode (metadados e immutables mascarados) para identificar clones
+"""
+
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from eth_utils import function_signature_to_4byte_selector
+
+PUSH1, PUSH3, PUSH4, PUSH20, PUSH32 = 0x60, 0x62, 0x63, 0x73, 0x7f
+EQ = 0x14
+DUP1, DUP16 = 0x80, 0x8f
+SWAP1, SWAP16 = 0x90, 0x9f
+
+# Funções de risco por categoria (assinatura canônica -> seletor calculado uma vez na importação)
+RISK_SIGNATURES: Dict[str, Tuple[str, ...]] = {
+    'mint': (
+        'mint(address,uint256)', 'mint(uint256)', 'mintTo(address,uint256)', 'mintFor(address,uint256)',
+        'issue(uint256)', 'setMinter(address)', 'addMinter(address)',
+    ),
+    'queima': (
+        'burn(uint256)', 'burn(address,uint256)', 'burnFrom(address,uint256)',
+    ),
+    'pausa': (
+        'pause()', 'unpause()', 'setPaused(bool)',
+    ),
+    'blacklist': (
+        'blacklist(address)', 'blacklistAddress(address,bool)', 'addToBlacklist(address)',
+        'removeFromBlacklist(address)', 'setBlacklist(address,bool)', 'isBlacklisted(address)',
+        'addBot(address)', 'addBots(address[])', 'delBot(address)', 'setBots(address[])',
+        'setBot(address,bool)', 'blockBots(address[])', 'isBot(address)', 'setSniper(address,bool)',
+    ),
+    'taxa': (
+        'setTaxFee(uint256)', 'setTaxFeePercent(uint256)', 'setLiquidityFeePercent(uint256)', 'setFee(uint256)',
+        'setFees(uint256,uint256)', 'setBuyFee(uint256)', 'setSellFee(uint256)', 'setTaxes(uint256,uint256)',
+        'updateFees(uint256,uint256)', 'updateBuyFees(uint256,uint256,uint256)',
+        'updateSellFees(uint256,uint256,uint256)', 'setBuyTax(uint256)', 'setSellTax(uint256)',
+        'setTax(uint256,uint256)', 'setMarketingFee(uint256)',
+    ),
+    'isenção de taxa': (
+        'excludeFromFee(address)', 'includeInFee(address)', 'excludeFromFees(address,bool)',
+        'setExcludedFromFee(address,bool)',
+    ),
+    'limite': (
+        'setMaxTxAmount(uint256)', 'setMaxTxPercent(uint256)', 'setMaxWalletSize(uint256)',
+        'setMaxWallet(uint256)', 'setMaxWalletAmount(uint256)', 'updateMaxTxnAmount(uint256)',
+        'updateMaxWalletAmount(uint256)', 'setCooldownEnabled(bool)', 'setMaxSellAmount(uint256)',
+    ),
+    'trading': (
+        'setTradingEnabled(bool)', 'setTrading(bool)', 'tradingStatus(bool)', 'setSwapEnabled(bool)',
+        'disableTrading()', 'enableTrading(bool)',
+    ),
+    'saldo': (
+        'setBalance(address,uint256)', 'setBalances(address[],uint256[])', 'rebase(uint256,int256)',
+        'transferFromOwner(address,address,uint256)',
+    ),
+    'upgrade': (
+        'upgradeTo(address)', 'upgradeToAndCall(address,bytes)', 'setImplementation(address)',
+    ),
+}
+
+RISK_SELECTORS: Dict[bytes, Tuple[str, str]] = {
+    function_signature_to_4byte_selector(signature): (signature.split('(')[0], category)
+    for category, signatures in RISK_SIGNATURES.items()
+    for signature in signatures
+}
+
+
+def extract_selectors(code: bytes) -> FrozenSet[bytes]:
+    """
+    Seletores do dispatcher em uma passada: PUSH4 seguido de EQ (ou DUPn/SWAPn e EQ, padrão
+    'PUSH4 sel DUP2 EQ' de alguns compiladores); dados de PUSH nunca são lidos como opcode.
+    O otimizador encurta seletores com byte inicial zero para PUSH3
+    """
+    code = bytes(code)
+    size = len(code)
+    selectors = set()
+    i = 0
+    while i < size:
+        opcode = code[i]
+        if PUSH1 <= opcode <= PUSH32:
+            width = opcode - PUSH1 + 1
+            end = i + width + 1
+            if (opcode == PUSH4 or opcode == PUSH3) and end < size:
+                following = code[end]
+                if DUP1 <= following <= DUP16 or SWAP1 <= following <= SWAP16:
+                    following = code[end + 1] if end + 1 < size else None
+                if following == EQ:
+                    selectors.add(code[i + 1:end].rjust(4, b'\x00'))
+            i = end
+        else:
+            i += 1
+    return frozenset(selectors)
+
+
+def strip_metadata(code: bytes) -> bytes:
+    """Remove o CBOR de metadados do compilador (hash IPFS/bzzr muda a cada compilação)"""
+    code = bytes(code)
+    if len(code) < 2:
+        return code
+    length = int.from_bytes(code[-2:], 'big')
+    start = len(code) - length - 2
+    if 0 < length and start >= 0 and 0xa1 <= code[start] <= 0xa5:  # Mapa CBOR com 1-5 chaves
+        return code[:start]
+    return code
+
+
+def normalize_bytecode(code: bytes) -> bytes:
+    """
+    Bytecode sem metadados e com imediatos de PUSH20-PUSH32 zerados: immutables (PUSH32 preenchidos
+    no deploy) e endereços/constantes embutidos variam entre clones do mesmo template
+    """
+    data = bytearray(strip_metadata(code))
+    size = len(data)
+    i = 0
+    while i < size:
+        opcode = data[i]
+        if PUSH1 <= opcode <= PUSH32:
+            end = min(i + opcode - PUSH1 + 2, size)
+            if opcode >= PUSH20:
+                data[i + 1:end] = bytes(end - i - 1)
+            i = end
+        else:
+            i += 1
+    return bytes(data)
+
+
+def opcode_skeleton(code: bytes) -> bytes:
+    """Só os opcodes (sem nenhum imediato): mesma lógica com constantes diferentes = mesma família"""
+    code = strip_metadata(code)
+    size = len(code)
+    skeleton = bytearray()
+    i = 0
+    while i < size:
+        opcode = code[i]
+        skeleton.append(opcode)
+        i += opcode - PUSH1 + 2 if PUSH1 <= opcode <= PUSH32 else 1
+    return bytes(skeleton)
+
+
+def risky_functions(selectors: FrozenSet[bytes]) -> List[Tuple[str, str]]:
+    """(nome, categoria) das funções de risco presentes (lookup O(1) por seletor)"""
+    return sorted(RISK_SELECTORS[selector] for selector in selectors if selector in RISK_SELECTORS)
+
+
+class SelectorIndex:
+    """Seletores por hash de bytecode (clones extraídos uma única vez)"""
+
+    def __init__(self):
+        self._selectors: Dict[str, FrozenSet[bytes]] = {}
+
+        # Estatísticas
+        self.hits = 0
+        self.extractions = 0
+
+    def get(self, code_hash: str, code: Optional[bytes] = None) -> FrozenSet[bytes]:
+        selectors = self._selectors.get(code_hash)
+        if selectors is not None:
+            self.hits += 1
+            return selectors
+
+        selectors = extract_selectors(code or b'')
+        if code:
+            self._selectors[code_hash] = selectors
+            self.extractions += 1
+        return selectors
+
+    def get_stats(self) -> Dict:
+        return {
+            'code_hashes': len(self._selectors),
+            'hits': self.hits,
+            'extractions': self.extractions,
+            'risk_selectors': len(RISK_SELECTORS)
+        }
+
+
+# Instância global compartilhada
+SELECTOR_INDEX = SelectorIndex()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Orquestrador de verificações com grafo de dependências
+Cada verificação começa assim que suas dependências terminam (independentes rodam em paralelo);
+a primeira que bloquear cancela as demais. Latência medida por verificação e de ponta a ponta
+"""
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class Check:
+    """Nó do grafo: run recebe {dependência: resultado} e pode ser síncrono ou assíncrono"""
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+    blocking: Optional[Callable[[Any], Optional[str]]] = None  # Motivo do bloqueio (None = segue)
+
+
+@dataclass
+class CheckRun:
+    results: Dict[str, Any]
+    timings: Dict[str, float]  # ms de cada verificação concluída
+    total_ms: float
+    blocked_by: Optional[str] = None
+    block_reason: Optional[str] = None
+    skipped: List[str] = field(default_factory=list)  # Canceladas ou não iniciadas pelo bloqueio
+
+    def timing_report(self) -> Dict[str, float]:
+        return {**self.timings, 'total': self.total_ms}
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """'total ms (mais lenta ms, ...)' a partir de {verificação: ms, 'total': ms}"""
+    slowest = sorted(((name, ms) for name, ms in timings.items() if name != 'total'),
+                     key=lambda item: item[1], reverse=True)
+    return f"{timings.get('total', 0):.0f} ms (" + ", ".join(f"{name} {ms:.0f}" for name, ms in slowest) + ")"
+
+
+async def _execute(check: Check, inputs: Dict[str, Any]) -> Any:
+    result = check.run(inputs)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+class CheckOrchestrator:
+    """Executa grafos de verificações e acumula a latência de cada uma"""
+
+    def __init__(self):
+        self._latency: Dict[str, List[float]] = {}  # Nome -> [execuções, ms total, ms máximo]
+
+        # Estatísticas
+        self.runs = 0
+        self.short_circuits = 0
+
+    def _record(self, name: str, ms: float):
+        entry = self._latency.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += ms
+        entry[2] = max(entry[2], ms)
+
+    async def run(self, checks: Sequence[Check], graph: str = 'checks') -> CheckRun:
+        """
+        Roda o grafo (latências acumuladas como '<graph>.<verificação>'). Exceção em uma verificação cancela as demais e propaga
+        (cada verificação decide o que é erro tolerável)
+        """
+        names = {check.name for check in checks}
+        missing = {dep for check in checks for dep in check.deps} - names
+        if len(names) != len(checks) or missing:
+            raise ValueError(f"grafo de verificações inválido (dependências ausentes: {sorted(missing)})")
+
+        start = time.perf_counter()
+        pending = {check.name: check for check in checks}
+        running: Dict[asyncio.Future, Tuple[Check, float]] = {}
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        blocked_by = block_reason = None
+
+        def launch_ready():
+            for name, check in list(pending.items()):
+                if all(dep in results for dep in check.deps):
+                    del pending[name]
+                    task = asyncio.ensure_future(_execute(check, {dep: results[dep] for dep in check.deps}))
+                    running[task] = (check, time.perf_counter())
+
+        self.runs += 1
+        try:
+            launch_ready()
+            while running and blocked_by is None:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    check, started = running.pop(task)
+                    results[check.name] = task.result()
+                    timings[check.name] = (time.perf_counter() - started) * 1000
+                    self._record(f'{graph}.{check.name}', timings[check.name])
+                    reason = check.blocking(results[check.name]) if check.blocking else None
+                    if reason and blocked_by is None:
+                        blocked_by, block_reason = check.name, reason
+                if blocked_by is None:
+                    launch_ready()
+            if pending and blocked_by is None:
+                raise ValueError(f"dependência circular entre {sorted(pending)}")
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        if blocked_by is not None:
+            self.short_circuits += 1
+        skipped = [check.name for check, _ in running.values()] + list(pending)
+        total_ms = (time.perf_counter() - start) * 1000
+        self._record(f'{graph}.total', total_ms)
+        return CheckRun(results, timings, total_ms, blocked_by, block_reason, skipped)
+
+    def get_stats(self) -> Dict:
+        return {
+            'runs': self.runs,
+            'short_circuits': self.short_circuits,
+            'latency_ms': {
+                name: {'count': count, 'avg': round(total / count, 1), 'max': round(maximum, 1)}
+                for name, (count, total, maximum) in self._latency.items()
+            }
+        }
+
+
+# Instância global compartilhada
+CHECK_ORCHESTRATOR = CheckOrchestrator()
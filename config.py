@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 from web3 import Web3
 
@@ -11,6 +12,13 @@ except:
 # Base Network Configuration
 BASE_RPC_URL = os.getenv('BASE_RPC_URL', 'https://mainnet.base.org')
 BASE_RPC_BACKUP = os.getenv('BASE_RPC_BACKUP', 'https://base-mainnet.public.blastapi.io')
+# Pool de endpoints (separados por vírgula); padrão: principal + backup
+BASE_RPC_URLS = list(dict.fromkeys(
+    url.strip() for url in os.getenv('BASE_RPC_URLS', f'{BASE_RPC_URL},{BASE_RPC_BACKUP}').split(',') if url.strip()
+))
+# Endpoints extras só para envio de transações (privados/sequencer, ex: https://mainnet-sequencer.base.org)
+TX_BROADCAST_URLS = [url.strip() for url in os.getenv('TX_BROADCAST_URLS', '').split(',') if url.strip()]
+BASE_WS_URL = os.getenv('BASE_WS_URL')  # wss:// - habilita streaming eth_subscribe (sem polling)
 CHAIN_ID = int(os.getenv('CHAIN_ID', '8453'))
 
 # Wallet Configuration
@@ -23,6 +31,10 @@ TRADE_AMOUNT_WETH = float(os.getenv('TRADE_AMOUNT_WETH', '0.000398'))  # 20% do
 MAX_GAS_PRICE = int(os.getenv('MAX_GAS_PRICE', '50'))  # Aumentado para Base Network (mais competitivo)
 SLIPPAGE_TOLERANCE = float(os.getenv('SLIPPAGE_TOLERANCE', '20'))  # Aumentado para memecoins muito voláteis
 MAX_PRIORITY_FEE = int(os.getenv('MAX_PRIORITY_FEE', '5'))  # Aumentado para velocidade na Base Network
+MIN_PRIORITY_FEE_GWEI = float(os.getenv('MIN_PRIORITY_FEE_GWEI', '0.001'))  # Piso da priority fee (Base costuma aceitar ~0.001 gwei)
+FEE_HISTORY_BLOCKS = int(os.getenv('FEE_HISTORY_BLOCKS', '20'))  # Blocos do eth_feeHistory usados nos percentis de priority fee
+BASE_FEE_ELASTICITY = int(os.getenv('BASE_FEE_ELASTICITY', '6'))  # Multiplicador de elasticidade EIP-1559 da Base
+BASE_FEE_CHANGE_DENOMINATOR = int(os.getenv('BASE_FEE_CHANGE_DENOMINATOR', '250'))  # Denominador de variação do base fee da Base
 
 # Sistema de Crescimento Inteligente - CONFIGURAÇÃO AGRESSIVA
 SMART_SCALING_ENABLED = os.getenv('SMART_SCALING_ENABLED', 'true').lower() == 'true'
@@ -53,11 +65,17 @@ ENABLE_SUSHISWAP = os.getenv('ENABLE_SUSHISWAP', 'true').lower() == 'true'
 
 # Security Settings - Otimizado para memecoins com crescimento rápido
 ENABLE_MEV_PROTECTION = os.getenv('ENABLE_MEV_PROTECTION', 'true').lower() == 'true'
+MEV_WINDOW_BLOCKS = int(os.getenv('MEV_WINDOW_BLOCKS', '5'))  # Blocos recentes mantidos no índice do observador de MEV
+MEV_PRIORITY_MULTIPLIER = float(os.getenv('MEV_PRIORITY_MULTIPLIER', '10'))  # Priority fee acima de N x a mediana do bloco = suspeita
 MIN_LIQUIDITY_USD = float(os.getenv('MIN_LIQUIDITY_USD', '1500'))  # Mais agressivo para memecoins (reduzido para mais oportunidades)
 MAX_TRADE_IMPACT = float(os.getenv('MAX_TRADE_IMPACT', '10'))  # Mais flexível para oportunidades
 MIN_SCORE_TO_BUY = int(os.getenv('MIN_SCORE_TO_BUY', '30'))  # Score reduzido para mais trades (crescimento rápido)
 ENABLE_HONEYPOT_CHECK = os.getenv('ENABLE_HONEYPOT_CHECK', 'true').lower() == 'true'
 RISK_TOLERANCE = os.getenv('RISK_TOLERANCE', 'high').lower()  # high, medium, low
+SECURITY_VERDICT_TTL = int(os.getenv('SECURITY_VERDICT_TTL', '3600'))  # Segundos que as verificações de bytecode ficam válidas para clones do mesmo template
+HONEYPOT_TEMPLATE_CONFIRMATIONS = int(os.getenv('HONEYPOT_TEMPLATE_CONFIRMATIONS', '2'))  # Tokens distintos com honeypot confirmado para bloquear o template inteiro
+HONEYPOT_TAX = float(os.getenv('HONEYPOT_TAX', '50'))  # Taxa de compra/venda (%) simulada a partir da qual o token é tratado como honeypot
+MAX_TOKEN_TAX = float(os.getenv('MAX_TOKEN_TAX', '15'))  # Taxa de compra/venda (%) simulada acima da qual o token perde pontos
 
 # Trading Mode - MODO REAL HABILITADO
 SIMULATION_MODE = os.getenv('SIMULATION_MODE', 'false').lower() == 'true'  # DESABILITADO - TRADING REAL
@@ -68,9 +86,29 @@ MEV_PROTECTION = os.getenv('MEV_PROTECTION', 'true').lower() == 'true'  # Prote
 # Performance Settings
 TRANSACTION_TIMEOUT = int(os.getenv('TRANSACTION_TIMEOUT', '30'))  # Timeout para transações
 CONFIRMATION_BLOCKS = int(os.getenv('CONFIRMATION_BLOCKS', '1'))  # Confirmações necessárias
+TX_POLL_INTERVAL = float(os.getenv('TX_POLL_INTERVAL', '1'))  # Intervalo de checagem de novos blocos com transações pendentes
 MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))  # Tentativas máximas
 SCAN_INTERVAL = float(os.getenv('SCAN_INTERVAL', '0.5'))  # Intervalo de scan em segundos
+GET_LOGS_BLOCK_RANGE = int(os.getenv('GET_LOGS_BLOCK_RANGE', '500'))  # Blocos por chamada get_logs
+GET_LOGS_ADDRESS_CHUNK = int(os.getenv('GET_LOGS_ADDRESS_CHUNK', '100'))  # Endereços por filtro get_logs (provedores limitam a lista)
+MAX_TRACKED_POOLS = int(os.getenv('MAX_TRACKED_POOLS', '500'))  # Pools acompanhados por cotador local (menos usados saem primeiro)
+V3_TICK_WORD_RADIUS = int(os.getenv('V3_TICK_WORD_RADIUS', '2'))  # Palavras do tickBitmap V3 em cache de cada lado do preço
 PRIORITY_FEE = int(os.getenv('PRIORITY_FEE', '2'))  # Priority fee em Gwei
+MAX_CONCURRENT_ANALYSES = int(os.getenv('MAX_CONCURRENT_ANALYSES', '8'))  # Tokens analisados em paralelo
+
+# RPC assíncrono (pool aiohttp compartilhado)
+RPC_POOL_SIZE = int(os.getenv('RPC_POOL_SIZE', '32'))  # Conexões simultâneas no pool
+RPC_KEEPALIVE_TIMEOUT = float(os.getenv('RPC_KEEPALIVE_TIMEOUT', '60'))  # Segundos mantendo sockets abertos
+RPC_TIMEOUT = float(os.getenv('RPC_TIMEOUT', '10'))  # Timeout por requisição em segundos
+RPC_HEDGE_LANE = int(os.getenv('RPC_HEDGE_LANE', '1'))  # Faixas até esta (0=execução, 1=posições) enviam leituras a 2 endpoints
+RPC_PROBE_INTERVAL = float(os.getenv('RPC_PROBE_INTERVAL', '10'))  # Segundos entre medições de head/latência dos endpoints
+RPC_METHOD_COSTS = json.loads(os.getenv('RPC_METHOD_COSTS', '{}'))  # Custo em créditos por método (ex: {"eth_getLogs": 5})
+RPC_CACHE_BLOCK_WINDOW = int(os.getenv('RPC_CACHE_BLOCK_WINDOW', '64'))  # Blocos mantidos no cache de leituras
+TOKEN_METADATA_DB = os.getenv('TOKEN_METADATA_DB', 'token_metadata.db')  # SQLite com metadados imutáveis de tokens
+
+# WebSocket (eth_subscribe)
+WS_RECONNECT_DELAY = float(os.getenv('WS_RECONNECT_DELAY', '1'))  # Espera inicial antes de reconectar
+WS_MAX_RECONNECT_DELAY = float(os.getenv('WS_MAX_RECONNECT_DELAY', '30'))  # Teto do backoff exponencial
 
 # Security Thresholds
 MIN_LIQUIDITY_ETH = float(os.getenv('MIN_LIQUIDITY_ETH', '0.5'))  # Liquidez mínima em ETH
@@ -90,6 +128,9 @@ WETH_ADDRESS = "0x4200000000000000000000000000000000000006"
 USDC_ADDRESS = "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913"
 USDT_ADDRESS = "0xfde4C96c8593536E31F229EA8f37b2ADa2699bb2"
 
+# Multicall3 (mesmo endereço em todas as redes EVM)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
 # DEX Router Addresses on Base
 UNISWAP_V3_ROUTER = "0x2626664c2603336E57B271c5C0b26F421741e481"
 AERODROME_ROUTER = "0xcF77a3Ba9A5CA399B7c97c74d54e5b1Beb874E43"
@@ -98,6 +139,7 @@ SUSHISWAP_ROUTER = "0x6BDED42c6DA8FBf0d2bA55B2fa120C5e0c8D7891"
 
 # DEX Factory Addresses
 UNISWAP_V3_FACTORY = "0x33128a8fC17869897dcE68Ed026d694621f6FDfD"
+UNISWAP_V3_QUOTER = "0x3d4e44Eb1374240CE5F1B871ab261CD16335B76a"  # QuoterV2 (cotação on-chain da simulação de honeypot)
 AERODROME_FACTORY = "0x420DD381b31aEf6683db6B902084cB0FFECe40Da"
 BASESWAP_FACTORY = "0xFDa619b6d20975be80A10332cD39b9a4b0FAa8BB"
 
@@ -105,7 +147,11 @@ BASESWAP_FACTORY = "0xFDa619b6d20975be80A10332cD39b9a4b0FAa8BB"
 DEFAULT_GAS_LIMIT = 400000  # Aumentado para Base Network
 PRIORITY_GAS_LIMIT = 600000  # Aumentado para transações complexas
 APPROVAL_GAS_LIMIT = 100000  # Gas específico para aprovações
+APPROVE_MAX = os.getenv('APPROVE_MAX', 'true').lower() == 'true'  # Aprovação máxima única por (token, router); false = APPROVAL_MULTIPLIER x valor
+APPROVAL_MULTIPLIER = int(os.getenv('APPROVAL_MULTIPLIER', '10'))  # Múltiplo do valor aprovado quando APPROVE_MAX=false
 SWAP_GAS_LIMIT = 350000     # Gas específico para swaps
+GAS_LIMIT_MARGIN = float(os.getenv('GAS_LIMIT_MARGIN', '0.2'))  # Margem sobre o p99 do gasUsed aprendido (ou sobre o estimate_gas)
+GAS_MODEL_SAMPLES = int(os.getenv('GAS_MODEL_SAMPLES', '64'))  # Recibos mantidos por (router, direção, bytecode)
 
 def validate_config():
     """Validate essential configuration"""
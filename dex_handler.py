@@ -1,63 +1,47 @@
 import json
-from web3 import Web3
-from typing import Dict, List, Optional, Tuple
+from web3 import Web3, AsyncWeb3
+from typing import Dict, Iterable, List, Optional, Tuple
 import requests
 import time
 import asyncio
 from colorama import Fore, Style, init
 from config import *
-from rate_limiter import BASE_RPC_LIMITER, with_rate_limit
+from rate_limiter import BASE_RPC_LIMITER, LANE_EXECUTION, with_rate_limit
+from multicall import Multicall3, encode_get_amounts_out, decode_get_amounts_out
+from pool_pricing import POOL_PRICER
+from v3_quoter import V3_QUOTER
+from token_metadata import TOKEN_METADATA
+from nonce_manager import NONCE_MANAGER
+from tx_tracker import TX_TRACKER
+from tx_broadcaster import TX_BROADCASTER
+from swap_templates import SWAP_TEMPLATES, sign_transaction
+from fee_oracle import FEE_ORACLE
+from gas_model import GAS_MODEL, gas_key
+from allowance_manager import ALLOWANCES, UNLIMITED_THRESHOLD
+from preflight import PREFLIGHT, PreflightError
 
 # Inicializar colorama
 init(autoreset=True)
 
 class DEXHandler:
-    def __init__(self, web3: Web3):
+    def __init__(self, web3: AsyncWeb3):
         self.web3 = web3
-        self.backup_web3 = None
-        self.balance_cache = {}
-        self.cache_timeout = 30  # Cache por 30 segundos
         self.dexs = self._initialize_dexs()
-        self._init_backup_rpc()
+        self.multicall = Multicall3(web3)
+        self._account = None
+        self.last_sign_ms = 0.0
     
-    def _init_backup_rpc(self):
-        """Inicializa RPC backup"""
-        try:
-            self.backup_web3 = Web3(Web3.HTTPProvider(BASE_RPC_BACKUP))
-            if self.backup_web3.is_connected():
-                print(f"{Fore.GREEN}✅ RPC backup conectado: {BASE_RPC_BACKUP}{Style.RESET_ALL}")
-            else:
-                print(f"{Fore.YELLOW}⚠️ RPC backup não disponível{Style.RESET_ALL}")
-                self.backup_web3 = None
-        except Exception as e:
-            print(f"{Fore.YELLOW}⚠️ Erro ao conectar RPC backup: {str(e)}{Style.RESET_ALL}")
-            self.backup_web3 = None
+    @property
+    def account(self):
+        """Conta local derivada uma única vez"""
+        if self._account is None:
+            self._account = self.web3.eth.account.from_key(PRIVATE_KEY)
+        return self._account
     
-    def _get_web3_instance(self):
-        """Retorna instância Web3 disponível (principal ou backup)"""
-        if self.web3.is_connected():
-            return self.web3
-        elif self.backup_web3 and self.backup_web3.is_connected():
-            print(f"{Fore.YELLOW}🔄 Usando RPC backup{Style.RESET_ALL}")
-            return self.backup_web3
-        else:
-            return self.web3  # Fallback para principal mesmo se não conectado
+    async def _get_web3_instance(self):
+        """Instância Web3 (failover entre endpoints é feito por requisição no pool RPC, sem is_connected)"""
+        return self.web3
     
-    def _get_cached_balance(self, cache_key: str):
-        """Obtém saldo do cache se válido"""
-        if cache_key in self.balance_cache:
-            cached_data = self.balance_cache[cache_key]
-            if time.time() - cached_data['timestamp'] < self.cache_timeout:
-                return cached_data['balance']
-        return None
-    
-    def _cache_balance(self, cache_key: str, balance: float):
-        """Armazena saldo no cache"""
-        self.balance_cache[cache_key] = {
-            'balance': balance,
-            'timestamp': time.time()
-        }
-        
     def _initialize_dexs(self) -> Dict:
         """Inicializa as configurações das DEXs"""
         dexs = {}
@@ -157,24 +141,39 @@ class DEXHandler:
                 "outputs": [{"internalType": "uint256[]", "name": "amounts", "type": "uint256[]"}],
                 "stateMutability": "view",
                 "type": "function"
+            },
+            {
+                "inputs": [
+                    {
+                        "components": [
+                            {"internalType": "address", "name": "tokenIn", "type": "address"},
+                            {"internalType": "address", "name": "tokenOut", "type": "address"},
+                            {"internalType": "uint24", "name": "fee", "type": "uint24"},
+                            {"internalType": "address", "name": "recipient", "type": "address"},
+                            {"internalType": "uint256", "name": "amountIn", "type": "uint256"},
+                            {"internalType": "uint256", "name": "amountOutMinimum", "type": "uint256"},
+                            {"internalType": "uint160", "name": "sqrtPriceLimitX96", "type": "uint160"}
+                        ],
+                        "internalType": "struct IV3SwapRouter.ExactInputSingleParams",
+                        "name": "params",
+                        "type": "tuple"
+                    }
+                ],
+                "name": "exactInputSingle",
+                "outputs": [{"internalType": "uint256", "name": "amountOut", "type": "uint256"}],
+                "stateMutability": "payable",
+                "type": "function"
             }
         ]
     
     async def get_weth_balance(self) -> float:
-        """Obtém saldo WETH da carteira com cache e RPC backup"""
-        cache_key = f"weth_balance_{WALLET_ADDRESS}"
-        
-        # Verificar cache primeiro
-        cached_balance = self._get_cached_balance(cache_key)
-        if cached_balance is not None:
-            return cached_balance
-        
+        """Obtém saldo WETH da carteira (failover no pool RPC; leituras no mesmo bloco vêm do RPC_CACHE)"""
         # Tentar obter saldo com rate limiting
         for attempt in range(2):  # Máximo 2 tentativas
             try:
-                await BASE_RPC_LIMITER.acquire()
+                await BASE_RPC_LIMITER.acquire('eth_call')
                 
-                web3_instance = self._get_web3_instance()
+                web3_instance = await self._get_web3_instance()
                 weth_contract = web3_instance.eth.contract(
                     address=WETH_ADDRESS,
                     abi=[{
@@ -186,12 +185,9 @@ class DEXHandler:
                     }]
                 )
                 
-                balance_wei = weth_contract.functions.balanceOf(WALLET_ADDRESS).call()
+                balance_wei = await weth_contract.functions.balanceOf(WALLET_ADDRESS).call()
                 balance_eth = float(web3_instance.from_wei(balance_wei, 'ether'))
                 
-                # Cache o resultado
-                self._cache_balance(cache_key, balance_eth)
-                
                 print(f"✅ Saldo WETH lido: {balance_eth:.6f} WETH (raw: {balance_wei}, decimals: 18)")
                 BASE_RPC_LIMITER.handle_success()
                 return balance_eth
@@ -216,10 +212,10 @@ class DEXHandler:
         """
         for attempt in range(2):
             try:
-                await BASE_RPC_LIMITER.acquire()
+                await BASE_RPC_LIMITER.acquire('eth_getBalance')
                 
-                web3_instance = self._get_web3_instance()
-                eth_balance = web3_instance.eth.get_balance(WALLET_ADDRESS)
+                web3_instance = await self._get_web3_instance()
+                eth_balance = await web3_instance.eth.get_balance(WALLET_ADDRESS)
                 eth_balance_eth = float(web3_instance.from_wei(eth_balance, 'ether'))
                 
                 if eth_balance_eth >= min_eth_needed:
@@ -234,7 +230,7 @@ class DEXHandler:
                 ]
                 
                 weth_contract = web3_instance.eth.contract(address=WETH_ADDRESS, abi=weth_abi)
-                weth_balance = weth_contract.functions.balanceOf(WALLET_ADDRESS).call()
+                weth_balance = await weth_contract.functions.balanceOf(WALLET_ADDRESS).call()
                 weth_balance_eth = float(web3_instance.from_wei(weth_balance, 'ether'))
                 
                 # Calcular quanto WETH converter - SEMPRE converter pelo menos 0.00005 ETH
@@ -250,16 +246,14 @@ class DEXHandler:
                     print(f"💱 Convertendo {eth_needed:.6f} WETH para ETH...")
                     
                     # Preparar transação de withdraw com gas ULTRA baixo
-                    withdraw_tx = weth_contract.functions.withdraw(withdraw_amount).build_transaction({
+                    withdraw_tx = await weth_contract.functions.withdraw(withdraw_amount).build_transaction({
                         'from': WALLET_ADDRESS,
                         'gas': 30000,  # Gas mínimo para withdraw
-                        'gasPrice': web3_instance.to_wei(0.1, 'gwei'),  # Gas price ULTRA baixo
-                        'nonce': web3_instance.eth.get_transaction_count(WALLET_ADDRESS)
+                        **await FEE_ORACLE.get_fees(web3_instance, 'normal')
                     })
                     
                     # Assinar e enviar
-                    signed_tx = web3_instance.eth.account.sign_transaction(withdraw_tx, PRIVATE_KEY)
-                    tx_hash = web3_instance.eth.send_raw_transaction(signed_tx.rawTransaction)
+                    tx_hash = await self._send_transaction(web3_instance, withdraw_tx)
                     
                     print(f"✅ WETH convertido para ETH: {tx_hash.hex()}")
                     
@@ -293,8 +287,8 @@ class DEXHandler:
             print("🔄 Executando trade com WETH como gas...")
             
             # Primeiro, converter uma pequena quantidade de WETH para ETH para gas
-            await BASE_RPC_LIMITER.acquire()
-            web3_instance = self._get_web3_instance()
+            await BASE_RPC_LIMITER.acquire('eth_sendRawTransaction', lane=LANE_EXECUTION)
+            web3_instance = await self._get_web3_instance()
             
             # Converter apenas o mínimo necessário para gas
             weth_abi = [
@@ -311,16 +305,14 @@ class DEXHandler:
             print(f"💱 Convertendo {gas_amount_weth:.6f} WETH para gas...")
             
             # Preparar transação de withdraw com gas MÍNIMO
-            withdraw_tx = weth_contract.functions.withdraw(withdraw_amount).build_transaction({
+            withdraw_tx = await weth_contract.functions.withdraw(withdraw_amount).build_transaction({
                 'from': WALLET_ADDRESS,
                 'gas': 25000,  # Gas MÍNIMO
-                'gasPrice': web3_instance.to_wei(0.05, 'gwei'),  # Gas price ULTRA baixo
-                'nonce': web3_instance.eth.get_transaction_count(WALLET_ADDRESS)
+                **await FEE_ORACLE.get_fees(web3_instance, 'normal')
             })
             
             # Assinar e enviar
-            signed_tx = web3_instance.eth.account.sign_transaction(withdraw_tx, PRIVATE_KEY)
-            tx_hash = web3_instance.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = await self._send_transaction(web3_instance, withdraw_tx)
             
             print(f"✅ WETH convertido para gas: {tx_hash.hex()}")
             
@@ -339,8 +331,8 @@ class DEXHandler:
         Executa trade normal após ter ETH suficiente para gas
         """
         try:
-            await BASE_RPC_LIMITER.acquire()
-            web3_instance = self._get_web3_instance()
+            await BASE_RPC_LIMITER.acquire('eth_sendRawTransaction', lane=LANE_EXECUTION)
+            web3_instance = await self._get_web3_instance()
             
             router_contract = web3_instance.eth.contract(
                 address=router_address,
@@ -354,10 +346,10 @@ class DEXHandler:
             
             if is_buy:
                 # Compra: WETH -> Token
-                amounts_out = router_contract.functions.getAmountsOut(amount_wei, path).call()
+                amounts_out = await router_contract.functions.getAmountsOut(amount_wei, path).call()
                 min_amount_out = int(amounts_out[-1] * (1 - slippage / 100))
                 
-                transaction = router_contract.functions.swapExactTokensForTokens(
+                transaction = await router_contract.functions.swapExactTokensForTokens(
                     amount_wei,
                     min_amount_out,
                     path,
@@ -365,16 +357,15 @@ class DEXHandler:
                     deadline
                 ).build_transaction({
                     'from': WALLET_ADDRESS,
-                    'gas': 200000,
-                    'gasPrice': web3_instance.to_wei(0.1, 'gwei'),  # Gas ultra baixo
-                    'nonce': web3_instance.eth.get_transaction_count(WALLET_ADDRESS)
+                    'gas': GAS_MODEL.hot_limit(self._gas_key(router_address, token_address, is_buy), 200000),
+                    **await FEE_ORACLE.get_fees(web3_instance, 'high')
                 })
             else:
                 # Venda: Token -> WETH
-                amounts_out = router_contract.functions.getAmountsOut(amount_wei, path).call()
+                amounts_out = await router_contract.functions.getAmountsOut(amount_wei, path).call()
                 min_amount_out = int(amounts_out[-1] * (1 - slippage / 100))
                 
-                transaction = router_contract.functions.swapExactTokensForTokens(
+                transaction = await router_contract.functions.swapExactTokensForTokens(
                     amount_wei,
                     min_amount_out,
                     path,
@@ -382,14 +373,14 @@ class DEXHandler:
                     deadline
                 ).build_transaction({
                     'from': WALLET_ADDRESS,
-                    'gas': 200000,
-                    'gasPrice': web3_instance.to_wei(0.1, 'gwei'),
-                    'nonce': web3_instance.eth.get_transaction_count(WALLET_ADDRESS)
+                    'gas': GAS_MODEL.hot_limit(self._gas_key(router_address, token_address, is_buy), 200000),
+                    **await FEE_ORACLE.get_fees(web3_instance, 'high')
                 })
             
-            # Assinar e enviar transação
-            signed_txn = web3_instance.eth.account.sign_transaction(transaction, PRIVATE_KEY)
-            tx_hash = web3_instance.eth.send_raw_transaction(signed_txn.rawTransaction)
+            # Assinar e enviar transação (simulação pré-envio em paralelo com a assinatura)
+            tx_hash = await self._send_transaction(
+                web3_instance, transaction, self._swap_preflight(path[0], router_address)
+            )
             
             print(f"✅ Trade executado: {tx_hash.hex()}")
             BASE_RPC_LIMITER.handle_success()
@@ -411,6 +402,11 @@ class DEXHandler:
         Versão ULTRA otimizada - teste mínimo e rápido
         """
         try:
+            # Pool conhecido pelo motor local com reservas: sem RPC
+            if POOL_PRICER.has_liquidity(WETH_ADDRESS, token_address):
+                print(f"✅ Liquidez encontrada (reservas locais)")
+                return True
+            
             # Usar apenas uma quantidade mínima para teste ultra rápido
             test_amount = 10000000000000  # 0.00001 WETH (mínimo)
             
@@ -423,7 +419,14 @@ class DEXHandler:
                     
                 dex_info = self.dexs[dex_key]
                 try:
-                    await BASE_RPC_LIMITER.acquire()
+                    if dex_key == 'uniswap_v3':
+                        # V3: simulação local sobre o estado do pool
+                        if await self._get_v3_quote(WETH_ADDRESS, token_address, test_amount):
+                            print(f"✅ Liquidez encontrada em {dex_info['name']}")
+                            return True
+                        continue
+                    
+                    await BASE_RPC_LIMITER.acquire('eth_call')
                     
                     router_contract = self.web3.eth.contract(
                         address=dex_info['router'],
@@ -433,7 +436,7 @@ class DEXHandler:
                     # Testar apenas WETH -> Token (mais comum para novos tokens)
                     path = [WETH_ADDRESS, token_address]
                     
-                    amounts = router_contract.functions.getAmountsOut(test_amount, path).call()
+                    amounts = await router_contract.functions.getAmountsOut(test_amount, path).call()
                     
                     if len(amounts) >= 2 and amounts[-1] > 0:
                         print(f"✅ Liquidez encontrada em {dex_info['name']}")
@@ -455,82 +458,149 @@ class DEXHandler:
             print(f"❌ Erro ao verificar liquidez: {str(e)}")
             return False
 
-    async def get_best_price(self, token_address: str, amount_in: int, is_buy: bool = True) -> Tuple[str, int, str]:
-        """
-        Encontra o melhor preço entre todas as DEXs com rate limiting e verificação de liquidez
-        Returns: (dex_name, amount_out, router_address)
-        """
-        best_price = 0
-        best_dex = None
-        best_router = None
-        successful_queries = 0
-        
-        # Tentar múltiplos paths para encontrar liquidez
-        paths_to_try = []
-        
+    def _quote_paths(self, token_address: str, is_buy: bool) -> List[List[str]]:
+        """Paths testados na cotação, em ordem de preferência"""
         if is_buy:
             # Para compra: WETH -> Token
-            paths_to_try = [
+            return [
                 [WETH_ADDRESS, token_address],  # Direto
                 [WETH_ADDRESS, USDC_ADDRESS, token_address],  # Via USDC
                 [WETH_ADDRESS, USDT_ADDRESS, token_address],  # Via USDT
             ]
-        else:
-            # Para venda: Token -> WETH
-            paths_to_try = [
-                [token_address, WETH_ADDRESS],  # Direto
-                [token_address, USDC_ADDRESS, WETH_ADDRESS],  # Via USDC
-                [token_address, USDT_ADDRESS, WETH_ADDRESS],  # Via USDT
-            ]
+        # Para venda: Token -> WETH
+        return [
+            [token_address, WETH_ADDRESS],  # Direto
+            [token_address, USDC_ADDRESS, WETH_ADDRESS],  # Via USDC
+            [token_address, USDT_ADDRESS, WETH_ADDRESS],  # Via USDT
+        ]
+    
+    async def get_quote_matrix(self, token_address: str, amount_in: int, is_buy: bool = True,
+                               skip: Iterable[str] = ()) -> Dict[Tuple[str, Tuple[str, ...]], int]:
+        """
+        Cota todas as combinações DEX x path em um único aggregate3 (Multicall3)
+        skip: DEXs já cotadas localmente (fora da matriz)
+        Returns: {(dex_key, path): amount_out} - 0 quando a chamada falhou ou sem liquidez
+        """
+        paths = self._quote_paths(token_address, is_buy)
         
+        keys = []
+        calls = []
         for dex_key, dex_info in self.dexs.items():
+            if dex_key == 'uniswap_v3' or dex_key in skip:
+                continue  # SwapRouter02 não implementa getAmountsOut - cotado pelo V3_QUOTER
+            for path in paths:
+                keys.append((dex_key, tuple(path)))
+                calls.append((dex_info['router'], encode_get_amounts_out(amount_in, path)))
+        
+        await BASE_RPC_LIMITER.acquire('eth_call')  # Um único eth_call para toda a matriz
+        results = await self.multicall.aggregate3(calls)
+        BASE_RPC_LIMITER.handle_success()
+        
+        matrix = {}
+        for key, (success, return_data) in zip(keys, results):
+            amount_out = 0
+            if success and return_data:
+                try:
+                    amounts = decode_get_amounts_out(return_data)
+                    amount_out = amounts[-1] if len(amounts) >= 2 else 0
+                except Exception:
+                    amount_out = 0  # Retorno inválido (router sem getAmountsOut)
+            matrix[key] = amount_out
+        
+        return matrix
+    
+    async def _get_v3_quote(self, token_in: str, token_out: str, amount_in: int):
+        """Cotação Uniswap V3 local; aquece o cache do par na primeira vez"""
+        if not V3_QUOTER.is_warm(token_in, token_out):
             try:
-                await BASE_RPC_LIMITER.acquire()
-                
-                router_contract = self.web3.eth.contract(
-                    address=dex_info['router'],
-                    abi=self.get_router_abi()
-                )
-                
-                # Tentar diferentes paths até encontrar liquidez
-                for path in paths_to_try:
-                    try:
-                        amounts = router_contract.functions.getAmountsOut(amount_in, path).call()
-                        amount_out = amounts[-1]
-                        
-                        if amount_out > 0:  # Encontrou liquidez
-                            successful_queries += 1
-                            
-                            if amount_out > best_price:
-                                best_price = amount_out
-                                best_dex = dex_info['name']
-                                best_router = dex_info['router']
-                                
-                            path_str = " -> ".join([addr[:6] + "..." for addr in path])
-                            print(f"💰 {dex_info['name']} ({path_str}): {amount_out / 10**18:.6f} {'WETH' if not is_buy else 'tokens'}")
-                            BASE_RPC_LIMITER.handle_success()
-                            break  # Encontrou liquidez, não precisa testar outros paths
-                            
-                    except Exception as path_error:
-                        # Se este path falhou, tentar o próximo
-                        continue
-                
-                # Se chegou aqui sem break, não encontrou liquidez em nenhum path
-                if successful_queries == 0 or best_dex != dex_info['name']:
-                    print(f"⚠️ {dex_info['name']}: Sem liquidez em nenhum path")
-                
+                await BASE_RPC_LIMITER.acquire('eth_call', calls=4)  # getPool + 3 multicalls de estado
+                await V3_QUOTER.warm(await self._get_web3_instance(), token_in, token_out)
+                BASE_RPC_LIMITER.handle_success()
             except Exception as e:
-                error_msg = str(e)
-                if "429" in error_msg or "Too Many Requests" in error_msg:
+                if "429" in str(e) or "Too Many Requests" in str(e):
                     BASE_RPC_LIMITER.handle_429_error()
-                    print(f"🚫 Rate limit 429 detectado. Backoff: {BASE_RPC_LIMITER.current_backoff}s")
-                    print(f"⚠️ Rate limit em {dex_info['name']}, aguardando {BASE_RPC_LIMITER.current_backoff:.1f}s...")
-                    await asyncio.sleep(min(BASE_RPC_LIMITER.current_backoff, 3))  # Máximo 3s
-                elif "execution reverted" in error_msg.lower():
-                    print(f"⚠️ {dex_info['name']}: Sem par de trading para este token")
-                else:
-                    print(f"⚠️ {dex_info['name']}: {error_msg[:50]}...")
-                continue
+                print(f"⚠️ Erro ao carregar pools Uniswap V3: {str(e)[:50]}...")
+                return None
+        
+        return V3_QUOTER.quote(token_in, token_out, amount_in)
+    
+    async def get_best_price(self, token_address: str, amount_in: int, is_buy: bool = True) -> Tuple[str, int, str]:
+        """
+        Encontra o melhor preço entre todas as DEXs: Uniswap V3 e pools V2 conhecidos são cotados
+        localmente; os routers V2 sem pool conhecido em uma única chamada Multicall3
+        Returns: (dex_name, amount_out, router_address)
+        """
+        best_price = 0
+        best_dex = None
+        best_router = None
+        successful_queries = 0
+        
+        token_in, token_out = (WETH_ADDRESS, token_address) if is_buy else (token_address, WETH_ADDRESS)
+        unit = 'WETH' if not is_buy else 'tokens'
+        
+        # Uniswap V3: simulação tick a tick sobre o estado em cache (todos os fee tiers)
+        if 'uniswap_v3' in self.dexs:
+            v3_quote = await self._get_v3_quote(token_in, token_out, amount_in)
+            if v3_quote:
+                successful_queries += 1
+                best_price = v3_quote.amount_out
+                best_dex = self.dexs['uniswap_v3']['name']
+                best_router = self.dexs['uniswap_v3']['router']
+                print(f"⚡ Uniswap V3 (local, fee {v3_quote.fee / 10000:.2f}%): {v3_quote.amount_out / 10**18:.6f} {unit}")
+        
+        # Pools V2 com reservas em memória: sem RPC
+        priced_locally = set()
+        local_quote = POOL_PRICER.best_quote(token_in, token_out, amount_in)
+        if local_quote and local_quote.dex in self.dexs:
+            successful_queries += 1
+            priced_locally = {pool.dex for pool in POOL_PRICER.pools_for(token_in, token_out)
+                              if pool.reserve0 > 0 and pool.reserve1 > 0}
+            dex_info = self.dexs[local_quote.dex]
+            print(f"⚡ {dex_info['name']} (local): {local_quote.amount_out / 10**18:.6f} {unit} "
+                  f"- impacto {local_quote.price_impact:.2f}%")
+            if local_quote.amount_out > best_price:
+                best_price = local_quote.amount_out
+                best_dex = dex_info['name']
+                best_router = dex_info['router']
+        
+        # Routers V2 sem pool conhecido: um aggregate3 (nenhum RPC se todos foram cotados localmente)
+        remaining = [dex_key for dex_key in self.dexs if dex_key != 'uniswap_v3' and dex_key not in priced_locally]
+        if not remaining:
+            return best_dex, best_price, best_router
+        
+        try:
+            quote_matrix = await self.get_quote_matrix(token_address, amount_in, is_buy, skip=priced_locally)
+        except Exception as e:
+            error_msg = str(e)
+            if "429" in error_msg or "Too Many Requests" in error_msg:
+                BASE_RPC_LIMITER.handle_429_error()
+                print(f"⚠️ Rate limit na cotação, aguardando {BASE_RPC_LIMITER.current_backoff:.1f}s...")
+                await asyncio.sleep(min(BASE_RPC_LIMITER.current_backoff, 3))  # Máximo 3s
+            else:
+                print(f"⚠️ Erro na cotação Multicall3: {error_msg[:50]}...")
+            quote_matrix = {}
+        
+        paths_to_try = self._quote_paths(token_address, is_buy)
+        
+        for dex_key in remaining:
+            dex_info = self.dexs[dex_key]
+            
+            # Primeiro path com liquidez em cada DEX (ordem de preferência)
+            for path in paths_to_try:
+                amount_out = quote_matrix.get((dex_key, tuple(path)), 0)
+                if amount_out > 0:
+                    successful_queries += 1
+                    
+                    if amount_out > best_price:
+                        best_price = amount_out
+                        best_dex = dex_info['name']
+                        best_router = dex_info['router']
+                    
+                    path_str = " -> ".join([addr[:6] + "..." for addr in path])
+                    print(f"💰 {dex_info['name']} ({path_str}): {amount_out / 10**18:.6f} {'WETH' if not is_buy else 'tokens'}")
+                    break
+            else:
+                print(f"⚠️ {dex_info['name']}: Sem liquidez em nenhum path")
         
         if successful_queries == 0:
             print("⚠️ Nenhuma DEX retornou preço válido - assumindo token muito novo")
@@ -541,6 +611,192 @@ class DEXHandler:
             
         return best_dex, best_price, best_router
     
+    async def _send_transaction(self, web3_instance, transaction: Dict, preflight=None):
+        """
+        Assina com nonce reservado localmente (sem get_transaction_count por transação) e
+        transmite a mesma raw transaction para todos os endpoints em paralelo.
+        preflight(transaction) roda em paralelo com a assinatura; se falhar, nada é enviado
+        """
+        start = time.perf_counter()
+        transaction['nonce'] = await NONCE_MANAGER.reserve(web3_instance)
+        simulation = None
+        if preflight is not None:
+            simulation = asyncio.create_task(preflight(dict(transaction)))
+            await asyncio.sleep(0)  # eth_call sai antes da assinatura (CPU) e volta enquanto ela roda
+        try:
+            signed_tx = sign_transaction(self.account, transaction)
+            self.last_sign_ms = (time.perf_counter() - start) * 1000
+            if simulation is not None:
+                await simulation
+            broadcast = await TX_BROADCASTER.broadcast(signed_tx.rawTransaction)
+        except BaseException as e:
+            if simulation is not None and not simulation.done():
+                simulation.cancel()
+            await NONCE_MANAGER.release(web3_instance, transaction['nonce'], e if isinstance(e, Exception) else None)
+            raise
+        
+        NONCE_MANAGER.mark_sent(transaction['nonce'])
+        return broadcast.tx_hash
+    
+    def _swap_function(self, router_contract, amount_in: int, amount_out_min: int,
+                       path: List[str], deadline: int, v3_quote=None):
+        """Função de swap do router: exactInputSingle no Uniswap V3, swapExactTokensForTokens nos V2"""
+        if router_contract.address.lower() == UNISWAP_V3_ROUTER.lower():
+            fee = v3_quote.fee if v3_quote else 3000  # Tier mais comum quando o par não está em cache
+            return router_contract.functions.exactInputSingle(
+                (path[0], path[-1], fee, WALLET_ADDRESS, amount_in, amount_out_min, 0)
+            )
+        
+        return router_contract.functions.swapExactTokensForTokens(
+            amount_in,
+            amount_out_min,
+            path,
+            WALLET_ADDRESS,
+            deadline
+        )
+    
+    def _gas_key(self, router_address: str, token_address: str, is_buy: bool):
+        """Chave do modelo de gas (hash do bytecode pelos metadados locais, sem RPC)"""
+        meta = TOKEN_METADATA.get(token_address)
+        return gas_key(router_address, is_buy, meta.code_hash if meta else None)
+    
+    def _swap_preflight(self, token_in: str, router_address: str):
+        """
+        Simulação obrigatória do swap contra o estado 'pending'. Aprovação do mesmo par ainda
+        não incluída pode fazer a simulação reverter: aguarda a aprovação e simula de novo
+        """
+        async def preflight(transaction: Dict):
+            try:
+                return await PREFLIGHT.simulate(self.web3, transaction, WALLET_ADDRESS)
+            except PreflightError:
+                approval = ALLOWANCES.pending_approval(token_in, router_address)
+                if approval is None:
+                    raise
+                print("⏳ Aprovação pendente: aguardando inclusão antes de simular o swap novamente...")
+                await self._wait_for_tx(approval)
+                return await PREFLIGHT.simulate(self.web3, transaction, WALLET_ADDRESS)
+        
+        return preflight
+    
+    async def _wait_for_tx(self, tx_hash):
+        """
+        Aguarda a inclusão no rastreador compartilhado. Timeout pode ser transação descartada do
+        mempool: ressincroniza o nonce para que o próximo envio preencha a lacuna
+        """
+        result = await TX_TRACKER.wait(self.web3, tx_hash)
+        if result.status == 'timeout':
+            try:
+                await NONCE_MANAGER.resync(self.web3)
+            except Exception as e:
+                print(f"⚠️ Erro ao ressincronizar nonce: {str(e)[:80]}")
+        return result
+    
+    async def _send_and_confirm(self, transaction: Dict, hot_path: bool = False, gas_model_key=None,
+                                preflight=None, on_sent=None) -> Optional[str]:
+        """
+        Assina e envia com retry; aguarda a confirmação no rastreador compartilhado.
+        on_sent() roda uma vez, após o primeiro broadcast aceito (débito de allowance/saldo locais)
+        """
+        max_retries = 3
+        sent = False
+        for attempt in range(max_retries):
+            try:
+                # Nonce reservado a cada tentativa (tentativa falha devolve o nonce)
+                tx_hash = await self._send_transaction(self.web3, transaction, preflight)
+                if on_sent is not None and not sent:
+                    on_sent()
+                sent = True
+                
+                print(f"🚀 Transação enviada: {tx_hash.hex()}")
+                if preflight is not None:
+                    print(f"🧪 Simulação pré-envio: OK em {PREFLIGHT.last_latency * 1000:.0f} ms (paralela à assinatura)")
+                if hot_path and attempt == 0:
+                    local_ms = SWAP_TEMPLATES.last_build_ms + self.last_sign_ms
+                    print(f"⚡ Caminho rápido: calldata + nonce + assinatura em {local_ms:.2f} ms de CPU local")
+                
+                # Aguardar confirmação (rastreador compartilhado: o restante do bot segue rodando)
+                result = await self._wait_for_tx(tx_hash)
+                ALLOWANCES.on_receipt(result.receipt)  # Approval emitido pelo transferFrom ressincroniza o cache
+                if result.status == 'confirmed':
+                    print(f"✅ Transação confirmada com sucesso! (bloco {result.block_number})")
+                    if gas_model_key is not None:
+                        GAS_MODEL.record(gas_model_key, result.receipt['gasUsed'])
+                    return tx_hash.hex()
+                elif result.status == 'reverted':
+                    print(f"❌ Transação falhou na blockchain")
+                    return None
+                else:
+                    print(f"⚠️ Timeout aguardando confirmação ({TRANSACTION_TIMEOUT}s)")
+                    # Retornar hash mesmo sem confirmação para monitoramento
+                    return tx_hash.hex()
+                
+            except PreflightError as simulation_error:
+                # Revert previsto: não chega à chain nem gasta gas (nova tentativa reverteria igual)
+                print(f"🛑 Swap abortado antes do envio: {simulation_error}")
+                return None
+            except Exception as send_error:
+                print(f"❌ Tentativa {attempt + 1}/{max_retries} falhou: {str(send_error)}")
+                if attempt < max_retries - 1:
+                    # Aguardar antes da próxima tentativa
+                    await asyncio.sleep(2)
+                    # Substituição exige fees maiores: +12,5% ou o alvo atual de urgência alta
+                    FEE_ORACLE.bump(transaction)
+                else:
+                    print(f"❌ Todas as tentativas falharam")
+                    return None
+        
+        return None
+    
+    async def prepare_swap_templates(self, amount_in: int) -> bool:
+        """
+        Pré-codifica a compra em todos os routers e pré-busca gas, allowance, saldo e nonce
+        (fora do caminho crítico; renovado periodicamente)
+        """
+        try:
+            eth_balance = float(self.web3.from_wei(await self.web3.eth.get_balance(WALLET_ADDRESS), 'ether'))
+            if eth_balance < 0.00005:
+                SWAP_TEMPLATES.clear()  # Sem gas: caminho normal cuida da conversão WETH->ETH
+                return False
+            
+            # Mesmo ajuste de gas do caminho normal de compra (fees vêm do oráculo a cada envio)
+            gas_limit, urgency = (50000, 'normal') if eth_balance < 0.0001 else (100000, 'high')
+            
+            routers = [dex['router'] for dex in self.dexs.values()]
+            await SWAP_TEMPLATES.prepare(self.web3, routers, amount_in, gas_limit * 2, urgency)
+            return True
+        except Exception as e:
+            print(f"⚠️ Erro ao preparar templates de swap: {str(e)[:80]}")
+            SWAP_TEMPLATES.clear()
+            return False
+    
+    def _hot_buy_transaction(self, token_address: str, amount_in: int, router_address: str,
+                             slippage: float) -> Optional[Dict]:
+        """Compra a partir do template: mínimo de saída pelas cotações locais, sem RPC"""
+        if not SWAP_TEMPLATES.is_ready(router_address, amount_in):
+            return None
+        
+        amount_out, fee = 0, None
+        if router_address.lower() == UNISWAP_V3_ROUTER.lower():
+            v3_quote = V3_QUOTER.quote(WETH_ADDRESS, token_address, amount_in)
+            if v3_quote:
+                amount_out, fee = v3_quote.amount_out, v3_quote.fee
+        else:
+            local_quote = POOL_PRICER.best_quote(WETH_ADDRESS, token_address, amount_in)
+            dex_info = self.dexs.get(local_quote.dex) if local_quote else None
+            if dex_info and dex_info['router'].lower() == router_address.lower():
+                amount_out = local_quote.amount_out
+        
+        # Mesmo slippage do caminho normal; token sem cotação local aceita qualquer quantidade
+        effective_slippage = min(slippage + 5, 25)
+        amount_out_min = int(amount_out * (100 - effective_slippage) / 100) if amount_out > 0 else 1
+        transaction = SWAP_TEMPLATES.build_transaction(
+            router_address, Web3.to_checksum_address(token_address), amount_in, max(amount_out_min, 1), fee
+        )
+        if transaction is not None:
+            # Gas aprendido dos recibos (bytecode/router já vistos); template mantém o padrão
+            transaction['gas'] = GAS_MODEL.hot_limit(self._gas_key(router_address, token_address, True), transaction['gas'])
+        return transaction
+    
     async def execute_swap(self, token_address: str, amount_in: int, router_address: str, 
                     is_buy: bool = True, slippage: float = SLIPPAGE_TOLERANCE) -> Optional[str]:
         """
@@ -553,6 +809,16 @@ class DEXHandler:
             
             print(f"🔄 Iniciando swap: {'Compra' if is_buy else 'Venda'} de {self.web3.from_wei(amount_in, 'ether'):.6f} {'WETH' if is_buy else 'tokens'}")
             
+            # Caminho rápido: calldata pré-codificada, saldo/allowance/fee pré-buscados (sem RPC antes do broadcast)
+            if is_buy:
+                transaction = self._hot_buy_transaction(token_address, amount_in, router_address, slippage)
+                if transaction is not None:
+                    return await self._send_and_confirm(
+                        transaction, hot_path=True, gas_model_key=self._gas_key(router_address, token_address, True),
+                        preflight=self._swap_preflight(WETH_ADDRESS, router_address),
+                        on_sent=lambda: SWAP_TEMPLATES.commit(router_address, amount_in)
+                    )
+            
             # Verificar saldos antes da transação
             if is_buy:
                 weth_balance = await self.get_weth_balance()
@@ -561,11 +827,11 @@ class DEXHandler:
                     print(f"❌ Saldo WETH insuficiente: {weth_balance:.6f} < {required_weth:.6f}")
                     return None
             
-            # Verificar ETH para gas com rate limiting
-            await BASE_RPC_LIMITER.acquire()
-            web3_instance = self._get_web3_instance()
+            # Verificar ETH para gas com rate limiting (faixa de execução: nunca atrás de scans)
+            await BASE_RPC_LIMITER.acquire('eth_getBalance', lane=LANE_EXECUTION)
+            web3_instance = await self._get_web3_instance()
             
-            eth_balance = web3_instance.eth.get_balance(WALLET_ADDRESS)
+            eth_balance = await web3_instance.eth.get_balance(WALLET_ADDRESS)
             eth_balance_eth = web3_instance.from_wei(eth_balance, 'ether')
             min_eth_for_gas = 0.00005  # Aumentado para forçar conversão
             
@@ -576,6 +842,7 @@ class DEXHandler:
                     print("❌ Não foi possível obter ETH suficiente para gas")
                     # Tentar usar WETH diretamente para gas se conversão falhar
                     print("🔄 Tentando usar WETH diretamente para transação...")
+                    amount = float(web3_instance.from_wei(amount_in, 'ether'))
                     return await self._execute_trade_with_weth_gas(router_address, token_address, amount, is_buy, slippage)
             
             router_contract = self.web3.eth.contract(
@@ -588,8 +855,14 @@ class DEXHandler:
             
             # Calcular amount_out_min com slippage mais flexível
             amount_out_min = 1  # Valor mínimo padrão para tokens novos
+            is_v3 = router_address.lower() == UNISWAP_V3_ROUTER.lower()
+            v3_quote = V3_QUOTER.quote(path[0], path[-1], amount_in) if is_v3 else None
             try:
-                amounts = router_contract.functions.getAmountsOut(amount_in, path).call()
+                if is_v3:
+                    # SwapRouter02 não tem getAmountsOut: usar a cotação V3 local
+                    amounts = [amount_in, v3_quote.amount_out] if v3_quote else []
+                else:
+                    amounts = await router_contract.functions.getAmountsOut(amount_in, path).call()
                 if len(amounts) >= 2 and amounts[-1] > 0:
                     # Usar slippage mais agressivo para memecoins
                     effective_slippage = min(slippage + 5, 25)  # +5% extra, máximo 25%
@@ -607,148 +880,63 @@ class DEXHandler:
             # Preparar transação
             if is_buy:
                 # Comprar token com WETH (não ETH direto)
-                # Primeiro precisa aprovar WETH se necessário
-                weth_abi = [
-                    {"constant": False, "inputs": [{"name": "_spender", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "approve", "outputs": [{"name": "", "type": "bool"}], "type": "function"},
-                    {"constant": True, "inputs": [{"name": "_owner", "type": "address"}, {"name": "_spender", "type": "address"}], "name": "allowance", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}
-                ]
+                # Usar gas mais conservador para saldos baixos (vale para aprovação e swap)
+                eth_balance = await self.web3.eth.get_balance(WALLET_ADDRESS)
+                eth_balance_eth = float(self.web3.from_wei(eth_balance, 'ether'))
                 
-                weth_contract = self.web3.eth.contract(address=WETH_ADDRESS, abi=weth_abi)
-                
-                # Verificar allowance atual
-                current_allowance = weth_contract.functions.allowance(WALLET_ADDRESS, router_address).call()
+                # Ajustar gas baseado no saldo disponível
+                if eth_balance_eth < 0.0001:  # Saldo muito baixo
+                    gas_limit = 50000
+                    fees = await FEE_ORACLE.get_fees(self.web3, 'normal')
+                else:
+                    gas_limit = 100000
+                    fees = await FEE_ORACLE.get_fees(self.web3, 'high')
                 
-                if current_allowance < amount_in:
-                    # Aprovar WETH para o router
-                    # Usar gas mais conservador para saldos baixos
-                    eth_balance = self.web3.eth.get_balance(WALLET_ADDRESS)
-                    eth_balance_eth = float(self.web3.from_wei(eth_balance, 'ether'))
-                    
-                    # Ajustar gas baseado no saldo disponível
-                    if eth_balance_eth < 0.0001:  # Saldo muito baixo
-                        gas_limit = 50000
-                        gas_price = self.web3.to_wei(1, 'gwei')  # Gas price muito baixo
-                    else:
-                        gas_limit = 100000
-                        gas_price = self.web3.to_wei(MAX_GAS_PRICE, 'gwei')
-                    
-                    approve_tx = weth_contract.functions.approve(
-                        router_address, 
-                        amount_in * 2  # Aprovar um pouco mais para futuras transações
-                    ).build_transaction({
-                        'from': WALLET_ADDRESS,
-                        'gas': gas_limit,
-                        'gasPrice': gas_price,
-                        'nonce': self.web3.eth.get_transaction_count(WALLET_ADDRESS)
-                    })
-                    
-                    # Assinar e enviar aprovação
-                    signed_approve = self.web3.eth.account.sign_transaction(approve_tx, PRIVATE_KEY)
-                    approve_hash = self.web3.eth.send_raw_transaction(signed_approve.rawTransaction)
+                # WETH normalmente já aprovado na inicialização (allowance em cache, sem RPC)
+                approve_hash = await self.ensure_allowance(WETH_ADDRESS, router_address, amount_in, gas_limit, fees)
+                if approve_hash is not None:
                     print(f"🔓 Aprovação WETH enviada: {approve_hash.hex()}")
-                    
-                    # Aguardar confirmação da aprovação
-                    time.sleep(3)
+                    # Swap sai no mesmo tick com o nonce seguinte: o nó executa na ordem
                 
-                # Agora fazer o swap usando swapExactTokensForTokens
-                transaction = router_contract.functions.swapExactTokensForTokens(
-                    amount_in,
-                    amount_out_min,
-                    path,
-                    WALLET_ADDRESS,
-                    deadline
+                # Agora fazer o swap (swapExactTokensForTokens ou exactInputSingle no V3)
+                swap_gas = await self.estimate_gas_for_swap(
+                    token_address, amount_in, router_address, True, default=gas_limit * 2, v3_quote=v3_quote
+                )
+                transaction = await self._swap_function(
+                    router_contract, amount_in, amount_out_min, path, deadline, v3_quote
                 ).build_transaction({
                     'from': WALLET_ADDRESS,
-                    'gas': gas_limit * 2,  # Usar o mesmo gas ajustado
-                    'gasPrice': gas_price,
-                    'nonce': self.web3.eth.get_transaction_count(WALLET_ADDRESS)
+                    'gas': swap_gas,
+                    **fees
                 })
             else:
                 # Vender token por WETH
-                # Primeiro aprovar o token se necessário
-                token_abi = [
-                    {"constant": False, "inputs": [{"name": "_spender", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "approve", "outputs": [{"name": "", "type": "bool"}], "type": "function"},
-                    {"constant": True, "inputs": [{"name": "_owner", "type": "address"}, {"name": "_spender", "type": "address"}], "name": "allowance", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}
-                ]
-                
-                token_contract = self.web3.eth.contract(address=token_address, abi=token_abi)
-                
-                # Verificar allowance atual
-                current_allowance = token_contract.functions.allowance(WALLET_ADDRESS, router_address).call()
-                
-                if current_allowance < amount_in:
-                    # Aprovar token para o router
-                    approve_tx = token_contract.functions.approve(
-                        router_address, 
-                        amount_in * 2  # Aprovar um pouco mais
-                    ).build_transaction({
-                        'from': WALLET_ADDRESS,
-                        'gas': 100000,
-                        'gasPrice': self.web3.to_wei(MAX_GAS_PRICE, 'gwei'),
-                        'nonce': self.web3.eth.get_transaction_count(WALLET_ADDRESS)
-                    })
-                    
-                    # Assinar e enviar aprovação
-                    signed_approve = self.web3.eth.account.sign_transaction(approve_tx, PRIVATE_KEY)
-                    approve_hash = self.web3.eth.send_raw_transaction(signed_approve.rawTransaction)
+                # Primeiro aprovar o token se necessário (uma vez por token/router)
+                approve_hash = await self.ensure_allowance(
+                    token_address, router_address, amount_in, APPROVAL_GAS_LIMIT,
+                    await FEE_ORACLE.get_fees(self.web3, 'high')
+                )
+                if approve_hash is not None:
                     print(f"🔓 Aprovação token enviada: {approve_hash.hex()}")
-                    
-                    # Aguardar confirmação da aprovação
-                    time.sleep(3)
+                    # Swap sai no mesmo tick com o nonce seguinte: o nó executa na ordem
                 
                 # Fazer swap de token para WETH
-                transaction = router_contract.functions.swapExactTokensForTokens(
-                    amount_in,
-                    amount_out_min,
-                    path,
-                    WALLET_ADDRESS,
-                    deadline
+                swap_gas = await self.estimate_gas_for_swap(
+                    token_address, amount_in, router_address, False, default=DEFAULT_GAS_LIMIT, v3_quote=v3_quote
+                )
+                transaction = await self._swap_function(
+                    router_contract, amount_in, amount_out_min, path, deadline, v3_quote
                 ).build_transaction({
                     'from': WALLET_ADDRESS,
-                    'gas': DEFAULT_GAS_LIMIT,
-                    'gasPrice': self.web3.to_wei(MAX_GAS_PRICE, 'gwei'),
-                    'nonce': self.web3.eth.get_transaction_count(WALLET_ADDRESS)
+                    'gas': swap_gas,
+                    **await FEE_ORACLE.get_fees(self.web3, 'high')
                 })
             
-            # Assinar e enviar transação com retry logic
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    # Atualizar nonce para cada tentativa
-                    transaction['nonce'] = self.web3.eth.get_transaction_count(WALLET_ADDRESS)
-                    
-                    signed_txn = self.web3.eth.account.sign_transaction(transaction, PRIVATE_KEY)
-                    tx_hash = self.web3.eth.send_raw_transaction(signed_txn.rawTransaction)
-                    
-                    print(f"🚀 Transação enviada: {tx_hash.hex()}")
-                    
-                    # Aguardar confirmação básica
-                    try:
-                        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
-                        if receipt.status == 1:
-                            print(f"✅ Transação confirmada com sucesso!")
-                            return tx_hash.hex()
-                        else:
-                            print(f"❌ Transação falhou na blockchain")
-                            return None
-                    except Exception as wait_error:
-                        print(f"⚠️ Timeout aguardando confirmação: {wait_error}")
-                        # Retornar hash mesmo sem confirmação para monitoramento
-                        return tx_hash.hex()
-                    
-                except Exception as send_error:
-                    print(f"❌ Tentativa {attempt + 1}/{max_retries} falhou: {str(send_error)}")
-                    if attempt < max_retries - 1:
-                        # Aguardar antes da próxima tentativa
-                        await asyncio.sleep(2)
-                        # Aumentar gas price para próxima tentativa
-                        if 'gasPrice' in transaction:
-                            transaction['gasPrice'] = int(transaction['gasPrice'] * 1.2)
-                    else:
-                        print(f"❌ Todas as tentativas falharam")
-                        return None
-            
-            return None
+            return await self._send_and_confirm(
+                transaction, gas_model_key=self._gas_key(router_address, token_address, is_buy),
+                preflight=self._swap_preflight(path[0], router_address),
+                on_sent=lambda: ALLOWANCES.consume(path[0], router_address, amount_in)  # Swap consome a aprovação
+            )
             
         except Exception as e:
             error_msg = str(e)
@@ -787,7 +975,7 @@ class DEXHandler:
         
         return liquidity_info
     
-    def test_all_dexs(self) -> Dict[str, bool]:
+    async def test_all_dexs(self) -> Dict[str, bool]:
         """Testa conectividade com todas as DEXs"""
         results = {}
         
@@ -797,7 +985,7 @@ class DEXHandler:
             try:
                 # Teste mais simples: verificar se o contrato existe
                 router_address = dex_info['router']
-                code = self.web3.eth.get_code(router_address)
+                code = await self.web3.eth.get_code(router_address)
                 
                 if len(code) > 0:
                     # Contrato existe, tentar uma chamada simples
@@ -811,7 +999,7 @@ class DEXHandler:
                         test_path = [WETH_ADDRESS, USDC_ADDRESS]
                         test_amount = self.web3.to_wei(0.0001, 'ether')  # Valor menor
                         
-                        amounts = router_contract.functions.getAmountsOut(test_amount, test_path).call()
+                        amounts = await router_contract.functions.getAmountsOut(test_amount, test_path).call()
                         
                         results[dex_info['name']] = True
                         print(f"✅ {dex_info['name']}: Conectado")
@@ -834,21 +1022,65 @@ class DEXHandler:
         
         return results
     
+    async def _approve(self, token_address: str, spender: str, value: int, gas_limit: int, fees: Dict):
+        """Envia approve sem aguardar; o cache assume o novo valor até o desfecho no rastreador"""
+        approve_abi = [
+            {"constant": False, "inputs": [{"name": "_spender", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "approve", "outputs": [{"name": "", "type": "bool"}], "type": "function"}
+        ]
+        token_contract = self.web3.eth.contract(address=Web3.to_checksum_address(token_address), abi=approve_abi)
+        approve_tx = await token_contract.functions.approve(spender, value).build_transaction({
+            'from': WALLET_ADDRESS,
+            'gas': gas_limit,
+            **fees
+        })
+        
+        tx_hash = await self._send_transaction(self.web3, approve_tx)
+        ALLOWANCES.mark_pending(token_address, spender, value, tx_hash.hex())
+        
+        def on_result(future):
+            result = None if future.cancelled() or future.exception() else future.result()
+            ALLOWANCES.on_approval_result(token_address, spender, result is not None and result.success)
+            if result is not None:
+                ALLOWANCES.on_receipt(result.receipt)
+        
+        TX_TRACKER.track(self.web3, tx_hash).add_done_callback(on_result)
+        return tx_hash
+    
+    async def ensure_allowance(self, token_address: str, spender: str, amount: int, gas_limit: int, fees: Dict):
+        """
+        Garante allowance >= amount pelo cache local: aprova (máximo, por padrão) só quando falta.
+        Returns: hash da aprovação enviada ou None se já havia allowance
+        """
+        if await ALLOWANCES.fetch(self.web3, token_address, spender) >= amount:
+            return None
+        return await self._approve(token_address, spender, ALLOWANCES.approval_amount(amount), gas_limit, fees)
+    
+    async def preapprove_weth(self, amount_in: int) -> int:
+        """
+        Aprova WETH para todos os routers habilitados na inicialização (fora do caminho de compra).
+        Returns: número de aprovações enviadas
+        """
+        routers = [dex['router'] for dex in self.dexs.values()]
+        current = await ALLOWANCES.read_many(self.web3, [(WETH_ADDRESS, router) for router in routers])
+        missing = [router for router, value in zip(routers, current)
+                   if value < (UNLIMITED_THRESHOLD if APPROVE_MAX else amount_in)]
+        if not missing:
+            return 0
+        
+        fees = await FEE_ORACLE.get_fees(self.web3, 'normal')
+        for router in missing:
+            tx_hash = await self._approve(WETH_ADDRESS, router, ALLOWANCES.approval_amount(amount_in), APPROVAL_GAS_LIMIT, fees)
+            print(f"🔓 WETH pré-aprovado para {router[:10]}...: {tx_hash.hex()}")
+        return len(missing)
+    
     async def approve_token_if_needed(self, token_address: str, router_address: str, amount: int) -> bool:
         """
         Aprova token para o router se necessário
         Returns: True se aprovação foi bem-sucedida ou não necessária
         """
         try:
-            token_abi = [
-                {"constant": True, "inputs": [{"name": "_owner", "type": "address"}, {"name": "_spender", "type": "address"}], "name": "allowance", "outputs": [{"name": "", "type": "uint256"}], "type": "function"},
-                {"constant": False, "inputs": [{"name": "_spender", "type": "address"}, {"name": "_value", "type": "uint256"}], "name": "approve", "outputs": [{"name": "", "type": "bool"}], "type": "function"}
-            ]
-            
-            token_contract = self.web3.eth.contract(address=token_address, abi=token_abi)
-            
-            # Verificar allowance atual
-            current_allowance = token_contract.functions.allowance(WALLET_ADDRESS, router_address).call()
+            # Verificar allowance atual (cache local; contrato lido só na primeira vez)
+            current_allowance = await ALLOWANCES.fetch(self.web3, token_address, router_address)
             
             if current_allowance >= amount:
                 print(f"✅ Token já aprovado: {current_allowance} >= {amount}")
@@ -856,33 +1088,26 @@ class DEXHandler:
             
             print(f"🔓 Aprovando token {token_address[:10]}... para {amount}")
             
-            # Preparar transação de aprovação
-            approve_tx = token_contract.functions.approve(
-                router_address,
-                amount * 10  # Aprovar 10x mais para evitar múltiplas aprovações
-            ).build_transaction({
-                'from': WALLET_ADDRESS,
-                'gas': 100000,
-                'gasPrice': self.web3.to_wei(MAX_GAS_PRICE, 'gwei'),
-                'nonce': self.web3.eth.get_transaction_count(WALLET_ADDRESS)
-            })
-            
-            # Assinar e enviar
-            signed_tx = self.web3.eth.account.sign_transaction(approve_tx, PRIVATE_KEY)
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            tx_hash = await self.ensure_allowance(
+                token_address, router_address, amount, APPROVAL_GAS_LIMIT,
+                await FEE_ORACLE.get_fees(self.web3, 'normal')
+            )
+            if tx_hash is None:
+                # Allowance mudou desde a leitura acima (ex.: aprovação pendente confirmada)
+                print(f"✅ Token já aprovado (allowance atualizado)")
+                return True
             
             print(f"🔓 Aprovação enviada: {tx_hash.hex()}")
             
             # Aguardar confirmação
-            try:
-                receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
-                if receipt.status == 1:
-                    print(f"✅ Token aprovado com sucesso!")
-                    return True
-                else:
-                    print(f"❌ Aprovação falhou")
-                    return False
-            except Exception as wait_error:
+            result = await self._wait_for_tx(tx_hash)
+            if result.status == 'confirmed':
+                print(f"✅ Token aprovado com sucesso!")
+                return True
+            elif result.status == 'reverted':
+                print(f"❌ Aprovação falhou")
+                return False
+            else:
                 print(f"⚠️ Timeout na aprovação, mas pode ter sido processada")
                 return True  # Assumir sucesso para continuar
                 
@@ -894,16 +1119,15 @@ class DEXHandler:
         """Obtém saldo de um token específico"""
         try:
             token_abi = [
-                {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"}
+                {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"}
             ]
             
             token_contract = self.web3.eth.contract(address=token_address, abi=token_abi)
             
-            balance_wei = token_contract.functions.balanceOf(WALLET_ADDRESS).call()
+            balance_wei = await token_contract.functions.balanceOf(WALLET_ADDRESS).call()
             
             try:
-                decimals = token_contract.functions.decimals().call()
+                decimals = await TOKEN_METADATA.get_decimals(self.web3, token_address)
             except:
                 decimals = 18  # Padrão
             
@@ -914,30 +1138,22 @@ class DEXHandler:
             print(f"❌ Erro ao obter saldo do token: {e}")
             return 0.0
     
-    async def estimate_gas_for_swap(self, token_address: str, amount_in: int, router_address: str, is_buy: bool = True) -> int:
-        """Estima gas necessário para o swap"""
-        try:
-            router_contract = self.web3.eth.contract(
-                address=router_address,
-                abi=self.get_router_abi()
-            )
-            
-            path = [WETH_ADDRESS, token_address] if is_buy else [token_address, WETH_ADDRESS]
-            deadline = int(time.time()) + 300
-            
-            if is_buy:
-                gas_estimate = router_contract.functions.swapExactTokensForTokens(
-                    amount_in, 1, path, WALLET_ADDRESS, deadline
-                ).estimate_gas({'from': WALLET_ADDRESS})
-            else:
-                gas_estimate = router_contract.functions.swapExactTokensForTokens(
-                    amount_in, 1, path, WALLET_ADDRESS, deadline
-                ).estimate_gas({'from': WALLET_ADDRESS})
-            
-            # Adicionar margem de segurança
-            return int(gas_estimate * 1.2)
-            
-        except Exception as e:
-            print(f"⚠️ Não foi possível estimar gas: {e}")
-            # Retornar valor padrão
-            return DEFAULT_GAS_LIMIT
\ No newline at end of file
+    async def estimate_gas_for_swap(self, token_address: str, amount_in: int, router_address: str, is_buy: bool = True,
+                                    default: int = DEFAULT_GAS_LIMIT, v3_quote=None) -> int:
+        """
+        Gas limit do swap: p99 + margem dos recibos da mesma combinação (router, direção, bytecode);
+        estimate_gas só para combinações nunca vistas
+        """
+        router_contract = self.web3.eth.contract(
+            address=router_address,
+            abi=self.get_router_abi()
+        )
+        path = [WETH_ADDRESS, token_address] if is_buy else [token_address, WETH_ADDRESS]
+        deadline = int(time.time()) + 300
+        swap_function = self._swap_function(router_contract, amount_in, 1, path, deadline, v3_quote)
+        
+        return await GAS_MODEL.get_limit(
+            self._gas_key(router_address, token_address, is_buy),
+            lambda: swap_function.estimate_gas({'from': WALLET_ADDRESS}),
+            default
+        )
\ No newline at end of file
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Decodificadores de eventos de criação de pools por DEX
+Registro indexado por (factory, topic0) com codecs ABI pré-compilados
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+from eth_abi.registry import registry
+from eth_abi.decoding import ContextFramesBytesIO
+from web3 import Web3
+
+from config import UNISWAP_V3_FACTORY, AERODROME_FACTORY, BASESWAP_FACTORY
+
+# topic0 = keccak da assinatura do evento
+V2_PAIR_CREATED_TOPIC = '0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9'  # PairCreated(address,address,address,uint256)
+V3_POOL_CREATED_TOPIC = '0x783cca1c0412dd0d695e784568c96da2e9c22ff989357a2e8b1d9b2b4e6b7118'  # PoolCreated(address,address,uint24,int24,address)
+AERODROME_POOL_CREATED_TOPIC = '0x2128d88d14c80cb081c1252a5acff7a264671bf199ce226b53788fb26065005e'  # PoolCreated(address,address,bool,address,uint256)
+
+# Decodificadores do campo data (compilados uma vez no import)
+_V2_DATA_DECODER = registry.get_decoder('(address,uint256)')        # pair, allPairsLength
+_V3_DATA_DECODER = registry.get_decoder('(int24,address)')          # tickSpacing, pool
+_AERODROME_DATA_DECODER = registry.get_decoder('(address,uint256)')  # pool, allPoolsLength
+
+
+@dataclass(frozen=True)
+class PoolCreated:
+    """Pool recém-criado, já decodificado (campos ausentes na DEX ficam None)"""
+    dex: str                     # Chave da DEX em DEXHandler.dexs
+    factory: str
+    pool: str
+    token0: str
+    token1: str
+    block_number: int
+    fee: Optional[int] = None           # Uniswap V3: fee tier em centésimos de bip (500 = 0.05%)
+    tick_spacing: Optional[int] = None  # Uniswap V3
+    stable: Optional[bool] = None       # Aerodrome: pool estável ou volátil
+
+    def other_token(self, token: str) -> str:
+        """Retorna o outro token do par"""
+        return self.token1 if token.lower() == self.token0.lower() else self.token0
+
+
+def _decode_data(decoder, data) -> Tuple:
+    return decoder(ContextFramesBytesIO(bytes(data)))
+
+
+def _topic_address(topic) -> str:
+    return Web3.to_checksum_address(bytes(topic)[-20:])
+
+
+def _topic_int(topic) -> int:
+    return int.from_bytes(bytes(topic), 'big')
+
+
+def _decode_v2(dex: str, log) -> PoolCreated:
+    pair, _ = _decode_data(_V2_DATA_DECODER, log['data'])
+    return PoolCreated(
+        dex=dex,
+        factory=log['address'],
+        pool=Web3.to_checksum_address(pair),
+        token0=_topic_address(log['topics'][1]),
+        token1=_topic_address(log['topics'][2]),
+        block_number=log['blockNumber']
+    )
+
+
+def _decode_v3(dex: str, log) -> PoolCreated:
+    tick_spacing, pool = _decode_data(_V3_DATA_DECODER, log['data'])
+    return PoolCreated(
+        dex=dex,
+        factory=log['address'],
+        pool=Web3.to_checksum_address(pool),
+        token0=_topic_address(log['topics'][1]),
+        token1=_topic_address(log['topics'][2]),
+        block_number=log['blockNumber'],
+        fee=_topic_int(log['topics'][3]),
+        tick_spacing=tick_spacing
+    )
+
+
+def _decode_aerodrome(dex: str, log) -> PoolCreated:
+    pool, _ = _decode_data(_AERODROME_DATA_DECODER, log['data'])
+    return PoolCreated(
+        dex=dex,
+        factory=log['address'],
+        pool=Web3.to_checksum_address(pool),
+        token0=_topic_address(log['topics'][1]),
+        token1=_topic_address(log['topics'][2]),
+        block_number=log['blockNumber'],
+        stable=_topic_int(log['topics'][3]) != 0
+    )
+
+
+# Registro: (factory em minúsculas, topic0) -> (chave da DEX, decodificador)
+POOL_CREATED_DECODERS: Dict[Tuple[str, str], Tuple[str, Callable]] = {
+    (UNISWAP_V3_FACTORY.lower(), V3_POOL_CREATED_TOPIC): ('uniswap_v3', _decode_v3),
+    (AERODROME_FACTORY.lower(), AERODROME_POOL_CREATED_TOPIC): ('aerodrome', _decode_aerodrome),
+    (BASESWAP_FACTORY.lower(), V2_PAIR_CREATED_TOPIC): ('baseswap', _decode_v2),
+}
+
+
+def decode_pool_created(log) -> Optional[PoolCreated]:
+    """Decodifica um log de criação de pool; None se (factory, topic0) não está registrado"""
+    if not log['topics']:
+        return None
+
+    entry = POOL_CREATED_DECODERS.get((log['address'].lower(), log['topics'][0].hex()))
+    if entry is None:
+        return None
+
+    dex, decoder = entry
+    return decoder(dex, log)
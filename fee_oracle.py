@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Oráculo de taxas EIP-1559
+baseFeePerGas previsto a cada bloco (parâmetros da Base: elasticidade 6, denominador 250) e
+percentis de priority fee do eth_feeHistory; entrega maxFeePerGas/maxPriorityFeePerGas por urgência
+"""
+
+import asyncio
+import math
+import time
+from statistics import median
+from typing import Dict, List, Optional
+from web3 import AsyncWeb3
+
+from config import (BASE_FEE_ELASTICITY, BASE_FEE_CHANGE_DENOMINATOR, FEE_HISTORY_BLOCKS,
+                    MIN_PRIORITY_FEE_GWEI, MAX_PRIORITY_FEE, MAX_GAS_PRICE)
+
+FEE_HISTORY_PERCENTILES = [10, 50, 90]
+BLOCK_TIME = 2  # Segundos por bloco na Base
+STALE_AFTER = 10 * BLOCK_TIME  # Estado mais velho que isso força leitura antes de precificar
+
+# Urgência -> (índice do percentil de priority fee, blocos de alta máxima do base fee cobertos)
+URGENCY_LEVELS = {
+    'low': (0, 1),
+    'normal': (1, 3),
+    'high': (2, 6),
+}
+URGENCY_ORDER = ['low', 'normal', 'high']
+
+# Alta máxima do base fee por bloco: bloco cheio (gasUsed = elasticidade x alvo)
+MAX_BASE_FEE_CHANGE = (BASE_FEE_ELASTICITY - 1) / BASE_FEE_CHANGE_DENOMINATOR
+
+REPLACEMENT_BUMP = 1.125  # Nós exigem +10% em ambos os campos para substituir; margem de arredondamento
+
+
+def next_base_fee(base_fee: int, gas_used: int, gas_limit: int,
+                  elasticity: int = BASE_FEE_ELASTICITY,
+                  denominator: int = BASE_FEE_CHANGE_DENOMINATOR) -> int:
+    """Base fee do próximo bloco (mesma aritmética inteira do cliente)"""
+    gas_target = gas_limit // elasticity
+    if gas_target == 0 or gas_used == gas_target:
+        return base_fee
+    if gas_used > gas_target:
+        delta = base_fee * (gas_used - gas_target) // gas_target // denominator
+        return base_fee + max(delta, 1)
+    delta = base_fee * (gas_target - gas_used) // gas_target // denominator
+    return max(base_fee - delta, 0)
+
+
+class FeeOracle:
+    """Estado de taxas atualizado uma vez por bloco em segundo plano"""
+
+    def __init__(self, history_blocks: int = FEE_HISTORY_BLOCKS):
+        self.history_blocks = history_blocks
+        self.base_fee: Optional[int] = None      # Base fee do próximo bloco
+        self.block_number: Optional[int] = None  # Último bloco incorporado
+        self.rewards: List[List[int]] = []       # Priority fees por bloco nos FEE_HISTORY_PERCENTILES
+        self.updated_at = 0.0
+        self.min_priority_fee = int(MIN_PRIORITY_FEE_GWEI * 10**9)
+        self.max_priority_fee = MAX_PRIORITY_FEE * 10**9
+        self.max_fee_cap = MAX_GAS_PRICE * 10**9
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Estatísticas
+        self.refreshes = 0
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.base_fee is not None and time.monotonic() - self.updated_at < STALE_AFTER
+
+    def update_from_history(self, history) -> None:
+        """Incorpora a resposta do eth_feeHistory (baseFeePerGas traz um item extra: o próximo bloco)"""
+        base_fees = list(history['baseFeePerGas'])
+        if not base_fees:
+            return
+        newest = history['oldestBlock'] + len(base_fees) - 2
+        if self.block_number is not None and newest < self.block_number:
+            return  # Endpoint atrasado: manter o estado mais novo
+
+        self.base_fee = base_fees[-1]
+        self.block_number = newest
+        rewards = [list(block) for block in (history.get('reward') or []) if block]
+        if rewards:
+            self.rewards = rewards[-self.history_blocks:]
+        self.updated_at = time.monotonic()
+        self.refreshes += 1
+
+    def on_new_head(self, block_number: int, base_fee: Optional[int], gas_used: Optional[int],
+                    gas_limit: Optional[int]):
+        """Cabeçalho do newHeads: base fee do próximo bloco calculado localmente, sem RPC"""
+        if base_fee is not None and gas_used is not None and gas_limit:
+            if self.block_number is None or block_number > self.block_number:
+                self.base_fee = next_base_fee(base_fee, gas_used, gas_limit)
+                self.block_number = block_number
+                self.updated_at = time.monotonic()
+        if self._wakeup is not None:
+            self._wakeup.set()  # Percentis de priority fee atualizados em segundo plano
+
+    async def refresh(self, web3: AsyncWeb3):
+        history = await web3.eth.fee_history(self.history_blocks, 'latest', FEE_HISTORY_PERCENTILES)
+        self.update_from_history(history)
+
+    def start(self, web3: AsyncWeb3):
+        """Atualização em segundo plano: a cada novo head (WebSocket) ou a cada bloco por polling"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(web3))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, web3: AsyncWeb3):
+        while True:
+            try:
+                await self.refresh(web3)
+            except Exception as e:
+                print(f"⚠️ Erro ao atualizar taxas (eth_feeHistory): {str(e)[:80]}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=BLOCK_TIME)
+            except asyncio.TimeoutError:
+                pass
+
+    def priority_fee(self, urgency: str = 'normal') -> int:
+        """Mediana, nos últimos blocos, do percentil da urgência pedida"""
+        index, _ = URGENCY_LEVELS[urgency]
+        samples = [block[index] for block in self.rewards if len(block) > index]
+        fee = int(median(samples)) if samples else self.min_priority_fee
+        return min(max(fee, self.min_priority_fee), self.max_priority_fee)
+
+    def fees(self, urgency: str = 'normal') -> Dict[str, int]:
+        """
+        Campos EIP-1559 para a urgência: priority fee pelo percentil e maxFee cobrindo a alta máxima
+        do base fee pelos próximos N blocos (o que sobra não é cobrado: paga-se base fee + priority)
+        """
+        _, blocks = URGENCY_LEVELS[urgency]
+        priority = self.priority_fee(urgency)
+        base_ceiling = math.ceil((self.base_fee or 0) * (1 + MAX_BASE_FEE_CHANGE) ** blocks)
+        max_fee = min(base_ceiling + priority, self.max_fee_cap)
+        return {'maxFeePerGas': max_fee, 'maxPriorityFeePerGas': min(priority, max_fee)}
+
+    async def get_fees(self, web3: AsyncWeb3, urgency: str = 'normal') -> Dict[str, int]:
+        """fees() com leitura imediata se o estado estiver velho (loop em segundo plano parado)"""
+        if not self.is_fresh:
+            await self.refresh(web3)
+        return self.fees(urgency)
+
+    def bump(self, transaction: Dict, urgency: str = 'high') -> Dict:
+        """
+        Reenvio: urgência maior que a atual e pelo menos +12,5% em ambos os campos
+        (regra de substituição dos nós), sem passar do teto configurado
+        """
+        target = self.fees(urgency)
+        for field in ('maxFeePerGas', 'maxPriorityFeePerGas'):
+            bumped = math.ceil(transaction.get(field, 0) * REPLACEMENT_BUMP)
+            transaction[field] = min(max(bumped, target[field]), self.max_fee_cap)
+        transaction['maxPriorityFeePerGas'] = min(transaction['maxPriorityFeePerGas'], transaction['maxFeePerGas'])
+        transaction.pop('gasPrice', None)
+        return transaction
+
+    def get_stats(self) -> Dict:
+        return {
+            'block': self.block_number,
+            'base_fee_gwei': (self.base_fee or 0) / 10**9,
+            'priority_gwei': {urgency: self.priority_fee(urgency) / 10**9 for urgency in URGENCY_ORDER},
+            'refreshes': self.refreshes,
+            'fresh': self.is_fresh
+        }
+
+
+# Instância global compartilhada (iniciada em SniperBot.initialize)
+FEE_ORACLE = FeeOracle()
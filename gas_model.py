@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Modelo de gas limit aprendido dos recibos
+gasUsed real por (router, compra/venda, hash do bytecode do token): clones compartilham a mesma
+entrada e o caminho crítico usa o p99 + margem sem estimate_gas; simulação só para combinações novas
+"""
+
+import math
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from config import GAS_LIMIT_MARGIN, GAS_MODEL_SAMPLES
+
+ROUTER_SAMPLES_FACTOR = 4  # Histórico agregado por router guarda mais recibos (todos os tokens)
+
+GasKey = Tuple[str, str, Optional[str]]
+
+
+def gas_key(router: str, is_buy: bool, code_hash: Optional[str]) -> GasKey:
+    """Chave do modelo (code_hash None = bytecode ainda desconhecido: só o agregado do router)"""
+    return router.lower(), 'buy' if is_buy else 'sell', code_hash
+
+
+def percentile(samples, q: float) -> int:
+    """Percentil por posição (nearest-rank)"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class GasModel:
+    """Distribuição recente de gasUsed por combinação e agregada por router/direção"""
+
+    def __init__(self, max_samples: int = GAS_MODEL_SAMPLES, margin: float = GAS_LIMIT_MARGIN):
+        self.max_samples = max_samples
+        self.margin = margin
+        self._samples: Dict[GasKey, Deque[int]] = {}
+        self._router_samples: Dict[Tuple[str, str], Deque[int]] = {}
+
+        # Estatísticas
+        self.hits = 0
+        self.router_hits = 0
+        self.simulations = 0
+        self.recorded = 0
+
+    def _limit(self, samples) -> int:
+        return round(percentile(samples, 0.99) * (1 + self.margin))
+
+    def record(self, key: GasKey, gas_used: int):
+        """gasUsed de um recibo confirmado"""
+        router, direction, code_hash = key
+        if code_hash is not None:
+            self._samples.setdefault(key, deque(maxlen=self.max_samples)).append(gas_used)
+        self._router_samples.setdefault(
+            (router, direction), deque(maxlen=self.max_samples * ROUTER_SAMPLES_FACTOR)
+        ).append(gas_used)
+        self.recorded += 1
+
+    def limit(self, key: GasKey) -> Optional[int]:
+        """p99 + margem da combinação exata (None se nunca vista)"""
+        samples = self._samples.get(key)
+        return self._limit(samples) if samples else None
+
+    def router_limit(self, key: GasKey) -> Optional[int]:
+        """p99 + margem de todos os tokens já negociados no router/direção"""
+        samples = self._router_samples.get(key[:2])
+        return self._limit(samples) if samples else None
+
+    def hot_limit(self, key: GasKey, default: int) -> int:
+        """Caminho crítico (sem RPC): combinação exata, agregado do router ou o padrão"""
+        limit = self.limit(key)
+        if limit is not None:
+            self.hits += 1
+            return limit
+        limit = self.router_limit(key)
+        if limit is not None:
+            self.router_hits += 1
+            return limit
+        return default
+
+    async def get_limit(self, key: GasKey, simulate: Callable[[], Awaitable[int]], default: int) -> int:
+        """Combinação conhecida: cache; nova: estimate_gas + margem; simulação falhou: hot_limit"""
+        limit = self.limit(key)
+        if limit is not None:
+            self.hits += 1
+            return limit
+
+        self.simulations += 1
+        try:
+            return round(await simulate() * (1 + self.margin))
+        except Exception as e:
+            print(f"⚠️ Não foi possível estimar gas: {str(e)[:80]}")
+            return self.hot_limit(key, default)
+
+    def get_stats(self) -> Dict:
+        return {
+            'combinations': len(self._samples),
+            'routers': {f"{router[:10]}/{direction}": self._limit(samples)
+                        for (router, direction), samples in self._router_samples.items()},
+            'hits': self.hits,
+            'router_hits': self.router_hits,
+            'simulations': self.simulations,
+            'recorded': self.recorded
+        }
+
+
+# Instância global compartilhada (alimentada pelos recibos de DEXHandler._send_and_confirm)
+GAS_MODEL = GasModel()
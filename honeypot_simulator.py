@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Detecção de honeypot por compra e venda simuladas
+Um contrato auxiliar (bytecode linear montado aqui, sem compilador) é injetado por state override
+em um endereço descartável com saldo de ETH: deposita WETH, compra pelo router detectado, testa uma
+transferência, vende tudo de volta e devolve cotações e saldos. Tudo em um único eth_call
+Uniswap V3: exactInputSingle no SwapRouter02 com a cotação do QuoterV2 (taxa = diferença de saldo)
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Tuple
+from eth_abi import encode
+from eth_utils import function_signature_to_4byte_selector
+from web3 import Web3, AsyncWeb3
+
+from config import (WETH_ADDRESS, BASESWAP_ROUTER, SUSHISWAP_ROUTER, AERODROME_ROUTER, AERODROME_FACTORY,
+                    UNISWAP_V3_ROUTER, UNISWAP_V3_QUOTER, HONEYPOT_TAX)
+from pool_pricing import POOL_PRICER
+from v3_quoter import V3_QUOTER, FEE_TIER_SPACING
+
+# Endereços fictícios: carteira descartável (recebe o código auxiliar) e destino do teste de transferência
+SIMULATION_ADDRESS = Web3.to_checksum_address('0x5151515151515151515151515151515151515151')
+TRANSFER_PROBE = Web3.to_checksum_address('0x7e57000000000000000000000000000000007e57')
+TRANSFER_PROBE_DIVISOR = 10  # Transfere 10% do comprado antes de vender o restante
+DEADLINE = 2**64 - 1
+MAX_UINT256 = 2**256 - 1
+
+# Routers V2 com swap suportando taxa na transferência + Uniswap V3 (um candidato por fee tier)
+SIMULATED_ROUTERS = {
+    'baseswap': BASESWAP_ROUTER,
+    'aerodrome': AERODROME_ROUTER,
+    'sushiswap': SUSHISWAP_ROUTER,
+    'uniswap_v3': UNISWAP_V3_ROUTER,
+}
+V3_DEX = 'uniswap_v3'
+
+DEPOSIT = function_signature_to_4byte_selector('deposit()')
+APPROVE = function_signature_to_4byte_selector('approve(address,uint256)')
+TRANSFER = function_signature_to_4byte_selector('transfer(address,uint256)')
+BALANCE_OF = function_signature_to_4byte_selector('balanceOf(address)')
+GET_AMOUNTS_OUT = function_signature_to_4byte_selector('getAmountsOut(uint256,address[])')
+SWAP_FOT = function_signature_to_4byte_selector(
+    'swapExactTokensForTokensSupportingFeeOnTransferTokens(uint256,uint256,address[],address,uint256)')
+ROUTE = '(address,address,bool,address)'
+AERODROME_GET_AMOUNTS_OUT = function_signature_to_4byte_selector(f'getAmountsOut(uint256,{ROUTE}[])')
+AERODROME_SWAP_FOT = function_signature_to_4byte_selector(
+    f'swapExactTokensForTokensSupportingFeeOnTransferTokens(uint256,uint256,{ROUTE}[],address,uint256)')
+V3_QUOTE = function_signature_to_4byte_selector('quoteExactInputSingle((address,address,uint256,uint24,uint160))')
+V3_SWAP = function_signature_to_4byte_selector(
+    'exactInputSingle((address,address,uint24,address,uint256,uint256,uint160))')
+MAX_TX_GETTERS = tuple(
+    function_signature_to_4byte_selector(signature)
+    for signature in ('_maxTxAmount()', 'maxTxAmount()', 'maxTransactionAmount()', 'maxTx()')
+)
+
+# Palavras do retorno do contrato auxiliar
+BUY_EXPECTED, BUY_OK, RECEIVED, TRANSFER_OK, SELL_AMOUNT, SELL_EXPECTED, SELL_OK, WETH_OUT, MAX_TX = range(9)
+RESULT_WORDS = MAX_TX + len(MAX_TX_GETTERS)
+
+# Layout de memória: resultados em 0x00, calldata montada em 0x200, retorno das chamadas em 0x400
+CALLDATA_BUFFER = 0x200
+RETURN_BUFFER = 0x400
+RETURN_WORDS = 4  # getAmountsOut de 2 tokens: offset, tamanho, amounts[0], amounts[1] / QuoterV2: amountOut, ...
+
+PUSH1, POP, MUL, DIV, SWAP1 = 0x60, 0x50, 0x02, 0x04, 0x90
+MLOAD, MSTORE, CODECOPY, GAS = 0x51, 0x52, 0x39, 0x5a
+CALL, STATICCALL, RETURN = 0xf1, 0xfa, 0xf3
+
+
+class _Assembler:
+    """Montador mínimo: código linear (sem saltos) seguido da seção de dados com as calldatas"""
+
+    def __init__(self):
+        self.code = bytearray()
+        self.data = bytearray()
+        self._fixups: List[Tuple[int, int]] = []  # (posição do imediato PUSH2, offset na seção de dados)
+
+    def push(self, value: int, width: int = 0):
+        width = width or max(1, (value.bit_length() + 7) // 8)
+        self.code += bytes([PUSH1 + width - 1]) + value.to_bytes(width, 'big')
+
+    def op(self, *opcodes: int):
+        self.code += bytes(opcodes)
+
+    def push_data(self, blob: bytes):
+        """PUSH2 com o offset do blob no código final (resolvido em assemble)"""
+        self._fixups.append((len(self.code) + 1, len(self.data)))
+        self.push(0, 2)
+        self.data += blob
+
+    def call(self, target: str, calldata: bytes, value: int = 0, static: bool = False,
+             patch: Optional[Tuple[int, int, int]] = None):
+        """
+        Copia a calldata pré-codificada para a memória, opcionalmente sobrescreve o argumento
+        patch=(índice, palavra de resultado, divisor) e chama; deixa o sucesso na pilha
+        """
+        for word in range(RETURN_WORDS):  # Retorno curto/ausente não deixa lixo da chamada anterior
+            self.push(0)
+            self.push(RETURN_BUFFER + 32 * word)
+            self.op(MSTORE)
+        self.push(len(calldata))
+        self.push_data(calldata)
+        self.push(CALLDATA_BUFFER)
+        self.op(CODECOPY)
+        if patch is not None:
+            argument, word, divisor = patch
+            self.push(32 * word)
+            self.op(MLOAD)
+            if divisor > 1:
+                self.push(divisor)
+                self.op(SWAP1, DIV)
+            self.push(CALLDATA_BUFFER + 4 + 32 * argument)
+            self.op(MSTORE)
+        self.push(32 * RETURN_WORDS)
+        self.push(RETURN_BUFFER)
+        self.push(len(calldata))
+        self.push(CALLDATA_BUFFER)
+        if not static:
+            self.push(value)
+        self.push(int(target, 16), 20)
+        self.op(GAS, STATICCALL if static else CALL)
+
+    def store(self, word: int, return_word: Optional[int] = None):
+        """Guarda o sucesso da chamada (ou sucesso x palavra do retorno) no resultado"""
+        if return_word is not None:
+            self.push(RETURN_BUFFER + 32 * return_word)
+            self.op(MLOAD, MUL)
+        self.push(32 * word)
+        self.op(MSTORE)
+
+    def assemble(self) -> bytes:
+        code = bytearray(self.code)
+        for position, offset in self._fixups:
+            code[position:position + 2] = (len(code) + offset).to_bytes(2, 'big')
+        return bytes(code + self.data)
+
+
+def _quote_call(asm: '_Assembler', dex: str, router: str, path: List[str], fee: Optional[int],
+                amount_in: int = 0, patch: Optional[int] = None) -> int:
+    """
+    Cotação antes do swap; devolve a palavra do retorno com a quantia de saída.
+    QuoterV2 executa o swap e reverte internamente: CALL comum (STATICCALL reverteria sempre)
+    """
+    if dex == V3_DEX:
+        calldata = V3_QUOTE + encode(['(address,address,uint256,uint24,uint160)'], [(path[0], path[1], amount_in, fee, 0)])
+        asm.call(UNISWAP_V3_QUOTER, calldata, patch=None if patch is None else (2, patch, 1))
+        return 0
+    if dex == 'aerodrome':
+        routes = [(path[0], path[1], False, AERODROME_FACTORY)]
+        calldata = AERODROME_GET_AMOUNTS_OUT + encode(['uint256', f'{ROUTE}[]'], [amount_in, routes])
+    else:
+        calldata = GET_AMOUNTS_OUT + encode(['uint256', 'address[]'], [amount_in, path])
+    asm.call(router, calldata, static=True, patch=None if patch is None else (0, patch, 1))
+    return 3
+
+
+def _swap_call(asm: '_Assembler', dex: str, router: str, path: List[str], fee: Optional[int],
+               amount_in: int = 0, patch: Optional[int] = None):
+    """Swap de path[0] para path[1] com saída mínima 0 (valor de entrada fixo ou lido da palavra `patch`)"""
+    if dex == V3_DEX:
+        params = (path[0], path[1], fee, SIMULATION_ADDRESS, amount_in, 0, 0)
+        calldata = V3_SWAP + encode(['(address,address,uint24,address,uint256,uint256,uint160)'], [params])
+        argument = 4
+    elif dex == 'aerodrome':
+        routes = [(path[0], path[1], False, AERODROME_FACTORY)]
+        calldata = AERODROME_SWAP_FOT + encode(['uint256', 'uint256', f'{ROUTE}[]', 'address', 'uint256'],
+                                               [amount_in, 0, routes, SIMULATION_ADDRESS, DEADLINE])
+        argument = 0
+    else:
+        calldata = SWAP_FOT + encode(['uint256', 'uint256', 'address[]', 'address', 'uint256'],
+                                     [amount_in, 0, path, SIMULATION_ADDRESS, DEADLINE])
+        argument = 0
+    asm.call(router, calldata, patch=None if patch is None else (argument, patch, 1))
+
+
+def build_round_trip(token: str, router: str, dex: str, amount_in: int, fee: Optional[int] = None) -> bytes:
+    """
+    Bytecode do contrato auxiliar para (token, router, valor); nenhuma chamada reverte o todo.
+    `fee` = fee tier do pool quando dex é uniswap_v3
+    """
+    token = Web3.to_checksum_address(token)
+    buy_path, sell_path = [WETH_ADDRESS, token], [token, WETH_ADDRESS]
+    balance_of = BALANCE_OF + encode(['address'], [SIMULATION_ADDRESS])
+    approve_router = APPROVE + encode(['address', 'uint256'], [router, MAX_UINT256])
+
+    asm = _Assembler()
+    asm.call(WETH_ADDRESS, DEPOSIT, value=amount_in)
+    asm.op(POP)
+    asm.call(WETH_ADDRESS, approve_router)
+    asm.op(POP)
+
+    # Compra: cotação antes do swap (diferença para o recebido = taxa de compra)
+    quoted_word = _quote_call(asm, dex, router, buy_path, fee, amount_in=amount_in)
+    asm.store(BUY_EXPECTED, return_word=quoted_word)
+    _swap_call(asm, dex, router, buy_path, fee, amount_in=amount_in)
+    asm.store(BUY_OK)
+    asm.call(token, balance_of, static=True)
+    asm.store(RECEIVED, return_word=0)
+
+    # Transferência simples entre carteiras (bloqueios de transferência)
+    asm.call(token, TRANSFER + encode(['address', 'uint256'], [TRANSFER_PROBE, 0]),
+             patch=(1, RECEIVED, TRANSFER_PROBE_DIVISOR))
+    asm.store(TRANSFER_OK)
+
+    # Venda de todo o saldo restante: cotação com as reservas pós-compra vs. WETH recebido
+    asm.call(token, balance_of, static=True)
+    asm.store(SELL_AMOUNT, return_word=0)
+    asm.call(token, approve_router)
+    asm.op(POP)
+    quoted_word = _quote_call(asm, dex, router, sell_path, fee, patch=SELL_AMOUNT)
+    asm.store(SELL_EXPECTED, return_word=quoted_word)
+    _swap_call(asm, dex, router, sell_path, fee, patch=SELL_AMOUNT)
+    asm.store(SELL_OK)
+    asm.call(WETH_ADDRESS, balance_of, static=True)
+    asm.store(WETH_OUT, return_word=0)
+
+    # Limites de max-tx expostos pelos getters mais comuns (0 = ausente)
+    for index, selector in enumerate(MAX_TX_GETTERS):
+        asm.call(token, selector, static=True)
+        asm.store(MAX_TX + index, return_word=0)
+
+    asm.push(32 * RESULT_WORDS)
+    asm.push(0)
+    asm.op(RETURN)
+    return asm.assemble()
+
+
+def _tax(expected: int, received: int) -> Optional[float]:
+    if expected <= 0:
+        return None
+    return max(0.0, (1 - received / expected) * 100)
+
+
+@dataclass
+class HoneypotReport:
+    """Resultado da ida e volta simulada (taxas em %)"""
+    token: str
+    dex: str
+    router: str
+    expected_buy: int
+    buy_ok: bool
+    transfer_ok: bool
+    sell_ok: bool
+    buy_tax: Optional[float]
+    sell_tax: Optional[float]
+    max_tx: Optional[int]
+    latency: float
+    fee: Optional[int] = None  # Fee tier simulado (uniswap_v3)
+
+    @property
+    def has_liquidity(self) -> bool:
+        return self.expected_buy > 0
+
+    @property
+    def is_honeypot(self) -> bool:
+        """Compra passa mas a venda ou a transferência entre carteiras reverte, ou a taxa passa de HONEYPOT_TAX"""
+        if not self.has_liquidity or not self.buy_ok:
+            return False
+        return (not self.sell_ok or not self.transfer_ok
+                or max(self.buy_tax or 0, self.sell_tax or 0) >= HONEYPOT_TAX)
+
+    @property
+    def reason(self) -> str:
+        if not self.has_liquidity:
+            return "sem liquidez nos routers simulados"
+        if not self.buy_ok:
+            if self.max_tx and self.expected_buy > self.max_tx:
+                return "compra excede o max-tx"
+            return "compra reverte"
+        if not self.sell_ok:
+            return "venda reverte"
+        if not self.transfer_ok:
+            return "transferência entre carteiras bloqueada"
+        if self.is_honeypot:
+            return f"taxas de compra {self.buy_tax or 0:.1f}% / venda {self.sell_tax or 0:.1f}%"
+        return ""
+
+    def to_dict(self) -> Dict:
+        result = asdict(self)
+        result.update(simulated=True, is_honeypot=self.is_honeypot, reason=self.reason)
+        return result
+
+
+def parse_round_trip(token: str, dex: str, router: str, data: bytes, latency: float = 0.0,
+                     fee: Optional[int] = None) -> HoneypotReport:
+    data = bytes(data)
+    if len(data) < 32 * RESULT_WORDS:
+        raise ValueError(f"retorno da simulação com {len(data)} bytes")
+    words = [int.from_bytes(data[32 * i:32 * (i + 1)], 'big') for i in range(RESULT_WORDS)]
+    buy_ok, sell_ok = bool(words[BUY_OK]), bool(words[SELL_OK])
+    limits = [value for value in words[MAX_TX:] if value]
+    return HoneypotReport(
+        token=token,
+        dex=dex,
+        router=router,
+        expected_buy=words[BUY_EXPECTED],
+        buy_ok=buy_ok,
+        transfer_ok=bool(words[TRANSFER_OK]),
+        sell_ok=sell_ok,
+        buy_tax=_tax(words[BUY_EXPECTED], words[RECEIVED]) if buy_ok else None,
+        sell_tax=_tax(words[SELL_EXPECTED], words[WETH_OUT]) if sell_ok else None,
+        max_tx=min(limits) if limits else None,
+        latency=latency,
+        fee=fee
+    )
+
+
+class HoneypotSimulator:
+    """Ida e volta simulada por token (nunca reaproveitada entre clones: taxas e bloqueios são estado do token)"""
+
+    def __init__(self, block_identifier: str = 'pending'):
+        self.block_identifier = block_identifier
+
+        # Estatísticas
+        self.simulations = 0
+        self.honeypots = 0
+
+    def detect_routers(self, token: str, amount_in: int) -> List[Tuple[str, str, Optional[int]]]:
+        """
+        (dex, router, fee) do pool WETH conhecido com mais liquidez (V2 em cache ou V3 cotado localmente);
+        sem pool conhecido, todos os routers V2 e todos os fee tiers V3
+        """
+        pools = [pool for pool in POOL_PRICER.pools_for(WETH_ADDRESS, token) if pool.dex in SIMULATED_ROUTERS]
+        if pools:
+            best = max(pools, key=lambda pool: pool.reserve0 if pool.token0.lower() == WETH_ADDRESS.lower()
+                       else pool.reserve1)
+            return [(best.dex, SIMULATED_ROUTERS[best.dex], None)]
+
+        quote = V3_QUOTER.quote(WETH_ADDRESS, token, amount_in)
+        if quote is not None:
+            return [(V3_DEX, UNISWAP_V3_ROUTER, quote.fee)]
+
+        candidates = [(dex, router, None) for dex, router in SIMULATED_ROUTERS.items() if dex != V3_DEX]
+        return candidates + [(V3_DEX, UNISWAP_V3_ROUTER, fee) for fee in FEE_TIER_SPACING]
+
+    async def simulate(self, web3: AsyncWeb3, token: str, dex: str, router: str, amount_in: int,
+                       fee: Optional[int] = None) -> HoneypotReport:
+        """Um eth_call: código auxiliar e saldo de ETH injetados no endereço descartável"""
+        code = build_round_trip(token, router, dex, amount_in, fee)
+        override = {SIMULATION_ADDRESS: {'balance': hex(amount_in), 'code': '0x' + code.hex()}}
+        call = {'from': SIMULATION_ADDRESS, 'to': SIMULATION_ADDRESS, 'data': '0x'}
+
+        self.simulations += 1
+        start = time.monotonic()
+        result = await web3.eth.call(call, self.block_identifier, override)
+        return parse_round_trip(token, dex, router, result, time.monotonic() - start, fee)
+
+    async def check(self, web3: AsyncWeb3, token: str, amount_in: int) -> Optional[HoneypotReport]:
+        """
+        Relatório do router com liquidez (routers candidatos simulados em paralelo).
+        None = nenhum router (V2 ou V3) com liquidez: inconclusivo
+        """
+        candidates = self.detect_routers(token, amount_in)
+        reports = await asyncio.gather(
+            *(self.simulate(web3, token, dex, router, amount_in, fee) for dex, router, fee in candidates),
+            return_exceptions=len(candidates) > 1  # Com um único router o erro de RPC propaga
+        )
+        liquid = [report for report in reports if isinstance(report, HoneypotReport) and report.has_liquidity]
+        if not liquid:
+            errors = [report for report in reports if isinstance(report, Exception)]
+            if errors and len(errors) == len(reports):
+                raise errors[0]
+            return None
+
+        report = max(liquid, key=lambda report: report.expected_buy)
+        if report.is_honeypot:
+            self.honeypots += 1
+        return report
+
+    def get_stats(self) -> Dict:
+        return {
+            'simulations': self.simulations,
+            'honeypots': self.honeypots
+        }
+
+
+# Instância global compartilhada
+HONEYPOT_SIMULATOR = HoneypotSimulator()
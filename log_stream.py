@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Stream de eventos via WebSocket (eth_subscribe)
+Recebe logs e newHeads em tempo real com reconexão automática
+"""
+
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, Optional
+import websockets
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+
+from config import WS_RECONNECT_DELAY, WS_MAX_RECONNECT_DELAY
+
+
+def format_log(raw: Dict) -> AttributeDict:
+    """Converte log JSON-RPC cru para o mesmo formato retornado por eth.get_logs"""
+    return AttributeDict({
+        'address': Web3.to_checksum_address(raw['address']),
+        'topics': [HexBytes(topic) for topic in raw['topics']],
+        'data': HexBytes(raw['data']),
+        'blockNumber': int(raw['blockNumber'], 16),
+        'blockHash': HexBytes(raw['blockHash']),
+        'transactionHash': HexBytes(raw['transactionHash']),
+        'transactionIndex': int(raw['transactionIndex'], 16),
+        'logIndex': int(raw['logIndex'], 16),
+        'removed': bool(raw.get('removed', False))
+    })
+
+
+def format_head(raw: Dict) -> AttributeDict:
+    """Converte cabeçalho newHeads cru (campos usados pelo bot; campos de gas ausentes viram None)"""
+    def optional_int(key: str) -> Optional[int]:
+        return int(raw[key], 16) if raw.get(key) is not None else None
+
+    return AttributeDict({
+        'number': int(raw['number'], 16),
+        'hash': HexBytes(raw['hash']),
+        'parentHash': HexBytes(raw['parentHash']),
+        'timestamp': int(raw['timestamp'], 16),
+        'baseFeePerGas': optional_int('baseFeePerGas'),
+        'gasUsed': optional_int('gasUsed'),
+        'gasLimit': optional_int('gasLimit')
+    })
+
+
+class LogStream:
+    """Assinatura eth_subscribe de logs + newHeads com reconexão e backoff exponencial"""
+
+    def __init__(self, ws_url: str, log_filter: Dict,
+                 on_log: Callable[[AttributeDict], Awaitable[None]],
+                 on_head: Optional[Callable[[AttributeDict], Awaitable[None]]] = None,
+                 on_connect: Optional[Callable[[], Awaitable[None]]] = None):
+        self.ws_url = ws_url
+        self.log_filter = log_filter
+        self.on_log = on_log
+        self.on_head = on_head
+        self.on_connect = on_connect
+        self.running = False
+        self.reconnects = 0
+        self._ws = None
+        self._request_id = 0
+
+    async def run(self):
+        """Mantém a assinatura ativa até stop() - reconecta automaticamente"""
+        self.running = True
+        delay = WS_RECONNECT_DELAY
+
+        while self.running:
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=20, ping_timeout=20,
+                                              max_size=None) as ws:
+                    self._ws = ws
+                    subscriptions = await self._subscribe(ws)
+                    delay = WS_RECONNECT_DELAY
+                    print(f"🔌 WebSocket conectado: {len(subscriptions)} assinaturas ativas")
+
+                    # Backfill do intervalo perdido (feito pelo chamador)
+                    if self.on_connect:
+                        await self.on_connect()
+
+                    async for message in ws:
+                        if not self.running:
+                            break
+                        await self._handle_message(message, subscriptions)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.running:
+                    print(f"⚠️ WebSocket desconectado: {str(e)[:80]} - reconectando em {delay:.0f}s")
+            finally:
+                self._ws = None
+
+            if self.running:
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, WS_MAX_RECONNECT_DELAY)
+
+    async def stop(self):
+        """Encerra a assinatura"""
+        self.running = False
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _subscribe(self, ws) -> Dict[str, str]:
+        """Cria as assinaturas e retorna {subscription_id: tipo}"""
+        requests = {}
+        kinds = [('logs', ['logs', self.log_filter])]
+        if self.on_head:
+            kinds.append(('newHeads', ['newHeads']))
+
+        for kind, params in kinds:
+            self._request_id += 1
+            requests[self._request_id] = kind
+            await ws.send(json.dumps({
+                'jsonrpc': '2.0', 'id': self._request_id,
+                'method': 'eth_subscribe', 'params': params
+            }))
+
+        subscriptions = {}
+        while len(subscriptions) < len(requests):
+            response = json.loads(await ws.recv())
+            if response.get('id') not in requests:
+                continue
+            if 'error' in response:
+                raise Exception(f"eth_subscribe falhou: {response['error']}")
+            subscriptions[response['result']] = requests[response['id']]
+
+        return subscriptions
+
+    async def _handle_message(self, message, subscriptions: Dict[str, str]):
+        """Roteia notificação eth_subscription para o callback correto"""
+        payload = json.loads(message)
+        if payload.get('method') != 'eth_subscription':
+            return
+
+        params = payload['params']
+        kind = subscriptions.get(params.get('subscription'))
+
+        try:
+            if kind == 'logs':
+                log = format_log(params['result'])
+                if not log['removed']:  # Ignorar logs removidos por reorg
+                    await self.on_log(log)
+            elif kind == 'newHeads':
+                await self.on_head(format_head(params['result']))
+        except Exception as e:
+            print(f"❌ Erro ao processar notificação {kind}: {e}")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Observador de atividade MEV em segundo plano
+Cada bloco novo é lido uma única vez (transações completas) e indexado por endereço envolvido
+(destino e endereços na calldata: router, token, pool); janela deslizante de MEV_WINDOW_BLOCKS
+blocos com contadores agregados, então check_mev_protection responde da memória em O(1).
+Cada leitura de bloco paga créditos no BASE_RPC_LIMITER (faixa de descoberta: cede a vez durante 429)
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from statistics import median
+from typing import Deque, Dict, List, Optional, Set
+from web3 import AsyncWeb3
+
+from config import MEV_WINDOW_BLOCKS, MEV_PRIORITY_MULTIPLIER, MIN_PRIORITY_FEE_GWEI
+from rate_limiter import BASE_RPC_LIMITER, RateLimitPreempted, LANE_DISCOVERY
+
+BLOCK_TIME = 2  # Segundos por bloco na Base
+DEPOSIT_TX_TYPE = 0x7e  # Transações de sistema/depósito da OP Stack (sem taxa)
+CALLDATA_WORDS_SCANNED = 16
+ADDRESS_MIN = 2**128  # Palavra ABI com 12 bytes zero e valor >= 2^128: endereço (quantias ficam abaixo)
+ADDRESS_LIMIT = 2**160
+MAX_SAMPLES = 10  # Transações suspeitas guardadas por endereço
+
+
+def _calldata(tx) -> bytes:
+    data = tx.get('input') or b''
+    return bytes.fromhex(data[2:]) if isinstance(data, str) else bytes(data)
+
+
+def involved_addresses(tx) -> Set[str]:
+    """Destino da transação e endereços ABI nas primeiras palavras da calldata (path, token, pool)"""
+    addresses = {tx['to'].lower()} if tx.get('to') else set()
+    data = _calldata(tx)
+    for offset in range(4, min(len(data), 4 + 32 * CALLDATA_WORDS_SCANNED) - 31, 32):
+        value = int.from_bytes(data[offset:offset + 32], 'big')
+        if ADDRESS_MIN <= value < ADDRESS_LIMIT:
+            addresses.add('0x' + value.to_bytes(20, 'big').hex())
+    return addresses
+
+
+def priority_fee(tx, base_fee: int) -> int:
+    """Gorjeta efetiva por gas (EIP-1559 ou legado)"""
+    if tx.get('maxPriorityFeePerGas') is not None:
+        return max(min(tx['maxPriorityFeePerGas'], tx['maxFeePerGas'] - base_fee), 0)
+    return max(tx.get('gasPrice', 0) - base_fee, 0)
+
+
+@dataclass
+class AddressActivity:
+    """Contadores de um endereço (em um bloco ou agregados na janela)"""
+    txs: int = 0
+    high_priority: int = 0
+    sandwiches: int = 0
+    samples: List[Dict] = field(default_factory=list)
+
+    def add(self, other: 'AddressActivity', sign: int = 1):
+        self.txs += sign * other.txs
+        self.high_priority += sign * other.high_priority
+        self.sandwiches += sign * other.sandwiches
+
+
+def analyze_block(block, min_priority_fee: int = int(MIN_PRIORITY_FEE_GWEI * 10**9),
+                  multiplier: float = MEV_PRIORITY_MULTIPLIER) -> Dict[str, AddressActivity]:
+    """
+    Atividade por endereço em um bloco: gorjetas muito acima da mediana do bloco e sanduíches
+    (mesmo remetente antes e depois de outro remetente no mesmo endereço)
+    """
+    base_fee = block.get('baseFeePerGas') or 0
+    txs = [tx for tx in block.get('transactions', []) if isinstance(tx, Mapping) and tx.get('type') != DEPOSIT_TX_TYPE]
+    tips = [priority_fee(tx, base_fee) for tx in txs]
+    threshold = max(median(tips) if tips else 0, min_priority_fee) * multiplier
+
+    activity: Dict[str, AddressActivity] = {}
+    sequence: Dict[str, Dict[str, int]] = {}  # Endereço -> {remetente: posição da última transação}
+    for tx, tip in zip(txs, tips):
+        sender = (tx.get('from') or '').lower()
+        tx_hash = tx['hash'].hex() if hasattr(tx['hash'], 'hex') else tx['hash']
+        for address in involved_addresses(tx):
+            entry = activity.setdefault(address, AddressActivity())
+            last_seen = sequence.setdefault(address, {})
+            entry.txs += 1
+            if tip > threshold:
+                entry.high_priority += 1
+                entry.samples.append({'hash': tx_hash, 'block': block['number'], 'priority_fee': tip,
+                                      'reason': 'High priority fee'})
+            previous = last_seen.get(sender)
+            if previous is not None and entry.txs - previous > 1:  # Outro remetente entre as duas
+                entry.sandwiches += 1
+                entry.samples.append({'hash': tx_hash, 'block': block['number'], 'sender': sender,
+                                      'reason': 'Sandwich pattern'})
+            last_seen[sender] = entry.txs
+    return activity
+
+
+class MEVWatcher:
+    """Índice em memória da atividade MEV nos últimos blocos"""
+
+    def __init__(self, window: int = MEV_WINDOW_BLOCKS):
+        self.window = window
+        self._blocks: Deque = deque()  # (número, {endereço: AddressActivity})
+        self._totals: Dict[str, AddressActivity] = {}
+        self.last_block: Optional[int] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Estatísticas
+        self.blocks_ingested = 0
+        self.queries = 0
+
+    @property
+    def is_ready(self) -> bool:
+        return self.last_block is not None
+
+    def ingest(self, block) -> bool:
+        """Incorpora um bloco (ignorado se já visto) e descarta os que saíram da janela"""
+        number = block['number']
+        if self.last_block is not None and number <= self.last_block:
+            return False
+
+        activity = analyze_block(block)
+        self._blocks.append((number, activity))
+        for address, entry in activity.items():
+            total = self._totals.setdefault(address, AddressActivity())
+            total.add(entry)
+            total.samples = (total.samples + entry.samples)[-MAX_SAMPLES:]
+        self.last_block = number
+        self.blocks_ingested += 1
+
+        while self._blocks and self._blocks[0][0] <= number - self.window:
+            _, expired = self._blocks.popleft()
+            for address, entry in expired.items():
+                total = self._totals[address]
+                total.add(entry, -1)
+                if total.txs <= 0:
+                    del self._totals[address]
+        return True
+
+    async def _get_block(self, web3: AsyncWeb3, number: int, lane: Optional[int]):
+        await BASE_RPC_LIMITER.acquire('eth_getBlockByNumber', lane=lane)
+        return await web3.eth.get_block(number, full_transactions=True)
+
+    async def sync(self, web3: AsyncWeb3, lane: Optional[int] = None) -> int:
+        """
+        Lê (em paralelo) os blocos ainda não vistos, no máximo a janela, com créditos do limitador
+        na faixa `lane` (padrão: faixa do contexto). Só a sequência contígua lida é incorporada;
+        a primeira falha (ex.: RateLimitPreempted) propaga e o resto é lido na próxima vez
+        """
+        latest = await web3.eth.block_number
+        first = latest - self.window + 1 if self.last_block is None else max(self.last_block + 1, latest - self.window + 1)
+        numbers = range(first, latest + 1)
+        blocks = await asyncio.gather(*(self._get_block(web3, number, lane) for number in numbers),
+                                      return_exceptions=True)
+        ingested = 0
+        for block in blocks:
+            if isinstance(block, BaseException):
+                raise block
+            ingested += self.ingest(block)
+        return ingested
+
+    def on_new_head(self, block_number: int):
+        """newHeads do WebSocket: acorda a leitura do bloco sem esperar o polling"""
+        if self._wakeup is not None and (self.last_block is None or block_number > self.last_block):
+            self._wakeup.set()
+
+    def start(self, web3: AsyncWeb3):
+        """Leitura em segundo plano: a cada novo head (WebSocket) ou a cada bloco por polling"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(web3))
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, web3: AsyncWeb3):
+        while True:
+            try:
+                await self.sync(web3, lane=LANE_DISCOVERY)
+            except RateLimitPreempted:
+                # Provedor em backoff de 429: espera o backoff em vez de disputar créditos com a execução
+                await asyncio.sleep(max(BASE_RPC_LIMITER.current_backoff, BLOCK_TIME))
+                continue
+            except Exception as e:
+                print(f"⚠️ Erro ao indexar blocos (MEV): {str(e)[:80]}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=BLOCK_TIME)
+            except asyncio.TimeoutError:
+                pass
+
+    def check(self, address: str) -> Dict:
+        """Risco MEV do endereço na janela (lookup no índice, sem RPC)"""
+        self.queries += 1
+        if not self.is_ready:
+            return {
+                'mev_risk_level': 'UNKNOWN',
+                'suspicious_transactions': [],
+                'recommended_delay': 0,
+                'safe_to_trade': True,
+                'window_blocks': 0
+            }
+
+        activity = self._totals.get(address.lower(), AddressActivity())
+        oldest = self.last_block - self.window + 1
+        suspicious = [sample for sample in activity.samples if sample['block'] >= oldest]
+        return {
+            'mev_risk_level': 'LOW' if not suspicious else 'HIGH',
+            'suspicious_transactions': suspicious,
+            'recommended_delay': 0 if not suspicious else 30,  # segundos
+            'safe_to_trade': not suspicious,
+            'sandwiches': activity.sandwiches,
+            'high_priority': activity.high_priority,
+            'window_blocks': len(self._blocks)
+        }
+
+    def get_stats(self) -> Dict:
+        return {
+            'last_block': self.last_block,
+            'window_blocks': len(self._blocks),
+            'addresses': len(self._totals),
+            'blocks_ingested': self.blocks_ingested,
+            'queries': self.queries
+        }
+
+
+# Instância global compartilhada
+MEV_WATCHER = MEVWatcher()
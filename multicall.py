@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Cliente Multicall3 para Base Network
+Agrupa várias eth_call em uma única chamada aggregate3 com tolerância a falhas por chamada
+"""
+
+from typing import List, Sequence, Tuple
+from eth_abi import encode, decode
+from web3 import Web3, AsyncWeb3
+
+from config import MULTICALL3_ADDRESS
+
+# Seletores pré-calculados (evita keccak a cada chamada)
+AGGREGATE3_SELECTOR = bytes(Web3.keccak(text='aggregate3((address,bool,bytes)[])')[:4])
+GET_AMOUNTS_OUT_SELECTOR = bytes(Web3.keccak(text='getAmountsOut(uint256,address[])')[:4])
+
+
+def encode_get_amounts_out(amount_in: int, path: Sequence[str]) -> bytes:
+    """Codifica calldata de getAmountsOut(uint256,address[])"""
+    return GET_AMOUNTS_OUT_SELECTOR + encode(
+        ['uint256', 'address[]'],
+        [amount_in, [Web3.to_checksum_address(addr) for addr in path]]
+    )
+
+
+def decode_get_amounts_out(data: bytes) -> List[int]:
+    """Decodifica retorno uint256[] de getAmountsOut"""
+    return list(decode(['uint256[]'], data)[0])
+
+
+class Multicall3:
+    """Executa N chamadas de leitura em uma única ida ao RPC"""
+
+    def __init__(self, web3: AsyncWeb3, address: str = MULTICALL3_ADDRESS):
+        self.web3 = web3
+        self.address = Web3.to_checksum_address(address)
+
+    @staticmethod
+    def encode_aggregate3(calls: Sequence[Tuple[str, bytes]], allow_failure: bool = True) -> bytes:
+        """Codifica calldata de aggregate3 a partir de (target, calldata)"""
+        call_structs = [
+            (Web3.to_checksum_address(target), allow_failure, bytes(call_data))
+            for target, call_data in calls
+        ]
+        return AGGREGATE3_SELECTOR + encode(['(address,bool,bytes)[]'], [call_structs])
+
+    @staticmethod
+    def decode_aggregate3(data: bytes) -> List[Tuple[bool, bytes]]:
+        """Decodifica retorno (bool success, bytes returnData)[]"""
+        return [(bool(success), bytes(return_data))
+                for success, return_data in decode(['(bool,bytes)[]'], bytes(data))[0]]
+
+    async def aggregate3(self, calls: Sequence[Tuple[str, bytes]], allow_failure: bool = True,
+                         block_identifier='latest') -> List[Tuple[bool, bytes]]:
+        """
+        Executa todas as chamadas em um único eth_call
+        Returns: lista de (sucesso, dados) na mesma ordem das chamadas
+        """
+        if not calls:
+            return []
+
+        result = await self.web3.eth.call({
+            'to': self.address,
+            'data': self.encode_aggregate3(calls, allow_failure)
+        }, block_identifier)
+
+        return self.decode_aggregate3(result)
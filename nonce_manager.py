@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Gerenciador de nonce por carteira
+Nonces reservados localmente (sem get_transaction_count por transação), ressincronizados do
+estado 'pending' em erro de nonce e com reaproveitamento de lacunas deixadas por transações não enviadas
+"""
+
+import asyncio
+from typing import Dict, Optional, Set
+from web3 import AsyncWeb3
+
+from config import WALLET_ADDRESS
+
+# Mensagens de erro do nó que indicam nonce local dessincronizado
+NONCE_ERRORS = ('nonce too low', 'nonce too high', 'already known', 'replacement transaction underpriced',
+                'invalid nonce')
+
+
+def is_nonce_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(pattern in message for pattern in NONCE_ERRORS)
+
+
+class NonceManager:
+    """Alocador assíncrono de nonces para uma carteira"""
+
+    def __init__(self, address: str):
+        self.address = address
+        self._next: Optional[int] = None  # Próximo nonce nunca alocado
+        self._in_flight: Set[int] = set()  # Reservados e ainda não enviados
+        self._released: Set[int] = set()   # Lacunas: reservados e não enviados (reutilizados primeiro)
+        self._lock = asyncio.Lock()
+
+        # Estatísticas
+        self.reserved = 0
+        self.resyncs = 0
+
+    async def _sync(self, web3: AsyncWeb3):
+        """Lê o nonce 'pending' do nó; nunca recua abaixo de nonces ainda em uso local"""
+        pending = await web3.eth.get_transaction_count(self.address, 'pending')
+        floor = max(self._in_flight) + 1 if self._in_flight else 0
+
+        # Lacuna de transação descartada pelo nó (pending < local): o próximo envio preenche
+        self._next = max(pending, floor)
+        self._released = {nonce for nonce in self._released if pending <= nonce < self._next}
+        self.resyncs += 1
+
+    async def reserve(self, web3: AsyncWeb3) -> int:
+        """Reserva o próximo nonce (RPC apenas na primeira chamada ou após resync)"""
+        async with self._lock:
+            if self._next is None:
+                await self._sync(web3)
+
+            if self._released:
+                nonce = min(self._released)
+                self._released.discard(nonce)
+            else:
+                nonce = self._next
+                self._next += 1
+
+            self._in_flight.add(nonce)
+            self.reserved += 1
+            return nonce
+
+    async def prefetch(self, web3: AsyncWeb3):
+        """Sincroniza antes do primeiro envio para que reserve() não faça RPC no caminho crítico"""
+        async with self._lock:
+            if self._next is None:
+                await self._sync(web3)
+
+    def mark_sent(self, nonce: int):
+        """Transação aceita pelo nó: o nonce passa a contar no 'pending' remoto"""
+        self._in_flight.discard(nonce)
+
+    async def release(self, web3: AsyncWeb3, nonce: int, error: Optional[Exception] = None):
+        """
+        Transação não enviada: devolve o nonce para reuso.
+        Erro de nonce no nó invalida a sequência local e força resync do 'pending'.
+        """
+        async with self._lock:
+            self._in_flight.discard(nonce)
+
+            if error is not None and is_nonce_error(error):
+                await self._sync(web3)
+            elif self._next is not None and nonce == self._next - 1:
+                self._next -= 1
+            else:
+                self._released.add(nonce)
+
+    async def resync(self, web3: AsyncWeb3):
+        """Ressincroniza manualmente (ex: transação descartada do mempool)"""
+        async with self._lock:
+            await self._sync(web3)
+
+    def get_stats(self) -> Dict:
+        return {
+            'next_nonce': self._next,
+            'in_flight': len(self._in_flight),
+            'gaps': len(self._released),
+            'reserved': self.reserved,
+            'resyncs': self.resyncs
+        }
+
+
+# Instância global compartilhada (carteira do bot)
+NONCE_MANAGER = NonceManager(WALLET_ADDRESS)
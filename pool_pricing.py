@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Motor de preços local para pools de produto constante (x*y=k)
+Reservas mantidas em memória e atualizadas por eventos Sync - cotação sem RPC
+Registro limitado a MAX_TRACKED_POOLS (menos usados saem primeiro; pools de posições abertas ficam)
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from web3 import AsyncWeb3
+
+from config import MAX_TRACKED_POOLS, GET_LOGS_ADDRESS_CHUNK
+from event_decoders import PoolCreated
+
+# topic0 dos eventos Sync (UniswapV2/BaseSwap/SushiSwap e Aerodrome)
+SYNC_TOPIC_V2 = '0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1'         # Sync(uint112,uint112)
+SYNC_TOPIC_AERODROME = '0xcf2aa50876cdfbb541206f89af0ee78d44a2abf8d328e37fa4917f982149848a'  # Sync(uint256,uint256)
+SYNC_TOPICS = [SYNC_TOPIC_V2, SYNC_TOPIC_AERODROME]
+
+GET_RESERVES_SELECTOR = bytes.fromhex('0902f1ac')
+
+# Fee de swap por DEX em pontos-base (1 bp = 0.01%)
+V2_FEE_BPS = {
+    'baseswap': 25,   # 0.25%
+    'sushiswap': 30,  # 0.3%
+    'aerodrome': 30   # 0.3% (pools voláteis, fee padrão da factory)
+}
+
+
+@dataclass
+class Quote:
+    """Cotação calculada localmente"""
+    amount_out: int
+    effective_price: float  # amount_out / amount_in (unidades brutas)
+    price_impact: float     # % abaixo do preço spot
+    pool: str
+    dex: str
+
+
+@dataclass
+class ConstantProductPool:
+    """Pool x*y=k com reservas em memória"""
+    address: str
+    dex: str
+    token0: str
+    token1: str
+    fee_bps: int
+    reserve0: int = 0
+    reserve1: int = 0
+    updated_at: Tuple[int, int] = (0, 0)  # (bloco, logIndex) do último Sync aplicado
+
+    def _reserves_for(self, token_in: str) -> Tuple[int, int]:
+        if token_in.lower() == self.token0.lower():
+            return self.reserve0, self.reserve1
+        return self.reserve1, self.reserve0
+
+    def get_amount_out(self, amount_in: int, token_in: str) -> int:
+        """Matemática inteira idêntica ao contrato (fee sobre a entrada)"""
+        reserve_in, reserve_out = self._reserves_for(token_in)
+        if amount_in <= 0 or reserve_in == 0 or reserve_out == 0:
+            return 0
+
+        if self.dex == 'aerodrome':
+            # Pool.getAmountOut: amountIn -= amountIn * fee / 10000; out = amountIn * rB / (rA + amountIn)
+            amount_in -= amount_in * self.fee_bps // 10000
+            return amount_in * reserve_out // (reserve_in + amount_in)
+
+        # UniswapV2Library.getAmountOut com fee em pontos-base
+        amount_in_with_fee = amount_in * (10000 - self.fee_bps)
+        return amount_in_with_fee * reserve_out // (reserve_in * 10000 + amount_in_with_fee)
+
+    def quote(self, amount_in: int, token_in: str) -> Quote:
+        """Cotação com preço efetivo e impacto em relação ao preço spot"""
+        reserve_in, reserve_out = self._reserves_for(token_in)
+        amount_out = self.get_amount_out(amount_in, token_in)
+
+        effective_price = amount_out / amount_in if amount_in > 0 else 0.0
+        spot_price = reserve_out / reserve_in if reserve_in > 0 else 0.0
+        price_impact = (1 - effective_price / spot_price) * 100 if spot_price > 0 else 100.0
+
+        return Quote(amount_out, effective_price, price_impact, self.address, self.dex)
+
+
+async def get_logs_by_address(web3: AsyncWeb3, addresses: List[str], params: Dict) -> List:
+    """get_logs com a lista de endereços em blocos de GET_LOGS_ADDRESS_CHUNK (em paralelo)"""
+    chunks = [addresses[i:i + GET_LOGS_ADDRESS_CHUNK] for i in range(0, len(addresses), GET_LOGS_ADDRESS_CHUNK)]
+    results = await asyncio.gather(*(web3.eth.get_logs({**params, 'address': chunk}) for chunk in chunks))
+    return [log for logs in results for log in logs]
+
+
+class PoolPricingEngine:
+    """Registro de pools V2 conhecidos (LRU limitado) e cotação local entre eles"""
+
+    def __init__(self, max_pools: int = MAX_TRACKED_POOLS):
+        self.max_pools = max_pools
+        self.pools: Dict[str, ConstantProductPool] = OrderedDict()  # Menos usado primeiro
+        self._by_pair: Dict[Tuple[str, str], List[str]] = {}
+        self._pinned: Set[str] = set()  # Tokens com posição aberta: pools nunca saem do registro
+
+        # Estatísticas
+        self.evictions = 0
+
+    @staticmethod
+    def _pair_key(token_a: str, token_b: str) -> Tuple[str, str]:
+        a, b = token_a.lower(), token_b.lower()
+        return (a, b) if a < b else (b, a)
+
+    @staticmethod
+    def supports(pool: PoolCreated) -> bool:
+        """Apenas pools de produto constante (Aerodrome estável usa outra curva)"""
+        return pool.dex in V2_FEE_BPS and not pool.stable
+
+    def register_pool(self, address: str, dex: str, token0: str, token1: str,
+                      reserve0: int = 0, reserve1: int = 0) -> ConstantProductPool:
+        """Adiciona pool ao registro (idempotente)"""
+        key = address.lower()
+        if key not in self.pools:
+            self.pools[key] = ConstantProductPool(
+                address, dex, token0, token1, V2_FEE_BPS[dex], reserve0, reserve1
+            )
+            self._by_pair.setdefault(self._pair_key(token0, token1), []).append(key)
+            self._evict()
+        self.pools.move_to_end(key)
+        return self.pools[key]
+
+    def pin(self, token: str):
+        """Posição aberta: pools do token ficam no registro até unpin"""
+        self._pinned.add(token.lower())
+
+    def unpin(self, token: str):
+        self._pinned.discard(token.lower())
+        self._evict()
+
+    def _is_pinned(self, pool: ConstantProductPool) -> bool:
+        return pool.token0.lower() in self._pinned or pool.token1.lower() in self._pinned
+
+    def _touch(self, keys: Iterable[str]):
+        for key in keys:
+            self.pools.move_to_end(key)
+
+    def _evict(self):
+        """Remove os pools menos usados (exceto os de posições abertas) acima do limite"""
+        excess = len(self.pools) - self.max_pools
+        for key in [key for key, pool in self.pools.items() if not self._is_pinned(pool)][:max(excess, 0)]:
+            pool = self.pools.pop(key)
+            pair = self._pair_key(pool.token0, pool.token1)
+            self._by_pair[pair].remove(key)
+            if not self._by_pair[pair]:
+                del self._by_pair[pair]
+            self.evictions += 1
+
+    def apply_sync_log(self, log) -> bool:
+        """Atualiza reservas a partir de um log Sync; ignora logs mais antigos que o estado atual"""
+        pool = self.pools.get(log['address'].lower())
+        if pool is None or not log['topics'] or log['topics'][0].hex() not in SYNC_TOPICS:
+            return False
+
+        position = (log['blockNumber'], log['logIndex'])
+        if position < pool.updated_at:
+            return False
+
+        data = bytes(log['data'])
+        pool.reserve0 = int.from_bytes(data[0:32], 'big')
+        pool.reserve1 = int.from_bytes(data[32:64], 'big')
+        pool.updated_at = position
+        return True
+
+    def best_quote(self, token_in: str, token_out: str, amount_in: int) -> Optional[Quote]:
+        """Melhor cotação local entre os pools conhecidos do par (None se nenhum tem reservas)"""
+        best = None
+        keys = self._by_pair.get(self._pair_key(token_in, token_out), [])
+        self._touch(keys)
+        for key in keys:
+            quote = self.pools[key].quote(amount_in, token_in)
+            if quote.amount_out > 0 and (best is None or quote.amount_out > best.amount_out):
+                best = quote
+        return best
+
+    def pools_for(self, token_a: str, token_b: str) -> List[ConstantProductPool]:
+        """Pools conhecidos do par"""
+        keys = self._by_pair.get(self._pair_key(token_a, token_b), [])
+        self._touch(keys)
+        return [self.pools[key] for key in keys]
+
+    def has_liquidity(self, token_a: str, token_b: str) -> bool:
+        """True se algum pool conhecido do par tem reservas nos dois lados"""
+        keys = self._by_pair.get(self._pair_key(token_a, token_b), [])
+        self._touch(keys)
+        return any(self.pools[key].reserve0 > 0 and self.pools[key].reserve1 > 0 for key in keys)
+
+    async def load_pool(self, web3: AsyncWeb3, pool: PoolCreated) -> Optional[ConstantProductPool]:
+        """Registra pool recém-criado e lê as reservas iniciais (um único eth_call)"""
+        if not self.supports(pool):
+            return None
+
+        entry = self.register_pool(pool.pool, pool.dex, pool.token0, pool.token1)
+        data = bytes(await web3.eth.call({'to': pool.pool, 'data': GET_RESERVES_SELECTOR}))
+        if len(data) >= 64 and entry.updated_at == (0, 0):
+            entry.reserve0 = int.from_bytes(data[0:32], 'big')
+            entry.reserve1 = int.from_bytes(data[32:64], 'big')
+        return entry
+
+    async def sync_from_logs(self, web3: AsyncWeb3, from_block: int, to_block: int) -> int:
+        """Aplica os eventos Sync dos pools do registro (lista de endereços em blocos)"""
+        if not self.pools:
+            return 0
+
+        logs = await get_logs_by_address(web3, [entry.address for entry in self.pools.values()], {
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': [SYNC_TOPICS]
+        })
+        return sum(1 for log in logs if self.apply_sync_log(log))
+
+
+# Instância global compartilhada
+POOL_PRICER = PoolPricingEngine()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Simulação pré-envio de swaps
+eth_call da calldata exata que será assinada contra o estado 'pending', em paralelo com a assinatura;
+revert ou saída abaixo do mínimo aborta o envio antes de gastar gas; falha de transporte (timeout, 429,
+conexão) não é revert e segue o caminho normal de retry
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from eth_abi import decode
+from web3 import AsyncWeb3
+from web3.exceptions import ContractLogicError
+
+from swap_templates import V2_SWAP_SELECTOR, V3_SWAP_SELECTOR
+
+# Offset do amountOutMin na calldata de cada função de swap
+MIN_OUT_OFFSETS = {
+    V2_SWAP_SELECTOR: 4 + 32,        # swapExactTokensForTokens(amountIn, amountOutMin, ...)
+    V3_SWAP_SELECTOR: 4 + 5 * 32,    # exactInputSingle((tokenIn, tokenOut, fee, recipient, amountIn, amountOutMin, ...))
+}
+SIMULATION_FIELDS = ('from', 'to', 'data', 'value', 'gas')
+REVERT_MESSAGES = ('execution reverted', 'revert', 'invalid opcode', 'out of gas')
+
+
+class PreflightError(Exception):
+    """Simulação indicou que o swap falharia na chain"""
+
+
+@dataclass
+class SimulationResult:
+    amount_out: int
+    min_amount_out: int
+    latency: float  # Segundos do eth_call
+
+
+def decode_amount_out(calldata: bytes, result: bytes) -> Optional[int]:
+    """Saída do swap pelo retorno da função (uint256[] amounts nos V2, uint256 amountOut no V3)"""
+    selector = bytes(calldata[:4])
+    if selector == V2_SWAP_SELECTOR:
+        amounts = decode(['uint256[]'], bytes(result))[0]
+        return amounts[-1] if amounts else None
+    if selector == V3_SWAP_SELECTOR:
+        return decode(['uint256'], bytes(result))[0]
+    return None
+
+
+def calldata_min_out(calldata: bytes) -> int:
+    """amountOutMin codificado na própria transação"""
+    offset = MIN_OUT_OFFSETS.get(bytes(calldata[:4]))
+    if offset is None or len(calldata) < offset + 32:
+        return 0
+    return int.from_bytes(calldata[offset:offset + 32], 'big')
+
+
+def is_execution_revert(error: Exception) -> bool:
+    """Erro da execução do swap (revert/panic), não do endpoint"""
+    if isinstance(error, ContractLogicError):
+        return True
+    message = str(error).lower()
+    return any(pattern in message for pattern in REVERT_MESSAGES)
+
+
+def _calldata(transaction: Dict) -> bytes:
+    data = transaction.get('data', b'')
+    return bytes.fromhex(data[2:]) if isinstance(data, str) else bytes(data)
+
+
+class SwapPreflight:
+    """Executa e contabiliza as simulações pré-envio"""
+
+    def __init__(self, block_identifier: str = 'pending'):
+        self.block_identifier = block_identifier
+
+        # Estatísticas
+        self.simulated = 0
+        self.aborted = 0
+        self.last_latency = 0.0
+
+    async def simulate(self, web3: AsyncWeb3, transaction: Dict, sender: str,
+                       min_amount_out: Optional[int] = None) -> SimulationResult:
+        """
+        eth_call da transação (mesma calldata, valor e gas) a partir da carteira.
+        Levanta PreflightError se reverter ou se a saída ficar abaixo do mínimo
+        (padrão: o amountOutMin da calldata, nunca menos de 1 token); erros de transporte propagam como estão
+        """
+        calldata = _calldata(transaction)
+        call = {key: transaction[key] for key in SIMULATION_FIELDS if key in transaction}
+        call['from'] = sender
+        minimum = max(min_amount_out if min_amount_out is not None else calldata_min_out(calldata), 1)
+
+        self.simulated += 1
+        start = time.monotonic()
+        try:
+            result = await web3.eth.call(call, self.block_identifier)
+        except Exception as e:
+            if not is_execution_revert(e):
+                raise
+            self.aborted += 1
+            raise PreflightError(f"simulação reverteu: {str(e)[:120]}") from e
+        finally:
+            self.last_latency = time.monotonic() - start
+
+        amount_out = decode_amount_out(calldata, result)
+        if amount_out is not None and amount_out < minimum:
+            self.aborted += 1
+            raise PreflightError(f"saída simulada {amount_out} abaixo do mínimo {minimum}")
+        return SimulationResult(amount_out if amount_out is not None else 0, minimum, self.last_latency)
+
+    def get_stats(self) -> Dict:
+        return {
+            'simulated': self.simulated,
+            'aborted': self.aborted,
+            'last_ms': round(self.last_latency * 1000, 1)
+        }
+
+
+# Instância global compartilhada
+PREFLIGHT = SwapPreflight()
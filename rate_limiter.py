@@ -1,86 +1,308 @@
 #!/usr/bin/env python3
 """
 Rate Limiter inteligente para evitar 429 errors
+Token bucket com acquire O(1), custo em créditos por método JSON-RPC e fila FIFO sem busy sleeping.
+Faixas de prioridade: execução > posições > análise > descoberta > dashboards
 """
 
 import asyncio
+import contextvars
+import math
 import time
-from typing import Dict, List
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from config import RPC_METHOD_COSTS, GET_LOGS_BLOCK_RANGE
+
+# Compute units por método (tabela de preços do provedor); 1 crédito = 1 eth_call
+METHOD_COMPUTE_UNITS = {
+    'eth_chainId': 0,
+    'eth_blockNumber': 10,
+    'eth_feeHistory': 10,
+    'eth_maxPriorityFeePerGas': 10,
+    'eth_getTransactionReceipt': 15,
+    'eth_getBlockByNumber': 16,
+    'eth_getBalance': 19,
+    'eth_getCode': 19,
+    'eth_gasPrice': 19,
+    'eth_call': 26,
+    'eth_getTransactionCount': 26,
+    'eth_getLogs': 75,
+    'eth_estimateGas': 87,
+    'eth_sendRawTransaction': 250,
+    'eth_getBlockReceipts': 500,
+}
+CREDIT_COMPUTE_UNITS = METHOD_COMPUTE_UNITS['eth_call']
+
+METHOD_COSTS: Dict[str, float] = {
+    method: units / CREDIT_COMPUTE_UNITS for method, units in METHOD_COMPUTE_UNITS.items()
+}
+METHOD_COSTS.update(RPC_METHOD_COSTS)  # Ajustes por provedor via .env
+
+
+def method_cost(method: str, params=None) -> float:
+    """Custo em créditos; eth_getLogs cresce com a largura da faixa de blocos"""
+    cost = METHOD_COSTS.get(method, 1.0)
+
+    if method == 'eth_getLogs' and params:
+        query = params[0] if isinstance(params, (list, tuple)) else params
+        try:
+            span = int(str(query['toBlock']), 0) - int(str(query['fromBlock']), 0) + 1
+            cost *= max(1, math.ceil(span / GET_LOGS_BLOCK_RANGE))
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    return cost
+
+
+# Faixas de prioridade (menor número = atendido primeiro)
+LANE_EXECUTION = 0   # Envio de compras/vendas
+LANE_POSITION = 1    # Preço e saldo de posições abertas
+LANE_ANALYSIS = 2    # Análise de tokens detectados (padrão)
+LANE_DISCOVERY = 3   # Scans de novos pares
+LANE_DASHBOARD = 4   # Status e Telegram
+LANE_NAMES = ('execution', 'position', 'analysis', 'discovery', 'dashboard')
+
+# Faixas a partir desta são descartadas durante backoff de 429
+PREEMPTIBLE_LANE = LANE_DISCOVERY
+
+_current_lane = contextvars.ContextVar('rpc_lane', default=LANE_ANALYSIS)
+
+
+@contextmanager
+def rpc_lane(lane: int):
+    """Define a faixa das chamadas RPC feitas neste contexto (herdada por tasks criadas dentro dele)"""
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> int:
+    return _current_lane.get()
+
+
+class RateLimitPreempted(Exception):
+    """Trabalho de baixa prioridade descartado enquanto o provedor responde 429"""
+
+
 @dataclass
 class RateLimitConfig:
-    max_requests: int
+    max_requests: int  # créditos por janela (1 crédito = 1 eth_call)
     time_window: int  # segundos
     backoff_multiplier: float = 2.0
     max_backoff: int = 60
+    burst: Optional[int] = None  # Capacidade do bucket (padrão: max_requests)
+    execution_reserve: float = 0.0  # Fração da capacidade que só a faixa de execução pode consumir
 
 class SmartRateLimiter:
-    """Rate limiter inteligente com backoff exponencial"""
-    
+    """Rate limiter inteligente com token bucket, faixas de prioridade e backoff exponencial"""
+
     def __init__(self, config: RateLimitConfig):
         self.config = config
-        self.requests: List[float] = []
+        self.rate = config.max_requests / config.time_window  # créditos por segundo
+        self.capacity = float(config.burst or config.max_requests)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.reserve = self.capacity * config.execution_reserve
+
+        # Uma fila FIFO por faixa: (custo, future) - despachadas por um único timer
+        self._waiters: List[Deque[Tuple[float, asyncio.Future]]] = [deque() for _ in LANE_NAMES]
+        self._timer: Optional[asyncio.TimerHandle] = None
+
         self.current_backoff = 0
         self.last_429_time = 0
         self.consecutive_429s = 0
-        
-    async def acquire(self):
-        """Adquire permissão para fazer uma requisição"""
-        now = time.time()
-        
-        # Limpar requisições antigas
-        self.requests = [req_time for req_time in self.requests 
-                        if now - req_time < self.config.time_window]
-        
-        # Verificar se precisa de backoff após 429
-        if self.current_backoff > 0:
-            if now - self.last_429_time < self.current_backoff:
-                wait_time = self.current_backoff - (now - self.last_429_time)
-                print(f"⏳ Rate limit backoff: aguardando {wait_time:.1f}s")
-                await asyncio.sleep(wait_time)
-            else:
-                # Reduzir backoff gradualmente
-                self.current_backoff = max(0, self.current_backoff * 0.5)
-        
-        # Verificar limite de requisições
-        if len(self.requests) >= self.config.max_requests:
-            oldest_request = min(self.requests)
-            wait_time = self.config.time_window - (now - oldest_request)
-            if wait_time > 0:
-                print(f"⏳ Rate limit: aguardando {wait_time:.1f}s")
-                await asyncio.sleep(wait_time)
-        
-        # Registrar nova requisição
-        self.requests.append(time.time())
-    
+        self._blocked_until = 0.0
+
+        # Estatísticas
+        self.granted = 0
+        self.queued = 0
+        self.credits_spent = 0.0
+        self.preempted = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _take(self, cost: float):
+        self.tokens -= cost
+        self.granted += 1
+        self.credits_spent += cost
+
+    def _can_take(self, lane: int, cost: float) -> bool:
+        """
+        Faixas comuns não consomem a reserva de execução.
+        Execução pode usar a reserva e ficar devendo até uma capacidade (quitada pelo refill,
+        o que atrasa as demais faixas em vez da ordem de compra/venda).
+        """
+        if lane == LANE_EXECUTION:
+            return self.tokens - cost >= -self.capacity
+        return self.tokens - cost >= self.reserve
+
+    def _cost(self, method: str, calls: int, lane: int, params=None) -> float:
+        """
+        Custo limitado ao que a faixa pode ter no bucket de uma vez (faixas comuns não alcançam
+        a reserva de execução; sem o limite, um pedido caro esperaria para sempre e travaria a fila)
+        """
+        ceiling = self.capacity if lane == LANE_EXECUTION else self.capacity - self.reserve
+        return min(method_cost(method, params) * calls, ceiling)
+
+    def should_yield(self, lane: Optional[int] = None) -> bool:
+        """Trabalho preemptível deve ceder a vez (backoff de 429 em andamento)"""
+        lane = current_lane() if lane is None else lane
+        return lane >= PREEMPTIBLE_LANE and time.monotonic() < self._blocked_until
+
+    def try_acquire(self, method: str = 'eth_call', calls: int = 1, lane: Optional[int] = None,
+                    params=None) -> bool:
+        """Tenta consumir créditos sem esperar (O(1)); respeita quem já está na fila com prioridade igual ou maior"""
+        lane = current_lane() if lane is None else lane
+        cost = self._cost(method, calls, lane, params)
+        now = time.monotonic()
+        self._refill(now)
+
+        if (now >= self._blocked_until and not any(self._waiters[:lane + 1])
+                and self._can_take(lane, cost)):
+            self._take(cost)
+            return True
+        return False
+
+    async def acquire(self, method: str = 'eth_call', calls: int = 1, lane: Optional[int] = None, params=None):
+        """
+        Adquire créditos para `calls` chamadas de `method` na faixa `lane` (padrão: faixa do contexto).
+        `params` = parâmetros JSON-RPC (filtro do eth_getLogs: custo cresce com a faixa de blocos).
+        Levanta RateLimitPreempted para faixas preemptíveis durante backoff de 429.
+        """
+        lane = current_lane() if lane is None else lane
+        if self.try_acquire(method, calls, lane, params):
+            return
+        if self.should_yield(lane):
+            self.preempted += 1
+            raise RateLimitPreempted(f"RPC em backoff: faixa {LANE_NAMES[lane]} adiada")
+
+        cost = self._cost(method, calls, lane, params)
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append((cost, future))
+        self.queued += 1
+
+        wait_time = self._schedule()
+        if wait_time >= 1:
+            print(f"⏳ Rate limit: aguardando {wait_time:.1f}s")
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.tokens += cost  # Créditos concedidos e não usados voltam ao bucket
+            raise
+
+    def _next_lane(self) -> Optional[int]:
+        """Faixa de maior prioridade com alguém esperando (descarta waiters cancelados)"""
+        for lane, waiters in enumerate(self._waiters):
+            while waiters and waiters[0][1].done():
+                waiters.popleft()
+            if waiters:
+                return lane
+        return None
+
+    def _schedule(self) -> float:
+        """Agenda o despacho para quando o primeiro da faixa mais prioritária puder ser atendido"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        lane = self._next_lane()
+        if lane is None:
+            return 0.0
+
+        now = time.monotonic()
+        self._refill(now)
+        cost = self._waiters[lane][0][0]
+        floor = -self.capacity if lane == LANE_EXECUTION else self.reserve
+        delay = max(self._blocked_until - now, (cost + floor - self.tokens) / self.rate, 0.0)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+        return delay
+
+    def _dispatch(self):
+        """Libera waiters por prioridade (FIFO dentro de cada faixa) enquanto houver créditos"""
+        self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+
+        while now >= self._blocked_until:
+            lane = self._next_lane()
+            if lane is None:
+                break
+            cost, future = self._waiters[lane][0]
+            if not self._can_take(lane, cost):
+                break  # Faixas menores esperam a de maior prioridade
+            self._waiters[lane].popleft()
+            self._take(cost)
+            future.set_result(None)
+
+        if self._next_lane() is not None:
+            self._schedule()
+
+    def _preempt(self):
+        """Falha os waiters das faixas preemptíveis para liberar a fila para execução"""
+        for waiters in self._waiters[PREEMPTIBLE_LANE:]:
+            while waiters:
+                _, future = waiters.popleft()
+                if not future.done():
+                    future.set_exception(RateLimitPreempted("RPC em backoff: trabalho de baixa prioridade descartado"))
+                    self.preempted += 1
+
     def handle_429_error(self):
         """Lidar com erro 429"""
         now = time.time()
         self.last_429_time = now
         self.consecutive_429s += 1
-        
+
         # Backoff exponencial
-        base_backoff = min(5 * (self.config.backoff_multiplier ** self.consecutive_429s), 
+        base_backoff = min(5 * (self.config.backoff_multiplier ** self.consecutive_429s),
                           self.config.max_backoff)
         self.current_backoff = base_backoff
-        
+
+        # Bucket esvaziado e fila pausada durante o backoff
+        self.tokens = 0.0
+        self._blocked_until = time.monotonic() + self.current_backoff
+        self._preempt()
+
         print(f"🚫 Rate limit 429 detectado. Backoff: {self.current_backoff}s")
-    
+
     def handle_success(self):
         """Lidar com requisição bem-sucedida"""
         if self.consecutive_429s > 0:
             self.consecutive_429s = max(0, self.consecutive_429s - 1)
             if self.consecutive_429s == 0:
                 self.current_backoff = 0
+                self._blocked_until = 0.0
                 print("✅ Rate limit recuperado")
+                if self._next_lane() is not None:
+                    self._schedule()  # Fila não espera o fim do backoff já encerrado
+
+    def get_stats(self) -> Dict:
+        self._refill(time.monotonic())
+        return {
+            'tokens': round(self.tokens, 2),
+            'capacity': self.capacity,
+            'waiting': {LANE_NAMES[lane]: len(waiters) for lane, waiters in enumerate(self._waiters) if waiters},
+            'granted': self.granted,
+            'queued': self.queued,
+            'preempted': self.preempted,
+            'credits_spent': round(self.credits_spent, 2),
+            'backoff': self.current_backoff
+        }
 
 # Configurações OTIMIZADAS para Base Network (evitar 429 errors)
 BASE_RPC_LIMITER = SmartRateLimiter(RateLimitConfig(
-    max_requests=15,  # 15 requisições por janela (evitar rate limit)
+    max_requests=15,  # 15 créditos (eth_call equivalentes) por janela
     time_window=60,   # 60 segundos
     backoff_multiplier=1.5,  # Backoff moderado
-    max_backoff=10    # Backoff máximo 10 segundos
+    max_backoff=10,   # Backoff máximo 10 segundos
+    execution_reserve=0.3  # 30% do bucket reservado para compras/vendas
 ))
 
 TELEGRAM_LIMITER = SmartRateLimiter(RateLimitConfig(
@@ -93,7 +315,7 @@ TELEGRAM_LIMITER = SmartRateLimiter(RateLimitConfig(
 async def with_rate_limit(limiter: SmartRateLimiter, func, *args, **kwargs):
     """Executa função com rate limiting"""
     await limiter.acquire()
-    
+
     try:
         result = await func(*args, **kwargs) if asyncio.iscoroutinefunction(func) else func(*args, **kwargs)
         limiter.handle_success()
@@ -101,4 +323,4 @@ async def with_rate_limit(limiter: SmartRateLimiter, func, *args, **kwargs):
     except Exception as e:
         if "429" in str(e) or "Too Many Requests" in str(e):
             limiter.handle_429_error()
-        raise e
\ No newline at end of file
+        raise e
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Cache de leituras RPC indexado por bloco
+eth_call, eth_getCode, eth_getBalance e eth_getTransactionCount respondidos uma vez por bloco,
+invalidados a cada novo head e descartados quando o bloco é órfão (reorg)
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set, Tuple
+
+from config import RPC_CACHE_BLOCK_WINDOW
+
+# Métodos de leitura cujo resultado depende apenas dos parâmetros e do bloco
+CACHEABLE_METHODS = {'eth_call', 'eth_getCode', 'eth_getBalance', 'eth_getTransactionCount'}
+
+CacheKey = Tuple[str, str, int]
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    return str(value)
+
+
+class RPCReadCache:
+    """Cache read-through por (método, parâmetros, número do bloco)"""
+
+    def __init__(self, block_window: int = RPC_CACHE_BLOCK_WINDOW):
+        self.block_window = block_window
+        self.head: Optional[int] = None
+        self.entries: Dict[CacheKey, Dict] = {}
+        self._keys_by_block: Dict[int, Set[CacheKey]] = {}
+        self._block_hashes: Dict[int, bytes] = {}
+        self._inflight: Dict[CacheKey, asyncio.Future] = {}
+
+        # Estatísticas
+        self.hits = 0
+        self.misses = 0
+        self.reorgs = 0
+
+    def _resolve_block(self, block_identifier) -> Optional[int]:
+        """'latest' vira o head atual; tags sem número fixo (pending, safe...) não são cacheadas"""
+        if block_identifier is None or block_identifier == 'latest':
+            return self.head
+        if isinstance(block_identifier, int):
+            return block_identifier
+        if isinstance(block_identifier, str) and block_identifier.startswith('0x'):
+            return int(block_identifier, 16)
+        return None
+
+    def cache_key(self, method: str, params: Any) -> Optional[CacheKey]:
+        """Chave da leitura, ou None se não deve ser cacheada"""
+        if method not in CACHEABLE_METHODS:
+            return None
+
+        params = list(params or [])
+        block_number = self._resolve_block(params[1] if len(params) > 1 else 'latest')
+        if block_number is None or (self.head is not None and block_number > self.head):
+            return None
+
+        # eth_call com state override (3º parâmetro) também entra na chave
+        serialized = json.dumps([params[0]] + params[2:], sort_keys=True, default=_json_default)
+        return (method, serialized, block_number)
+
+    def get(self, key: CacheKey) -> Optional[Dict]:
+        response = self.entries.get(key)
+        if response is not None:
+            self.hits += 1
+        return response
+
+    def put(self, key: CacheKey, response: Dict):
+        """Armazena apenas respostas de sucesso"""
+        if 'error' in response or 'result' not in response:
+            return
+        if self.head is not None and key[2] < self.head - self.block_window:
+            return
+        self.entries[key] = response
+        self._keys_by_block.setdefault(key[2], set()).add(key)
+
+    def _drop_from(self, block_number: int):
+        """Remove entradas e hashes de blocos >= block_number (órfãos)"""
+        for number in [n for n in self._keys_by_block if n >= block_number]:
+            for key in self._keys_by_block.pop(number):
+                self.entries.pop(key, None)
+        for number in [n for n in self._block_hashes if n >= block_number]:
+            del self._block_hashes[number]
+
+    def _prune(self):
+        """Descarta blocos fora da janela mantida"""
+        oldest = self.head - self.block_window
+        for number in [n for n in self._keys_by_block if n < oldest]:
+            for key in self._keys_by_block.pop(number):
+                self.entries.pop(key, None)
+        for number in [n for n in self._block_hashes if n < oldest]:
+            del self._block_hashes[number]
+
+    def on_new_head(self, block_number: int, block_hash: Optional[bytes] = None,
+                    parent_hash: Optional[bytes] = None):
+        """
+        Avança o head. Leituras 'latest' passam a resolver para o novo bloco.
+        Reorg detectado (número repetido/menor ou parentHash divergente) descarta os blocos órfãos.
+        """
+        fork_block = None
+
+        if self.head is not None and block_number <= self.head:
+            known_hash = self._block_hashes.get(block_number)
+            if block_hash is None or known_hash is None or bytes(block_hash) != known_hash:
+                fork_block = block_number
+        if parent_hash is not None:
+            known_parent = self._block_hashes.get(block_number - 1)
+            if known_parent is not None and bytes(parent_hash) != known_parent:
+                fork_block = block_number - 1 if fork_block is None else min(fork_block, block_number - 1)
+
+        if fork_block is not None:
+            self.reorgs += 1
+            self._drop_from(fork_block)
+
+        if self.head is None or block_number >= self.head or fork_block is not None:
+            self.head = block_number
+        if block_hash is not None:
+            self._block_hashes[block_number] = bytes(block_hash)
+        self._prune()
+
+    def _observe(self, method: str, response: Dict):
+        """Respostas de eth_blockNumber também avançam o head (modo polling, sem newHeads)"""
+        if method == 'eth_blockNumber' and isinstance(response.get('result'), str):
+            block_number = int(response['result'], 16)
+            if self.head is None or block_number > self.head:
+                self.on_new_head(block_number)
+
+    def clear(self):
+        self.entries.clear()
+        self._keys_by_block.clear()
+
+    async def middleware(self, make_request, w3):
+        """Middleware AsyncWeb3: leituras idênticas no mesmo bloco chegam ao RPC uma única vez"""
+        async def cached_request(method, params):
+            key = self.cache_key(method, params)
+            if key is None:
+                response = await make_request(method, params)
+                self._observe(method, response)
+                return response
+
+            cached = self.get(key)
+            if cached is not None:
+                return dict(cached)
+
+            # Requisição idêntica já em andamento: aguardar a mesma resposta
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self.hits += 1
+                return dict(await asyncio.shield(inflight))
+
+            self.misses += 1
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            try:
+                response = await make_request(method, params)
+                self.put(key, response)
+                future.set_result(response)
+                return response
+            except BaseException as e:
+                future.set_exception(e)
+                future.exception()  # Evita aviso de exceção não consumida
+                raise
+            finally:
+                del self._inflight[key]
+
+        return cached_request
+
+    def sync_middleware(self, make_request, w3):
+        """Middleware Web3 síncrono (helpers do Telegram) compartilhando o mesmo cache"""
+        def cached_request(method, params):
+            key = self.cache_key(method, params)
+            if key is None:
+                response = make_request(method, params)
+                self._observe(method, response)
+                return response
+
+            cached = self.get(key)
+            if cached is not None:
+                return dict(cached)
+
+            self.misses += 1
+            response = make_request(method, params)
+            self.put(key, response)
+            return response
+
+        return cached_request
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'head': self.head,
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total * 100) if total else 0.0,
+            'reorgs': self.reorgs
+        }
+
+
+# Instância global compartilhada
+RPC_CACHE = RPCReadCache()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Camada RPC assíncrona compartilhada
+AsyncWeb3 sobre um único pool de conexões aiohttp keep-alive usado por todos os componentes;
+com vários endpoints, as requisições passam pelo pool RPC com score de saúde
+"""
+
+from typing import Optional, Sequence, Union
+import aiohttp
+from web3 import AsyncWeb3
+from web3.providers.async_rpc import AsyncHTTPProvider
+
+from config import RPC_POOL_SIZE, RPC_KEEPALIVE_TIMEOUT, RPC_TIMEOUT
+from rpc_cache import RPC_CACHE
+from rpc_pool import PooledProvider
+
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Retorna a sessão aiohttp compartilhada (deve ser chamada dentro do event loop)"""
+    global _http_session
+
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=RPC_POOL_SIZE,                    # Conexões simultâneas no pool
+            keepalive_timeout=RPC_KEEPALIVE_TIMEOUT,  # Reutilizar sockets entre chamadas
+            ttl_dns_cache=300
+        )
+        _http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=RPC_TIMEOUT),
+            raise_for_status=True
+        )
+
+    return _http_session
+
+
+async def create_http_provider(endpoint_uri: str) -> AsyncHTTPProvider:
+    provider = AsyncHTTPProvider(
+        endpoint_uri,
+        request_kwargs={'timeout': aiohttp.ClientTimeout(total=RPC_TIMEOUT)}
+    )
+    # Registrar a sessão compartilhada para este endpoint (web3 reutiliza a mesma sessão)
+    await provider.cache_async_session(get_http_session())
+    return provider
+
+
+async def create_async_web3(endpoint_uri: Union[str, Sequence[str]]) -> AsyncWeb3:
+    """Cria AsyncWeb3 para o endpoint (ou lista de endpoints) usando o pool de conexões compartilhado"""
+    endpoints = [endpoint_uri] if isinstance(endpoint_uri, str) else list(endpoint_uri)
+    providers = [await create_http_provider(uri) for uri in endpoints]
+
+    # Vários endpoints: roteamento por saúde e leituras críticas hedged
+    provider = providers[0] if len(providers) == 1 else PooledProvider(providers)
+    web3 = AsyncWeb3(provider)
+    # Leituras por bloco servidas do cache compartilhado entre endpoints
+    web3.middleware_onion.add(RPC_CACHE.middleware, 'rpc_cache')
+    return web3
+
+
+async def close_http_session():
+    """Fecha o pool de conexões compartilhado"""
+    global _http_session
+
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Pool de endpoints RPC com score de saúde e requisições hedged
+Cada requisição vai para o endpoint com melhor latência/erros/atraso de head; leituras das faixas
+críticas (execução e posições) são enviadas a dois endpoints e a primeira resposta vence
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from web3.providers.async_base import AsyncBaseProvider
+
+from config import RPC_TIMEOUT, RPC_HEDGE_LANE, RPC_PROBE_INTERVAL
+from rate_limiter import current_lane
+
+# Leituras idempotentes que podem ir a dois endpoints ao mesmo tempo
+HEDGED_METHODS = {
+    'eth_call', 'eth_getBalance', 'eth_getCode', 'eth_getTransactionCount', 'eth_blockNumber',
+    'eth_getTransactionReceipt', 'eth_getBlockByNumber', 'eth_getBlockReceipts', 'eth_estimateGas',
+    'eth_feeHistory', 'eth_maxPriorityFeePerGas', 'eth_gasPrice', 'eth_chainId'
+}
+
+# Erros JSON-RPC que indicam problema do endpoint (não da requisição): tentar outro
+ENDPOINT_ERROR_CODES = {-32005, 429}
+ENDPOINT_ERROR_MESSAGES = ('rate limit', 'too many requests', 'capacity exceeded', 'header not found')
+
+LATENCY_ALPHA = 0.2         # Peso da amostra mais recente na média móvel
+ERROR_PENALTY = 4.0         # Score multiplicado por (1 + ERROR_PENALTY * taxa de erro)
+HEAD_LAG_PENALTY = 2.0      # Segundos de penalidade por bloco atrás do melhor head (~1 bloco na Base)
+COOLDOWN_AFTER_ERRORS = 3   # Erros consecutivos que tiram o endpoint da rotação
+COOLDOWN_SECONDS = 30
+
+
+class EndpointError(Exception):
+    """Resposta do endpoint indica falha dele (rate limit, nó atrasado), não da chamada"""
+
+
+def is_endpoint_error(response: Dict) -> bool:
+    error = response.get('error')
+    if not error:
+        return False
+    if isinstance(error, dict):
+        message = str(error.get('message', '')).lower()
+        return error.get('code') in ENDPOINT_ERROR_CODES or any(m in message for m in ENDPOINT_ERROR_MESSAGES)
+    return any(m in str(error).lower() for m in ENDPOINT_ERROR_MESSAGES)
+
+
+@dataclass
+class RPCEndpoint:
+    """Endpoint e sua saúde recente"""
+    url: str
+    provider: AsyncBaseProvider
+    latency: Optional[float] = None  # Média móvel exponencial (segundos)
+    error_rate: float = 0.0          # Média móvel exponencial de falhas (0-1)
+    head: Optional[int] = None
+    consecutive_errors: int = 0
+    cooldown_until: float = 0.0
+    requests: int = 0
+    errors: int = 0
+
+    def record(self, latency: Optional[float], ok: bool):
+        self.requests += 1
+        self.error_rate += LATENCY_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+
+        if ok:
+            self.consecutive_errors = 0
+            self.latency = latency if self.latency is None else self.latency + LATENCY_ALPHA * (latency - self.latency)
+        else:
+            self.errors += 1
+            self.consecutive_errors += 1
+            if self.consecutive_errors >= COOLDOWN_AFTER_ERRORS:
+                self.cooldown_until = time.monotonic() + COOLDOWN_SECONDS
+
+    def record_censored(self, elapsed: float):
+        """
+        Hedge perdido (cancelado): só se sabe que a latência é maior que elapsed. A amostra só
+        pode subir a média e não conta como sucesso (não zera erros nem a taxa de erro)
+        """
+        if self.latency is None or elapsed > self.latency:
+            self.latency = elapsed if self.latency is None else self.latency + LATENCY_ALPHA * (elapsed - self.latency)
+
+    def score(self, best_head: Optional[int], now: float) -> float:
+        """Menor é melhor: latência penalizada por erros e por atraso de head"""
+        if now < self.cooldown_until:
+            return float('inf')
+
+        latency = self.latency if self.latency is not None else 0.0  # Endpoint novo: testar logo
+        lag = max(0, best_head - self.head) if best_head is not None and self.head is not None else 0
+        return latency * (1 + ERROR_PENALTY * self.error_rate) + lag * HEAD_LAG_PENALTY
+
+
+class PooledProvider(AsyncBaseProvider):
+    """Provider AsyncWeb3 que roteia cada requisição para o melhor endpoint do pool"""
+
+    def __init__(self, providers: Sequence[AsyncBaseProvider], hedge_lane: int = RPC_HEDGE_LANE,
+                 probe_interval: float = RPC_PROBE_INTERVAL):
+        super().__init__()
+        self.endpoints = [
+            RPCEndpoint(str(getattr(provider, 'endpoint_uri', provider)), provider) for provider in providers
+        ]
+        self.hedge_lane = hedge_lane
+        self.probe_interval = probe_interval
+        self._last_probe = 0.0
+        self._probe_task: Optional[asyncio.Task] = None
+
+        # Estatísticas
+        self.hedged = 0
+        self.failovers = 0
+
+    @property
+    def best_head(self) -> Optional[int]:
+        heads = [endpoint.head for endpoint in self.endpoints if endpoint.head is not None]
+        return max(heads) if heads else None
+
+    def ranked(self) -> List[RPCEndpoint]:
+        """Endpoints do melhor para o pior (em cooldown por último, mas ainda usáveis)"""
+        now = time.monotonic()
+        best_head = self.best_head
+        return sorted(self.endpoints, key=lambda endpoint: endpoint.score(best_head, now))
+
+    async def _send(self, endpoint: RPCEndpoint, method: str, params: Any) -> Dict:
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(endpoint.provider.make_request(method, params), timeout=RPC_TIMEOUT)
+        except asyncio.CancelledError:
+            # Perdeu o hedge: não é erro nem sucesso; o tempo até o cancelamento é só um piso da latência
+            endpoint.record_censored(time.monotonic() - start)
+            raise
+        except Exception:
+            endpoint.record(None, ok=False)
+            raise
+
+        if is_endpoint_error(response):
+            endpoint.record(None, ok=False)
+            raise EndpointError(f"{endpoint.url}: {response['error']}")
+
+        endpoint.record(time.monotonic() - start, ok=True)
+        if method == 'eth_blockNumber' and isinstance(response.get('result'), str):
+            endpoint.head = int(response['result'], 16)
+        return response
+
+    async def _hedged(self, endpoints: List[RPCEndpoint], method: str, params: Any) -> Dict:
+        """Mesma leitura em vários endpoints: primeira resposta válida vence, as demais são canceladas"""
+        self.hedged += 1
+        tasks = {asyncio.create_task(self._send(endpoint, method, params)) for endpoint in endpoints}
+        last_error: Optional[BaseException] = None
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def make_request(self, method: str, params: Any) -> Dict:
+        self._maybe_probe()
+        ranked = self.ranked()
+
+        hedge = method in HEDGED_METHODS and current_lane() <= self.hedge_lane and len(ranked) > 1
+        if hedge:
+            try:
+                return await self._hedged(ranked[:2], method, params)
+            except Exception:
+                if len(ranked) == 2:
+                    raise
+                ranked = ranked[2:]
+                self.failovers += 1
+
+        last_error = None
+        for index, endpoint in enumerate(ranked):
+            try:
+                return await self._send(endpoint, method, params)
+            except Exception as e:
+                last_error = e
+                if index + 1 < len(ranked):
+                    self.failovers += 1
+        raise last_error
+
+    def _maybe_probe(self):
+        """Atualiza head e latência de todos os endpoints em segundo plano, no máximo a cada probe_interval"""
+        now = time.monotonic()
+        if now - self._last_probe < self.probe_interval or len(self.endpoints) < 2:
+            return
+        if self._probe_task is not None and not self._probe_task.done():
+            return
+        self._last_probe = now
+        self._probe_task = asyncio.create_task(self.probe())
+
+    async def probe(self):
+        """eth_blockNumber em todos os endpoints (falhas entram na taxa de erro)"""
+        await asyncio.gather(
+            *[self._send(endpoint, 'eth_blockNumber', []) for endpoint in self.endpoints],
+            return_exceptions=True
+        )
+
+    async def is_connected(self, show_traceback: bool = False) -> bool:
+        await self.probe()
+        return any(endpoint.consecutive_errors == 0 for endpoint in self.endpoints)
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        best_head = self.best_head
+        return {
+            'hedged': self.hedged,
+            'failovers': self.failovers,
+            'endpoints': [
+                {
+                    'url': endpoint.url,
+                    'latency_ms': round(endpoint.latency * 1000, 1) if endpoint.latency is not None else None,
+                    'error_rate': round(endpoint.error_rate, 3),
+                    'head_lag': (best_head - endpoint.head) if best_head is not None and endpoint.head is not None else None,
+                    'score': endpoint.score(best_head, now)
+                }
+                for endpoint in self.endpoints
+            ]
+        }
+
+    def __str__(self) -> str:
+        return f"RPC pool ({len(self.endpoints)} endpoints)"
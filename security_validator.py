@@ -5,238 +5,273 @@ Implementa verificações de segurança avançadas
 """
 
 import time
+import asyncio
 from typing import Dict, List, Optional, Tuple
-from web3 import Web3
+from eth_utils import function_signature_to_4byte_selector
+from web3 import Web3, AsyncWeb3
 from colorama import Fore, Style, init
 import requests
 
 from config import *
+from token_metadata import TOKEN_METADATA, TokenMetadata
+from fee_oracle import FEE_ORACLE
+from bytecode_selectors import SELECTOR_INDEX, risky_functions
+from verdict_cache import VERDICT_CACHE
+from honeypot_simulator import HONEYPOT_SIMULATOR
+from mev_watcher import MEV_WATCHER
+from check_orchestrator import CHECK_ORCHESTRATOR, Check, format_timings
+from multicall import Multicall3
+
+OWNER_SELECTOR = function_signature_to_4byte_selector('owner()')
+TOTAL_SUPPLY_SELECTOR = function_signature_to_4byte_selector('totalSupply()')
+BALANCE_OF_ZERO_CALLDATA = function_signature_to_4byte_selector('balanceOf(address)') + bytes(32)
 
 init(autoreset=True)
 
 class SecurityValidator:
-    def __init__(self, web3: Web3):
+    def __init__(self, web3: AsyncWeb3):
         self.web3 = web3
         self.honeypot_contracts = set()
         self.blacklisted_tokens = set()
         
-    def validate_token_security(self, token_address: str) -> Dict:
+    async def validate_token_security(self, token_address: str) -> Dict:
         """
         Valida segurança do token
+        Clones de um template já analisado reaproveitam as verificações de bytecode do cache;
+        estado (owner/supply) e honeypot são sempre verificados no próprio token
         Returns: dict com score de segurança e detalhes
         """
+        try:
+            metadata = await TOKEN_METADATA.fetch(self.web3, token_address)
+            code = TOKEN_METADATA.get_code(metadata.code_hash) if metadata.is_contract else None
+            if not code:
+                return await self._analyze_token_security(token_address, metadata)
+            return await VERDICT_CACHE.resolve(
+                metadata.code_hash, code, token_address,
+                lambda: self._analyze_code(metadata),
+                lambda code_checks: self._analyze_token_security(token_address, metadata, code_checks)
+            )
+            
+        except Exception as e:
+            return {
+                'score': 0,
+                'issues': [f"Erro na validação: {str(e)}"],
+                'warnings': [],
+                'is_safe': False,
+                'details': {}
+            }
+    
+    def _analyze_code(self, metadata: TokenMetadata) -> Dict:
+        """Verificações que dependem só do bytecode (valem para todos os clones do template)"""
+        return {
+            'contract': metadata.code_size > 2,  # "0x" apenas
+            'dangerous_functions': self._check_dangerous_functions(metadata)
+        }
+    
+    async def _analyze_token_security(self, token_address: str, metadata: TokenMetadata,
+                                      code_checks: Optional[Dict] = None) -> Dict:
+        """
+        Executa as verificações como grafo: entradas compartilhadas (metadados e um aggregate3 com
+        owner/totalSupply/balanceOf) lidas uma vez, verificações independentes em paralelo e
+        parada imediata em contrato inválido ou honeypot. `code_checks` = verificações de bytecode
+        do template (cache); estado e honeypot são sempre do token. Erros propagam
+        """
         security_score = 100
         issues = []
         warnings = []
+        code_checks = code_checks or self._analyze_code(metadata)
         
-        try:
-            # 1. Verificar se é contrato válido
-            code = self.web3.eth.get_code(token_address)
-            if len(code) <= 2:  # "0x" apenas
-                issues.append("Token não é um contrato válido")
-                security_score -= 50
-            
-            # 2. Verificar se é ERC20 padrão
-            erc20_valid = self._check_erc20_compliance(token_address)
-            if not erc20_valid:
+        run = await CHECK_ORCHESTRATOR.run([
+            Check('token_state', lambda inputs: self._fetch_token_state(token_address)),
+            Check('contract', lambda inputs: code_checks['contract'],
+                  blocking=lambda valid: None if valid else "contrato inválido"),
+            Check('honeypot', lambda inputs: self._check_honeypot(token_address, metadata),
+                  blocking=lambda info: info.get('reason') if info['is_honeypot'] or info.get('buy_ok') is False else None),
+            Check('erc20', lambda inputs: self._check_erc20_compliance(metadata, inputs['token_state']),
+                  deps=('token_state',)),
+            Check('ownership', lambda inputs: self._check_ownership(inputs['token_state']), deps=('token_state',)),
+            Check('dangerous_functions', lambda inputs: code_checks['dangerous_functions']),
+            Check('liquidity', lambda inputs: self._check_liquidity_security(token_address)),
+            Check('holders', lambda inputs: self._check_holder_distribution(token_address)),
+        ], graph='token')
+        results = run.results
+        details = {}
+        
+        # 1. Verificar se é contrato válido (bytecode do store de metadados)
+        if results.get('contract') is False:
+            issues.append("Token não é um contrato válido")
+            security_score -= 50
+        
+        # 2. Verificar se é ERC20 padrão
+        if 'erc20' in results:
+            details['erc20_compliant'] = results['erc20']
+            if not results['erc20']:
                 warnings.append("Token pode não seguir padrão ERC20 completo")
                 security_score -= 15  # Reduzido de 30 para 15
-            
-            # 3. Verificar honeypot
-            is_honeypot = self._check_honeypot(token_address)
-            if is_honeypot:
-                issues.append("Token identificado como honeypot")
+        
+        # 3. Verificar honeypot
+        if 'honeypot' in results:
+            honeypot_info = results['honeypot']
+            details['is_honeypot'] = honeypot_info['is_honeypot']
+            details['honeypot'] = honeypot_info
+            if honeypot_info['is_honeypot']:
+                issues.append(f"Token identificado como honeypot ({honeypot_info.get('reason') or 'lista local'})")
                 security_score -= 80
-            
-            # 4. Verificar ownership e renúncia
-            ownership_info = self._check_ownership(token_address)
+            elif honeypot_info.get('buy_ok') is False:
+                issues.append(f"Compra simulada falhou: {honeypot_info['reason']}")
+                security_score -= 50
+            elif honeypot_info.get('simulated'):
+                max_tax = max(honeypot_info['buy_tax'] or 0, honeypot_info['sell_tax'] or 0)
+                if max_tax > MAX_TOKEN_TAX:
+                    warnings.append(f"Taxas altas: compra {honeypot_info['buy_tax'] or 0:.1f}% / venda {honeypot_info['sell_tax'] or 0:.1f}%")
+                    security_score -= 20
+            elif ENABLE_HONEYPOT_CHECK:
+                # Sem simulação não há como saber se a venda passa: reprovado até haver pool simulável
+                issues.append(f"Honeypot não verificado ({honeypot_info.get('reason')})")
+                security_score -= 50
+        
+        # 4. Verificar ownership e renúncia
+        if 'ownership' in results:
+            ownership_info = details['ownership'] = results['ownership']
             if ownership_info['has_owner'] and not ownership_info['renounced']:
                 warnings.append("Contrato ainda tem owner ativo")
                 security_score -= 20
-            
-            # 5. Verificar funções perigosas
-            dangerous_functions = self._check_dangerous_functions(token_address)
+        
+        # 5. Verificar funções perigosas
+        if 'dangerous_functions' in results:
+            dangerous_functions = details['dangerous_functions'] = results['dangerous_functions']
             if dangerous_functions:
                 warnings.append(f"Funções perigosas encontradas: {', '.join(dangerous_functions)}")
                 security_score -= 20  # Reduzido de 40 para 20
-            
-            # 6. Verificar liquidez
-            liquidity_info = self._check_liquidity_security(token_address)
+        
+        # 6. Verificar liquidez
+        if 'liquidity' in results:
+            liquidity_info = details['liquidity'] = results['liquidity']
             if liquidity_info['locked_percentage'] < 50:
                 warnings.append(f"Apenas {liquidity_info['locked_percentage']}% da liquidez está bloqueada")
                 security_score -= 15
-            
-            # 7. Verificar distribuição de holders
-            holder_distribution = self._check_holder_distribution(token_address)
+        
+        # 7. Verificar distribuição de holders
+        if 'holders' in results:
+            holder_distribution = details['holder_distribution'] = results['holders']
             if holder_distribution['top_10_percentage'] > 80:
                 warnings.append("Concentração alta nos top 10 holders")
                 security_score -= 25
-            
-            return {
-                'score': max(0, security_score),
-                'issues': issues,
-                'warnings': warnings,
-                'is_safe': security_score >= 40 and not issues,  # Menos restritivo
-                'details': {
-                    'erc20_compliant': erc20_valid,
-                    'is_honeypot': is_honeypot,
-                    'ownership': ownership_info,
-                    'dangerous_functions': dangerous_functions,
-                    'liquidity': liquidity_info,
-                    'holder_distribution': holder_distribution
-                }
-            }
-            
+        
+        # Só bloqueio definitivo é conclusivo (contrato inválido ou honeypot confirmado); compra
+        # revertida pode ser trading ainda fechado e veredito parcial por falha de leitura deve ser refeito
+        honeypot_info = results.get('honeypot', {})
+        final_block = run.blocked_by == 'contract' or (run.blocked_by == 'honeypot' and honeypot_info.get('is_honeypot'))
+        details['inconclusive'] = not final_block and (
+            run.blocked_by is not None
+            or results['token_state'].get('error') is not None
+            or (ENABLE_HONEYPOT_CHECK and not honeypot_info.get('simulated') and not honeypot_info.get('is_honeypot'))
+        )
+        details['timings'] = run.timing_report()
+        details['blocked_by'] = run.blocked_by
+        details['skipped_checks'] = run.skipped
+        
+        return {
+            'score': max(0, security_score),
+            'issues': issues,
+            'warnings': warnings,
+            'is_safe': security_score >= 40 and not issues,  # Menos restritivo
+            'details': details
+        }
+    
+    async def _fetch_token_state(self, token_address: str) -> Dict:
+        """owner(), totalSupply() e balanceOf(0) em um único aggregate3 (entradas de ERC20 e ownership)"""
+        try:
+            results = await Multicall3(self.web3).aggregate3([
+                (token_address, OWNER_SELECTOR),
+                (token_address, TOTAL_SUPPLY_SELECTOR),
+                (token_address, BALANCE_OF_ZERO_CALLDATA),
+            ])
         except Exception as e:
-            return {
-                'score': 0,
-                'issues': [f"Erro na validação: {str(e)}"],
-                'warnings': [],
-                'is_safe': False,
-                'details': {}
-            }
+            return {'owner': None, 'total_supply': None, 'balance_ok': False, 'error': str(e)[:80]}
+        
+        (owner_ok, owner), (supply_ok, supply), (balance_ok, balance) = results
+        return {
+            'owner': Web3.to_checksum_address(owner[12:32]) if owner_ok and len(owner) >= 32 else None,
+            'total_supply': int.from_bytes(supply[:32], 'big') if supply_ok and len(supply) >= 32 else None,
+            'balance_ok': balance_ok and len(balance) >= 32,
+            'error': None
+        }
     
-    def _check_erc20_compliance(self, token_address: str) -> bool:
+    def _check_erc20_compliance(self, metadata: TokenMetadata, token_state: Dict) -> bool:
         """Verifica se o token segue o padrão ERC20 (versão flexível)"""
-        try:
-            erc20_abi = [
-                {"constant": True, "inputs": [], "name": "name", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"},
-                {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"}
-            ]
-            
-            contract = self.web3.eth.contract(address=token_address, abi=erc20_abi)
-            
-            # Testar pelo menos 3 das 5 funções básicas
-            functions_working = 0
-            
-            try:
-                name = contract.functions.name().call()
-                if name and len(name) <= 100:
-                    functions_working += 1
-            except:
-                pass
-            
-            try:
-                symbol = contract.functions.symbol().call()
-                if symbol and len(symbol) <= 20:
-                    functions_working += 1
-            except:
-                pass
-            
-            try:
-                decimals = contract.functions.decimals().call()
-                if 0 <= decimals <= 18:
-                    functions_working += 1
-            except:
-                pass
-            
-            try:
-                total_supply = contract.functions.totalSupply().call()
-                if total_supply > 0:
-                    functions_working += 1
-            except:
-                pass
-            
-            try:
-                # Testar balanceOf com endereço zero
-                balance = contract.functions.balanceOf("0x0000000000000000000000000000000000000000").call()
-                functions_working += 1
-            except:
-                pass
-            
-            # Considerar válido se pelo menos 2 funções funcionam (mais flexível)
-            return functions_working >= 2
-            
-        except Exception:
-            return False
+        # Testar as 5 funções básicas (name/symbol/decimals do store, totalSupply/balanceOf do aggregate3)
+        functions_working = 0
+        
+        if metadata.name and len(metadata.name) <= 100:
+            functions_working += 1
+        
+        if metadata.symbol and len(metadata.symbol) <= 20:
+            functions_working += 1
+        
+        if metadata.decimals is not None and 0 <= metadata.decimals <= 18:
+            functions_working += 1
+        
+        if token_state['total_supply']:
+            functions_working += 1
+        
+        # balanceOf com endereço zero
+        if token_state['balance_ok']:
+            functions_working += 1
+        
+        # Considerar válido se pelo menos 2 funções funcionam (mais flexível)
+        return functions_working >= 2
     
-    def _check_honeypot(self, token_address: str) -> bool:
-        """Verifica se o token é um honeypot"""
-        try:
-            # Verificar na lista local
-            if token_address.lower() in self.honeypot_contracts:
-                return True
-            
-            # Simular compra e venda pequena
-            test_amount = self.web3.to_wei(0.0001, 'ether')
-            
-            # Tentar simular transação de compra
-            # (Implementação simplificada - em produção usaria simulação mais robusta)
-            
-            return False  # Por enquanto, assumir que não é honeypot
-            
-        except Exception:
-            return False
+    async def _check_honeypot(self, token_address: str, metadata: TokenMetadata) -> Dict:
+        """
+        Verifica se o token é um honeypot: compra e venda de volta simuladas em um único eth_call
+        (taxas, bloqueio de transferência e max-tx; routers V2 e Uniswap V3). Erro de RPC propaga: sem veredito no cache
+        """
+        # Verificar na lista local
+        if token_address.lower() in self.honeypot_contracts:
+            return {'is_honeypot': True, 'simulated': False, 'reason': 'lista local'}
+        
+        if not ENABLE_HONEYPOT_CHECK:
+            return {'is_honeypot': False, 'simulated': False}
+        
+        report = await HONEYPOT_SIMULATOR.check(
+            self.web3, token_address, self.web3.to_wei(TRADE_AMOUNT_WETH, 'ether')
+        )
+        if report is None:
+            # Sem pool com liquidez nos routers simulados (V2 e V3): reprovado e inconclusivo
+            return {'is_honeypot': False, 'simulated': False, 'reason': 'sem liquidez para simular'}
+        
+        if report.is_honeypot:
+            self.honeypot_contracts.add(token_address.lower())
+        return report.to_dict()
     
-    def _check_ownership(self, token_address: str) -> Dict:
-        """Verifica informações de ownership do contrato"""
-        try:
-            # ABI para verificar owner
-            owner_abi = [
-                {"constant": True, "inputs": [], "name": "owner", "outputs": [{"name": "", "type": "address"}], "type": "function"}
-            ]
-            
-            try:
-                contract = self.web3.eth.contract(address=token_address, abi=owner_abi)
-                owner = contract.functions.owner().call()
-                
-                # Verificar se owner é endereço zero (renunciado)
-                zero_address = "0x0000000000000000000000000000000000000000"
-                
-                return {
-                    'has_owner': True,
-                    'owner_address': owner,
-                    'renounced': owner.lower() == zero_address.lower()
-                }
-                
-            except Exception:
-                # Contrato pode não ter função owner
-                return {
-                    'has_owner': False,
-                    'owner_address': None,
-                    'renounced': True
-                }
-                
-        except Exception:
+    def _check_ownership(self, token_state: Dict) -> Dict:
+        """Verifica informações de ownership do contrato (owner() lido no aggregate3)"""
+        owner = token_state['owner']
+        if owner is None:
+            # Contrato pode não ter função owner
             return {
                 'has_owner': False,
                 'owner_address': None,
                 'renounced': True
             }
-    
-    def _check_dangerous_functions(self, token_address: str) -> List[str]:
-        """Verifica funções perigosas no contrato"""
-        dangerous_functions = []
         
+        # Verificar se owner é endereço zero (renunciado)
+        zero_address = "0x0000000000000000000000000000000000000000"
+        
+        return {
+            'has_owner': True,
+            'owner_address': owner,
+            'renounced': owner.lower() == zero_address.lower()
+        }
+    
+    def _check_dangerous_functions(self, metadata: TokenMetadata) -> List[str]:
+        """Verifica funções perigosas pelos seletores reais do dispatcher (memorizados por bytecode)"""
         try:
-            # Lista de funções perigosas conhecidas
-            dangerous_signatures = [
-                'mint(address,uint256)',
-                'burn(uint256)',
-                'pause()',
-                'blacklist(address)',
-                'setTaxFee(uint256)',
-                'setMaxTxAmount(uint256)',
-                'excludeFromFee(address)',
-                'includeInFee(address)'
-            ]
-            
-            # Obter bytecode do contrato
-            code = self.web3.eth.get_code(token_address)
-            code_hex = code.hex()
+            selectors = SELECTOR_INDEX.get(metadata.code_hash, TOKEN_METADATA.get_code(metadata.code_hash))
             
-            # Verificar assinaturas de funções perigosas
-            for func_sig in dangerous_signatures:
-                # Calcular hash da função
-                func_hash = self.web3.keccak(text=func_sig)[:4].hex()
-                
-                if func_hash in code_hex:
-                    dangerous_functions.append(func_sig.split('(')[0])
-            
-            return dangerous_functions
+            # Nomes únicos em ordem alfabética (sobrecargas como burn(uint256)/burn(address,uint256) contam uma vez)
+            return list(dict.fromkeys(name for name, _ in risky_functions(selectors)))
             
         except Exception:
             return []
@@ -283,26 +318,15 @@ class SecurityValidator:
                 'is_well_distributed': False
             }
     
-    def check_mev_protection(self, token_address: str, amount: int) -> Dict:
-        """Verifica proteção contra MEV"""
+    async def check_mev_protection(self, token_address: str, amount: int) -> Dict:
+        """
+        Verifica proteção contra MEV a partir do índice do observador de blocos (sem RPC por trade);
+        índice ainda vazio é preenchido uma vez com a janela recente
+        """
         try:
-            current_block = self.web3.eth.block_number
-            
-            # Verificar se há atividade suspeita de MEV
-            recent_blocks = []
-            for i in range(5):  # Últimos 5 blocos
-                block = self.web3.eth.get_block(current_block - i, full_transactions=True)
-                recent_blocks.append(block)
-            
-            # Analisar transações suspeitas
-            suspicious_activity = self._analyze_mev_activity(recent_blocks, token_address)
-            
-            return {
-                'mev_risk_level': 'LOW' if not suspicious_activity else 'HIGH',
-                'suspicious_transactions': suspicious_activity,
-                'recommended_delay': 0 if not suspicious_activity else 30,  # segundos
-                'safe_to_trade': not suspicious_activity
-            }
+            if not MEV_WATCHER.is_ready:
+                await MEV_WATCHER.sync(self.web3)
+            return MEV_WATCHER.check(token_address)
             
         except Exception as e:
             return {
@@ -313,30 +337,11 @@ class SecurityValidator:
                 'error': str(e)
             }
     
-    def _analyze_mev_activity(self, blocks: List, token_address: str) -> List:
-        """Analisa atividade de MEV nos blocos recentes"""
-        suspicious_txs = []
-        
-        try:
-            for block in blocks:
-                for tx in block.transactions:
-                    # Verificar se a transação envolve o token
-                    if tx.to and tx.to.lower() in [token_address.lower(), UNISWAP_V3_ROUTER.lower()]:
-                        # Verificar padrões suspeitos de MEV
-                        if tx.gas_price > self.web3.to_wei(100, 'gwei'):  # Gas muito alto
-                            suspicious_txs.append({
-                                'hash': tx.hash.hex(),
-                                'gas_price': tx.gas_price,
-                                'reason': 'High gas price'
-                            })
-            
-            return suspicious_txs
-            
-        except Exception:
-            return []
-    
-    def validate_trade_conditions(self, token_address: str, amount: int, is_buy: bool) -> Dict:
-        """Valida condições gerais para o trade"""
+    async def validate_trade_conditions(self, token_address: str, amount: int, is_buy: bool) -> Dict:
+        """
+        Valida condições gerais para o trade: segurança do token, MEV, mercado e gas em paralelo;
+        token inseguro cancela as demais verificações
+        """
         try:
             validation_result = {
                 'safe_to_trade': True,
@@ -345,8 +350,19 @@ class SecurityValidator:
                 'recommended_actions': []
             }
             
+            checks = [
+                Check('security', lambda inputs: self.validate_token_security(token_address),
+                      blocking=lambda security: None if security['is_safe'] else "token inseguro"),
+                Check('market', lambda inputs: self._check_market_conditions()),
+                Check('gas', lambda inputs: self._current_gas_price()),
+            ]
+            if ENABLE_MEV_PROTECTION:
+                checks.append(Check('mev', lambda inputs: self.check_mev_protection(token_address, amount)))
+            run = await CHECK_ORCHESTRATOR.run(checks, graph='trade')
+            results = run.results
+            
             # 1. Verificar segurança do token
-            security_check = self.validate_token_security(token_address)
+            security_check = results['security']
             if not security_check['is_safe']:
                 validation_result['blocking_issues'].extend(security_check['issues'])
                 validation_result['safe_to_trade'] = False
@@ -354,22 +370,29 @@ class SecurityValidator:
             validation_result['warnings'].extend(security_check['warnings'])
             
             # 2. Verificar proteção MEV
-            if ENABLE_MEV_PROTECTION:
-                mev_check = self.check_mev_protection(token_address, amount)
-                if not mev_check['safe_to_trade']:
-                    validation_result['warnings'].append("Atividade MEV detectada")
-                    validation_result['recommended_actions'].append(f"Aguardar {mev_check['recommended_delay']} segundos")
+            mev_check = results.get('mev')
+            if mev_check is not None and not mev_check['safe_to_trade']:
+                validation_result['warnings'].append("Atividade MEV detectada")
+                validation_result['recommended_actions'].append(f"Aguardar {mev_check['recommended_delay']} segundos")
             
             # 3. Verificar condições de mercado
-            market_conditions = self._check_market_conditions()
-            if market_conditions['volatility'] > 50:  # Alta volatilidade
+            market_conditions = results.get('market')
+            if market_conditions is not None and market_conditions['volatility'] > 50:  # Alta volatilidade
                 validation_result['warnings'].append("Alta volatilidade do mercado")
             
-            # 4. Verificar gas price
-            current_gas = self.web3.eth.gas_price
-            if current_gas > self.web3.to_wei(MAX_GAS_PRICE, 'gwei'):
+            # 4. Verificar gas price (base fee + priority do oráculo, sem RPC quando atualizado)
+            current_gas = results.get('gas')
+            if current_gas is not None and current_gas > self.web3.to_wei(MAX_GAS_PRICE, 'gwei'):
                 validation_result['warnings'].append(f"Gas price alto: {self.web3.from_wei(current_gas, 'gwei'):.1f} gwei")
             
+            # Latência de ponta a ponta por verificação (e das sub-verificações de segurança do token)
+            validation_result['timings'] = run.timing_report()
+            print(f"⏱️ Validação em {format_timings(validation_result['timings'])}")
+            details = security_check.get('details', {})
+            if 'timings' in details:
+                validation_result['security_timings'] = details['timings']
+                print(f"   🛡️ Segurança: {format_timings(details['timings'])}")
+            
             return validation_result
             
         except Exception as e:
@@ -380,6 +403,12 @@ class SecurityValidator:
                 'recommended_actions': ['Tentar novamente mais tarde']
             }
     
+    async def _current_gas_price(self) -> int:
+        """Base fee + priority 'high' do oráculo (RPC só se o oráculo estiver desatualizado)"""
+        if not FEE_ORACLE.is_fresh:
+            await FEE_ORACLE.refresh(self.web3)
+        return FEE_ORACLE.base_fee + FEE_ORACLE.priority_fee('high')
+    
     def _check_market_conditions(self) -> Dict:
         """Verifica condições gerais do mercado"""
         try:
@@ -401,13 +430,13 @@ class SecurityValidator:
                 'market_cap': 0
             }
     
-    def print_security_report(self, token_address: str):
+    async def print_security_report(self, token_address: str):
         """Imprime relatório de segurança detalhado"""
         print(f"\n{Fore.CYAN}🛡️ RELATÓRIO DE SEGURANÇA{Style.RESET_ALL}")
         print(f"{Fore.CYAN}{'='*50}{Style.RESET_ALL}")
         print(f"Token: {token_address}")
         
-        security_check = self.validate_token_security(token_address)
+        security_check = await self.validate_token_security(token_address)
         
         # Score de segurança
         score = security_check['score']
@@ -443,6 +472,10 @@ class SecurityValidator:
         print(f"\n{Fore.CYAN}📋 DETALHES:{Style.RESET_ALL}")
         print(f"   • ERC20 Compliant: {'✅' if details.get('erc20_compliant') else '❌'}")
         print(f"   • Honeypot: {'❌' if details.get('is_honeypot') else '✅'}")
+        honeypot = details.get('honeypot', {})
+        if honeypot.get('simulated'):
+            print(f"   • Taxas simuladas ({honeypot['dex']}): compra {honeypot['buy_tax'] or 0:.1f}% / "
+                  f"venda {honeypot['sell_tax'] or 0:.1f}%")
         
         if 'ownership' in details:
             ownership = details['ownership']
@@ -13,6 +13,13 @@ from dex_handler import DEXHandler
 from token_monitor import TokenMonitor
 from security_validator import SecurityValidator
 from aggressive_strategy import AggressiveStrategy
+from rpc_client import create_async_web3, close_http_session
+from rpc_cache import RPC_CACHE
+from token_metadata import TOKEN_METADATA
+from tx_tracker import TX_TRACKER
+from fee_oracle import FEE_ORACLE
+from mev_watcher import MEV_WATCHER
+from rate_limiter import rpc_lane, LANE_EXECUTION, LANE_POSITION, LANE_DISCOVERY, LANE_DASHBOARD
 
 # Inicializar colorama
 init(autoreset=True)
@@ -20,6 +27,7 @@ init(autoreset=True)
 class SniperBot:
     def __init__(self):
         self.web3 = None
+        self.async_web3 = None
         self.dex_handler = None
         self.token_monitor = None
         self.security_validator = None
@@ -40,9 +48,8 @@ class SniperBot:
         self.smart_scaling = SMART_SCALING_ENABLED
         self.last_balance_check = 0
         
-        # Cache para saldos (evitar rate limit)
-        self._weth_balance_cache = 0.0
-        self._weth_balance_time = 0
+        # Último saldo WETH lido (leituras repetidas no mesmo bloco são servidas pelo RPC_CACHE)
+        self.last_weth_balance = 0.0
         
         # Estratégia agressiva para crescimento rápido
         self.aggressive_strategy = None
@@ -85,7 +92,7 @@ class SniperBot:
         
         return TelegramMock()
         
-    def initialize(self):
+    async def initialize(self):
         """Inicializa o bot"""
         try:
             print(f"{Fore.CYAN}🚀 Inicializando Sniper Bot para Base Network...{Style.RESET_ALL}")
@@ -98,11 +105,15 @@ class SniperBot:
             # Validar configuração
             validate_config()
             
-            # Conectar à Base Network
-            self.web3 = Web3(Web3.HTTPProvider(BASE_RPC_URL))
-            if not self.web3.is_connected():
+            # Conectar à Base Network (AsyncWeb3 sobre o pool de endpoints RPC)
+            self.async_web3 = await create_async_web3(BASE_RPC_URLS)
+            if not await self.async_web3.is_connected():
                 raise Exception("Não foi possível conectar à Base Network")
             
+            # Web3 síncrono apenas para utilitários fora do event loop (ex: comandos Telegram)
+            self.web3 = Web3(Web3.HTTPProvider(BASE_RPC_URL))
+            self.web3.middleware_onion.add(RPC_CACHE.sync_middleware, 'rpc_cache')
+            
             print(f"{Fore.GREEN}✅ Conectado à Base Network{Style.RESET_ALL}")
             
             # Log de conexão bem-sucedida
@@ -120,10 +131,33 @@ class SniperBot:
             print(f"💰 Carteira configurada: {WALLET_ADDRESS[:6]}...{WALLET_ADDRESS[-4:]}")
             print("🔐 Chave privada: Validada ✅")
             
+            # Metadados de tokens já vistos em execuções anteriores
+            known_tokens = TOKEN_METADATA.open()
+            print(f"{Fore.GREEN}✅ Metadados de tokens carregados: {known_tokens}{Style.RESET_ALL}")
+            
             # Inicializar handlers
-            self.dex_handler = DEXHandler(self.web3)
-            self.token_monitor = TokenMonitor(self.web3, self._process_new_token)
-            self.security_validator = SecurityValidator(self.web3)
+            self.dex_handler = DEXHandler(self.async_web3)
+            self.token_monitor = TokenMonitor(self.async_web3, self._process_new_token)
+            self.security_validator = SecurityValidator(self.async_web3)
+            
+            # Oráculo de taxas EIP-1559 (base fee e priority fee atualizados a cada bloco)
+            FEE_ORACLE.start(self.async_web3)
+            
+            # Observador de MEV: cada bloco lido uma vez, consultas de MEV respondidas da memória
+            if ENABLE_MEV_PROTECTION:
+                MEV_WATCHER.start(self.async_web3)
+            
+            # WETH aprovado uma vez para todos os routers: nenhum approve no caminho de compra
+            try:
+                approvals = await self.dex_handler.preapprove_weth(self.web3.to_wei(self.current_trade_amount, 'ether'))
+                if approvals:
+                    print(f"{Fore.GREEN}🔓 WETH pré-aprovado para {approvals} routers{Style.RESET_ALL}")
+            except Exception as e:
+                print(f"{Fore.YELLOW}⚠️ Pré-aprovação de WETH falhou (aprovação será feita na compra): {str(e)[:80]}{Style.RESET_ALL}")
+            
+            # Compras pré-codificadas: detecção -> broadcast sem RPC no caminho crítico
+            if await self.dex_handler.prepare_swap_templates(self.web3.to_wei(self.current_trade_amount, 'ether')):
+                print(f"{Fore.GREEN}⚡ Templates de compra prontos para {len(self.dex_handler.dexs)} routers{Style.RESET_ALL}")
             
             # Inicializar estratégia agressiva
             self.aggressive_strategy = AggressiveStrategy(self)
@@ -131,14 +165,14 @@ class SniperBot:
             self.aggressive_strategy.reset_positions()
             print(f"{Fore.GREEN}🚀 Estratégia agressiva ativada para crescimento rápido{Style.RESET_ALL}")
             
-            # Verificar saldo ETH
-            balance = self.web3.eth.get_balance(WALLET_ADDRESS)
+            # Verificar saldos ETH e WETH em paralelo
+            balance, weth_balance = await asyncio.gather(
+                self.async_web3.eth.get_balance(WALLET_ADDRESS),
+                self._get_weth_balance()
+            )
             balance_eth = float(self.web3.from_wei(balance, 'ether'))
             
             print(f"{Fore.YELLOW}💰 Saldo ETH: {balance_eth:.6f} ETH{Style.RESET_ALL}")
-            
-            # Verificar saldo WETH (versão síncrona para inicialização)
-            weth_balance = self._get_weth_balance_sync()
             print(f"{Fore.YELLOW}💰 Saldo WETH: {weth_balance:.6f} WETH{Style.RESET_ALL}")
             
             # Log de saldos
@@ -193,11 +227,11 @@ class SniperBot:
             print(f"{Fore.RED}❌ Erro na inicialização: {str(e)}{Style.RESET_ALL}")
             return False
     
-    def test_connections(self):
+    async def test_connections(self):
         """Testa conexões com todas as DEXs"""
         print(f"{Fore.CYAN}🔍 Testando conexões com DEXs...{Style.RESET_ALL}")
         
-        results = self.dex_handler.test_all_dexs()
+        results = await self.dex_handler.test_all_dexs()
         
         working_dexs = sum(1 for working in results.values() if working)
         total_dexs = len(results)
@@ -224,7 +258,7 @@ class SniperBot:
             )
             
             # Validação de segurança primeiro
-            security_validation = self.security_validator.validate_trade_conditions(
+            security_validation = await self.security_validator.validate_trade_conditions(
                 token_address, self.web3.to_wei(TRADE_AMOUNT_WETH, 'ether'), is_buy=True
             )
             
@@ -296,7 +330,8 @@ class SniperBot:
                     
                     # Executar estratégia de compra
                     if await self.aggressive_strategy.execute_buy_strategy(token_address, token_info):
-                        await self._execute_buy_order(token_address, token_info)
+                        with rpc_lane(LANE_EXECUTION):
+                            await self._execute_buy_order(token_address, token_info)
                     else:
                         print(f"{Fore.RED}❌ Falha na estratégia de compra{Style.RESET_ALL}")
                 else:
@@ -315,10 +350,12 @@ class SniperBot:
                 min_score = 40 if MEMECOIN_MODE else MIN_SCORE_TO_BUY
                 
                 if final_recommendation in ['STRONG_BUY', 'BUY'] and combined_score >= min_score:
-                    await self._execute_buy_order(token_address, token_info)
+                    with rpc_lane(LANE_EXECUTION):
+                        await self._execute_buy_order(token_address, token_info)
                 elif final_recommendation == 'WEAK_BUY' and combined_score >= 30 and MEMECOIN_MODE:
                     print(f"{Fore.YELLOW}🎲 Comprando token de risco moderado (memecoin mode){Style.RESET_ALL}")
-                    await self._execute_buy_order(token_address, token_info)
+                    with rpc_lane(LANE_EXECUTION):
+                        await self._execute_buy_order(token_address, token_info)
                 else:
                     print(f"{Fore.YELLOW}⏭️ Token ignorado - Score: {combined_score}, Mínimo: {min_score}{Style.RESET_ALL}")
                     await self.telegram_bot.send_notification(
@@ -359,10 +396,12 @@ class SniperBot:
                 "high"
             )
             
-            # Verificar saldo antes de executar
-            balance = self.web3.eth.get_balance(WALLET_ADDRESS)
+            # Verificar saldos antes de executar (em paralelo)
+            balance, weth_balance = await asyncio.gather(
+                self.async_web3.eth.get_balance(WALLET_ADDRESS),
+                self._get_weth_balance()
+            )
             balance_eth = float(self.web3.from_wei(balance, 'ether'))
-            weth_balance = await self._get_weth_balance()
             
             # Log detalhado dos saldos
             print(f"{Fore.CYAN}💰 Verificação de saldos:{Style.RESET_ALL}")
@@ -391,7 +430,7 @@ class SniperBot:
                 
                 if conversion_success:
                     # Atualizar saldo ETH após conversão
-                    balance_eth = self.web3.from_wei(self.web3.eth.get_balance(WALLET_ADDRESS), 'ether')
+                    balance_eth = self.web3.from_wei(await self.async_web3.eth.get_balance(WALLET_ADDRESS), 'ether')
                     print(f"{Fore.GREEN}✅ Conversão realizada! Novo saldo ETH: {balance_eth:.6f}{Style.RESET_ALL}")
                     await self.telegram_bot.send_notification(
                         f"✅ **Conversão WETH->ETH realizada!**\n"
@@ -494,7 +533,8 @@ class SniperBot:
                 )
                 
                 # Agendar venda
-                asyncio.create_task(self._schedule_sell_order(token_address, token_info, tx_hash))
+                with rpc_lane(LANE_POSITION):  # Acompanhamento da posição herda a faixa de posições
+                    asyncio.create_task(self._schedule_sell_order(token_address, token_info, tx_hash))
                 
                 # Log da transação
                 if ENABLE_LOGGING:
@@ -523,16 +563,23 @@ class SniperBot:
                 f"⏳ **Aguardando confirmação...**\n"
                 f"📛 {token_info['symbol']}\n"
                 f"🔗 TX: `{buy_tx_hash[:10]}...{buy_tx_hash[-10:]}`\n"
-                f"⏰ Aguardando 30 segundos...", 
+                f"⏰ Aguardando inclusão em bloco...", 
                 "normal"
             )
             
-            # Aguardar alguns blocos
-            await asyncio.sleep(30)  # 30 segundos
+            # Aguardar a inclusão (resultado já conhecido se execute_swap confirmou)
+            buy_result = await TX_TRACKER.wait(self.async_web3, buy_tx_hash)
+            if buy_result.status == 'timeout':
+                print(f"{Fore.YELLOW}⚠️ Compra não confirmada em {TRANSACTION_TIMEOUT}s, cancelando venda{Style.RESET_ALL}")
+                await self.telegram_bot.send_notification(
+                    f"⚠️ **Compra não confirmada**\n"
+                    f"📛 {token_info['symbol']}\n"
+                    f"💡 Venda cancelada", 
+                    "high"
+                )
+                return
             
-            # Verificar se a compra foi bem-sucedida
-            buy_receipt = self.web3.eth.get_transaction_receipt(buy_tx_hash)
-            if buy_receipt.status != 1:
+            if not buy_result.success:
                 print(f"{Fore.RED}❌ Compra falhou, cancelando venda{Style.RESET_ALL}")
                 await self.telegram_bot.send_notification(
                     f"❌ **Compra falhou!**\n"
@@ -595,9 +642,10 @@ class SniperBot:
             )
             
             # Executar venda (usar saldo em wei)
-            sell_tx_hash = await self.dex_handler.execute_swap(
-                token_address, token_balance_wei, best_router, is_buy=False
-            )
+            with rpc_lane(LANE_EXECUTION):
+                sell_tx_hash = await self.dex_handler.execute_swap(
+                    token_address, token_balance_wei, best_router, is_buy=False
+                )
             
             if sell_tx_hash:
                 self.successful_trades += 1
@@ -641,8 +689,8 @@ class SniperBot:
                  "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"}
             ]
             
-            contract = self.web3.eth.contract(address=token_address, abi=erc20_abi)
-            balance = contract.functions.balanceOf(WALLET_ADDRESS).call()
+            contract = self.async_web3.eth.contract(address=token_address, abi=erc20_abi)
+            balance = await contract.functions.balanceOf(WALLET_ADDRESS).call()
             return balance
             
         except Exception as e:
@@ -652,15 +700,14 @@ class SniperBot:
     async def _calculate_profit(self, buy_tx_hash: str, sell_tx_hash: str):
         """Calcula lucro da operação"""
         try:
-            buy_receipt = self.web3.eth.get_transaction_receipt(buy_tx_hash)
-            sell_receipt = self.web3.eth.get_transaction_receipt(sell_tx_hash)
-            
-            buy_tx = self.web3.eth.get_transaction(buy_tx_hash)
-            sell_tx = self.web3.eth.get_transaction(sell_tx_hash)
+            buy_receipt, sell_receipt = await asyncio.gather(
+                self.async_web3.eth.get_transaction_receipt(buy_tx_hash),
+                self.async_web3.eth.get_transaction_receipt(sell_tx_hash)
+            )
             
-            # Calcular custos de gas
-            buy_gas_cost = buy_receipt.gasUsed * buy_tx.gasPrice
-            sell_gas_cost = sell_receipt.gasUsed * sell_tx.gasPrice
+            # Calcular custos de gas (EIP-1559: preço efetivo = base fee + priority fee pagos)
+            buy_gas_cost = buy_receipt.gasUsed * buy_receipt.effectiveGasPrice
+            sell_gas_cost = sell_receipt.gasUsed * sell_receipt.effectiveGasPrice
             total_gas_cost = self.web3.from_wei(buy_gas_cost + sell_gas_cost, 'ether')
             
             # Calcular lucro bruto (simplificado)
@@ -676,8 +723,8 @@ class SniperBot:
         except Exception as e:
             print(f"{Fore.RED}❌ Erro ao calcular lucro: {str(e)}{Style.RESET_ALL}")
     
-    def print_status(self):
-        """Imprime status do bot"""
+    def print_status(self, balance_eth: Optional[float] = None, weth_balance: Optional[float] = None):
+        """Imprime status do bot (saldos já lidos pelo chamador, sem RPC bloqueante)"""
         print(f"\n{Fore.CYAN}{'='*50}")
         print(f"📊 STATUS DO SNIPER BOT")
         print(f"{'='*50}{Style.RESET_ALL}")
@@ -687,14 +734,7 @@ class SniperBot:
         print(f"{Fore.YELLOW}💰 Lucro total: {self.total_profit:.6f} ETH{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}⚙️ Valor por trade: {TRADE_AMOUNT_WETH} ETH{Style.RESET_ALL}")
         
-        if self.web3:
-            # Mostrar saldo ETH (para gas)
-            balance = self.web3.eth.get_balance(WALLET_ADDRESS)
-            balance_eth = float(self.web3.from_wei(balance, 'ether'))
-            
-            # Mostrar saldo WETH (para trading)
-            weth_balance = self._get_weth_balance_sync()
-            
+        if balance_eth is not None and weth_balance is not None:
             print(f"{Fore.YELLOW}💳 Saldo ETH (gas): {balance_eth:.6f} ETH{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}💰 Saldo WETH (trading): {weth_balance:.6f} WETH{Style.RESET_ALL}")
             print(f"{Fore.YELLOW}📊 Total estimado: {balance_eth + weth_balance:.6f} ETH{Style.RESET_ALL}")
@@ -702,18 +742,7 @@ class SniperBot:
         print(f"{Fore.CYAN}{'='*50}{Style.RESET_ALL}\n")
     
     def _get_weth_balance_sync(self) -> float:
-        """Obtém saldo WETH da carteira com cache e retry"""
-        # Cache por 30 segundos para evitar rate limit
-        current_time = time.time()
-        if hasattr(self, '_weth_balance_cache') and hasattr(self, '_weth_balance_time'):
-            if current_time - self._weth_balance_time < 30:
-                cached_balance = self._weth_balance_cache
-                # Diagnóstico: se cache for 0, forçar atualização
-                if cached_balance == 0.0:
-                    print(f"{Fore.YELLOW}⚠️ Cache WETH zerado detectado - forçando atualização...{Style.RESET_ALL}")
-                else:
-                    return cached_balance
-        
+        """Obtém saldo WETH da carteira com retry (cache por bloco no RPC_CACHE)"""
         for attempt in range(3):
             try:
                 weth_abi = [
@@ -732,9 +761,7 @@ class SniperBot:
                 # Log detalhado para diagnóstico
                 print(f"{Fore.GREEN}✅ Saldo WETH lido: {result:.6f} WETH (raw: {balance}, decimals: {decimals}){Style.RESET_ALL}")
                 
-                # Cache o resultado
-                self._weth_balance_cache = result
-                self._weth_balance_time = current_time
+                self.last_weth_balance = result
                 
                 # Diagnóstico adicional
                 if result == 0.0:
@@ -753,30 +780,43 @@ class SniperBot:
                     print(f"{Fore.RED}❌ Erro ao obter saldo WETH: {str(e)}{Style.RESET_ALL}")
                     break
         
-        # Se falhou, retorna último valor em cache ou valor padrão
-        if hasattr(self, '_weth_balance_cache'):
-            print(f"{Fore.YELLOW}⚠️ Usando saldo em cache: {self._weth_balance_cache:.6f} WETH{Style.RESET_ALL}")
-            return self._weth_balance_cache
-        
-        return 0.0
+        # Se falhou, retorna o último saldo lido
+        print(f"{Fore.YELLOW}⚠️ Usando último saldo lido: {self.last_weth_balance:.6f} WETH{Style.RESET_ALL}")
+        return self.last_weth_balance
     
     async def _get_weth_balance(self) -> float:
-        """Obtém saldo WETH da carteira (versão assíncrona)"""
-        return self._get_weth_balance_sync()
+        """Obtém saldo WETH da carteira (versão assíncrona, não bloqueia o event loop)"""
+        try:
+            weth_abi = [
+                {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], 
+                 "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"}
+            ]
+            
+            weth_contract = self.async_web3.eth.contract(address=WETH_ADDRESS, abi=weth_abi)
+            balance = await weth_contract.functions.balanceOf(WALLET_ADDRESS).call()
+            
+            # WETH sempre tem 18 decimais
+            result = balance / 10**18
+            self.last_weth_balance = result
+            return result
+            
+        except Exception as e:
+            print(f"{Fore.RED}❌ Erro ao obter saldo WETH: {str(e)}{Style.RESET_ALL}")
+            return self.last_weth_balance
     
     async def _get_token_balance(self, token_address: str) -> float:
         """Obtém saldo de um token específico"""
         try:
             erc20_abi = [
                 {"constant": True, "inputs": [{"name": "_owner", "type": "address"}], 
-                 "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "decimals", 
-                 "outputs": [{"name": "", "type": "uint8"}], "type": "function"}
+                 "name": "balanceOf", "outputs": [{"name": "balance", "type": "uint256"}], "type": "function"}
             ]
             
-            token_contract = self.web3.eth.contract(address=token_address, abi=erc20_abi)
-            balance = token_contract.functions.balanceOf(WALLET_ADDRESS).call()
-            decimals = token_contract.functions.decimals().call()
+            token_contract = self.async_web3.eth.contract(address=token_address, abi=erc20_abi)
+            balance, decimals = await asyncio.gather(
+                token_contract.functions.balanceOf(WALLET_ADDRESS).call(),
+                TOKEN_METADATA.get_decimals(self.async_web3, token_address)
+            )
             
             return balance / (10 ** decimals)
             
@@ -1038,17 +1078,17 @@ class SniperBot:
     async def _analyze_contract_advanced(self, token_address: str) -> int:
         """Análise avançada do contrato"""
         try:
-            # Verificações básicas de segurança
-            code = self.web3.eth.get_code(token_address)
+            # Verificações básicas de segurança (tamanho do bytecode vem do store de metadados)
+            code_size = (await TOKEN_METADATA.fetch(self.async_web3, token_address)).code_size
             
             score = 50
             
             # Contrato tem código suficiente
-            if len(code) > 1000:
+            if code_size > 1000:
                 score += 20
             
             # Verificar se não é um proxy malicioso (verificação básica)
-            if len(code) < 10000:  # Contratos muito grandes podem ser suspeitos
+            if code_size < 10000:  # Contratos muito grandes podem ser suspeitos
                 score += 15
             
             # Adicionar verificações de honeypot se habilitado
@@ -1215,10 +1255,10 @@ class SniperBot:
     async def start(self):
         """Inicia o bot"""
         try:
-            if not self.initialize():
+            if not await self.initialize():
                 return False
             
-            if not self.test_connections():
+            if not await self.test_connections():
                 return False
             
             self.running = True
@@ -1234,8 +1274,10 @@ class SniperBot:
                 await self.telegram_bot.start()
             
             # Loop principal
-            monitor_task = asyncio.create_task(self.token_monitor.monitor_new_tokens())
-            status_task = asyncio.create_task(self._status_loop())
+            with rpc_lane(LANE_DISCOVERY):
+                monitor_task = asyncio.create_task(self.token_monitor.monitor_new_tokens())
+            with rpc_lane(LANE_DASHBOARD):
+                status_task = asyncio.create_task(self._status_loop())
             
             await asyncio.gather(monitor_task, status_task)
             
@@ -1245,24 +1287,34 @@ class SniperBot:
             print(f"{Fore.RED}❌ Erro no bot: {str(e)}{Style.RESET_ALL}")
         finally:
             self.stop()
+            await close_http_session()
+            TOKEN_METADATA.close()
     
     async def _status_loop(self):
         """Loop de status"""
         while self.running:
             await asyncio.sleep(60)  # A cada minuto
-            self.print_status()
+            
+            balance_eth = 0.0
+            weth_balance = 0.0
+            try:
+                if self.async_web3:
+                    balance, weth_balance = await asyncio.gather(
+                        self.async_web3.eth.get_balance(WALLET_ADDRESS),
+                        self._get_weth_balance()
+                    )
+                    balance_eth = float(self.web3.from_wei(balance, 'ether'))
+            except Exception as e:
+                print(f"❌ Erro ao obter saldos para status: {e}")
+            
+            self.print_status(balance_eth, weth_balance)
+            
+            # Renovar deadline, fee, allowance e saldo dos templates de compra
+            await self.dex_handler.prepare_swap_templates(self.web3.to_wei(self.current_trade_amount, 'ether'))
             
             # Enviar status via Telegram simples
             if hasattr(self.telegram_bot, 'send_status_update'):
                 try:
-                    balance_eth = 0.0
-                    weth_balance = 0.0
-                    
-                    if self.web3:
-                        balance = self.web3.eth.get_balance(WALLET_ADDRESS)
-                        balance_eth = float(self.web3.from_wei(balance, 'ether'))
-                        weth_balance = self._get_weth_balance_sync()
-                    
                     status_data = {
                         'status': 'Rodando' if self.running else 'Parado',
                         'trades_executed': self.trades_executed,
@@ -1281,6 +1333,8 @@ class SniperBot:
         self.running = False
         if self.token_monitor:
             self.token_monitor.stop_monitoring()
+        FEE_ORACLE.stop()
+        MEV_WATCHER.stop()
         print(f"{Fore.RED}⏹️ Sniper Bot parado!{Style.RESET_ALL}")
 
 # Função principal para executar o bot
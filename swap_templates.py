@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Templates de swap pré-codificados para compras instantâneas
+Calldata por router já codificada com valor, deadline e destinatário; na detecção só o token
+(e o mínimo de saída) é escrito em offsets fixos e a transação sai com nonce local e fees do oráculo
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from eth_abi import encode
+from eth_account._utils.signing import sign_transaction_dict
+from eth_account.datastructures import SignedTransaction
+from eth_utils import function_signature_to_4byte_selector, keccak
+from hexbytes import HexBytes
+from web3 import Web3, AsyncWeb3
+
+from config import WALLET_ADDRESS, WETH_ADDRESS, UNISWAP_V3_ROUTER, CHAIN_ID
+from fee_oracle import FEE_ORACLE
+from allowance_manager import ALLOWANCES
+from nonce_manager import NONCE_MANAGER
+
+V2_SWAP_SELECTOR = function_signature_to_4byte_selector(
+    'swapExactTokensForTokens(uint256,uint256,address[],address,uint256)'
+)
+V3_SWAP_SELECTOR = function_signature_to_4byte_selector(
+    'exactInputSingle((address,address,uint24,address,uint256,uint256,uint160))'
+)
+BALANCE_OF_SELECTOR = function_signature_to_4byte_selector('balanceOf(address)')
+
+TEMPLATE_DEADLINE = 600   # Segundos de validade da deadline codificada
+REFRESH_MARGIN = 300      # Template é recodificado quando resta menos que isso
+DEFAULT_V3_FEE = 3000
+
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, 'big')
+
+
+@dataclass
+class SwapTemplate:
+    """Calldata de compra (WETH -> token) de um router com os offsets dos campos variáveis"""
+    router: str
+    calldata: bytes
+    amount_in: int
+    deadline: int
+    token_offset: int          # Início dos 20 bytes do endereço do token
+    amount_in_offset: int
+    min_out_offset: int
+    fee_offset: Optional[int]  # Apenas V3 (exactInputSingle)
+
+    def build(self, token_address: str, amount_in: int, amount_out_min: int, fee: Optional[int] = None) -> bytes:
+        """Escreve token/valor/mínimo nos offsets fixos (sem codificação ABI no caminho crítico)"""
+        data = bytearray(self.calldata)
+        data[self.token_offset:self.token_offset + 20] = bytes.fromhex(token_address[2:])
+        if amount_in != self.amount_in:
+            data[self.amount_in_offset:self.amount_in_offset + 32] = _word(amount_in)
+        data[self.min_out_offset:self.min_out_offset + 32] = _word(amount_out_min)
+        if self.fee_offset is not None:
+            data[self.fee_offset:self.fee_offset + 32] = _word(fee or DEFAULT_V3_FEE)
+        return bytes(data)
+
+
+def sign_transaction(account, transaction: Dict) -> SignedTransaction:
+    """
+    Assina com a chave já derivada da conta local: Account.sign_transaction recria a chave
+    (e a pública, uma multiplicação na curva) a cada chamada, metade do custo de assinar
+    """
+    unsigned = {key: value for key, value in transaction.items() if key != 'from'}
+    v, r, s, encoded = sign_transaction_dict(account._key_obj, unsigned)
+    return SignedTransaction(rawTransaction=HexBytes(encoded), hash=HexBytes(keccak(encoded)), r=r, s=s, v=v)
+
+
+def encode_buy_template(router: str, amount_in: int, deadline: int, recipient: str = WALLET_ADDRESS) -> SwapTemplate:
+    """Codifica a compra uma vez com token zero; os offsets apontam para os campos a preencher"""
+    placeholder = '0x' + '00' * 20
+
+    if router.lower() == UNISWAP_V3_ROUTER.lower():
+        # exactInputSingle: tupla estática (tokenIn, tokenOut, fee, recipient, amountIn, amountOutMin, sqrtPriceLimit)
+        args = encode(['(address,address,uint24,address,uint256,uint256,uint160)'],
+                      [(WETH_ADDRESS, placeholder, DEFAULT_V3_FEE, recipient, amount_in, 1, 0)])
+        return SwapTemplate(router, V3_SWAP_SELECTOR + args, amount_in, deadline,
+                            token_offset=4 + 32 + 12, amount_in_offset=4 + 4 * 32,
+                            min_out_offset=4 + 5 * 32, fee_offset=4 + 2 * 32)
+
+    # swapExactTokensForTokens: path dinâmico no fim, token é o último elemento
+    args = encode(['uint256', 'uint256', 'address[]', 'address', 'uint256'],
+                  [amount_in, 1, [WETH_ADDRESS, placeholder], recipient, deadline])
+    calldata = V2_SWAP_SELECTOR + args
+    return SwapTemplate(router, calldata, amount_in, deadline,
+                        token_offset=len(calldata) - 20, amount_in_offset=4,
+                        min_out_offset=4 + 32, fee_offset=None)
+
+
+class SwapTemplateCache:
+    """Templates por router + campos pré-buscados (gas e saldo WETH); fees do oráculo, allowances do cache"""
+
+    def __init__(self):
+        self.templates: Dict[str, SwapTemplate] = {}
+        self.weth_balance = 0
+        self.tx_fields: Dict = {}
+        self.urgency = 'high'
+
+        # Estatísticas
+        self.hot_builds = 0
+        self.last_build_ms = 0.0
+
+    async def _read_uint(self, web3: AsyncWeb3, data: bytes) -> int:
+        result = await web3.eth.call({'to': WETH_ADDRESS, 'data': data})
+        return int.from_bytes(bytes(result)[:32], 'big')
+
+    async def prepare(self, web3: AsyncWeb3, routers, amount_in: int, gas_limit: int, urgency: str = 'high'):
+        """Fora do caminho crítico: codifica templates, lê allowances/saldo e garante nonce sincronizado"""
+        deadline = int(time.time()) + TEMPLATE_DEADLINE
+        for router in routers:
+            self.templates[router.lower()] = encode_buy_template(Web3.to_checksum_address(router), amount_in, deadline)
+        await ALLOWANCES.read_many(web3, [(WETH_ADDRESS, router) for router in routers])  # Ressincroniza com a chain
+
+        self.weth_balance = await self._read_uint(web3, BALANCE_OF_SELECTOR + encode(['address'], [WALLET_ADDRESS]))
+        self.tx_fields = {'chainId': CHAIN_ID, 'value': 0, 'gas': gas_limit}
+        self.urgency = urgency
+        await NONCE_MANAGER.prefetch(web3)
+        if not FEE_ORACLE.is_fresh:
+            await FEE_ORACLE.refresh(web3)
+
+    def clear(self):
+        """Desativa o caminho rápido (ex: sem ETH para gas); compras voltam ao caminho normal"""
+        self.templates.clear()
+        self.tx_fields = {}
+
+    def is_ready(self, router: str, amount_in: int) -> bool:
+        template = self.templates.get(router.lower())
+        return (template is not None and bool(self.tx_fields) and FEE_ORACLE.is_fresh
+                and template.deadline - time.time() > REFRESH_MARGIN
+                and ALLOWANCES.has(WETH_ADDRESS, router, amount_in)
+                and self.weth_balance >= amount_in)
+
+    def build_transaction(self, router: str, token_address: str, amount_in: int,
+                          amount_out_min: int = 1, fee: Optional[int] = None) -> Optional[Dict]:
+        """Transação de compra pronta para assinar (None se o template não está pronto: usar caminho normal)"""
+        if not self.is_ready(router, amount_in):
+            return None
+
+        start = time.perf_counter()
+        template = self.templates[router.lower()]
+        transaction = dict(self.tx_fields)
+        transaction.update(FEE_ORACLE.fees(self.urgency))  # Estado do último bloco, sem RPC
+        transaction['to'] = template.router
+        transaction['data'] = template.build(token_address, amount_in, amount_out_min, fee)
+
+        self.hot_builds += 1
+        self.last_build_ms = (time.perf_counter() - start) * 1000
+        return transaction
+
+    def commit(self, router: str, amount_in: int):
+        """Compra transmitida: debita a aprovação e o saldo locais (simulação abortada não debita)"""
+        ALLOWANCES.consume(WETH_ADDRESS, router, amount_in)
+        self.weth_balance -= amount_in
+
+    def get_stats(self) -> Dict:
+        return {
+            'routers': len(self.templates),
+            'hot_builds': self.hot_builds,
+            'last_build_ms': round(self.last_build_ms, 3),
+            'urgency': self.urgency
+        }
+
+
+# Instância global compartilhada (preparada em SniperBot.initialize e renovada no loop de status)
+SWAP_TEMPLATES = SwapTemplateCache()
@@ -899,24 +899,9 @@ Para analisar um token específico, envie o comando:
         return self.sniper_bot and self.sniper_bot.running
     
     def get_weth_balance(self) -> float:
-        """Obtém saldo WETH com diagnóstico"""
+        """Obtém saldo WETH (cache por bloco: nunca mais antigo que o último head)"""
         if self.sniper_bot:
-            balance = self.sniper_bot._get_weth_balance_sync()
-            
-            # Diagnóstico: se saldo for 0, forçar atualização
-            if balance == 0.0:
-                print("⚠️ Saldo WETH zerado detectado - forçando atualização...")
-                # Limpar cache e tentar novamente
-                if hasattr(self.sniper_bot, '_weth_balance_cache'):
-                    delattr(self.sniper_bot, '_weth_balance_cache')
-                if hasattr(self.sniper_bot, '_weth_balance_time'):
-                    delattr(self.sniper_bot, '_weth_balance_time')
-                
-                # Tentar leitura novamente
-                balance = self.sniper_bot._get_weth_balance_sync()
-                print(f"🔄 Saldo após atualização forçada: {balance:.6f} WETH")
-            
-            return balance
+            return self.sniper_bot._get_weth_balance_sync()
         return 0.0
     
     def get_eth_balance(self) -> float:
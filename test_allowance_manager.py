@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Teste do cache de allowances (débito local, eventos Approval e aprovações pendentes)
+"""
+
+import asyncio
+from colorama import Fore, Style, init
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from config import WETH_ADDRESS, BASESWAP_ROUTER, AERODROME_ROUTER
+from allowance_manager import AllowanceManager, APPROVAL_TOPIC, MAX_UINT256
+
+# Inicializar colorama
+init(autoreset=True)
+
+OWNER = Web3.to_checksum_address('0x' + '11' * 20)
+TOKEN = Web3.to_checksum_address('0x' + 'ab' * 20)
+
+
+def _approval_log(token: str, owner: str, spender: str, value: int):
+    return {
+        'address': token,
+        'topics': [HexBytes(APPROVAL_TOPIC), HexBytes(b'\x00' * 12 + bytes.fromhex(owner[2:])),
+                   HexBytes(b'\x00' * 12 + bytes.fromhex(spender[2:]))],
+        'data': HexBytes(value.to_bytes(32, 'big'))
+    }
+
+
+def test_consume_keeps_unlimited_approval():
+    """Swap debita a aprovação finita; a máxima não é debitada (WETH9/OpenZeppelin)"""
+    print(f"{Fore.CYAN}🧪 Testando débito local...{Style.RESET_ALL}")
+
+    manager = AllowanceManager(OWNER)
+    manager.set(TOKEN, BASESWAP_ROUTER, 1000)
+    manager.consume(TOKEN, BASESWAP_ROUTER.lower(), 400)
+    assert manager.get(TOKEN, BASESWAP_ROUTER) == 600
+    manager.consume(TOKEN, BASESWAP_ROUTER, 1000)
+    assert manager.get(TOKEN, BASESWAP_ROUTER) == 0 and not manager.has(TOKEN, BASESWAP_ROUTER, 1)
+
+    manager.set(WETH_ADDRESS, BASESWAP_ROUTER, MAX_UINT256)
+    manager.consume(WETH_ADDRESS, BASESWAP_ROUTER, 10**18)
+    assert manager.get(WETH_ADDRESS, BASESWAP_ROUTER) == MAX_UINT256
+    print(f"{Fore.GREEN}✅ Débito local: OK{Style.RESET_ALL}")
+
+
+def test_receipt_approval_events():
+    """Eventos Approval da carteira atualizam o cache; de outros donos são ignorados"""
+    print(f"{Fore.CYAN}🧪 Testando eventos Approval...{Style.RESET_ALL}")
+
+    manager = AllowanceManager(OWNER)
+    manager.mark_pending(TOKEN, BASESWAP_ROUTER, MAX_UINT256, '0x01')
+    other_owner = Web3.to_checksum_address('0x' + '22' * 20)
+    receipt = {'logs': [
+        _approval_log(TOKEN, OWNER, BASESWAP_ROUTER, 12345),
+        _approval_log(TOKEN, other_owner, AERODROME_ROUTER, 999),
+        {'address': TOKEN, 'topics': [HexBytes(b'\x01' * 32)], 'data': HexBytes(b'')}
+    ]}
+    assert manager.on_receipt(receipt) == 1
+    assert manager.get(TOKEN, BASESWAP_ROUTER) == 12345
+    assert manager.get(TOKEN, AERODROME_ROUTER) is None
+    assert manager.get_stats()['pending'] == 0
+    print(f"{Fore.GREEN}✅ Eventos Approval: OK{Style.RESET_ALL}")
+
+
+def test_reads_batched_and_pending_preserved():
+    """Leitura em lote (um eth_call); aprovação pendente mantém o valor otimista; revert invalida"""
+    print(f"{Fore.CYAN}🧪 Testando leitura em lote...{Style.RESET_ALL}")
+
+    class FakeEth:
+        calls = 0
+
+        async def call(self, transaction, block_identifier='latest'):
+            FakeEth.calls += 1
+            return encode(['(bool,bytes)[]'], [[(True, (500).to_bytes(32, 'big')), (False, b'')]])
+
+    class FakeWeb3:
+        eth = FakeEth()
+
+    manager = AllowanceManager(OWNER)
+    manager.mark_pending(WETH_ADDRESS, AERODROME_ROUTER, MAX_UINT256, '0x02')
+    values = asyncio.run(manager.read_many(FakeWeb3(), [(WETH_ADDRESS, BASESWAP_ROUTER), (WETH_ADDRESS, AERODROME_ROUTER)]))
+    assert values == [500, MAX_UINT256] and FakeEth.calls == 1
+
+    assert asyncio.run(manager.fetch(FakeWeb3(), WETH_ADDRESS, BASESWAP_ROUTER)) == 500
+    assert FakeEth.calls == 1  # Cache local
+
+    manager.on_approval_result(WETH_ADDRESS, AERODROME_ROUTER, success=False)
+    assert manager.get(WETH_ADDRESS, AERODROME_ROUTER) is None
+    print(f"{Fore.GREEN}✅ Leitura em lote: OK{Style.RESET_ALL}")
+
+
+def test_approval_no_longer_needed():
+    """Allowance atualizado entre a leitura e o envio: ensure_allowance devolve None e conta como aprovado"""
+    print(f"{Fore.CYAN}🧪 Testando aprovação dispensada...{Style.RESET_ALL}")
+
+    from unittest.mock import AsyncMock, patch
+    from dex_handler import DEXHandler
+
+    handler = DEXHandler.__new__(DEXHandler)
+    handler.web3 = None
+    handler.ensure_allowance = AsyncMock(return_value=None)
+    handler._wait_for_tx = AsyncMock()
+    with patch('dex_handler.ALLOWANCES') as allowances, patch('dex_handler.FEE_ORACLE') as oracle:
+        allowances.fetch = AsyncMock(return_value=0)
+        oracle.get_fees = AsyncMock(return_value={})
+        assert asyncio.run(handler.approve_token_if_needed(TOKEN, BASESWAP_ROUTER, 10**18)) is True
+    handler._wait_for_tx.assert_not_awaited()
+    print(f"{Fore.GREEN}✅ Aprovação dispensada: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO CACHE DE ALLOWANCES{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_consume_keeps_unlimited_approval()
+    test_receipt_approval_events()
+    test_reads_batched_and_pending_preserved()
+    test_approval_no_longer_needed()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Cache de allowances funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Teste do extrator de seletores do dispatcher (sem falsos positivos de constantes/dados)
+"""
+
+from colorama import Fore, Style, init
+from eth_utils import function_signature_to_4byte_selector
+
+from bytecode_selectors import (SelectorIndex, extract_selectors, risky_functions, RISK_SELECTORS,
+                                RISK_SIGNATURES)
+
+# Inicializar colorama
+init(autoreset=True)
+
+TRANSFER = function_signature_to_4byte_selector('transfer(address,uint256)')
+MINT = function_signature_to_4byte_selector('mint(address,uint256)')
+BLACKLIST = function_signature_to_4byte_selector('blacklist(address)')
+PAUSE = function_signature_to_4byte_selector('pause()')
+SET_TAX = function_signature_to_4byte_selector('setTaxFee(uint256)')
+
+
+def _dispatch(selector: bytes, dup_before_eq: bool = False) -> bytes:
+    """DUP1 PUSH4 sel EQ PUSH2 dest JUMPI (ou PUSH4 sel DUP2 EQ)"""
+    push = bytes([0x60 + len(selector.lstrip(b'\x00') or b'\x00') - 1]) + (selector.lstrip(b'\x00') or b'\x00')
+    if dup_before_eq:
+        return push + bytes([0x81, 0x14, 0x61, 0x01, 0x00, 0x57])
+    return bytes([0x80]) + push + bytes([0x14, 0x61, 0x01, 0x00, 0x57])
+
+
+def _contract() -> bytes:
+    header = bytes([0x60, 0x00, 0x35, 0x60, 0xe0, 0x1c])  # PUSH1 0 CALLDATALOAD PUSH1 0xe0 SHR
+    dispatcher = _dispatch(TRANSFER) + _dispatch(MINT) + _dispatch(BLACKLIST, dup_before_eq=True)
+    # Seletor de risco como constante (erro customizado: PUSH4 sel PUSH1 0xe0 SHL) e dentro de um PUSH32
+    constant = bytes([0x63]) + PAUSE + bytes([0x60, 0xe0, 0x1b])
+    inside_push32 = bytes([0x7f]) + bytes(27) + SET_TAX + bytes([0x14])
+    return header + dispatcher + constant + inside_push32 + bytes([0x00, 0xfe])
+
+
+def test_extracts_only_dispatcher_selectors():
+    """PUSH4 comparados com EQ entram; constantes e bytes dentro de PUSH32 não"""
+    print(f"{Fore.CYAN}🧪 Testando extração...{Style.RESET_ALL}")
+
+    selectors = extract_selectors(_contract())
+    assert selectors == {TRANSFER, MINT, BLACKLIST}
+
+    # Substring no hex acharia pause e setTaxFee também (falsos positivos da busca antiga)
+    code_hex = _contract().hex()
+    assert PAUSE.hex() in code_hex and SET_TAX.hex() in code_hex
+    print(f"{Fore.GREEN}✅ Extração: OK{Style.RESET_ALL}")
+
+
+def test_push3_selector_with_leading_zero():
+    """Seletor com byte inicial zero encurtado para PUSH3 pelo otimizador"""
+    print(f"{Fore.CYAN}🧪 Testando seletor com zero inicial...{Style.RESET_ALL}")
+
+    selector = bytes.fromhex('00fdd58e')  # balanceOf(address,uint256) do ERC1155
+    assert extract_selectors(_dispatch(selector)) == {selector}
+    assert extract_selectors(bytes([0x63, 0x01, 0x02])) == frozenset()  # PUSH truncado no fim do código
+    print(f"{Fore.GREEN}✅ Seletor com zero inicial: OK{Style.RESET_ALL}")
+
+
+def test_risk_table_and_memoization():
+    """Tabela de risco sem colisões; seletores memorizados por hash do bytecode"""
+    print(f"{Fore.CYAN}🧪 Testando tabela de risco e memoização...{Style.RESET_ALL}")
+
+    assert len(RISK_SELECTORS) == sum(len(signatures) for signatures in RISK_SIGNATURES.values())
+    assert risky_functions(extract_selectors(_contract())) == [('blacklist', 'blacklist'), ('mint', 'mint')]
+
+    index = SelectorIndex()
+    code_hash = '0x' + '12' * 32
+    first = index.get(code_hash, _contract())
+    assert index.get(code_hash) is first
+    assert index.extractions == 1 and index.hits == 1
+    assert index.get('0x' + '34' * 32) == frozenset() and index.extractions == 1  # Sem código: não memoriza
+    print(f"{Fore.GREEN}✅ Tabela de risco e memoização: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO EXTRATOR DE SELETORES{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_extracts_only_dispatcher_selectors()
+    test_push3_selector_with_leading_zero()
+    test_risk_table_and_memoization()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Extrator de seletores funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Teste do orquestrador de verificações (paralelismo, dependências, parada no bloqueio, latências)
+"""
+
+import asyncio
+import time
+from colorama import Fore, Style, init
+
+from check_orchestrator import CheckOrchestrator, Check, format_timings
+from security_validator import SecurityValidator
+from token_metadata import TokenMetadata
+
+# Inicializar colorama
+init(autoreset=True)
+
+
+async def _slow(value, delay: float = 0.05):
+    await asyncio.sleep(delay)
+    return value
+
+
+def test_parallel_checks_and_dependencies():
+    """Independentes em paralelo; dependente recebe os resultados das dependências"""
+    print(f"{Fore.CYAN}🧪 Testando paralelismo e dependências...{Style.RESET_ALL}")
+
+    orchestrator = CheckOrchestrator()
+    run = asyncio.run(orchestrator.run([
+        Check('state', lambda inputs: _slow({'owner': '0xabc'})),
+        Check('code', lambda inputs: _slow(b'\x60\x00')),
+        Check('sync', lambda inputs: 42),
+        Check('ownership', lambda inputs: inputs['state']['owner'] + str(len(inputs['code'])), deps=('state', 'code')),
+    ], graph='token'))
+
+    assert run.results['ownership'] == '0xabc2' and run.results['sync'] == 42
+    assert run.total_ms < 90  # Duas de 50 ms em paralelo, não em sequência
+    assert set(run.timings) == {'state', 'code', 'sync', 'ownership'} and run.blocked_by is None
+    stats = orchestrator.get_stats()
+    assert stats['runs'] == 1 and stats['latency_ms']['token.state']['count'] == 1
+    assert format_timings(run.timing_report()).endswith(")") and 'state' in format_timings(run.timing_report())
+    print(f"{Fore.GREEN}✅ Paralelismo e dependências: OK{Style.RESET_ALL}")
+
+
+def test_blocking_short_circuits():
+    """Bloqueio cancela as verificações em andamento e não inicia as dependentes"""
+    print(f"{Fore.CYAN}🧪 Testando parada no bloqueio...{Style.RESET_ALL}")
+
+    orchestrator = CheckOrchestrator()
+    cancelled = []
+
+    async def slow_check():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    start = time.perf_counter()
+    run = asyncio.run(orchestrator.run([
+        Check('honeypot', lambda inputs: _slow({'is_honeypot': True}, 0.01),
+              blocking=lambda info: "venda reverte" if info['is_honeypot'] else None),
+        Check('mev', lambda inputs: slow_check()),
+        Check('after_mev', lambda inputs: 1, deps=('mev',)),
+    ]))
+    assert time.perf_counter() - start < 1
+    assert run.blocked_by == 'honeypot' and run.block_reason == "venda reverte"
+    assert sorted(run.skipped) == ['after_mev', 'mev'] and cancelled == [True]
+    assert orchestrator.short_circuits == 1
+    print(f"{Fore.GREEN}✅ Parada no bloqueio: OK{Style.RESET_ALL}")
+
+
+def test_errors_and_invalid_graphs():
+    """Exceção propaga (cancelando o resto); dependência ausente ou circular é rejeitada"""
+    print(f"{Fore.CYAN}🧪 Testando erros...{Style.RESET_ALL}")
+
+    orchestrator = CheckOrchestrator()
+
+    async def failing():
+        raise ConnectionError("rpc caiu")
+
+    for checks in ([Check('a', lambda inputs: failing()), Check('b', lambda inputs: _slow(1, 5))],
+                   [Check('a', lambda inputs: 1, deps=('x',))],
+                   [Check('a', lambda inputs: 1, deps=('b',)), Check('b', lambda inputs: 1, deps=('a',))]):
+        try:
+            asyncio.run(orchestrator.run(checks))
+            raise AssertionError("grafo deveria falhar")
+        except (ConnectionError, ValueError):
+            pass
+    print(f"{Fore.GREEN}✅ Erros: OK{Style.RESET_ALL}")
+
+
+class FakeValidator(SecurityValidator):
+    """Entradas de RPC substituídas por atrasos fixos"""
+
+    def __init__(self, honeypot: bool, simulated: bool = True, buy_ok: bool = True):
+        super().__init__(web3=None)
+        self.honeypot = honeypot
+        self.simulated = simulated
+        self.buy_ok = buy_ok
+
+    async def _fetch_token_state(self, token_address):
+        return await _slow({'owner': None, 'total_supply': 10**27, 'balance_ok': True, 'error': None})
+
+    async def _check_honeypot(self, token_address, metadata):
+        if self.honeypot:
+            return await _slow({'is_honeypot': True, 'simulated': True, 'reason': 'venda reverte'}, 0.01)
+        if not self.buy_ok:
+            return await _slow({'is_honeypot': False, 'simulated': True, 'buy_ok': False, 'reason': 'compra reverte'},
+                               0.01)
+        if not self.simulated:
+            return await _slow({'is_honeypot': False, 'simulated': False, 'reason': 'sem liquidez para simular'})
+        return await _slow({'is_honeypot': False, 'simulated': True, 'buy_ok': True, 'transfer_ok': True,
+                            'buy_tax': 1.0, 'sell_tax': 2.0, 'dex': 'baseswap'})
+
+
+def test_token_security_graph():
+    """Veredito completo com entradas em paralelo; honeypot interrompe antes das demais"""
+    print(f"{Fore.CYAN}🧪 Testando grafo de segurança do token...{Style.RESET_ALL}")
+
+    metadata = TokenMetadata('0x' + 'ab' * 20, 'Pepe', 'PEPE', 18, '0x' + '00' * 32, 2000)
+
+    verdict = asyncio.run(FakeValidator(honeypot=False)._analyze_token_security(metadata.address, metadata))
+    details = verdict['details']
+    assert verdict['is_safe'] and verdict['score'] == 100
+    assert details['erc20_compliant'] and details['ownership']['has_owner'] is False
+    assert details['inconclusive'] is False and details['timings']['total'] < 90
+
+    blocked = asyncio.run(FakeValidator(honeypot=True)._analyze_token_security(metadata.address, metadata))
+    assert not blocked['is_safe'] and blocked['details']['blocked_by'] == 'honeypot'
+    assert 'token_state' in blocked['details']['skipped_checks'] and 'ownership' not in blocked['details']
+    assert blocked['details']['inconclusive'] is False  # Honeypot confirmado: veredito definitivo
+
+    # Compra revertida (trading ainda fechado?) bloqueia, mas não é definitiva
+    closed = asyncio.run(FakeValidator(honeypot=False, buy_ok=False)._analyze_token_security(metadata.address, metadata))
+    assert not closed['is_safe'] and closed['details']['blocked_by'] == 'honeypot'
+    assert closed['details']['inconclusive'] is True
+
+    # Nenhum pool simulável: reprovado (sem venda comprovada) e fora do cache
+    unverified = asyncio.run(FakeValidator(honeypot=False, simulated=False)._analyze_token_security(
+        metadata.address, metadata))
+    assert not unverified['is_safe'] and unverified['score'] == 50
+    assert unverified['details']['inconclusive'] is True
+    print(f"{Fore.GREEN}✅ Grafo de segurança do token: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO ORQUESTRADOR DE VERIFICAÇÕES{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_parallel_checks_and_dependencies()
+    test_blocking_short_circuits()
+    test_errors_and_invalid_graphs()
+    test_token_security_graph()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Orquestrador de verificações funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Teste dos decodificadores de criação de pools (V2, V3 e Aerodrome)
+"""
+
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+from colorama import Fore, Style, init
+
+from config import *
+from event_decoders import (
+    decode_pool_created, V2_PAIR_CREATED_TOPIC, V3_POOL_CREATED_TOPIC, AERODROME_POOL_CREATED_TOPIC
+)
+
+# Inicializar colorama
+init(autoreset=True)
+
+TOKEN = "0x1111111111111111111111111111111111111111"
+POOL = "0x2222222222222222222222222222222222222222"
+
+
+def _topic(value) -> HexBytes:
+    if isinstance(value, str):
+        return HexBytes('0x' + '0' * 24 + value[2:])
+    return HexBytes(value.to_bytes(32, 'big'))
+
+
+def _log(factory, topic0, extra_topics, data):
+    return AttributeDict({
+        'address': factory,
+        'topics': [HexBytes(topic0), _topic(TOKEN), _topic(WETH_ADDRESS)] + [_topic(t) for t in extra_topics],
+        'data': HexBytes(data),
+        'blockNumber': 123
+    })
+
+
+def test_decode_v2_pair_created():
+    """PairCreated V2: pool no data, sem fee/stable"""
+    print(f"{Fore.CYAN}🧪 Testando PairCreated V2...{Style.RESET_ALL}")
+
+    pool = decode_pool_created(_log(BASESWAP_FACTORY, V2_PAIR_CREATED_TOPIC, [],
+                                    encode(['address', 'uint256'], [POOL, 7])))
+    assert pool.dex == 'baseswap'
+    assert pool.pool == POOL and pool.token0 == TOKEN and pool.token1 == WETH_ADDRESS
+    assert pool.fee is None and pool.stable is None and pool.block_number == 123
+    assert pool.other_token(WETH_ADDRESS) == TOKEN
+    print(f"{Fore.GREEN}✅ V2: OK{Style.RESET_ALL}")
+
+
+def test_decode_v3_pool_created():
+    """PoolCreated V3: fee indexado, tickSpacing e pool no data"""
+    print(f"{Fore.CYAN}🧪 Testando PoolCreated V3...{Style.RESET_ALL}")
+
+    pool = decode_pool_created(_log(UNISWAP_V3_FACTORY, V3_POOL_CREATED_TOPIC, [3000],
+                                    encode(['int24', 'address'], [60, POOL])))
+    assert pool.dex == 'uniswap_v3'
+    assert pool.pool == POOL and pool.fee == 3000 and pool.tick_spacing == 60
+    print(f"{Fore.GREEN}✅ V3: OK{Style.RESET_ALL}")
+
+
+def test_decode_aerodrome_pool_created():
+    """PoolCreated Aerodrome: stable indexado, pool no data"""
+    print(f"{Fore.CYAN}🧪 Testando PoolCreated Aerodrome...{Style.RESET_ALL}")
+
+    pool = decode_pool_created(_log(AERODROME_FACTORY, AERODROME_POOL_CREATED_TOPIC, [1],
+                                    encode(['address', 'uint256'], [POOL, 9])))
+    assert pool.dex == 'aerodrome'
+    assert pool.pool == POOL and pool.stable is True and pool.fee is None
+
+    # Topic de outra DEX na factory errada não é decodificado
+    assert decode_pool_created(_log(AERODROME_FACTORY, V3_POOL_CREATED_TOPIC, [3000],
+                                    encode(['int24', 'address'], [60, POOL]))) is None
+    print(f"{Fore.GREEN}✅ Aerodrome: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DOS DECODIFICADORES DE POOLS{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_decode_v2_pair_created()
+    test_decode_v3_pool_created()
+    test_decode_aerodrome_pool_created()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Decodificadores funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Teste do oráculo de taxas EIP-1559 (previsão de base fee e fees por urgência)
+"""
+
+import asyncio
+from colorama import Fore, Style, init
+
+from fee_oracle import FeeOracle, next_base_fee, MAX_BASE_FEE_CHANGE
+
+# Inicializar colorama
+init(autoreset=True)
+
+GWEI = 10**9
+GAS_LIMIT = 120_000_000
+
+
+def _history(oldest: int, base_fees, rewards):
+    return {'oldestBlock': oldest, 'baseFeePerGas': base_fees, 'reward': rewards}
+
+
+def test_base_fee_prediction():
+    """Bloco no alvo mantém; bloco cheio sobe no máximo 2%; bloco vazio cai"""
+    print(f"{Fore.CYAN}🧪 Testando previsão do base fee...{Style.RESET_ALL}")
+
+    base_fee = 10_000_000
+    target = GAS_LIMIT // 6
+    assert next_base_fee(base_fee, target, GAS_LIMIT) == base_fee
+    assert next_base_fee(base_fee, GAS_LIMIT, GAS_LIMIT) == base_fee + base_fee * 5 // 250
+    assert next_base_fee(base_fee, 0, GAS_LIMIT) == base_fee - base_fee // 250
+    assert next_base_fee(1, target + 1, GAS_LIMIT) == 2  # Alta mínima de 1 wei
+    assert abs(MAX_BASE_FEE_CHANGE - 0.02) < 1e-12
+    print(f"{Fore.GREEN}✅ Previsão do base fee: OK{Style.RESET_ALL}")
+
+
+def test_fees_by_urgency():
+    """Percentil de priority fee por urgência e maxFee cobrindo N blocos de alta máxima"""
+    print(f"{Fore.CYAN}🧪 Testando fees por urgência...{Style.RESET_ALL}")
+
+    oracle = FeeOracle()
+    oracle.update_from_history(_history(
+        100, [GWEI // 100] * 3 + [GWEI // 50],
+        [[10**6, 2 * 10**6, 5 * 10**7], [2 * 10**6, 3 * 10**6, 10**8], [3 * 10**6, 4 * 10**6, 2 * 10**8]]
+    ))
+    assert oracle.block_number == 102 and oracle.base_fee == GWEI // 50 and oracle.is_fresh
+
+    low, normal, high = oracle.fees('low'), oracle.fees('normal'), oracle.fees('high')
+    assert low['maxPriorityFeePerGas'] == 2 * 10**6
+    assert normal['maxPriorityFeePerGas'] == 3 * 10**6
+    assert high['maxPriorityFeePerGas'] == 10**8
+    assert low['maxFeePerGas'] < normal['maxFeePerGas'] < high['maxFeePerGas']
+    # Alta: 6 blocos cheios seguidos ainda incluem a transação
+    base_after_six = oracle.base_fee
+    for _ in range(6):
+        base_after_six = next_base_fee(base_after_six, GAS_LIMIT, GAS_LIMIT)
+    assert high['maxFeePerGas'] >= base_after_six + high['maxPriorityFeePerGas']
+
+    # Resposta de endpoint atrasado não sobrescreve o estado
+    oracle.update_from_history(_history(90, [GWEI] * 4, [[GWEI] * 3] * 3))
+    assert oracle.base_fee == GWEI // 50
+
+    # newHeads: próximo base fee calculado localmente
+    oracle.on_new_head(103, GWEI // 50, GAS_LIMIT, GAS_LIMIT)
+    assert oracle.block_number == 103 and oracle.base_fee == next_base_fee(GWEI // 50, GAS_LIMIT, GAS_LIMIT)
+    print(f"{Fore.GREEN}✅ Fees por urgência: OK{Style.RESET_ALL}")
+
+
+def test_replacement_bump_and_cap():
+    """Reenvio sobe os dois campos >= 12,5% sem passar do teto; gasPrice legado é removido"""
+    print(f"{Fore.CYAN}🧪 Testando bump de substituição...{Style.RESET_ALL}")
+
+    oracle = FeeOracle()
+    oracle.update_from_history(_history(10, [10**7, 10**7], [[10**5, 10**6, 10**7]]))
+
+    transaction = {'gasPrice': 1, **oracle.fees('high')}
+    previous = dict(transaction)
+    oracle.bump(transaction)
+    assert 'gasPrice' not in transaction
+    for field in ('maxFeePerGas', 'maxPriorityFeePerGas'):
+        assert transaction[field] * 8 >= previous[field] * 9
+
+    transaction = {'maxFeePerGas': oracle.max_fee_cap, 'maxPriorityFeePerGas': oracle.max_fee_cap}
+    oracle.bump(transaction)
+    assert transaction['maxFeePerGas'] == oracle.max_fee_cap
+    assert transaction['maxPriorityFeePerGas'] <= transaction['maxFeePerGas']
+    print(f"{Fore.GREEN}✅ Bump de substituição: OK{Style.RESET_ALL}")
+
+
+def test_get_fees_refreshes_stale_state():
+    """Sem estado (loop parado) get_fees lê o eth_feeHistory antes de precificar"""
+    print(f"{Fore.CYAN}🧪 Testando leitura sob demanda...{Style.RESET_ALL}")
+
+    class FakeEth:
+        calls = 0
+
+        async def fee_history(self, blocks, newest, percentiles):
+            FakeEth.calls += 1
+            return _history(50, [10**7] * blocks + [2 * 10**7], [[10**6, 2 * 10**6, 3 * 10**6]] * blocks)
+
+    class FakeWeb3:
+        eth = FakeEth()
+
+    oracle = FeeOracle(history_blocks=5)
+    fees = asyncio.run(oracle.get_fees(FakeWeb3(), 'normal'))
+    assert FakeEth.calls == 1 and oracle.base_fee == 2 * 10**7
+    assert fees['maxPriorityFeePerGas'] == 2 * 10**6
+    asyncio.run(oracle.get_fees(FakeWeb3(), 'high'))
+    assert FakeEth.calls == 1  # Estado atualizado: sem RPC
+    print(f"{Fore.GREEN}✅ Leitura sob demanda: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO ORÁCULO DE TAXAS{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_base_fee_prediction()
+    test_fees_by_urgency()
+    test_replacement_bump_and_cap()
+    test_get_fees_refreshes_stale_state()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Oráculo de taxas funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
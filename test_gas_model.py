@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Teste do modelo de gas limit aprendido (p99 + margem, simulação só para combinações novas)
+"""
+
+import asyncio
+from colorama import Fore, Style, init
+
+from config import BASESWAP_ROUTER, AERODROME_ROUTER
+from gas_model import GasModel, gas_key, percentile
+
+# Inicializar colorama
+init(autoreset=True)
+
+CODE_HASH = '0x' + 'aa' * 32
+CLONE_HASH = '0x' + 'bb' * 32
+
+
+def test_percentile_and_margin():
+    """p99 dos recibos mais a margem configurada"""
+    print(f"{Fore.CYAN}🧪 Testando p99 + margem...{Style.RESET_ALL}")
+
+    assert percentile(range(1, 101), 0.99) == 99
+    assert percentile([5], 0.99) == 5
+
+    model = GasModel(max_samples=200, margin=0.2)
+    key = gas_key(BASESWAP_ROUTER, True, CODE_HASH)
+    for gas_used in range(100_000, 200_000, 1000):
+        model.record(key, gas_used)
+    assert model.limit(key) == int(198_000 * 1.2)
+    assert model.limit(gas_key(BASESWAP_ROUTER, False, CODE_HASH)) is None  # Venda é outra combinação
+    print(f"{Fore.GREEN}✅ p99 + margem: OK{Style.RESET_ALL}")
+
+
+def test_hot_limit_fallbacks():
+    """Caminho crítico: combinação exata, depois agregado do router, depois o padrão"""
+    print(f"{Fore.CYAN}🧪 Testando limites do caminho crítico...{Style.RESET_ALL}")
+
+    model = GasModel(margin=0.1)
+    assert model.hot_limit(gas_key(BASESWAP_ROUTER, True, CODE_HASH), 200_000) == 200_000
+
+    model.record(gas_key(BASESWAP_ROUTER, True, CODE_HASH), 100_000)
+    model.record(gas_key(BASESWAP_ROUTER, True, None), 150_000)  # Bytecode desconhecido: só o router
+    assert model.hot_limit(gas_key(BASESWAP_ROUTER.lower(), True, CODE_HASH), 200_000) == 110_000
+    assert model.hot_limit(gas_key(BASESWAP_ROUTER, True, CLONE_HASH), 200_000) == 165_000
+    assert model.hot_limit(gas_key(AERODROME_ROUTER, True, CODE_HASH), 200_000) == 200_000
+    assert model.hits == 1 and model.router_hits == 1
+    print(f"{Fore.GREEN}✅ Limites do caminho crítico: OK{Style.RESET_ALL}")
+
+
+def test_simulation_only_for_unseen():
+    """estimate_gas só quando a combinação nunca foi vista; falha cai no agregado/padrão"""
+    print(f"{Fore.CYAN}🧪 Testando simulação sob demanda...{Style.RESET_ALL}")
+
+    model = GasModel(margin=0.2)
+    key = gas_key(BASESWAP_ROUTER, False, CODE_HASH)
+    calls = []
+
+    async def simulate():
+        calls.append(1)
+        return 100_000
+
+    async def reverted():
+        raise ValueError('execution reverted')
+
+    assert asyncio.run(model.get_limit(key, simulate, 400_000)) == 120_000
+    model.record(key, 90_000)
+    assert asyncio.run(model.get_limit(key, simulate, 400_000)) == 108_000
+    assert len(calls) == 1
+
+    assert asyncio.run(model.get_limit(gas_key(AERODROME_ROUTER, False, CODE_HASH), reverted, 400_000)) == 400_000
+    print(f"{Fore.GREEN}✅ Simulação sob demanda: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO MODELO DE GAS{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_percentile_and_margin()
+    test_hot_limit_fallbacks()
+    test_simulation_only_for_unseen()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Modelo de gas funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
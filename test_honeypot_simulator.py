@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Teste da detecção de honeypot: o bytecode auxiliar roda em um interpretador EVM mínimo
+contra WETH, token e router falsos (taxas, vendas bloqueadas, transferências bloqueadas)
+"""
+
+import asyncio
+from colorama import Fore, Style, init
+from eth_abi import decode, encode
+from eth_utils import function_signature_to_4byte_selector
+from web3 import Web3
+
+from config import BASESWAP_ROUTER, UNISWAP_V3_QUOTER, UNISWAP_V3_ROUTER, WETH_ADDRESS
+from honeypot_simulator import (HoneypotSimulator, SIMULATION_ADDRESS, TRANSFER_PROBE, build_round_trip,
+                                parse_round_trip)
+
+# Inicializar colorama
+init(autoreset=True)
+
+TOKEN = Web3.to_checksum_address('0x' + 'ab' * 20)
+PAIR = Web3.to_checksum_address('0x' + 'cc' * 20)
+AMOUNT_IN = 10**15
+
+
+def _selector(signature: str) -> bytes:
+    return function_signature_to_4byte_selector(signature)
+
+
+class Revert(Exception):
+    pass
+
+
+class FakeERC20:
+    """ERC20 com taxa de compra/venda (queimada) e bloqueios configuráveis"""
+
+    def __init__(self, buy_tax=0, sell_tax=0, block_sells=False, block_transfers=False, max_tx=0):
+        self.balances, self.allowances = {}, {}
+        self.buy_tax, self.sell_tax = buy_tax, sell_tax
+        self.block_sells, self.block_transfers, self.max_tx = block_sells, block_transfers, max_tx
+
+    def move(self, sender: str, to: str, amount: int):
+        if self.balances.get(sender, 0) < amount:
+            raise Revert("saldo insuficiente")
+        if to == PAIR and sender != PAIR and self.block_sells:
+            raise Revert("venda bloqueada")
+        if PAIR not in (sender, to) and self.block_transfers:
+            raise Revert("transferência bloqueada")
+        tax = self.buy_tax if sender == PAIR else self.sell_tax if to == PAIR else 0
+        self.balances[sender] -= amount
+        self.balances[to] = self.balances.get(to, 0) + amount - amount * tax // 100
+
+    def transfer_from(self, spender: str, sender: str, to: str, amount: int):
+        if self.allowances.get((sender, spender), 0) < amount:
+            raise Revert("allowance insuficiente")
+        self.move(sender, to, amount)
+
+    def __call__(self, caller: str, value: int, data: bytes) -> bytes:
+        selector, args = data[:4], data[4:]
+        if selector == _selector('deposit()'):
+            self.balances[caller] = self.balances.get(caller, 0) + value
+            return b''
+        if selector == _selector('approve(address,uint256)'):
+            spender, amount = decode(['address', 'uint256'], args)
+            self.allowances[(caller, Web3.to_checksum_address(spender))] = amount
+            return encode(['bool'], [True])
+        if selector == _selector('transfer(address,uint256)'):
+            to, amount = decode(['address', 'uint256'], args)
+            self.move(caller, Web3.to_checksum_address(to), amount)
+            return encode(['bool'], [True])
+        if selector == _selector('balanceOf(address)'):
+            owner = Web3.to_checksum_address(decode(['address'], args)[0])
+            return encode(['uint256'], [self.balances.get(owner, 0)])
+        if selector == _selector('_maxTxAmount()') and self.max_tx:
+            return encode(['uint256'], [self.max_tx])
+        raise Revert("função inexistente")
+
+
+class FakeRouter:
+    """Router V2 com um único par WETH/token (swap com suporte a taxa na transferência)"""
+
+    def __init__(self, weth: FakeERC20, token: FakeERC20):
+        self.tokens = {WETH_ADDRESS: weth, TOKEN: token}
+
+    def amount_out(self, amount_in: int, path) -> int:
+        reserve_in = self.tokens[path[0]].balances.get(PAIR, 0)
+        reserve_out = self.tokens[path[1]].balances.get(PAIR, 0)
+        with_fee = amount_in * 9975
+        return with_fee * reserve_out // (reserve_in * 10000 + with_fee)
+
+    def __call__(self, caller: str, value: int, data: bytes) -> bytes:
+        selector, args = data[:4], data[4:]
+        if selector == _selector('getAmountsOut(uint256,address[])'):
+            amount_in, path = decode(['uint256', 'address[]'], args)
+            path = [Web3.to_checksum_address(address) for address in path]
+            return encode(['uint256[]'], [[amount_in, self.amount_out(amount_in, path)]])
+        if selector == _selector('swapExactTokensForTokensSupportingFeeOnTransferTokens'
+                                 '(uint256,uint256,address[],address,uint256)'):
+            amount_in, _, path, to, _ = decode(['uint256', 'uint256', 'address[]', 'address', 'uint256'], args)
+            path = [Web3.to_checksum_address(address) for address in path]
+            token_in, token_out = self.tokens[path[0]], self.tokens[path[1]]
+            reserve_in = token_in.balances.get(PAIR, 0)
+            token_in.transfer_from(BASESWAP_ROUTER, caller, PAIR, amount_in)
+            received = token_in.balances[PAIR] - reserve_in
+            reserve_out = token_out.balances[PAIR]
+            with_fee = received * 9975
+            token_out.move(PAIR, Web3.to_checksum_address(to), with_fee * reserve_out // (reserve_in * 10000 + with_fee))
+            return b''
+        raise Revert("função inexistente")
+
+
+def run_evm(code: bytes, contracts, caller: str) -> bytes:
+    """Interpretador dos opcodes usados pelo contrato auxiliar"""
+    stack, memory, pc = [], bytearray(0x800), 0
+    while True:
+        op = code[pc]
+        if 0x60 <= op <= 0x7f:
+            width = op - 0x5f
+            stack.append(int.from_bytes(code[pc + 1:pc + 1 + width], 'big'))
+            pc += width + 1
+            continue
+        pc += 1
+        if op == 0x50:
+            stack.pop()
+        elif op == 0x02:
+            stack.append(stack.pop() * stack.pop() % 2**256)
+        elif op == 0x04:
+            a, b = stack.pop(), stack.pop()
+            stack.append(a // b if b else 0)
+        elif op == 0x90:
+            stack[-1], stack[-2] = stack[-2], stack[-1]
+        elif op == 0x51:
+            offset = stack.pop()
+            stack.append(int.from_bytes(memory[offset:offset + 32], 'big'))
+        elif op == 0x52:
+            offset, value = stack.pop(), stack.pop()
+            memory[offset:offset + 32] = value.to_bytes(32, 'big')
+        elif op == 0x39:
+            dest, offset, size = stack.pop(), stack.pop(), stack.pop()
+            memory[dest:dest + size] = code[offset:offset + size]
+        elif op == 0x5a:
+            stack.append(10**7)
+        elif op in (0xf1, 0xfa):
+            _, address = stack.pop(), Web3.to_checksum_address(stack.pop().to_bytes(20, 'big'))
+            value = stack.pop() if op == 0xf1 else 0
+            args_offset, args_size, ret_offset, ret_size = (stack.pop() for _ in range(4))
+            contract = contracts.get(address)
+            try:
+                if contract is None:
+                    raise Revert("sem código")
+                ret, ok = contract(caller, value, bytes(memory[args_offset:args_offset + args_size])), 1
+            except Revert:
+                ret, ok = b'', 0
+            ret = ret[:ret_size]
+            memory[ret_offset:ret_offset + len(ret)] = ret
+            stack.append(ok)
+        elif op == 0xf3:
+            offset, size = stack.pop(), stack.pop()
+            return bytes(memory[offset:offset + size])
+        else:
+            raise AssertionError(f"opcode inesperado {op:#x}")
+
+
+def _world(**token_options):
+    weth, token = FakeERC20(), FakeERC20(**token_options)
+    weth.balances[PAIR] = 10**18
+    token.balances[PAIR] = 10**24
+    return {WETH_ADDRESS: weth, TOKEN: token, BASESWAP_ROUTER: FakeRouter(weth, token)}
+
+
+def _round_trip(**token_options):
+    contracts = _world(**token_options)
+    result = run_evm(build_round_trip(TOKEN, BASESWAP_ROUTER, 'baseswap', AMOUNT_IN), contracts, SIMULATION_ADDRESS)
+    return parse_round_trip(TOKEN, 'baseswap', BASESWAP_ROUTER, result), contracts
+
+
+def test_round_trip_reports_taxes_and_limits():
+    """Token com 5%/5% e max-tx: vende de volta, taxas medidas, transferência de teste recebida"""
+    print(f"{Fore.CYAN}🧪 Testando ida e volta...{Style.RESET_ALL}")
+
+    report, contracts = _round_trip(buy_tax=5, sell_tax=5, max_tx=10**22)
+    assert report.buy_ok and report.sell_ok and report.transfer_ok
+    assert abs(report.buy_tax - 5) < 0.01 and 4 < report.sell_tax <= 5
+    assert report.max_tx == 10**22 and not report.is_honeypot and report.reason == ""
+    assert contracts[TOKEN].balances[TRANSFER_PROBE] > 0 and contracts[TOKEN].balances[SIMULATION_ADDRESS] == 0
+    print(f"{Fore.GREEN}✅ Ida e volta: OK{Style.RESET_ALL}")
+
+
+def test_honeypots_and_restrictions():
+    """Venda bloqueada, taxa abusiva e transferência entre carteiras bloqueada = honeypot"""
+    print(f"{Fore.CYAN}🧪 Testando honeypots...{Style.RESET_ALL}")
+
+    blocked, _ = _round_trip(block_sells=True)
+    assert blocked.buy_ok and not blocked.sell_ok and blocked.is_honeypot and blocked.reason == "venda reverte"
+
+    taxed, _ = _round_trip(sell_tax=99)
+    assert taxed.sell_ok and taxed.sell_tax > 98 and taxed.is_honeypot
+
+    restricted, _ = _round_trip(block_transfers=True)
+    assert not restricted.transfer_ok and restricted.sell_ok and restricted.is_honeypot
+    assert restricted.reason == "transferência entre carteiras bloqueada"
+
+    limited, _ = _round_trip(max_tx=10**18)
+    limited.buy_ok = False  # Compra acima do max-tx revertida pelo token
+    assert limited.reason == "compra excede o max-tx" and not limited.is_honeypot
+    print(f"{Fore.GREEN}✅ Honeypots: OK{Style.RESET_ALL}")
+
+
+class FakeEth:
+    """eth_call executando o código injetado pelo state override"""
+
+    def __init__(self, contracts):
+        self.contracts = contracts
+        self.calls = []
+
+    async def call(self, transaction, block_identifier='latest', state_override=None):
+        self.calls.append((transaction, block_identifier, state_override))
+        override = state_override[transaction['to']]
+        assert int(override['balance'], 16) == AMOUNT_IN
+        return run_evm(bytes.fromhex(override['code'][2:]), self.contracts, transaction['from'])
+
+
+class FakeWeb3:
+    def __init__(self, eth: FakeEth):
+        self.eth = eth
+
+
+def test_simulator_routers():
+    """Sem pool conhecido simula todos os routers V2 e fee tiers V3; cada token é simulado de novo"""
+    print(f"{Fore.CYAN}🧪 Testando simulador...{Style.RESET_ALL}")
+
+    simulator = HoneypotSimulator()
+    eth = FakeEth(_world(sell_tax=3))
+    report = asyncio.run(simulator.check(FakeWeb3(eth), TOKEN, AMOUNT_IN))
+    assert report.dex == 'baseswap' and report.sell_ok and len(eth.calls) == 7
+    assert eth.calls[0][1] == 'pending'
+
+    # Taxa alterada no mesmo token (estado, não código): nova simulação detecta
+    eth.contracts = _world(sell_tax=99)  # eth_call não persiste estado: mundo novo
+    assert asyncio.run(simulator.check(FakeWeb3(eth), TOKEN, AMOUNT_IN)).is_honeypot
+    assert len(eth.calls) == 14 and simulator.get_stats()['honeypots'] == 1
+
+    # Nenhum router com liquidez: inconclusivo
+    empty = FakeEth({})
+    assert asyncio.run(simulator.check(FakeWeb3(empty), TOKEN, AMOUNT_IN)) is None
+    print(f"{Fore.GREEN}✅ Simulador: OK{Style.RESET_ALL}")
+
+
+class FakeV3Pool:
+    """Router (exactInputSingle) e QuoterV2 de um pool V3 com fee tier 3000 (preço de produto constante)"""
+    FEE = 3000
+    PARAMS = '(address,address,uint24,address,uint256,uint256,uint160)'
+    QUOTE_PARAMS = '(address,address,uint256,uint24,uint160)'
+
+    def __init__(self, weth: FakeERC20, token: FakeERC20):
+        self.tokens = {WETH_ADDRESS: weth, TOKEN: token}
+
+    def amount_out(self, token_in: str, token_out: str, amount_in: int) -> int:
+        reserve_in = self.tokens[token_in].balances.get(PAIR, 0)
+        reserve_out = self.tokens[token_out].balances.get(PAIR, 0)
+        with_fee = amount_in * (10**6 - self.FEE)
+        return with_fee * reserve_out // (reserve_in * 10**6 + with_fee)
+
+    def quoter(self, caller: str, value: int, data: bytes) -> bytes:
+        if data[:4] != _selector(f'quoteExactInputSingle({self.QUOTE_PARAMS})'):
+            raise Revert("função inexistente")
+        token_in, token_out, amount_in, fee, _ = decode([self.QUOTE_PARAMS], data[4:])[0]
+        if fee != self.FEE:
+            raise Revert("pool inexistente")
+        amount_out = self.amount_out(Web3.to_checksum_address(token_in), Web3.to_checksum_address(token_out), amount_in)
+        return encode(['uint256', 'uint160', 'uint32', 'uint256'], [amount_out, 0, 0, 0])
+
+    def __call__(self, caller: str, value: int, data: bytes) -> bytes:
+        if data[:4] != _selector(f'exactInputSingle({self.PARAMS})'):
+            raise Revert("função inexistente")
+        token_in, token_out, fee, to, amount_in, _, _ = decode([self.PARAMS], data[4:])[0]
+        if fee != self.FEE:
+            raise Revert("pool inexistente")
+        token_in, token_out = Web3.to_checksum_address(token_in), Web3.to_checksum_address(token_out)
+        amount_out = self.amount_out(token_in, token_out, amount_in)
+        self.tokens[token_out].move(PAIR, Web3.to_checksum_address(to), amount_out)
+        reserve_in = self.tokens[token_in].balances.get(PAIR, 0)
+        self.tokens[token_in].transfer_from(UNISWAP_V3_ROUTER, caller, PAIR, amount_in)
+        if self.tokens[token_in].balances[PAIR] - reserve_in < amount_in:
+            raise Revert("IIA")  # Pool V3 exige o valor integral: taxa na venda reverte
+        return encode(['uint256'], [amount_out])
+
+
+def _v3_world(**token_options):
+    contracts = _world(**token_options)
+    del contracts[BASESWAP_ROUTER]
+    pool = FakeV3Pool(contracts[WETH_ADDRESS], contracts[TOKEN])
+    contracts.update({UNISWAP_V3_ROUTER: pool, UNISWAP_V3_QUOTER: pool.quoter})
+    return contracts
+
+
+def test_uniswap_v3_only_token():
+    """Token só com pool V3: fee tier encontrado, taxa de compra medida, venda taxada reverte"""
+    print(f"{Fore.CYAN}🧪 Testando token só na Uniswap V3...{Style.RESET_ALL}")
+
+    eth = FakeEth(_v3_world(buy_tax=4))
+    report = asyncio.run(HoneypotSimulator().check(FakeWeb3(eth), TOKEN, AMOUNT_IN))
+    assert report.dex == 'uniswap_v3' and report.fee == FakeV3Pool.FEE
+    assert report.buy_ok and report.sell_ok and report.transfer_ok and not report.is_honeypot
+    assert abs(report.buy_tax - 4) < 0.01 and report.sell_tax < 0.01
+
+    taxed = asyncio.run(HoneypotSimulator().check(FakeWeb3(FakeEth(_v3_world(sell_tax=10))), TOKEN, AMOUNT_IN))
+    assert taxed.buy_ok and not taxed.sell_ok and taxed.is_honeypot
+
+    # Sem pool em nenhum router: nada simulável
+    assert asyncio.run(HoneypotSimulator().check(FakeWeb3(FakeEth({})), TOKEN, AMOUNT_IN)) is None
+    print(f"{Fore.GREEN}✅ Token só na Uniswap V3: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DA DETECÇÃO DE HONEYPOT{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_round_trip_reports_taxes_and_limits()
+    test_honeypots_and_restrictions()
+    test_simulator_routers()
+    test_uniswap_v3_only_token()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Detecção de honeypot funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -60,7 +60,7 @@ def test_dex_handler_improvements():
     try:
         # Mock Web3
         mock_web3 = Mock()
-        mock_web3.is_connected.return_value = True
+        mock_web3.is_connected = AsyncMock(return_value=True)
         mock_web3.from_wei.return_value = 0.001
         mock_web3.to_wei.return_value = 1000000000000000
         
@@ -73,19 +73,16 @@ def test_dex_handler_improvements():
                 with patch('dex_handler.WETH_ADDRESS', MockConfig.WETH_ADDRESS):
                     dex_handler = DEXHandler(mock_web3)
                     
-                    # Testar inicialização
-                    print(f"   RPC backup inicializado: {'✅' if dex_handler.backup_web3 else '❌'}")
-                    print(f"   Cache de saldos: {'✅' if hasattr(dex_handler, 'balance_cache') else '❌'}")
-                    print(f"   Timeout do cache: {dex_handler.cache_timeout}s")
-                    
-                    # Testar cache
-                    cache_key = "test_balance"
-                    dex_handler._cache_balance(cache_key, 0.5)
-                    cached_value = dex_handler._get_cached_balance(cache_key)
-                    print(f"   Cache funcionando: {'✅' if cached_value == 0.5 else '❌'}")
+                    # Testar cache de leituras por bloco (substitui o cache de saldos com TTL)
+                    from rpc_cache import RPCReadCache
+                    cache = RPCReadCache()
+                    cache.on_new_head(100)
+                    key = cache.cache_key('eth_getBalance', [MockConfig.WALLET_ADDRESS, 'latest'])
+                    cache.put(key, {'jsonrpc': '2.0', 'id': 1, 'result': '0x1'})
+                    print(f"   Cache funcionando: {'✅' if cache.get(key) else '❌'}")
                     
                     # Testar Web3 instance
-                    web3_instance = dex_handler._get_web3_instance()
+                    web3_instance = asyncio.run(dex_handler._get_web3_instance())
                     print(f"   Web3 instance: {'✅' if web3_instance else '❌'}")
         
         print(f"{Fore.GREEN}✅ DEX Handler: OK{Style.RESET_ALL}")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Teste do modo streaming (eth_subscribe) do monitor de tokens
+"""
+
+import asyncio
+import json
+from unittest.mock import Mock, AsyncMock, patch
+from colorama import Fore, Style, init
+
+from config import *
+from log_stream import LogStream, format_log
+from token_monitor import TokenMonitor, FACTORY_ADDRESSES
+
+# Inicializar colorama
+init(autoreset=True)
+
+TX_HASH = "0x" + "ab" * 32
+BLOCK_HASH = "0x" + "cd" * 32
+TOKEN = "0x1111111111111111111111111111111111111111"
+
+
+def _raw_pair_log(block_number: int, log_index: int = 0):
+    """Log PairCreated cru como enviado pelo nó (token/WETH)"""
+    return {
+        'address': BASESWAP_FACTORY.lower(),
+        'topics': [
+            '0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9',
+            '0x' + '0' * 24 + TOKEN[2:],
+            '0x' + '0' * 24 + WETH_ADDRESS[2:].lower()
+        ],
+        'data': '0x',
+        'blockNumber': hex(block_number),
+        'blockHash': BLOCK_HASH,
+        'transactionHash': TX_HASH,
+        'transactionIndex': '0x0',
+        'logIndex': hex(log_index),
+        'removed': False
+    }
+
+
+class FakeWebSocket:
+    """WebSocket falso: confirma assinaturas e entrega notificações roteiradas"""
+
+    def __init__(self, notifications, fail_after=False):
+        self.notifications = notifications
+        self.fail_after = fail_after
+        self.pending = []
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def send(self, message):
+        request = json.loads(message)
+        self.sent.append(request)
+        kind = request['params'][0]
+        self.pending.append(json.dumps({'jsonrpc': '2.0', 'id': request['id'], 'result': f"sub-{kind}"}))
+
+    async def recv(self):
+        return self.pending.pop(0)
+
+    def __aiter__(self):
+        return self._messages()
+
+    async def _messages(self):
+        for kind, result in self.notifications:
+            yield json.dumps({
+                'jsonrpc': '2.0', 'method': 'eth_subscription',
+                'params': {'subscription': f"sub-{kind}", 'result': result}
+            })
+        if self.fail_after:
+            raise ConnectionError("conexão perdida")
+
+
+class FakeEth:
+    """eth com block_number aguardável (como no AsyncWeb3)"""
+
+    def __init__(self, block_number):
+        self._block_number = block_number
+
+    @property
+    def block_number(self):
+        async def value():
+            return self._block_number
+        return value()
+
+
+def test_format_log_matches_get_logs():
+    """Log do WebSocket deve ter o mesmo formato de eth.get_logs"""
+    print(f"{Fore.CYAN}🧪 Testando formatação de logs...{Style.RESET_ALL}")
+
+    log = format_log(_raw_pair_log(100, 3))
+    assert log['blockNumber'] == 100
+    assert log['logIndex'] == 3
+    assert log['topics'][1].hex()[26:] == TOKEN[2:]
+    assert log['address'] == BASESWAP_FACTORY
+    print(f"{Fore.GREEN}✅ Formatação: OK{Style.RESET_ALL}")
+
+
+def test_stream_reconnects_and_routes():
+    """Reconecta após queda e entrega logs/heads aos callbacks corretos"""
+    print(f"{Fore.CYAN}🧪 Testando reconexão e roteamento...{Style.RESET_ALL}")
+
+    head = {'number': hex(101), 'hash': BLOCK_HASH, 'parentHash': BLOCK_HASH, 'timestamp': '0x1'}
+    sockets = [
+        FakeWebSocket([('logs', _raw_pair_log(100))], fail_after=True),
+        FakeWebSocket([('newHeads', head)])
+    ]
+
+    logs, heads, connects = [], [], []
+    stream = None
+
+    async def on_log(log):
+        logs.append(log)
+
+    async def on_head(h):
+        heads.append(h)
+        stream.running = False
+
+    async def on_connect():
+        connects.append(True)
+
+    async def run():
+        nonlocal stream
+        stream = LogStream("wss://test", {'address': FACTORY_ADDRESSES}, on_log, on_head, on_connect)
+        with patch('log_stream.websockets.connect', side_effect=lambda *a, **k: sockets.pop(0)), \
+             patch('log_stream.WS_RECONNECT_DELAY', 0):
+            await asyncio.wait_for(stream.run(), timeout=5)
+
+    asyncio.run(run())
+
+    assert len(connects) == 2
+    assert stream.reconnects == 1
+    assert len(logs) == 1 and logs[0]['blockNumber'] == 100
+    assert len(heads) == 1 and heads[0]['number'] == 101
+    print(f"{Fore.GREEN}✅ Reconexão: OK{Style.RESET_ALL}")
+
+
+def test_backfill_gap_after_reconnect():
+    """Ao reconectar, blocos perdidos são buscados via get_logs sem duplicar pares"""
+    print(f"{Fore.CYAN}🧪 Testando backfill de blocos perdidos...{Style.RESET_ALL}")
+
+    web3 = Mock()
+    web3.eth = FakeEth(105)
+    monitor = TokenMonitor(web3, AsyncMock())
+    monitor._last_block = 100
+    monitor._scan_blocks_for_new_pairs = AsyncMock()
+
+    asyncio.run(monitor._backfill_gap())
+
+    monitor._scan_blocks_for_new_pairs.assert_awaited_once_with(101, 105)
+    assert monitor._last_block == 105
+
+    log = format_log(_raw_pair_log(105))
+    assert monitor._is_duplicate_log(log) is False
+    assert monitor._is_duplicate_log(log) is True
+    print(f"{Fore.GREEN}✅ Backfill: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO MODO STREAMING (WEBSOCKET){Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_format_log_matches_get_logs()
+    test_stream_reconnects_and_routes()
+    test_backfill_gap_after_reconnect()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Streaming com reconexão e backfill funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
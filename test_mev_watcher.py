@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Teste do observador de MEV (sanduíches, gorjetas fora da curva, janela deslizante, leitura única por bloco)
+"""
+
+import asyncio
+from unittest.mock import patch
+from colorama import Fore, Style, init
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+
+from mev_watcher import MEVWatcher, involved_addresses
+from security_validator import SecurityValidator
+from rate_limiter import SmartRateLimiter, RateLimitConfig, RateLimitPreempted, LANE_DISCOVERY
+
+# Inicializar colorama
+init(autoreset=True)
+
+ROUTER = '0x' + '11' * 20
+TOKEN = '0x' + 'ab' * 20
+WETH = '0x4200000000000000000000000000000000000006'
+BOT, VICTIM, OTHER = '0x' + 'b0' * 20, '0x' + 'c1' * 20, '0x' + 'd2' * 20
+BASE_FEE = 10**7
+
+
+def _swap(sender: str, nonce: int, tip: int = 10**6, token: str = TOKEN):
+    """Swap V2 (amountIn, amountOutMin, path, to, deadline) de transação EIP-1559"""
+    args = encode(['uint256', 'uint256', 'address[]', 'address', 'uint256'],
+                  [10**18, 0, [WETH, token], sender, 2**32])
+    return AttributeDict({
+        'hash': HexBytes(bytes([nonce]) * 32), 'from': sender, 'to': ROUTER, 'type': 2,
+        'input': HexBytes(b'\x5c\x11\xd7\x95' + args),
+        'maxPriorityFeePerGas': tip, 'maxFeePerGas': BASE_FEE * 2 + tip
+    })
+
+
+def _block(number: int, txs):
+    deposit = AttributeDict({'hash': HexBytes(b'\xee' * 32), 'from': OTHER, 'to': OTHER, 'type': 0x7e,
+                             'input': HexBytes(b''), 'gasPrice': 0})
+    return AttributeDict({'number': number, 'baseFeePerGas': BASE_FEE, 'transactions': [deposit] + txs})
+
+
+def test_calldata_addresses():
+    """Destino e endereços do path extraídos; quantias não viram endereço"""
+    print(f"{Fore.CYAN}🧪 Testando endereços envolvidos...{Style.RESET_ALL}")
+    assert involved_addresses(_swap(BOT, 1)) == {ROUTER, WETH, TOKEN, BOT}
+    print(f"{Fore.GREEN}✅ Endereços envolvidos: OK{Style.RESET_ALL}")
+
+
+def test_sandwich_and_priority_outlier():
+    """Mesmo remetente antes e depois da vítima = sanduíche; gorjeta 10x a mediana = suspeita"""
+    print(f"{Fore.CYAN}🧪 Testando padrões de MEV...{Style.RESET_ALL}")
+
+    watcher = MEVWatcher(window=5)
+    watcher.ingest(_block(100, [_swap(BOT, 1), _swap(VICTIM, 2), _swap(BOT, 3)]))
+    report = watcher.check(TOKEN)
+    assert report['mev_risk_level'] == 'HIGH' and report['sandwiches'] == 1 and not report['safe_to_trade']
+    assert report['suspicious_transactions'][0]['reason'] == 'Sandwich pattern'
+
+    # Mesmo remetente em sequência (sem ninguém no meio) não é sanduíche
+    clean = MEVWatcher(window=5)
+    clean.ingest(_block(100, [_swap(BOT, 1), _swap(BOT, 2), _swap(VICTIM, 3), _swap(OTHER, 4)]))
+    assert clean.check(TOKEN)['mev_risk_level'] == 'LOW'
+
+    outlier = MEVWatcher(window=5)
+    outlier.ingest(_block(100, [_swap(VICTIM, 1), _swap(OTHER, 2, token='0x' + '77' * 20), _swap(BOT, 3, tip=10**9)]))
+    report = outlier.check(TOKEN.upper().replace('0X', '0x'))
+    assert report['high_priority'] == 1 and report['suspicious_transactions'][0]['priority_fee'] == 10**9
+    assert outlier.check('0x' + '77' * 20)['mev_risk_level'] == 'LOW'
+    print(f"{Fore.GREEN}✅ Padrões de MEV: OK{Style.RESET_ALL}")
+
+
+def test_rolling_window():
+    """Blocos fora da janela saem dos contadores; bloco repetido é ignorado"""
+    print(f"{Fore.CYAN}🧪 Testando janela deslizante...{Style.RESET_ALL}")
+
+    watcher = MEVWatcher(window=3)
+    assert watcher.check(TOKEN)['mev_risk_level'] == 'UNKNOWN'
+    watcher.ingest(_block(100, [_swap(BOT, 1), _swap(VICTIM, 2), _swap(BOT, 3)]))
+    assert not watcher.ingest(_block(100, []))
+    for number in (101, 102):
+        watcher.ingest(_block(number, [_swap(VICTIM, number % 256)]))
+    assert watcher.check(TOKEN)['sandwiches'] == 1
+
+    watcher.ingest(_block(103, []))
+    report = watcher.check(TOKEN)
+    assert report['mev_risk_level'] == 'LOW' and report['sandwiches'] == 0 and report['window_blocks'] == 3
+    assert watcher.get_stats()['blocks_ingested'] == 4
+    print(f"{Fore.GREEN}✅ Janela deslizante: OK{Style.RESET_ALL}")
+
+
+class FakeEth:
+    def __init__(self, head: int):
+        self.head = head
+        self.fetched = []
+
+    @property
+    async def block_number(self):
+        return self.head
+
+    async def get_block(self, number, full_transactions=False):
+        assert full_transactions
+        self.fetched.append(number)
+        return _block(number, [_swap(BOT, 1), _swap(VICTIM, 2), _swap(BOT, 3)] if number == self.head else [])
+
+
+class FakeWeb3:
+    def __init__(self, eth: FakeEth):
+        self.eth = eth
+
+
+def _limiter():
+    """Bucket folgado: o teste não disputa créditos com o limitador global"""
+    return SmartRateLimiter(RateLimitConfig(max_requests=1000, time_window=1))
+
+
+def test_blocks_fetched_once():
+    """Cada bloco é lido uma vez; consultas de MEV não fazem RPC"""
+    print(f"{Fore.CYAN}🧪 Testando leitura única por bloco...{Style.RESET_ALL}")
+    with patch('mev_watcher.BASE_RPC_LIMITER', _limiter()):
+        _blocks_fetched_once()
+    print(f"{Fore.GREEN}✅ Leitura única por bloco: OK{Style.RESET_ALL}")
+
+
+def _blocks_fetched_once():
+    eth = FakeEth(head=200)
+    watcher = MEVWatcher(window=5)
+    assert asyncio.run(watcher.sync(FakeWeb3(eth))) == 5 and eth.fetched == [196, 197, 198, 199, 200]
+    assert asyncio.run(watcher.sync(FakeWeb3(eth))) == 0
+    eth.head = 201
+    asyncio.run(watcher.sync(FakeWeb3(eth)))
+    assert eth.fetched[-1] == 201 and len(eth.fetched) == 6
+
+    for _ in range(3):
+        assert watcher.check(TOKEN)['sandwiches'] == 2
+    assert len(eth.fetched) == 6 and watcher.get_stats()['queries'] == 3
+
+    # Validador: índice vazio preenchido uma vez, depois só memória
+    from mev_watcher import MEV_WATCHER
+    validator = SecurityValidator(FakeWeb3(FakeEth(head=300)))
+    report = asyncio.run(validator.check_mev_protection(TOKEN, 10**18))
+    assert report['mev_risk_level'] == 'HIGH' and MEV_WATCHER.last_block == 300
+    asyncio.run(validator.check_mev_protection(TOKEN, 10**18))
+    assert len(validator.web3.eth.fetched) == MEV_WATCHER.window
+
+
+def test_block_reads_metered_and_preempted():
+    """Leituras pagam créditos na faixa de descoberta; backoff de 429 adia o índice sem perder blocos"""
+    print(f"{Fore.CYAN}🧪 Testando créditos das leituras de bloco...{Style.RESET_ALL}")
+
+    watcher = MEVWatcher(window=3)
+    limiter = _limiter()
+    eth = FakeEth(head=50)
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        raise asyncio.CancelledError
+
+    with patch('mev_watcher.BASE_RPC_LIMITER', limiter):
+        asyncio.run(watcher.sync(FakeWeb3(eth), lane=LANE_DISCOVERY))
+        assert limiter.granted == 3 and watcher.last_block == 50
+
+        limiter.handle_429_error()
+        eth.head = 52
+        try:
+            asyncio.run(watcher.sync(FakeWeb3(eth), lane=LANE_DISCOVERY))
+            raise AssertionError("leitura deveria ser adiada")
+        except RateLimitPreempted:
+            pass
+        assert watcher.last_block == 50 and len(eth.fetched) == 3
+
+        # Loop em segundo plano: espera o backoff em vez de registrar erro e repetir
+        with patch('mev_watcher.asyncio.sleep', fake_sleep):
+            try:
+                asyncio.run(watcher._run(FakeWeb3(eth)))
+            except asyncio.CancelledError:
+                pass
+    assert sleeps == [max(limiter.current_backoff, 2)] and len(eth.fetched) == 3
+    print(f"{Fore.GREEN}✅ Créditos das leituras de bloco: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO OBSERVADOR DE MEV{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_calldata_addresses()
+    test_sandwich_and_priority_outlier()
+    test_rolling_window()
+    test_blocks_fetched_once()
+    test_block_reads_metered_and_preempted()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Observador de MEV funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Teste do motor de cotação Multicall3 (aggregate3)
+"""
+
+import asyncio
+from unittest.mock import Mock, AsyncMock, patch
+from eth_abi import encode, decode
+from colorama import Fore, Style, init
+
+from config import *
+from multicall import (
+    Multicall3, AGGREGATE3_SELECTOR, encode_get_amounts_out, decode_get_amounts_out
+)
+
+# Inicializar colorama
+init(autoreset=True)
+
+TOKEN = "0x1111111111111111111111111111111111111111"
+
+
+def _fake_eth_call(responses):
+    """Simula Multicall3: responde cada sub-chamada via responses[(router, path)]"""
+    calls_seen = []
+
+    def eth_call(tx, block_identifier='latest'):
+        data = bytes(tx['data'])
+        assert data[:4] == AGGREGATE3_SELECTOR
+        calls = decode(['(address,bool,bytes)[]'], data[4:])[0]
+        results = []
+        for target, allow_failure, call_data in calls:
+            amount_in, path = decode(['uint256', 'address[]'], call_data[4:])
+            key = (target.lower(), tuple(addr.lower() for addr in path))
+            calls_seen.append(key)
+            if key in responses:
+                out = [amount_in] + [0] * (len(path) - 2) + [responses[key]]
+                results.append((True, encode(['uint256[]'], [out])))
+            else:
+                results.append((False, b''))
+        return encode(['(bool,bytes)[]'], [results])
+
+    return eth_call, calls_seen
+
+
+def test_encode_decode_roundtrip():
+    """Testa codificação de getAmountsOut e aggregate3"""
+    print(f"{Fore.CYAN}🧪 Testando codificação Multicall3...{Style.RESET_ALL}")
+
+    call_data = encode_get_amounts_out(10**15, [WETH_ADDRESS, TOKEN])
+    amount_in, path = decode(['uint256', 'address[]'], call_data[4:])
+    assert amount_in == 10**15
+    assert [p.lower() for p in path] == [WETH_ADDRESS.lower(), TOKEN.lower()]
+
+    returned = encode(['uint256[]'], [[10**15, 42]])
+    assert decode_get_amounts_out(returned) == [10**15, 42]
+
+    encoded = encode(['(bool,bytes)[]'], [[(True, b'\x01'), (False, b'')]])
+    assert Multicall3.decode_aggregate3(encoded) == [(True, b'\x01'), (False, b'')]
+    print(f"{Fore.GREEN}✅ Codificação: OK{Style.RESET_ALL}")
+
+
+def test_aggregate3_single_round_trip():
+    """Todas as chamadas devem sair em um único eth_call"""
+    print(f"{Fore.CYAN}🧪 Testando aggregate3 em uma única chamada...{Style.RESET_ALL}")
+
+    router = BASESWAP_ROUTER
+    responses = {(router.lower(), (WETH_ADDRESS.lower(), TOKEN.lower())): 500}
+    eth_call, calls_seen = _fake_eth_call(responses)
+
+    web3 = Mock()
+    web3.eth.call = AsyncMock(side_effect=eth_call)
+
+    multicall = Multicall3(web3)
+    results = asyncio.run(multicall.aggregate3([
+        (router, encode_get_amounts_out(1000, [WETH_ADDRESS, TOKEN])),
+        (router, encode_get_amounts_out(1000, [WETH_ADDRESS, USDC_ADDRESS, TOKEN])),
+    ]))
+
+    assert web3.eth.call.call_count == 1
+    assert len(calls_seen) == 2
+    assert results[0][0] is True and decode_get_amounts_out(results[0][1])[-1] == 500
+    assert results[1] == (False, b'')
+    print(f"{Fore.GREEN}✅ aggregate3: OK{Style.RESET_ALL}")
+
+
+def test_best_price_from_quote_matrix():
+    """get_best_price deve escolher a melhor DEX a partir da matriz de cotações"""
+    print(f"{Fore.CYAN}🧪 Testando get_best_price com Multicall3...{Style.RESET_ALL}")
+
+    from dex_handler import DEXHandler
+
+    responses = {
+        (BASESWAP_ROUTER.lower(), (WETH_ADDRESS.lower(), TOKEN.lower())): 700,
+        (SUSHISWAP_ROUTER.lower(), (WETH_ADDRESS.lower(), USDC_ADDRESS.lower(), TOKEN.lower())): 900,
+    }
+    eth_call, calls_seen = _fake_eth_call(responses)
+
+    web3 = Mock()
+    web3.eth.call = AsyncMock(side_effect=eth_call)
+
+    with patch('dex_handler.BASE_RPC_LIMITER') as mock_limiter, \
+         patch('dex_handler.V3_QUOTER') as mock_v3:
+        mock_limiter.acquire = AsyncMock()
+        mock_v3.is_warm.return_value = True
+        mock_v3.quote.return_value = None  # Sem pool V3 para o par
+        dex_handler = DEXHandler(web3)
+        best_dex, best_price, best_router = asyncio.run(
+            dex_handler.get_best_price(TOKEN, 1000, is_buy=True)
+        )
+
+    assert web3.eth.call.call_count == 1
+    # Uniswap V3 fica fora do aggregate3 (cotado localmente pelo V3_QUOTER)
+    assert len(calls_seen) == (len(dex_handler.dexs) - 1) * 3
+    assert best_price == 900
+    assert best_router == SUSHISWAP_ROUTER
+    print(f"{Fore.GREEN}✅ Melhor preço: {best_dex} ({best_price}){Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO MOTOR DE COTAÇÃO MULTICALL3{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_encode_decode_roundtrip()
+    test_aggregate3_single_round_trip()
+    test_best_price_from_quote_matrix()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Cotação em uma única ida ao RPC!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Teste do gerenciador de nonce local
+"""
+
+import asyncio
+from unittest.mock import Mock, AsyncMock, patch
+from colorama import Fore, Style, init
+
+from config import *
+from nonce_manager import NonceManager
+from dex_handler import DEXHandler
+from tx_tracker import TxResult
+
+# Inicializar colorama
+init(autoreset=True)
+
+
+def _mock_web3(pending_nonces):
+    """get_transaction_count('pending') retorna os valores em sequência"""
+    web3 = Mock()
+    web3.eth.get_transaction_count = AsyncMock(side_effect=list(pending_nonces))
+    return web3
+
+
+def test_back_to_back_reservations():
+    """Aprovação e swap no mesmo tick: nonces consecutivos com uma única leitura do nó"""
+    print(f"{Fore.CYAN}🧪 Testando reservas consecutivas...{Style.RESET_ALL}")
+
+    manager = NonceManager(WALLET_ADDRESS)
+    web3 = _mock_web3([7])
+
+    async def run():
+        concurrent = await asyncio.gather(*[manager.reserve(web3) for _ in range(4)])
+        for nonce in concurrent:
+            manager.mark_sent(nonce)
+        return concurrent
+
+    assert sorted(asyncio.run(run())) == [7, 8, 9, 10]
+    web3.eth.get_transaction_count.assert_awaited_once_with(WALLET_ADDRESS, 'pending')
+    print(f"{Fore.GREEN}✅ Reservas consecutivas: OK{Style.RESET_ALL}")
+
+
+def test_released_nonce_fills_gap():
+    """Nonce de transação não enviada é reutilizado antes de avançar a sequência"""
+    print(f"{Fore.CYAN}🧪 Testando reuso de lacunas...{Style.RESET_ALL}")
+
+    manager = NonceManager(WALLET_ADDRESS)
+    web3 = _mock_web3([3])
+
+    async def run():
+        first, second, third = [await manager.reserve(web3) for _ in range(3)]
+        manager.mark_sent(first)
+        manager.mark_sent(third)
+        await manager.release(web3, second, ValueError("insufficient funds"))
+        retried = await manager.reserve(web3)
+        following = await manager.reserve(web3)
+        return retried, following
+
+    assert asyncio.run(run()) == (4, 6)
+    print(f"{Fore.GREEN}✅ Reuso de lacunas: OK{Style.RESET_ALL}")
+
+
+def test_nonce_error_resyncs_from_pending():
+    """Erro de nonce ressincroniza do 'pending', inclusive recuando após transação descartada"""
+    print(f"{Fore.CYAN}🧪 Testando resync em erro de nonce...{Style.RESET_ALL}")
+
+    manager = NonceManager(WALLET_ADDRESS)
+    web3 = _mock_web3([10, 15, 12])
+
+    async def run():
+        nonce = await manager.reserve(web3)                                    # 10
+        await manager.release(web3, nonce, ValueError("nonce too low"))        # pending = 15
+        after_low = await manager.reserve(web3)                                # 15
+        in_flight = await manager.reserve(web3)                                # 16 (ainda não enviado)
+        manager.mark_sent(after_low)
+        await manager.resync(web3)  # Nó descartou transações: pending = 12, mas 16 está em uso
+        return after_low, in_flight, await manager.reserve(web3)
+
+    after_low, in_flight, next_nonce = asyncio.run(run())
+    assert (after_low, in_flight, next_nonce) == (15, 16, 17)
+    assert manager.resyncs == 3
+    print(f"{Fore.GREEN}✅ Resync: OK{Style.RESET_ALL}")
+
+
+def test_dropped_transaction_timeout_fills_gap():
+    """Timeout no rastreador (transação descartada do mempool) ressincroniza e o próximo envio reusa o nonce"""
+    print(f"{Fore.CYAN}🧪 Testando lacuna de transação descartada...{Style.RESET_ALL}")
+
+    manager = NonceManager(WALLET_ADDRESS)
+    web3 = _mock_web3([20, 20])  # Nonce 20 descartado: 'pending' continua em 20
+    handler = DEXHandler.__new__(DEXHandler)
+    handler.web3 = web3
+    tracker = Mock()
+    tracker.wait = AsyncMock(return_value=TxResult('0x01', 'timeout'))
+
+    async def run():
+        dropped, queued = await manager.reserve(web3), await manager.reserve(web3)
+        manager.mark_sent(dropped)
+        manager.mark_sent(queued)
+        with patch('dex_handler.NONCE_MANAGER', manager), patch('dex_handler.TX_TRACKER', tracker):
+            result = await handler._wait_for_tx('0x01')
+        return dropped, queued, result, await manager.reserve(web3)
+
+    dropped, queued, result, refill = asyncio.run(run())
+    assert (dropped, queued, refill) == (20, 21, 20) and result.status == 'timeout'
+    assert manager.resyncs == 2
+    print(f"{Fore.GREEN}✅ Lacuna de transação descartada: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO GERENCIADOR DE NONCE{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_back_to_back_reservations()
+    test_released_nonce_fills_gap()
+    test_nonce_error_resyncs_from_pending()
+    test_dropped_transaction_timeout_fills_gap()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Nonces sequenciados localmente!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Teste do motor de preços local (produto constante)
+"""
+
+import asyncio
+from unittest.mock import Mock, AsyncMock, patch
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+from colorama import Fore, Style, init
+
+from config import *
+from pool_pricing import PoolPricingEngine, SYNC_TOPIC_V2, SYNC_TOPIC_AERODROME
+
+# Inicializar colorama
+init(autoreset=True)
+
+TOKEN = "0x1111111111111111111111111111111111111111"
+POOL_A = "0x2222222222222222222222222222222222222222"
+POOL_B = "0x3333333333333333333333333333333333333333"
+
+
+def _sync_log(pool: str, reserve0: int, reserve1: int, block_number: int, log_index: int = 0):
+    return AttributeDict({
+        'address': pool,
+        'topics': [HexBytes(SYNC_TOPIC_V2)],
+        'data': HexBytes(reserve0.to_bytes(32, 'big') + reserve1.to_bytes(32, 'big')),
+        'blockNumber': block_number,
+        'logIndex': log_index
+    })
+
+
+def test_exact_amm_math():
+    """Resultado idêntico ao getAmountOut dos contratos, incluindo a fee"""
+    print(f"{Fore.CYAN}🧪 Testando matemática x*y=k...{Style.RESET_ALL}")
+
+    engine = PoolPricingEngine()
+    sushi = engine.register_pool(POOL_A, 'sushiswap', TOKEN, WETH_ADDRESS, 10**24, 10**20)
+    aero = engine.register_pool(POOL_B, 'aerodrome', TOKEN, WETH_ADDRESS, 10**24, 10**20)
+
+    amount_in = 10**17
+    # UniswapV2Library: amountIn * 997 * rOut / (rIn * 1000 + amountIn * 997)
+    expected = amount_in * 997 * 10**24 // (10**20 * 1000 + amount_in * 997)
+    assert sushi.get_amount_out(amount_in, WETH_ADDRESS) == expected
+
+    # Aerodrome: fee descontada da entrada antes da curva
+    net_in = amount_in - amount_in * 30 // 10000
+    assert aero.get_amount_out(amount_in, WETH_ADDRESS) == net_in * 10**24 // (10**20 + net_in)
+
+    quote = sushi.quote(amount_in, WETH_ADDRESS)
+    assert 0.3 < quote.price_impact < 0.5  # 0.3% fee + ~0.1% de curva
+    assert sushi.get_amount_out(amount_in, TOKEN) < amount_in
+    print(f"{Fore.GREEN}✅ Matemática AMM: OK (impacto {quote.price_impact:.3f}%){Style.RESET_ALL}")
+
+
+def test_sync_events_update_reserves():
+    """Sync atualiza reservas; logs antigos (backfill) não sobrescrevem estado novo"""
+    print(f"{Fore.CYAN}🧪 Testando atualização por Sync...{Style.RESET_ALL}")
+
+    engine = PoolPricingEngine()
+    engine.register_pool(POOL_A, 'baseswap', TOKEN, WETH_ADDRESS)
+    engine.register_pool(POOL_B, 'sushiswap', TOKEN, WETH_ADDRESS)
+    assert engine.best_quote(WETH_ADDRESS, TOKEN, 10**16) is None
+
+    assert engine.apply_sync_log(_sync_log(POOL_A, 10**24, 10**20, 10))
+    assert engine.apply_sync_log(_sync_log(POOL_B, 10**24, 2 * 10**20, 10))
+    assert not engine.apply_sync_log(_sync_log(POOL_A, 1, 1, 9))
+    assert engine.pools[POOL_A.lower()].reserve0 == 10**24
+
+    best = engine.best_quote(WETH_ADDRESS, TOKEN, 10**16)
+    assert best.pool == POOL_A and best.dex == 'baseswap'  # Mais tokens por WETH
+    assert engine.has_liquidity(TOKEN, WETH_ADDRESS)
+    print(f"{Fore.GREEN}✅ Sync: OK{Style.RESET_ALL}")
+
+
+def test_best_price_uses_local_reserves():
+    """get_best_price cota localmente as DEXs com pool conhecido e só as demais via Multicall3"""
+    print(f"{Fore.CYAN}🧪 Testando get_best_price com reservas locais...{Style.RESET_ALL}")
+
+    from dex_handler import DEXHandler
+    from test_multicall import _fake_eth_call
+
+    engine = PoolPricingEngine()
+    engine.register_pool(POOL_A, 'baseswap', TOKEN, WETH_ADDRESS, 10**24, 10**20)
+    local_out = engine.pools[POOL_A.lower()].get_amount_out(10**16, WETH_ADDRESS)
+
+    # Rota melhor em outro router V2 (sem pool no registro) ainda é encontrada
+    eth_call, calls_seen = _fake_eth_call({
+        (SUSHISWAP_ROUTER.lower(), (WETH_ADDRESS.lower(), TOKEN.lower())): local_out * 2,
+    })
+    web3 = Mock()
+    web3.eth.call = AsyncMock(side_effect=eth_call)
+
+    with patch('dex_handler.POOL_PRICER', engine), patch('dex_handler.V3_QUOTER') as mock_v3, \
+            patch('dex_handler.BASE_RPC_LIMITER') as mock_limiter:
+        mock_limiter.acquire = AsyncMock()
+        mock_v3.is_warm.return_value = True
+        mock_v3.quote.return_value = None
+        dex_handler = DEXHandler(web3)
+        best_dex, best_price, best_router = asyncio.run(
+            dex_handler.get_best_price(TOKEN, 10**16, is_buy=True)
+        )
+        assert web3.eth.call.call_count == 1
+        assert calls_seen and all(router != BASESWAP_ROUTER.lower() for router, _ in calls_seen)
+        assert best_router == SUSHISWAP_ROUTER and best_price == local_out * 2
+
+        # Todas as DEXs V2 com pool conhecido: nenhuma chamada RPC
+        for index, dex in enumerate(('aerodrome', 'sushiswap')):
+            engine.register_pool('0x' + f'{index + 0x44:02x}' * 20, dex, TOKEN, WETH_ADDRESS, 10**23, 10**20)
+        best_dex, best_price, best_router = asyncio.run(
+            dex_handler.get_best_price(TOKEN, 10**16, is_buy=True)
+        )
+
+    assert web3.eth.call.call_count == 1
+    assert best_router == BASESWAP_ROUTER and best_price == local_out
+    print(f"{Fore.GREEN}✅ Preço local: {best_dex} ({best_price}){Style.RESET_ALL}")
+
+
+def test_bounded_registry_and_chunked_logs():
+    """Registro limitado (LRU, pools de posições ficam) e filtro de endereços em blocos"""
+    print(f"{Fore.CYAN}🧪 Testando registro limitado...{Style.RESET_ALL}")
+
+    engine = PoolPricingEngine(max_pools=3)
+    engine.pin(TOKEN)
+    engine.register_pool(POOL_A, 'baseswap', TOKEN, WETH_ADDRESS)
+    others = ['0x' + f'{i:040x}' for i in range(1, 5)]
+    for address in others[:2]:
+        engine.register_pool(address, 'baseswap', address, WETH_ADDRESS)
+    engine.pools_for(others[0], WETH_ADDRESS)  # Usado recentemente: fica
+    engine.register_pool(others[2], 'baseswap', others[2], WETH_ADDRESS)
+    assert set(engine.pools) == {POOL_A.lower(), others[0], others[2]} and engine.evictions == 1
+    assert engine.pools_for(others[1], WETH_ADDRESS) == []
+
+    engine.unpin(TOKEN)
+    engine.register_pool(others[3], 'baseswap', others[3], WETH_ADDRESS)
+    assert POOL_A.lower() not in engine.pools and len(engine.pools) == 3
+
+    web3 = Mock()
+    web3.eth.get_logs = AsyncMock(return_value=[])
+    with patch('pool_pricing.GET_LOGS_ADDRESS_CHUNK', 2):
+        asyncio.run(engine.sync_from_logs(web3, 10, 10))
+    filters = [call.args[0] for call in web3.eth.get_logs.call_args_list]
+    assert [len(f['address']) for f in filters] == [2, 1] and filters[0]['topics'] == [[SYNC_TOPIC_V2, SYNC_TOPIC_AERODROME]]
+    print(f"{Fore.GREEN}✅ Registro limitado: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO MOTOR DE PREÇOS LOCAL{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_exact_amm_math()
+    test_sync_events_update_reserves()
+    test_best_price_uses_local_reserves()
+    test_bounded_registry_and_chunked_logs()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Cotações locais sem RPC!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Teste da simulação pré-envio de swaps (revert e saída mínima abortam o envio)
+"""
+
+import asyncio
+import time
+from colorama import Fore, Style, init
+from eth_abi import encode
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+from config import BASESWAP_ROUTER, UNISWAP_V3_ROUTER
+from preflight import SwapPreflight, PreflightError, calldata_min_out, decode_amount_out
+from dex_handler import DEXHandler
+from swap_templates import encode_buy_template, TEMPLATE_DEADLINE
+
+# Inicializar colorama
+init(autoreset=True)
+
+TOKEN = Web3.to_checksum_address('0x' + 'ab' * 20)
+SENDER = Web3.to_checksum_address('0x' + 'cd' * 20)
+AMOUNT_IN = 398 * 10**12
+
+
+class FakeEth:
+    """eth_call com retorno ou erro configurado"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+
+    async def call(self, transaction, block_identifier='latest'):
+        self.calls.append((transaction, block_identifier))
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class FakeWeb3:
+    def __init__(self, eth: FakeEth):
+        self.eth = eth
+
+
+def _v2_transaction(min_out: int):
+    template = encode_buy_template(BASESWAP_ROUTER, AMOUNT_IN, int(time.time()) + TEMPLATE_DEADLINE, SENDER)
+    return {'to': BASESWAP_ROUTER, 'data': template.build(TOKEN, AMOUNT_IN, min_out), 'value': 0,
+            'gas': 200000, 'nonce': 7, 'maxFeePerGas': 10**8, 'chainId': 8453}
+
+
+def test_calldata_decoding():
+    """amountOutMin lido da calldata e saída decodificada do retorno (V2 e V3)"""
+    print(f"{Fore.CYAN}🧪 Testando decodificação...{Style.RESET_ALL}")
+
+    v2 = _v2_transaction(12345)['data']
+    assert calldata_min_out(v2) == 12345
+    assert decode_amount_out(v2, encode(['uint256[]'], [[AMOUNT_IN, 999]])) == 999
+
+    v3 = encode_buy_template(UNISWAP_V3_ROUTER, AMOUNT_IN, 0, SENDER).build(TOKEN, AMOUNT_IN, 777, fee=500)
+    assert calldata_min_out(v3) == 777
+    assert decode_amount_out(v3, encode(['uint256'], [888])) == 888
+    assert calldata_min_out(b'\x12\x34\x56\x78') == 0
+    print(f"{Fore.GREEN}✅ Decodificação: OK{Style.RESET_ALL}")
+
+
+def test_simulation_passes_and_uses_pending():
+    """Mesma calldata/gas contra 'pending', a partir da carteira (nonce e fees não vão no eth_call)"""
+    print(f"{Fore.CYAN}🧪 Testando simulação aprovada...{Style.RESET_ALL}")
+
+    eth = FakeEth(result=encode(['uint256[]'], [[AMOUNT_IN, 20_000]]))
+    transaction = _v2_transaction(10_000)
+    result = asyncio.run(SwapPreflight().simulate(FakeWeb3(eth), transaction, SENDER))
+
+    call, block = eth.calls[0]
+    assert block == 'pending'
+    assert call == {'from': SENDER, 'to': BASESWAP_ROUTER, 'data': transaction['data'], 'value': 0, 'gas': 200000}
+    assert result.amount_out == 20_000 and result.min_amount_out == 10_000
+    print(f"{Fore.GREEN}✅ Simulação aprovada: OK{Style.RESET_ALL}")
+
+
+def test_simulation_aborts():
+    """Revert ou saída abaixo do mínimo levantam PreflightError (mínimo nunca abaixo de 1)"""
+    print(f"{Fore.CYAN}🧪 Testando abortos...{Style.RESET_ALL}")
+
+    preflight = SwapPreflight()
+    reverted = FakeWeb3(FakeEth(error=ValueError('execution reverted: UniswapV2: INSUFFICIENT_OUTPUT_AMOUNT')))
+    zero_out = FakeWeb3(FakeEth(result=encode(['uint256[]'], [[AMOUNT_IN, 0]])))
+    low_out = FakeWeb3(FakeEth(result=encode(['uint256[]'], [[AMOUNT_IN, 500]])))
+
+    for web3, transaction, minimum in ((reverted, _v2_transaction(1), None),
+                                       (zero_out, _v2_transaction(1), None),
+                                       (low_out, _v2_transaction(1), 1000)):
+        try:
+            asyncio.run(preflight.simulate(web3, transaction, SENDER, minimum))
+            raise AssertionError("simulação deveria abortar")
+        except PreflightError:
+            pass
+
+    assert preflight.simulated == 3 and preflight.aborted == 3
+    print(f"{Fore.GREEN}✅ Abortos: OK{Style.RESET_ALL}")
+
+
+def test_transport_errors_are_not_reverts():
+    """Timeout, 429 e conexão caída propagam como estão (retry normal); revert tipado aborta"""
+    print(f"{Fore.CYAN}🧪 Testando erros de transporte...{Style.RESET_ALL}")
+
+    preflight = SwapPreflight()
+    for error in (asyncio.TimeoutError(), ValueError({'code': 429, 'message': 'Too Many Requests'}),
+                  ConnectionResetError("connection reset by peer")):
+        try:
+            asyncio.run(preflight.simulate(FakeWeb3(FakeEth(error=error)), _v2_transaction(1), SENDER))
+            raise AssertionError("erro deveria propagar")
+        except PreflightError:
+            raise AssertionError("erro de transporte tratado como revert")
+        except type(error):
+            pass
+
+    try:
+        asyncio.run(preflight.simulate(FakeWeb3(FakeEth(error=ContractLogicError("TransferHelper: TRANSFER_FROM_FAILED"))),
+                                       _v2_transaction(1), SENDER))
+        raise AssertionError("revert deveria abortar")
+    except PreflightError:
+        pass
+    assert preflight.aborted == 1
+    print(f"{Fore.GREEN}✅ Erros de transporte: OK{Style.RESET_ALL}")
+
+
+def test_aborted_swap_does_not_debit_allowance():
+    """Débito local só depois do broadcast aceito: simulação abortada não consome allowance"""
+    print(f"{Fore.CYAN}🧪 Testando débito após envio...{Style.RESET_ALL}")
+
+    handler = DEXHandler.__new__(DEXHandler)
+    debits = []
+
+    async def aborted(web3, transaction, preflight):
+        raise PreflightError("simulação reverteu")
+
+    handler._send_transaction = aborted
+    assert asyncio.run(handler._send_and_confirm({}, on_sent=lambda: debits.append(1))) is None
+    assert debits == []
+    print(f"{Fore.GREEN}✅ Débito após envio: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DA SIMULAÇÃO PRÉ-ENVIO{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_calldata_decoding()
+    test_simulation_passes_and_uses_pending()
+    test_simulation_aborts()
+    test_transport_errors_are_not_reverts()
+    test_aborted_swap_does_not_debit_allowance()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Simulação pré-envio funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
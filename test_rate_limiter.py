@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Teste do rate limiter token bucket (custos por método, fila FIFO e faixas de prioridade)
+"""
+
+import asyncio
+import time
+from colorama import Fore, Style, init
+
+from config import *
+from rate_limiter import (SmartRateLimiter, RateLimitConfig, RateLimitPreempted, method_cost, rpc_lane,
+                          LANE_EXECUTION, LANE_POSITION, LANE_ANALYSIS, LANE_DISCOVERY, LANE_DASHBOARD)
+
+# Inicializar colorama
+init(autoreset=True)
+
+
+def test_method_costs():
+    """Métodos baratos consomem menos créditos; eth_getLogs largo custa proporcionalmente mais"""
+    print(f"{Fore.CYAN}🧪 Testando custos por método...{Style.RESET_ALL}")
+
+    assert method_cost('eth_call') == 1.0
+    assert method_cost('eth_blockNumber') < method_cost('eth_getBalance') < method_cost('eth_call')
+    narrow = method_cost('eth_getLogs', [{'fromBlock': 1, 'toBlock': GET_LOGS_BLOCK_RANGE}])
+    wide = method_cost('eth_getLogs', [{'fromBlock': hex(1), 'toBlock': hex(GET_LOGS_BLOCK_RANGE * 4)}])
+    assert wide == narrow * 4
+
+    limiter = SmartRateLimiter(RateLimitConfig(max_requests=3, time_window=60))
+    assert all(limiter.try_acquire('eth_blockNumber') for _ in range(7))  # 7 x 0.38 < 3 créditos
+    assert not limiter.try_acquire('eth_call')
+
+    # Filtro repassado ao limitador: faixa larga é cobrada pela largura
+    billing = SmartRateLimiter(RateLimitConfig(max_requests=100, time_window=60))
+    assert billing.try_acquire('eth_getLogs', params=[{'fromBlock': 1, 'toBlock': GET_LOGS_BLOCK_RANGE * 4}])
+    assert abs(billing.credits_spent - wide) < 1e-9
+    print(f"{Fore.GREEN}✅ Custos por método: OK{Style.RESET_ALL}")
+
+
+def test_waiters_served_in_order_without_polling():
+    """Fila FIFO: cada waiter é liberado uma vez, na ordem de chegada, por um timer único"""
+    print(f"{Fore.CYAN}🧪 Testando fila FIFO...{Style.RESET_ALL}")
+
+    limiter = SmartRateLimiter(RateLimitConfig(max_requests=200, time_window=1, burst=1))
+    order = []
+
+    async def worker(index):
+        await limiter.acquire()
+        order.append(index)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*[worker(i) for i in range(10)])
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    assert order == list(range(10))
+    assert limiter.granted == 10 and limiter.queued == 9
+    assert 0.04 <= elapsed < 1.0  # 9 créditos a 200/s ≈ 45 ms
+    print(f"{Fore.GREEN}✅ Fila FIFO: OK ({elapsed * 1000:.0f} ms){Style.RESET_ALL}")
+
+
+def test_429_pauses_queue_until_recovery():
+    """429 esvazia o bucket e pausa a fila; sucesso encerra o backoff e libera os waiters"""
+    print(f"{Fore.CYAN}🧪 Testando backoff após 429...{Style.RESET_ALL}")
+
+    limiter = SmartRateLimiter(RateLimitConfig(max_requests=1000, time_window=1, max_backoff=10))
+
+    async def run():
+        limiter.handle_429_error()
+        assert limiter.current_backoff > 0 and not limiter.try_acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.05)
+        paused = not waiter.done()
+
+        limiter.handle_success()
+        await asyncio.wait_for(waiter, timeout=1)
+        return paused
+
+    assert asyncio.run(run())
+    assert limiter.current_backoff == 0 and limiter.consecutive_429s == 0
+    print(f"{Fore.GREEN}✅ Backoff: OK{Style.RESET_ALL}")
+
+
+def test_lanes_served_by_priority_with_execution_reserve():
+    """Execução passa na frente da fila e usa a reserva que as outras faixas não tocam"""
+    print(f"{Fore.CYAN}🧪 Testando faixas de prioridade...{Style.RESET_ALL}")
+
+    limiter = SmartRateLimiter(RateLimitConfig(max_requests=100, time_window=1, burst=4, execution_reserve=0.5))
+    order = []
+
+    async def worker(name, lane):
+        await limiter.acquire(lane=lane)
+        order.append(name)
+
+    async def run():
+        # 2 créditos livres acima da reserva: análise consome, dashboard e descoberta ficam na fila
+        assert limiter.try_acquire(lane=LANE_ANALYSIS) and limiter.try_acquire(lane=LANE_ANALYSIS)
+        assert not limiter.try_acquire(lane=LANE_ANALYSIS)
+
+        with rpc_lane(LANE_DASHBOARD):
+            dashboard = asyncio.create_task(worker('dashboard', None))  # Faixa herdada do contexto
+        discovery = asyncio.create_task(worker('discovery', LANE_DISCOVERY))
+        position = asyncio.create_task(worker('position', LANE_POSITION))
+        await asyncio.sleep(0)
+
+        # Execução não espera: usa a reserva mesmo com a fila cheia
+        assert limiter.try_acquire('eth_sendRawTransaction', lane=LANE_EXECUTION)
+        await asyncio.gather(dashboard, discovery, position)
+
+    asyncio.run(run())
+    assert order == ['position', 'discovery', 'dashboard']
+    print(f"{Fore.GREEN}✅ Faixas de prioridade: OK{Style.RESET_ALL}")
+
+
+def test_expensive_request_fits_below_reserve():
+    """Pedido mais caro que o espaço acima da reserva é limitado a ele (não espera para sempre nem trava a fila)"""
+    print(f"{Fore.CYAN}🧪 Testando pedido caro...{Style.RESET_ALL}")
+
+    limiter = SmartRateLimiter(RateLimitConfig(max_requests=15, time_window=1, execution_reserve=0.3))
+    order = []
+
+    async def worker(name, method, lane):
+        await limiter.acquire(method, lane=lane)
+        order.append(name)
+
+    async def run():
+        assert limiter.try_acquire('eth_getBlockReceipts', lane=LANE_ANALYSIS)  # 19 créditos -> 10.5
+        assert abs(limiter.tokens - limiter.reserve) < 0.01
+        receipts = asyncio.create_task(worker('receipts', 'eth_getBlockReceipts', LANE_ANALYSIS))
+        await asyncio.sleep(0)
+        discovery = asyncio.create_task(worker('discovery', 'eth_call', LANE_DISCOVERY))
+        await asyncio.wait_for(asyncio.gather(receipts, discovery), timeout=3)
+
+    asyncio.run(run())
+    assert order == ['receipts', 'discovery']
+    print(f"{Fore.GREEN}✅ Pedido caro: OK{Style.RESET_ALL}")
+
+
+def test_429_preempts_low_priority_lanes():
+    """Sob 429 descoberta/dashboards são descartados; posições esperam o fim do backoff"""
+    print(f"{Fore.CYAN}🧪 Testando preempção sob 429...{Style.RESET_ALL}")
+
+    limiter = SmartRateLimiter(RateLimitConfig(max_requests=1000, time_window=1, max_backoff=10))
+
+    async def run():
+        limiter.tokens = 0.0
+        discovery = asyncio.create_task(limiter.acquire('eth_getLogs', lane=LANE_DISCOVERY))
+        position = asyncio.create_task(limiter.acquire(lane=LANE_POSITION))
+        await asyncio.sleep(0)
+
+        limiter.handle_429_error()
+        assert limiter.should_yield(LANE_DASHBOARD) and not limiter.should_yield(LANE_POSITION)
+        try:
+            await discovery
+            raise AssertionError("descoberta deveria ser descartada")
+        except RateLimitPreempted:
+            pass
+        try:
+            await limiter.acquire(lane=LANE_DASHBOARD)
+            raise AssertionError("dashboard deveria ser descartado")
+        except RateLimitPreempted:
+            pass
+
+        await asyncio.sleep(0.02)
+        assert not position.done()
+        limiter.handle_success()
+        await asyncio.wait_for(position, timeout=1)
+
+    asyncio.run(run())
+    assert limiter.preempted == 2 and not limiter.should_yield(LANE_DISCOVERY)
+    print(f"{Fore.GREEN}✅ Preempção: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO RATE LIMITER TOKEN BUCKET{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_method_costs()
+    test_waiters_served_in_order_without_polling()
+    test_429_pauses_queue_until_recovery()
+    test_lanes_served_by_priority_with_execution_reserve()
+    test_expensive_request_fits_below_reserve()
+    test_429_preempts_low_priority_lanes()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Rate limiter funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
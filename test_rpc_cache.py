@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Teste do cache de leituras RPC por bloco (invalidação por head e reorg)
+"""
+
+import asyncio
+from colorama import Fore, Style, init
+
+from config import *
+from rpc_cache import RPCReadCache
+
+# Inicializar colorama
+init(autoreset=True)
+
+BALANCE_PARAMS = [WALLET_ADDRESS, 'latest']
+
+
+async def _cached_provider(cache: RPCReadCache, delay: float = 0):
+    """Middleware do cache sobre um provider falso que conta as requisições"""
+    calls = []
+
+    async def make_request(method, params):
+        calls.append((method, params))
+        await asyncio.sleep(delay)
+        if method == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': len(calls), 'result': hex(200)}
+        return {'jsonrpc': '2.0', 'id': len(calls), 'result': hex(len(calls))}
+
+    request = await cache.middleware(make_request, None)
+    return request, calls
+
+
+def test_identical_reads_hit_rpc_once_per_block():
+    """Leituras idênticas no mesmo bloco (inclusive concorrentes) fazem uma só requisição"""
+    print(f"{Fore.CYAN}🧪 Testando leituras repetidas no bloco...{Style.RESET_ALL}")
+
+    cache = RPCReadCache()
+    cache.on_new_head(100)
+
+    async def run():
+        request, calls = await _cached_provider(cache, delay=0.01)
+        results = await asyncio.gather(*[request('eth_getBalance', BALANCE_PARAMS) for _ in range(5)])
+        again = await request('eth_getBalance', [WALLET_ADDRESS, hex(100)])  # Mesmo bloco, número explícito
+        return calls, results, again
+
+    calls, results, again = asyncio.run(run())
+    assert len(calls) == 1
+    assert {r['result'] for r in results} == {'0x1'} and again['result'] == '0x1'
+    assert cache.hits == 5 and cache.misses == 1
+    print(f"{Fore.GREEN}✅ Uma requisição por bloco: OK{Style.RESET_ALL}")
+
+
+def test_new_head_invalidates_latest():
+    """Novo head (newHeads ou eth_blockNumber) faz 'latest' consultar o RPC novamente"""
+    print(f"{Fore.CYAN}🧪 Testando invalidação por novo head...{Style.RESET_ALL}")
+
+    cache = RPCReadCache()
+
+    async def run():
+        request, calls = await _cached_provider(cache)
+        await request('eth_getCode', BALANCE_PARAMS)     # Sem head conhecido: não cacheia
+        await request('eth_blockNumber', [])             # Head 200 observado
+        await request('eth_getCode', BALANCE_PARAMS)
+        await request('eth_getCode', BALANCE_PARAMS)     # Hit
+        cache.on_new_head(201)
+        await request('eth_getCode', BALANCE_PARAMS)     # Bloco novo: miss
+        await request('eth_getCode', [WALLET_ADDRESS, hex(200)])  # Bloco 200 continua em cache
+        await request('eth_getCode', [WALLET_ADDRESS, 'pending'])  # Nunca cacheado
+        await request('eth_sendRawTransaction', ['0x00'])         # Escrita passa direto
+        return calls
+
+    calls = asyncio.run(run())
+    assert [method for method, _ in calls].count('eth_getCode') == 4
+    assert cache.head == 201
+    print(f"{Fore.GREEN}✅ Invalidação por head: OK{Style.RESET_ALL}")
+
+
+def test_reorg_drops_orphaned_blocks():
+    """Reorg descarta entradas dos blocos órfãos e mantém as anteriores ao fork"""
+    print(f"{Fore.CYAN}🧪 Testando reorg...{Style.RESET_ALL}")
+
+    cache = RPCReadCache()
+    for number in range(100, 103):
+        cache.on_new_head(number, bytes([number]) * 32, bytes([number - 1]) * 32)
+        key = cache.cache_key('eth_call', [{'to': WETH_ADDRESS, 'data': '0x'}, 'latest'])
+        cache.put(key, {'jsonrpc': '2.0', 'id': number, 'result': hex(number)})
+
+    assert len(cache.entries) == 3
+
+    # Novo bloco 102 com outro hash (pai = 101 original): só 102 é órfão
+    cache.on_new_head(102, b'\xaa' * 32, bytes([101]) * 32)
+    assert cache.reorgs == 1 and sorted(key[2] for key in cache.entries) == [100, 101]
+
+    # Bloco 102 cujo pai diverge do 101 conhecido: 101 também é órfão
+    cache.on_new_head(102, b'\xbb' * 32, b'\xcc' * 32)
+    assert cache.reorgs == 2 and sorted(key[2] for key in cache.entries) == [100]
+
+    # Mesmo head reenviado não é reorg
+    cache.on_new_head(102, b'\xbb' * 32, b'\xcc' * 32)
+    assert cache.reorgs == 2
+    print(f"{Fore.GREEN}✅ Reorg: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO CACHE DE LEITURAS RPC{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_identical_reads_hit_rpc_once_per_block()
+    test_new_head_invalidates_latest()
+    test_reorg_drops_orphaned_blocks()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Cache por bloco funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
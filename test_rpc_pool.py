@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Teste do pool RPC (roteamento por saúde, failover e requisições hedged)
+"""
+
+import asyncio
+from colorama import Fore, Style, init
+
+from config import *
+from rate_limiter import rpc_lane, LANE_EXECUTION, LANE_DISCOVERY
+from rpc_pool import PooledProvider, COOLDOWN_AFTER_ERRORS
+
+# Inicializar colorama
+init(autoreset=True)
+
+
+class FakeProvider:
+    """Endpoint falso com latência, head e falhas configuráveis"""
+
+    def __init__(self, name: str, delay: float = 0.0, head: int = 100, fail: bool = False, rate_limited: bool = False):
+        self.endpoint_uri = name
+        self.delay = delay
+        self.head = head
+        self.fail = fail
+        self.rate_limited = rate_limited
+        self.calls = []
+
+    async def make_request(self, method, params):
+        self.calls.append(method)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(f"{self.endpoint_uri} fora do ar")
+        if self.rate_limited:
+            return {'jsonrpc': '2.0', 'id': 1, 'error': {'code': 429, 'message': 'Too Many Requests'}}
+        if method == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': 1, 'result': hex(self.head)}
+        return {'jsonrpc': '2.0', 'id': 1, 'result': self.endpoint_uri}
+
+
+def test_routes_to_healthiest_endpoint():
+    """Após medir latência e head, o endpoint rápido e em dia recebe as requisições"""
+    print(f"{Fore.CYAN}🧪 Testando roteamento por saúde...{Style.RESET_ALL}")
+
+    slow = FakeProvider('slow', delay=0.03)
+    lagging = FakeProvider('lagging', head=95)
+    fast = FakeProvider('fast')
+    pool = PooledProvider([slow, lagging, fast], probe_interval=3600)
+
+    async def run():
+        await pool.probe()
+        with rpc_lane(LANE_DISCOVERY):  # Sem hedge
+            return [(await pool.make_request('eth_call', []))['result'] for _ in range(3)]
+
+    assert asyncio.run(run()) == ['fast'] * 3
+    assert [endpoint.url for endpoint in pool.ranked()][0] == 'fast'
+    assert pool.ranked()[-1].url in ('slow', 'lagging')
+    print(f"{Fore.GREEN}✅ Roteamento: OK{Style.RESET_ALL}")
+
+
+def test_failover_and_cooldown():
+    """Endpoint caindo ou em rate limit: requisição segue para o próximo e o ruim sai da rotação"""
+    print(f"{Fore.CYAN}🧪 Testando failover...{Style.RESET_ALL}")
+
+    broken = FakeProvider('broken', fail=True)
+    limited = FakeProvider('limited', rate_limited=True)
+    backup = FakeProvider('backup', delay=0.01)
+    pool = PooledProvider([broken, limited, backup], probe_interval=3600)
+
+    async def run():
+        with rpc_lane(LANE_DISCOVERY):
+            return [(await pool.make_request('eth_call', []))['result'] for _ in range(COOLDOWN_AFTER_ERRORS + 2)]
+
+    assert set(asyncio.run(run())) == {'backup'}
+    # Em cooldown após erros consecutivos: pararam de receber tráfego
+    assert len(broken.calls) == COOLDOWN_AFTER_ERRORS and len(limited.calls) == COOLDOWN_AFTER_ERRORS
+    assert pool.ranked()[0].url == 'backup' and pool.failovers > 0
+    print(f"{Fore.GREEN}✅ Failover: OK{Style.RESET_ALL}")
+
+
+def test_execution_reads_are_hedged():
+    """Leituras da faixa de execução vão a dois endpoints; a primeira resposta vence"""
+    print(f"{Fore.CYAN}🧪 Testando hedge...{Style.RESET_ALL}")
+
+    stalled = FakeProvider('stalled', delay=0.5)
+    quick = FakeProvider('quick', delay=0.01)
+    pool = PooledProvider([stalled, quick], probe_interval=3600)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        with rpc_lane(LANE_EXECUTION):
+            response = await pool.make_request('eth_call', [])
+            elapsed = loop.time() - start
+            await pool.make_request('eth_sendRawTransaction', ['0x00'])  # Escrita nunca duplicada
+        return response, elapsed
+
+    response, elapsed = asyncio.run(run())
+    assert response['result'] == 'quick' and pool.hedged == 1
+    assert stalled.calls.count('eth_call') == 1 and quick.calls.count('eth_call') == 1
+    assert stalled.calls.count('eth_sendRawTransaction') + quick.calls.count('eth_sendRawTransaction') == 1
+    assert elapsed < 0.4  # Não esperou o endpoint travado
+    print(f"{Fore.GREEN}✅ Hedge: OK ({elapsed * 1000:.0f} ms){Style.RESET_ALL}")
+
+
+def test_cancelled_hedge_is_not_a_success():
+    """Perdedor do hedge não conta como sucesso: erros consecutivos continuam e a latência só sobe"""
+    print(f"{Fore.CYAN}🧪 Testando perdedor do hedge...{Style.RESET_ALL}")
+
+    stalled = FakeProvider('stalled', delay=0.2)
+    quick = FakeProvider('quick', delay=0.01)
+    pool = PooledProvider([stalled, quick], probe_interval=3600)
+    hanging = pool.endpoints[0]
+    hanging.latency, hanging.consecutive_errors, hanging.error_rate = 0.001, 2, 0.5
+
+    async def run():
+        with rpc_lane(LANE_EXECUTION):
+            await pool.make_request('eth_call', [])
+        await asyncio.sleep(0)  # Cancelamento do perdedor processado
+
+    asyncio.run(run())
+    assert hanging.consecutive_errors == 2 and hanging.error_rate == 0.5 and hanging.requests == 0
+    assert hanging.latency > 0.001  # Piso observado (~10 ms) puxa a média para cima
+    before = hanging.latency
+    hanging.record_censored(before / 2)
+    assert hanging.latency == before  # Piso abaixo da média não informa nada
+    print(f"{Fore.GREEN}✅ Perdedor do hedge: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO POOL RPC{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_routes_to_healthiest_endpoint()
+    test_failover_and_cooldown()
+    test_execution_reads_are_hedged()
+    test_cancelled_hedge_is_not_a_success()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Pool RPC funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
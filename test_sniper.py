@@ -14,18 +14,19 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config import *
 from dex_handler import DEXHandler
 from sniper_bot import SniperBot
+from rpc_client import create_async_web3
 
 async def test_connection():
     """Testa conexão com a Base Network"""
     print("🔍 Testando conexão com Base Network...")
     
     try:
-        web3 = Web3(Web3.HTTPProvider(BASE_RPC_URL))
-        if web3.is_connected():
+        web3 = await create_async_web3(BASE_RPC_URL)
+        if await web3.is_connected():
             print("✅ Conexão com Base Network: OK")
             
             # Testar bloco atual
-            latest_block = web3.eth.block_number
+            latest_block = await web3.eth.block_number
             print(f"📦 Bloco atual: {latest_block}")
             
             return web3
@@ -66,7 +67,7 @@ async def test_dex_connections(web3):
     
     try:
         dex_handler = DEXHandler(web3)
-        results = dex_handler.test_all_dexs()
+        results = await dex_handler.test_all_dexs()
         
         working_dexs = sum(1 for working in results.values() if working)
         total_dexs = len(results)
@@ -88,7 +89,7 @@ async def test_balance_check(web3):
     
     try:
         # Saldo ETH
-        balance = web3.eth.get_balance(WALLET_ADDRESS)
+        balance = await web3.eth.get_balance(WALLET_ADDRESS)
         balance_eth = float(web3.from_wei(balance, 'ether'))
         print(f"💰 Saldo ETH: {balance_eth:.6f} ETH")
         
@@ -144,7 +145,7 @@ async def test_gas_estimation(web3):
     
     try:
         # Gas price atual
-        gas_price = web3.eth.gas_price
+        gas_price = await web3.eth.gas_price
         gas_price_gwei = web3.from_wei(gas_price, 'gwei')
         print(f"⛽ Gas price atual: {gas_price_gwei:.2f} Gwei")
         
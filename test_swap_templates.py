@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Teste dos templates de swap pré-codificados (calldata idêntica à codificação ABI completa)
+"""
+
+import time
+from statistics import median
+from colorama import Fore, Style, init
+from eth_abi import encode
+from eth_account import Account
+from web3 import Web3
+
+from config import *
+from fee_oracle import FEE_ORACLE
+from allowance_manager import ALLOWANCES
+from swap_templates import (SwapTemplateCache, encode_buy_template, sign_transaction, V2_SWAP_SELECTOR,
+                            V3_SWAP_SELECTOR, TEMPLATE_DEADLINE)
+
+# Inicializar colorama
+init(autoreset=True)
+
+TOKEN = Web3.to_checksum_address('0x' + 'ab' * 20)
+AMOUNT_IN = 398 * 10**12
+RECIPIENT = Web3.to_checksum_address('0x' + 'cd' * 20)
+
+
+def test_v2_template_matches_full_encoding():
+    """Token, valor e mínimo escritos nos offsets dão a mesma calldata do encode completo"""
+    print(f"{Fore.CYAN}🧪 Testando template V2...{Style.RESET_ALL}")
+
+    deadline = int(time.time()) + TEMPLATE_DEADLINE
+    template = encode_buy_template(BASESWAP_ROUTER, AMOUNT_IN, deadline, RECIPIENT)
+
+    for amount_in in (AMOUNT_IN, AMOUNT_IN * 3):
+        expected = V2_SWAP_SELECTOR + encode(
+            ['uint256', 'uint256', 'address[]', 'address', 'uint256'],
+            [amount_in, 12345, [WETH_ADDRESS, TOKEN], RECIPIENT, deadline]
+        )
+        assert template.build(TOKEN, amount_in, 12345) == expected
+    print(f"{Fore.GREEN}✅ Template V2: OK{Style.RESET_ALL}")
+
+
+def test_v3_template_patches_fee_tier():
+    """exactInputSingle: tokenOut, fee tier e mínimo de saída corrigidos no lugar"""
+    print(f"{Fore.CYAN}🧪 Testando template V3...{Style.RESET_ALL}")
+
+    template = encode_buy_template(UNISWAP_V3_ROUTER, AMOUNT_IN, int(time.time()) + TEMPLATE_DEADLINE, RECIPIENT)
+    expected = V3_SWAP_SELECTOR + encode(
+        ['(address,address,uint24,address,uint256,uint256,uint160)'],
+        [(WETH_ADDRESS, TOKEN, 10000, RECIPIENT, AMOUNT_IN, 777, 0)]
+    )
+    assert template.build(TOKEN, AMOUNT_IN, 777, fee=10000) == expected
+    print(f"{Fore.GREEN}✅ Template V3: OK{Style.RESET_ALL}")
+
+
+def test_hot_path_readiness_and_cpu_time():
+    """Só usa o template com allowance/saldo pré-buscados; montagem + assinatura em poucos ms"""
+    print(f"{Fore.CYAN}🧪 Testando caminho rápido...{Style.RESET_ALL}")
+
+    cache = SwapTemplateCache()
+    router = BASESWAP_ROUTER
+    cache.templates[router.lower()] = encode_buy_template(router, AMOUNT_IN, int(time.time()) + TEMPLATE_DEADLINE, RECIPIENT)
+    cache.tx_fields = {'chainId': CHAIN_ID, 'value': 0, 'gas': 200000}
+    ALLOWANCES.set(WETH_ADDRESS, router, AMOUNT_IN * 2)
+    cache.weth_balance = AMOUNT_IN * 10
+    FEE_ORACLE.base_fee = FEE_ORACLE.block_number = None
+    assert cache.build_transaction(router, TOKEN, AMOUNT_IN) is None  # Oráculo sem estado: caminho normal
+
+    FEE_ORACLE.update_from_history({'oldestBlock': 100, 'baseFeePerGas': [10**7, 10**7],
+                                    'reward': [[10**5, 10**6, 10**7]]})
+
+    account = Account.create()
+    timings = []
+    for nonce in range(2):
+        start = time.perf_counter()
+        transaction = cache.build_transaction(router, TOKEN, AMOUNT_IN)
+        transaction['nonce'] = nonce
+        assert transaction['maxFeePerGas'] >= 10**7 + transaction['maxPriorityFeePerGas']
+        signed = sign_transaction(account, transaction)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert signed.rawTransaction == Account.sign_transaction(transaction, account.key).rawTransaction
+        assert ALLOWANCES.get(WETH_ADDRESS, router) == AMOUNT_IN * (2 - nonce)  # Montar não debita
+        cache.commit(router, AMOUNT_IN)  # Broadcast aceito
+
+    # Allowance consumida localmente: terceira compra volta ao caminho normal
+    assert ALLOWANCES.get(WETH_ADDRESS, router) == 0 and cache.weth_balance == AMOUNT_IN * 8
+    assert cache.build_transaction(router, TOKEN, AMOUNT_IN) is None
+    assert cache.build_transaction(UNISWAP_V3_ROUTER, TOKEN, AMOUNT_IN) is None  # Router sem template
+    assert cache.last_build_ms < 1.0
+
+    cache.clear()
+    assert not cache.is_ready(router, 1)
+    print(f"{Fore.GREEN}✅ Caminho rápido: OK (montagem + assinatura: {median(timings):.2f} ms){Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DOS TEMPLATES DE SWAP{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_v2_template_matches_full_encoding()
+    test_v3_template_patches_fee_tier()
+    test_hot_path_readiness_and_cpu_time()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Templates de swap funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Teste do store persistente de metadados de tokens
+"""
+
+import asyncio
+import os
+import tempfile
+from unittest.mock import Mock, AsyncMock
+from eth_abi import encode
+from colorama import Fore, Style, init
+
+from config import *
+from token_metadata import TokenMetadataStore, decode_string
+
+# Inicializar colorama
+init(autoreset=True)
+
+TOKEN = "0x1111111111111111111111111111111111111111"
+BYTECODE = bytes.fromhex('6080604052') * 40
+
+
+def _mock_web3(code: bytes = BYTECODE, delay: float = 0):
+    """RPC falso: aggregate3 com name/symbol/decimals e get_code"""
+    results = [
+        (True, encode(['string'], ['Test Token'])),
+        (True, b'PEPE'.ljust(32, b'\x00')),  # symbol bytes32 (tokens antigos)
+        (True, encode(['uint8'], [9]))
+    ]
+
+    async def call(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return encode(['(bool,bytes)[]'], [results])
+
+    web3 = Mock()
+    web3.eth.call = AsyncMock(side_effect=call)
+    web3.eth.get_code = AsyncMock(return_value=code)
+    return web3
+
+
+def test_first_sighting_then_local_hits():
+    """Primeira leitura vai ao RPC uma vez (mesmo concorrente); as seguintes são locais"""
+    print(f"{Fore.CYAN}🧪 Testando leitura única por token...{Style.RESET_ALL}")
+
+    store = TokenMetadataStore()
+    web3 = _mock_web3(delay=0.01)
+
+    async def run():
+        concurrent = await asyncio.gather(*[store.fetch(web3, TOKEN, block_number=42) for _ in range(3)])
+        decimals = await store.get_decimals(web3, TOKEN)
+        code = await store.get_bytecode(web3, TOKEN)
+        return concurrent, decimals, code
+
+    concurrent, decimals, code = asyncio.run(run())
+    meta = concurrent[0]
+    assert web3.eth.call.await_count == 1 and web3.eth.get_code.await_count == 1
+    assert (meta.name, meta.symbol, meta.decimals, meta.first_seen_block) == ('Test Token', 'PEPE', 9, 42)
+    assert decimals == 9 and code == BYTECODE and meta.code_size == len(BYTECODE)
+    assert store.get(TOKEN.upper().replace('0X', '0x')) is meta
+    print(f"{Fore.GREEN}✅ Leitura única: OK{Style.RESET_ALL}")
+
+
+def test_persisted_across_restarts():
+    """Metadados e bytecode sobrevivem a um restart (carregados na abertura)"""
+    print(f"{Fore.CYAN}🧪 Testando persistência em SQLite...{Style.RESET_ALL}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tokens.db')
+
+        store = TokenMetadataStore()
+        store.open(path)
+        meta = asyncio.run(store.fetch(_mock_web3(), TOKEN))
+        store.close()
+
+        restarted = TokenMetadataStore()
+        assert restarted.open(path) == 1
+        web3 = _mock_web3()
+        again = asyncio.run(restarted.fetch(web3, TOKEN))
+        assert again == meta
+        assert restarted.get_code(meta.code_hash) == BYTECODE
+        assert web3.eth.call.await_count == 0 and web3.eth.get_code.await_count == 0
+        restarted.close()
+    print(f"{Fore.GREEN}✅ Persistência: OK{Style.RESET_ALL}")
+
+
+def test_address_without_code_not_memoized():
+    """Endereço sem código não é gravado (pode receber deploy depois)"""
+    print(f"{Fore.CYAN}🧪 Testando endereço sem código...{Style.RESET_ALL}")
+
+    store = TokenMetadataStore()
+    web3 = _mock_web3(code=b'')
+    meta = asyncio.run(store.fetch(web3, TOKEN))
+    assert not meta.is_contract and store.get(TOKEN) is None
+
+    assert decode_string(encode(['string'], ['ABC'])) == 'ABC'
+    assert decode_string(b'') is None
+    print(f"{Fore.GREEN}✅ Endereço sem código: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO STORE DE METADADOS DE TOKENS{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_first_sighting_then_local_hits()
+    test_persisted_across_restarts()
+    test_address_without_code_not_memoized()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Metadados persistidos!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Teste do scanner de criação de pares do TokenMonitor
+"""
+
+import asyncio
+from unittest.mock import Mock, AsyncMock, patch
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+from colorama import Fore, Style, init
+
+from config import *
+from token_monitor import TokenMonitor, FACTORY_ADDRESSES, PAIR_CREATED_FILTER, PAIR_CREATED_TOPICS
+from event_decoders import V2_PAIR_CREATED_TOPIC
+from rate_limiter import SmartRateLimiter, RateLimitConfig, RateLimitPreempted, LANE_DISCOVERY
+
+# Inicializar colorama
+init(autoreset=True)
+
+TOKEN = "0x1111111111111111111111111111111111111111"
+PAIR = "0x2222222222222222222222222222222222222222"
+
+
+def _pair_log(factory: str, block_number: int):
+    """Log PairCreated V2 já formatado (como retornado por eth.get_logs)"""
+    return AttributeDict({
+        'address': factory,
+        'topics': [
+            HexBytes(V2_PAIR_CREATED_TOPIC),
+            HexBytes('0x' + '0' * 24 + TOKEN[2:]),
+            HexBytes('0x' + '0' * 24 + WETH_ADDRESS[2:])
+        ],
+        'data': HexBytes(encode(['address', 'uint256'], [PAIR, 1])),
+        'blockNumber': block_number,
+        'transactionHash': HexBytes(block_number.to_bytes(32, 'big')),
+        'logIndex': 0
+    })
+
+
+def _limiter():
+    """Bucket folgado: o teste não disputa créditos com o limitador global"""
+    return SmartRateLimiter(RateLimitConfig(max_requests=1000, time_window=1))
+
+
+def _monitor_with_logs(get_logs):
+    web3 = Mock()
+    web3.eth.get_logs = AsyncMock(side_effect=get_logs)
+    monitor = TokenMonitor(web3, AsyncMock())
+    monitor._scan_token_transfers = AsyncMock()
+    return web3, monitor
+
+
+def test_single_combined_query_per_chunk():
+    """Uma única chamada get_logs por faixa, cobrindo todas as factories e topics"""
+    print(f"{Fore.CYAN}🧪 Testando get_logs combinado...{Style.RESET_ALL}")
+
+    def get_logs(params):
+        return [_pair_log(BASESWAP_FACTORY, params['fromBlock'])]
+
+    web3, monitor = _monitor_with_logs(get_logs)
+    handled = []
+    monitor._process_pool_created = AsyncMock(side_effect=lambda pool: handled.append(pool))
+
+    span = GET_LOGS_BLOCK_RANGE * 2 + 10
+    limiter = _limiter()
+    with patch('token_monitor.BASE_RPC_LIMITER', limiter):
+        asyncio.run(monitor._scan_pair_created_events(1, span))
+    assert limiter.granted == 3  # Cada get_logs do scan passa pelo limitador
+
+    assert web3.eth.get_logs.call_count == 3
+    params = web3.eth.get_logs.call_args_list[0].args[0]
+    assert params['address'] == FACTORY_ADDRESSES
+    assert params['topics'] == [PAIR_CREATED_TOPICS]
+    assert params['toBlock'] - params['fromBlock'] + 1 == GET_LOGS_BLOCK_RANGE
+    assert [pool.block_number for pool in handled] == [1, 1 + GET_LOGS_BLOCK_RANGE, 1 + 2 * GET_LOGS_BLOCK_RANGE]
+    assert handled[0].pool == PAIR and handled[0].dex == 'baseswap'
+    print(f"{Fore.GREEN}✅ get_logs combinado: OK{Style.RESET_ALL}")
+
+
+def test_failed_range_is_split_not_swallowed():
+    """Faixa recusada pelo RPC é dividida ao meio em vez de ser ignorada"""
+    print(f"{Fore.CYAN}🧪 Testando divisão de faixa com erro...{Style.RESET_ALL}")
+
+    def get_logs(params):
+        if params['toBlock'] - params['fromBlock'] >= 4:
+            raise ValueError("query returned more than 10000 results")
+        return [_pair_log(BASESWAP_FACTORY, params['fromBlock'])]
+
+    web3, monitor = _monitor_with_logs(get_logs)
+    with patch('token_monitor.BASE_RPC_LIMITER', _limiter()):
+        logs = asyncio.run(monitor._get_pair_created_logs(1, 8))
+
+    assert [log['blockNumber'] for log in logs] == [1, 5]
+    print(f"{Fore.GREEN}✅ Divisão de faixa: OK{Style.RESET_ALL}")
+
+
+def test_dispatch_by_factory_and_topic():
+    """Eventos de factories desconhecidas ou repetidos não são processados"""
+    print(f"{Fore.CYAN}🧪 Testando roteamento por (factory, evento)...{Style.RESET_ALL}")
+
+    web3, monitor = _monitor_with_logs(lambda params: [])
+    monitor._process_pool_created = AsyncMock()
+
+    asyncio.run(monitor._dispatch_pair_event(_pair_log(BASESWAP_FACTORY, 1)))
+    asyncio.run(monitor._dispatch_pair_event(_pair_log(BASESWAP_FACTORY, 1)))
+    asyncio.run(monitor._dispatch_pair_event(_pair_log(TOKEN, 2)))
+
+    assert monitor._process_pool_created.await_count == 1
+    print(f"{Fore.GREEN}✅ Roteamento: OK{Style.RESET_ALL}")
+
+
+def test_scans_use_discovery_lane():
+    """Scans pedem créditos na faixa de descoberta e são adiados durante backoff de 429"""
+    print(f"{Fore.CYAN}🧪 Testando faixa de descoberta...{Style.RESET_ALL}")
+
+    web3, monitor = _monitor_with_logs(lambda params: [])
+    limiter = Mock()
+    limiter.acquire = AsyncMock()
+    with patch('token_monitor.BASE_RPC_LIMITER', limiter):
+        asyncio.run(monitor._get_pair_created_logs(1, 2))
+    limiter.acquire.assert_awaited_once_with('eth_getLogs', lane=LANE_DISCOVERY,
+                                             params=[{'fromBlock': 1, 'toBlock': 2, **PAIR_CREATED_FILTER}])
+
+    backoff = _limiter()
+    backoff.handle_429_error()
+    with patch('token_monitor.BASE_RPC_LIMITER', backoff):
+        try:
+            asyncio.run(monitor._scan_pair_created_events(1, 2))
+            raise AssertionError("scan adiado deveria propagar")
+        except RateLimitPreempted:
+            pass
+    assert web3.eth.get_logs.call_count == 1 and backoff.preempted == 1
+    print(f"{Fore.GREEN}✅ Faixa de descoberta: OK{Style.RESET_ALL}")
+
+
+class _HeadEth:
+    def __init__(self, heads):
+        self.heads = list(heads)
+
+    @property
+    async def block_number(self):
+        return self.heads.pop(0) if len(self.heads) > 1 else self.heads[0]
+
+
+def test_preempted_range_is_retried():
+    """Scan adiado pelo backoff não avança last_block: a mesma faixa é escaneada de novo"""
+    print(f"{Fore.CYAN}🧪 Testando repetição de faixa adiada...{Style.RESET_ALL}")
+
+    web3 = Mock()
+    web3.eth = _HeadEth([10, 12])
+    monitor = TokenMonitor(web3, AsyncMock())
+    monitor.running = True
+    scanned = []
+
+    async def scan(from_block, to_block):
+        scanned.append((from_block, to_block))
+        if len(scanned) == 1:
+            raise RateLimitPreempted("RPC em backoff")
+        monitor.running = False
+
+    monitor._scan_blocks_for_new_pairs = scan
+    with patch('token_monitor.BASE_WS_URL', None), patch('token_monitor.BASE_RPC_LIMITER', _limiter()), \
+            patch('token_monitor.asyncio.sleep', AsyncMock()):
+        asyncio.run(monitor.monitor_new_tokens())
+    assert scanned == [(11, 12), (11, 12)]
+    print(f"{Fore.GREEN}✅ Repetição de faixa adiada: OK{Style.RESET_ALL}")
+
+
+def test_single_transfer_scan_in_flight():
+    """Heads que chegam com um scan de transfers ainda esperando créditos não enfileiram outro"""
+    print(f"{Fore.CYAN}🧪 Testando scan de transfers único...{Style.RESET_ALL}")
+
+    web3, monitor = _monitor_with_logs(lambda params: [])
+    monitor.running = True
+    monitor._log_stream = Mock()
+    monitor._sync_pool_reserves = AsyncMock()
+    scans = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def slow_scan(from_block, to_block):
+            scans.append(from_block)
+            await release.wait()
+
+        monitor._scan_token_transfers = slow_scan
+        for number in (100, 101, 102):
+            await monitor._on_stream_head({'number': number, 'hash': b'', 'parentHash': b''})
+            await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(monitor._transfer_scan)
+        await monitor._on_stream_head({'number': 103, 'hash': b'', 'parentHash': b''})
+        await asyncio.gather(*monitor._stream_tasks)
+
+    with patch('token_monitor.BASE_RPC_LIMITER', _limiter()), patch('token_monitor.RPC_CACHE'), \
+            patch('token_monitor.TX_TRACKER'), patch('token_monitor.FEE_ORACLE'), patch('token_monitor.MEV_WATCHER'):
+        asyncio.run(run())
+    assert scans == [100, 103]
+    print(f"{Fore.GREEN}✅ Scan de transfers único: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO SCANNER DE PARES{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_single_combined_query_per_chunk()
+    test_failed_range_is_split_not_swallowed()
+    test_dispatch_by_factory_and_topic()
+    test_scans_use_discovery_lane()
+    test_preempted_range_is_retried()
+    test_single_transfer_scan_in_flight()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Scanner de pares funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
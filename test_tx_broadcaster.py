@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Teste do broadcast de transações em paralelo para vários endpoints
+"""
+
+import asyncio
+from colorama import Fore, Style, init
+from web3 import Web3
+
+from config import *
+from tx_broadcaster import TxBroadcaster, endpoint_label
+
+# Inicializar colorama
+init(autoreset=True)
+
+RAW_TX = bytes.fromhex('02f8' + 'ab' * 60)
+
+
+class FakeEndpoint:
+    """Endpoint falso que responde eth_sendRawTransaction após um atraso"""
+
+    def __init__(self, url: str, delay: float = 0.0, error: str = None):
+        self.endpoint_uri = url
+        self.delay = delay
+        self.error = error
+        self.received = []
+
+    async def make_request(self, method, params):
+        self.received.append((method, params[0]))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            return {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32000, 'message': self.error}}
+        return {'jsonrpc': '2.0', 'id': 1, 'result': Web3.to_hex(Web3.keccak(RAW_TX))}
+
+
+def test_fan_out_reports_first_acceptance():
+    """Todos recebem a mesma raw tx; o mais rápido é reportado e 'already known' não é erro"""
+    print(f"{Fore.CYAN}🧪 Testando fan-out...{Style.RESET_ALL}")
+
+    public = FakeEndpoint('https://public.example/rpc/SECRET', delay=0.05)
+    sequencer = FakeEndpoint('https://sequencer.example', delay=0.005)
+    duplicate = FakeEndpoint('https://backup.example', delay=0.02, error='already known')
+    broadcaster = TxBroadcaster(providers=[public, sequencer, duplicate])
+
+    async def run():
+        result = await broadcaster.broadcast(RAW_TX)
+        first = (result.first_endpoint, list(result.accepted))
+        await asyncio.gather(*broadcaster._background)  # Endpoints lentos completam o relatório
+        return result, first
+
+    result, (first_endpoint, accepted_at_return) = asyncio.run(run())
+    assert first_endpoint == 'sequencer.example' and accepted_at_return == ['sequencer.example']
+    assert result.tx_hash == Web3.keccak(RAW_TX)
+    assert sorted(result.accepted) == ['public.example', 'sequencer.example']
+    assert result.already_known == ['backup.example'] and not result.errors
+    assert {params for endpoint in (public, sequencer, duplicate) for _, params in endpoint.received} == {Web3.to_hex(RAW_TX)}
+    assert broadcaster.wins == {'sequencer.example': 1}
+    print(f"{Fore.GREEN}✅ Fan-out: OK{Style.RESET_ALL}")
+
+
+def test_all_rejections_raise_nonce_error_first():
+    """Nenhum aceite: erro de nonce tem prioridade (NONCE_MANAGER ressincroniza)"""
+    print(f"{Fore.CYAN}🧪 Testando rejeição total...{Style.RESET_ALL}")
+
+    broadcaster = TxBroadcaster(providers=[
+        FakeEndpoint('https://a.example', error='insufficient funds for gas'),
+        FakeEndpoint('https://b.example', delay=0.01, error='nonce too low'),
+    ])
+
+    try:
+        asyncio.run(broadcaster.broadcast(RAW_TX))
+        raise AssertionError("broadcast deveria falhar")
+    except ValueError as e:
+        assert 'nonce too low' in str(e)
+    assert broadcaster.wins == {}
+    print(f"{Fore.GREEN}✅ Rejeição total: OK{Style.RESET_ALL}")
+
+
+def test_endpoint_labels_hide_api_keys():
+    """URLs configuradas deduplicadas e reportadas só pelo host"""
+    broadcaster = TxBroadcaster(urls=['https://a.example/v2/KEY', 'https://a.example/v2/KEY', 'https://b.example'])
+    assert broadcaster.urls == ['https://a.example/v2/KEY', 'https://b.example']
+    assert endpoint_label('https://a.example/v2/KEY') == 'a.example'
+    assert broadcaster.get_stats()['endpoints'] == ['a.example', 'b.example']
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO BROADCAST DE TRANSAÇÕES{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_fan_out_reports_first_acceptance()
+    test_all_rejections_raise_nonce_error_first()
+    test_endpoint_labels_hide_api_keys()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Broadcast funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
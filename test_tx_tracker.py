@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Teste do rastreador assíncrono de confirmações
+"""
+
+import asyncio
+from unittest.mock import Mock, AsyncMock
+from hexbytes import HexBytes
+from colorama import Fore, Style, init
+
+from config import *
+from tx_tracker import TransactionTracker
+
+# Inicializar colorama
+init(autoreset=True)
+
+TX_A = '0x' + 'aa' * 32
+TX_B = '0x' + 'bb' * 32
+OTHER = '0x' + 'cc' * 32
+
+
+def _raw_receipt(tx_hash: str, block_number: int, status: int):
+    return {
+        'transactionHash': tx_hash, 'status': hex(status), 'blockNumber': hex(block_number),
+        'blockHash': '0x' + '00' * 32, 'transactionIndex': '0x0', 'gasUsed': '0x5208',
+        'cumulativeGasUsed': '0x5208', 'effectiveGasPrice': '0x1', 'logs': [],
+        'from': WALLET_ADDRESS, 'to': WETH_ADDRESS, 'contractAddress': None,
+        'logsBloom': '0x' + '00' * 256, 'type': '0x2'
+    }
+
+
+class FakeEth:
+    """Chain falsa: cada leitura de block_number avança um bloco"""
+
+    def __init__(self, start: int):
+        self.head = start
+
+    @property
+    def block_number(self):
+        async def advance():
+            self.head += 1
+            return self.head
+        return advance()
+
+
+def _mock_web3(receipts_by_block, start: int = 100):
+    web3 = Mock()
+    web3.eth = FakeEth(start)
+
+    async def coro_request(method, params):
+        assert method == 'eth_getBlockReceipts'
+        return receipts_by_block.get(int(params[0], 16), [])
+
+    web3.manager.coro_request = AsyncMock(side_effect=coro_request)
+    return web3
+
+
+def test_one_lookup_per_block_resolves_all():
+    """Uma busca de recibos por bloco resolve todas as transações incluídas, sem travar outras tarefas"""
+    print(f"{Fore.CYAN}🧪 Testando confirmação em lote...{Style.RESET_ALL}")
+
+    receipts = {
+        101: [_raw_receipt(OTHER, 101, 1)],
+        102: [_raw_receipt(TX_A, 102, 1), _raw_receipt(TX_B, 102, 0), _raw_receipt(OTHER, 102, 1)]
+    }
+    tracker = TransactionTracker(poll_interval=0.01)
+    web3 = _mock_web3(receipts)
+
+    async def run():
+        ticks = 0
+
+        async def other_work():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        worker = asyncio.create_task(other_work())
+        result_a, result_b = await asyncio.gather(
+            tracker.wait(web3, TX_A), tracker.wait(web3, HexBytes(TX_B))
+        )
+        worker.cancel()
+        return result_a, result_b, ticks
+
+    result_a, result_b, ticks = asyncio.run(run())
+    assert result_a.status == 'confirmed' and result_a.block_number == 102 and result_a.receipt.gasUsed == 21000
+    assert result_b.status == 'reverted'
+    assert web3.manager.coro_request.await_count == tracker.block_lookups == 2
+    assert ticks > 0
+    assert tracker.result(TX_A) is result_a  # Consultas posteriores não vão ao RPC
+    print(f"{Fore.GREEN}✅ Confirmação em lote: OK{Style.RESET_ALL}")
+
+
+def test_timeout_resolves_future():
+    """Transação nunca incluída resolve como timeout"""
+    print(f"{Fore.CYAN}🧪 Testando timeout...{Style.RESET_ALL}")
+
+    tracker = TransactionTracker(poll_interval=0.01)
+    result = asyncio.run(tracker.wait(_mock_web3({}), TX_A, timeout=0.05))
+    assert result.status == 'timeout' and not result.success
+    print(f"{Fore.GREEN}✅ Timeout: OK{Style.RESET_ALL}")
+
+
+def test_fallback_without_block_receipts():
+    """Nó sem eth_getBlockReceipts: hashes do bloco + recibo só das transações rastreadas"""
+    print(f"{Fore.CYAN}🧪 Testando fallback...{Style.RESET_ALL}")
+
+    tracker = TransactionTracker(poll_interval=0.01)
+    web3 = _mock_web3({})
+    web3.manager.coro_request = AsyncMock(side_effect=ValueError("the method eth_getBlockReceipts does not exist"))
+    web3.eth.get_block = AsyncMock(return_value={'transactions': [HexBytes(OTHER), HexBytes(TX_A)]})
+    web3.eth.get_transaction_receipt = AsyncMock(
+        return_value={'transactionHash': HexBytes(TX_A), 'status': 1, 'blockNumber': 101}
+    )
+
+    result = asyncio.run(tracker.wait(web3, TX_A))
+    assert result.success and not tracker.supports_block_receipts
+    web3.eth.get_transaction_receipt.assert_awaited_once()
+    print(f"{Fore.GREEN}✅ Fallback: OK{Style.RESET_ALL}")
+
+
+def test_null_block_receipts_retry_same_block():
+    """Endpoint atrasado devolve null para o bloco: mesmo bloco é consultado de novo, sem pular a transação"""
+    print(f"{Fore.CYAN}🧪 Testando bloco ainda indisponível...{Style.RESET_ALL}")
+
+    tracker = TransactionTracker(poll_interval=0.01)
+    web3 = _mock_web3({})
+    web3.eth.head = 100
+    requested = []
+    answers = iter([None, None, [_raw_receipt(TX_A, 101, 1)]])
+
+    async def coro_request(method, params):
+        requested.append(int(params[0], 16))
+        return next(answers, [])
+
+    web3.manager.coro_request = AsyncMock(side_effect=coro_request)
+    result = asyncio.run(tracker.wait(web3, TX_A, timeout=1))
+    assert result.success and result.block_number == 101
+    assert requested == [101, 101, 101]
+    print(f"{Fore.GREEN}✅ Bloco ainda indisponível: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO RASTREADOR DE TRANSAÇÕES{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_one_lookup_per_block_resolves_all()
+    test_timeout_resolves_future()
+    test_fallback_without_block_receipts()
+    test_null_block_receipts_retry_same_block()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Confirmações sem bloqueio!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Teste do cotador local Uniswap V3 (matemática de ticks e simulação de swap)
+"""
+
+import asyncio
+import math
+from unittest.mock import Mock, AsyncMock, patch
+from hexbytes import HexBytes
+from web3.datastructures import AttributeDict
+from colorama import Fore, Style, init
+
+from config import *
+from v3_quoter import (
+    V3PoolState, V3Quoter, Q96, MIN_TICK, MAX_TICK, MIN_SQRT_RATIO, MAX_SQRT_RATIO, SWAP_TOPIC,
+    get_sqrt_ratio_at_tick, get_tick_at_sqrt_ratio, compute_swap_step
+)
+
+# Inicializar colorama
+init(autoreset=True)
+
+TOKEN0 = "0x1111111111111111111111111111111111111111"
+TOKEN1 = "0x4200000000000000000000000000000000000006"
+POOL = "0x2222222222222222222222222222222222222222"
+
+
+def _encode_price_sqrt(reserve1: int, reserve0: int) -> int:
+    return math.isqrt(reserve1 * 2**192 // reserve0)
+
+
+def _pool(fee: int = 3000, l1: int = 10**18, l2: int = 5 * 10**18) -> V3PoolState:
+    """Pool no tick 0 com duas posições: [-600, 600] (l1) e [-6000, 6000] (l2)"""
+    pool = V3PoolState(POOL, TOKEN0, TOKEN1, fee, sqrt_price_x96=Q96, tick=0, liquidity=l1 + l2)
+    pool.ticks = {-6000: (l2, l2), -600: (l1, l1), 600: (l1, -l1), 6000: (l2, -l2)}
+    pool.initialized_ticks = sorted(pool.ticks)
+    pool.word_range = (-2, 2)
+    return pool
+
+
+def test_tick_math():
+    """TickMath nos extremos e inversa exata"""
+    print(f"{Fore.CYAN}🧪 Testando TickMath...{Style.RESET_ALL}")
+
+    assert get_sqrt_ratio_at_tick(0) == Q96
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+
+    for sqrt_price in [MIN_SQRT_RATIO, Q96, Q96 * 3 + 12345, MAX_SQRT_RATIO - 1]:
+        tick = get_tick_at_sqrt_ratio(sqrt_price)
+        assert get_sqrt_ratio_at_tick(tick) <= sqrt_price < get_sqrt_ratio_at_tick(tick + 1)
+    print(f"{Fore.GREEN}✅ TickMath: OK{Style.RESET_ALL}")
+
+
+def test_swap_step_matches_reference():
+    """computeSwapStep com os vetores de teste do v3-core"""
+    print(f"{Fore.CYAN}🧪 Testando computeSwapStep...{Style.RESET_ALL}")
+
+    price = _encode_price_sqrt(1, 1)
+    target = _encode_price_sqrt(101, 100)
+    sqrt_next, amount_in, amount_out, fee = compute_swap_step(price, target, 2 * 10**18, 10**18, 600)
+    assert (sqrt_next, amount_in, amount_out, fee) == (target, 9975124224178055, 9925619580021728, 5988667735148)
+
+    _, amount_in, amount_out, fee = compute_swap_step(price, _encode_price_sqrt(1000, 100), 2 * 10**18, 10**18, 600)
+    assert (amount_in, amount_out, fee) == (999400000000000000, 666399946655997866, 600000000000000)
+    print(f"{Fore.GREEN}✅ computeSwapStep: OK{Style.RESET_ALL}")
+
+
+def test_quote_crosses_initialized_ticks():
+    """Swap que cruza um tick usa a liquidez restante depois do cruzamento"""
+    print(f"{Fore.CYAN}🧪 Testando travessia de ticks...{Style.RESET_ALL}")
+
+    l1, l2 = 10**18, 5 * 10**18
+    pool = _pool(l1=l1, l2=l2)
+    amount_in = 5 * 10**17
+
+    # Referência: até o tick -600 com l1+l2, depois só l2
+    sqrt_600 = get_sqrt_ratio_at_tick(-600)
+    sqrt_a, in_a, out_a, fee_a = compute_swap_step(Q96, sqrt_600, l1 + l2, amount_in, 3000)
+    assert sqrt_a == sqrt_600  # Chegou ao tick: a quantidade cruza
+    remaining = amount_in - in_a - fee_a
+    _, in_b, out_b, fee_b = compute_swap_step(sqrt_600, get_sqrt_ratio_at_tick(-6000), l2, remaining, 3000)
+
+    assert pool.quote_exact_input(TOKEN0, amount_in) == out_a + out_b
+
+    # Trade pequeno dentro do range: um único passo
+    _, _, small_out, _ = compute_swap_step(Q96, get_sqrt_ratio_at_tick(600), l1 + l2, 10**15, 3000)
+    assert pool.quote_exact_input(TOKEN1, 10**15) == small_out
+
+    # Trade que sai da janela em cache não é cotado (evita preço errado)
+    assert pool.quote_exact_input(TOKEN0, 10**24) is None
+    print(f"{Fore.GREEN}✅ Travessia de ticks: OK{Style.RESET_ALL}")
+
+
+def test_quoter_best_tier_and_swap_events():
+    """Melhor fee tier e atualização de slot0 por evento Swap"""
+    print(f"{Fore.CYAN}🧪 Testando fee tiers e eventos Swap...{Style.RESET_ALL}")
+
+    quoter = V3Quoter()
+    for fee, address in [(500, POOL), (3000, "0x3333333333333333333333333333333333333333")]:
+        state = quoter.add_pool(address, TOKEN0, TOKEN1, fee)
+        template = _pool(fee)
+        state.sqrt_price_x96, state.tick, state.liquidity = template.sqrt_price_x96, template.tick, template.liquidity
+        state.ticks, state.initialized_ticks, state.word_range = template.ticks, template.initialized_ticks, (-30, 30)
+
+    best = quoter.quote(TOKEN0, TOKEN1, 10**15)
+    assert best.fee == 500  # Mesma liquidez, fee menor
+
+    new_sqrt = get_sqrt_ratio_at_tick(-60)
+    data = b''.join(value.to_bytes(32, 'big', signed=True) for value in [10**15, -10**15, new_sqrt, 6 * 10**18, -60])
+    log = AttributeDict({'address': POOL, 'topics': [HexBytes(SWAP_TOPIC)], 'data': HexBytes(data),
+                         'blockNumber': 10, 'logIndex': 1})
+    assert quoter.apply_log(log)
+    assert quoter.pools[POOL.lower()].tick == -60
+    assert quoter.pools[POOL.lower()].sqrt_price_x96 == new_sqrt
+    assert not quoter.apply_log(log)  # Evento já aplicado
+    print(f"{Fore.GREEN}✅ Fee tiers e Swap: OK{Style.RESET_ALL}")
+
+
+def test_bounded_cache_and_chunked_logs():
+    """Cache limitado (LRU, posições ficam; par despejado deixa de estar aquecido) e filtro em blocos"""
+    print(f"{Fore.CYAN}🧪 Testando cache limitado...{Style.RESET_ALL}")
+
+    quoter = V3Quoter(max_pools=2)
+    quoter.pin(TOKEN0)
+    quoter.add_pool(POOL, TOKEN0, TOKEN1, 3000)
+    others = ['0x' + f'{i:040x}' for i in range(1, 4)]
+    quoter.add_pool(others[0], others[0], TOKEN1, 500)
+    quoter._warm_pairs.add(quoter._pair_key(others[0], TOKEN1))
+    quoter.add_pool(others[1], others[1], TOKEN1, 500)
+    assert set(quoter.pools) == {POOL.lower(), others[1]} and quoter.evictions == 1
+    assert not quoter.is_warm(others[0], TOKEN1) and quoter.quote(others[0], TOKEN1, 10**18) is None
+
+    quoter.unpin(TOKEN0)
+    quoter.add_pool(others[2], others[2], TOKEN1, 500)
+    assert POOL.lower() not in quoter.pools
+
+    web3 = Mock()
+    web3.eth.get_logs = AsyncMock(return_value=[])
+    with patch('pool_pricing.GET_LOGS_ADDRESS_CHUNK', 1):
+        asyncio.run(quoter.sync_from_logs(web3, 10, 10))
+    assert [len(call.args[0]['address']) for call in web3.eth.get_logs.call_args_list] == [1, 1]
+    print(f"{Fore.GREEN}✅ Cache limitado: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO COTADOR LOCAL UNISWAP V3{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_tick_math()
+    test_swap_step_matches_reference()
+    test_quote_crosses_initialized_ticks()
+    test_quoter_best_tier_and_swap_events()
+    test_bounded_cache_and_chunked_logs()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Cotações V3 locais e exatas!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Teste do cache de verificações por template (immutables e metadados mascarados, honeypots por template)
+"""
+
+import asyncio
+from colorama import Fore, Style, init
+
+from bytecode_selectors import normalize_bytecode, opcode_skeleton, strip_metadata
+from verdict_cache import SecurityVerdictCache
+
+# Inicializar colorama
+init(autoreset=True)
+
+
+def _metadata(seed: int) -> bytes:
+    """CBOR {"ipfs": <34 bytes>, "solc": <3 bytes>} + tamanho em 2 bytes, como o solc anexa"""
+    cbor = bytes([0xa2, 0x64]) + b'ipfs' + bytes([0x58, 0x22]) + bytes([seed]) * 34 + bytes([0x64]) + b'solc' \
+        + bytes([0x43, 0x00, 0x08, 0x13])
+    return cbor + len(cbor).to_bytes(2, 'big')
+
+
+def _token(owner: int, supply: int, max_tx: int = 0x64, seed: int = 1) -> bytes:
+    """PUSH20 owner, PUSH32 supply (immutable), PUSH1 limite, lógica fixa e metadados"""
+    return (bytes([0x73]) + bytes([owner]) * 20 + bytes([0x7f]) + supply.to_bytes(32, 'big')
+            + bytes([0x60, max_tx, 0x55, 0x60, 0x00, 0x35, 0x14, 0x00, 0xfe]) + _metadata(seed))
+
+
+def _checks():
+    return {'contract': True, 'dangerous_functions': ['mint']}
+
+
+def _verdict(score: int, honeypot: bool = False):
+    return {'score': score, 'issues': [], 'warnings': [], 'is_safe': score >= 40,
+            'details': {'is_honeypot': honeypot}}
+
+
+def test_normalization():
+    """Clones com outros immutables/metadados normalizam igual; constantes pequenas mudam só o hash"""
+    print(f"{Fore.CYAN}🧪 Testando normalização...{Style.RESET_ALL}")
+
+    a, b = _token(0x11, 10**27, seed=1), _token(0x22, 10**24, seed=2)
+    assert a != b and normalize_bytecode(a) == normalize_bytecode(b)
+    assert strip_metadata(a) == a[:-len(_metadata(1))]
+    assert strip_metadata(b'\x60\x00') == b'\x60\x00'  # Sem metadados: inalterado
+
+    # Limite diferente (PUSH1): outro template, mesma família
+    c = _token(0x11, 10**27, max_tx=0x32)
+    assert normalize_bytecode(a) != normalize_bytecode(c)
+    assert opcode_skeleton(a) == opcode_skeleton(c)
+    assert opcode_skeleton(a) == bytes([0x73, 0x7f, 0x60, 0x55, 0x60, 0x35, 0x14, 0x00, 0xfe])
+    print(f"{Fore.GREEN}✅ Normalização: OK{Style.RESET_ALL}")
+
+
+def test_clone_reuses_code_checks_only():
+    """Clones reaproveitam as verificações de bytecode; estado/honeypot são analisados em cada token"""
+    print(f"{Fore.CYAN}🧪 Testando cache de verificações...{Style.RESET_ALL}")
+
+    cache = SecurityVerdictCache()
+    code_analyses, token_analyses = [], []
+
+    def analyze_code():
+        code_analyses.append(1)
+        return _checks()
+
+    def analyze_token(token):
+        async def analyze(checks):
+            token_analyses.append(token)
+            await asyncio.sleep(0.01)
+            checks['dangerous_functions'].append('alterado')  # Cópia: não corrompe o cache
+            return _verdict(75 if token != '0xB2' else 10)
+        return analyze
+
+    async def run():
+        first = await cache.resolve('0x01', _token(0x11, 10**27, seed=1), '0xA', analyze_code, analyze_token('0xA'))
+        burst = await asyncio.gather(*(
+            cache.resolve(f'0x1{i}', _token(0x30 + i, 10**20 + i, seed=i), f'0xB{i}', analyze_code,
+                          analyze_token(f'0xB{i}')) for i in range(5)
+        ))
+        return first, burst
+
+    first, burst = asyncio.run(run())
+    assert len(code_analyses) == 1 and len(token_analyses) == 6
+    assert first['details']['clone_family']['source'] == 'analysis'
+    assert all(answer['details']['clone_family']['source'] == 'cache' for answer in burst)
+    assert burst[2]['score'] == 10 and burst[3]['score'] == 75  # Veredito é de cada token
+    assert burst[-1]['details']['clone_family']['members'] == 6
+    assert cache.get('0x01', b'') == _checks()
+    assert cache.hits == 5 and cache.misses == 1
+    print(f"{Fore.GREEN}✅ Cache de verificações: OK{Style.RESET_ALL}")
+
+
+def test_template_flagging_and_errors():
+    """Template bloqueado só após honeypots em tokens distintos; família não é bloqueada; erros e TTL"""
+    print(f"{Fore.CYAN}🧪 Testando templates bloqueados...{Style.RESET_ALL}")
+
+    cache = SecurityVerdictCache(confirmations=2)
+
+    async def honeypot(checks):
+        return _verdict(20, honeypot=True)
+
+    async def clean(checks):
+        return _verdict(90)
+
+    async def failing(checks):
+        raise ConnectionError("rpc caiu")
+
+    template = lambda owner: _token(owner, 10**27)
+    asyncio.run(cache.resolve('0x01', template(0x11), '0xA', _checks, honeypot))
+    asyncio.run(cache.resolve('0x01', template(0x11), '0xA', _checks, honeypot))  # Mesmo token: uma confirmação
+    sibling = asyncio.run(cache.resolve('0x02', template(0x22), '0xB', _checks, clean))
+    assert sibling['is_safe'] and cache.flagged('0x02', b'') is None
+
+    asyncio.run(cache.resolve('0x03', template(0x33), '0xC', _checks, honeypot))
+    blocked = asyncio.run(cache.resolve('0x04', template(0x44), '0xD', _checks, failing))
+    assert blocked['is_safe'] is False and 'template malicioso' in blocked['issues'][0]
+    assert blocked['details']['clone_family']['source'] == 'template' and cache.template_blocks == 1
+
+    # Mesma família (esqueleto), outro template: analisado normalmente
+    variant = asyncio.run(cache.resolve('0x05', _token(0x11, 10**27, max_tx=0x32), '0xE', _checks, clean))
+    assert variant['is_safe'] and variant['details']['clone_family']['templates'] == 2
+
+    other = SecurityVerdictCache(ttl=-1)
+    try:
+        asyncio.run(other.resolve('0x06', template(0x11), '0xF', _checks, failing))
+        raise AssertionError("erro deveria propagar")
+    except ConnectionError:
+        pass
+    assert other.get('0x06', b'') is None  # TTL negativo: expirado na hora
+    print(f"{Fore.GREEN}✅ Templates bloqueados: OK{Style.RESET_ALL}")
+
+
+def main():
+    """Executa todos os testes"""
+    print(f"{Fore.YELLOW}🚀 TESTE DO CACHE DE VEREDITOS{Style.RESET_ALL}")
+    print("=" * 60)
+
+    test_normalization()
+    test_clone_reuses_code_checks_only()
+    test_template_flagging_and_errors()
+
+    print("=" * 60)
+    print(f"{Fore.GREEN}🎉 Cache de vereditos funcionando!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
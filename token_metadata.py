@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Metadados imutáveis de tokens persistidos em SQLite
+name/symbol/decimals e bytecode lidos uma única vez por endereço e compartilhados por todos os módulos
+"""
+
+import asyncio
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Optional
+from eth_abi import decode
+from web3 import Web3, AsyncWeb3
+
+from config import TOKEN_METADATA_DB
+from multicall import Multicall3
+from rpc_cache import RPC_CACHE
+
+# Seletores ERC20 (sem argumentos)
+NAME_SELECTOR = bytes.fromhex('06fdde03')
+SYMBOL_SELECTOR = bytes.fromhex('95d89b41')
+DECIMALS_SELECTOR = bytes.fromhex('313ce567')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    address TEXT PRIMARY KEY,
+    name TEXT,
+    symbol TEXT,
+    decimals INTEGER,
+    code_hash TEXT NOT NULL,
+    code_size INTEGER NOT NULL,
+    first_seen_block INTEGER
+);
+CREATE TABLE IF NOT EXISTS bytecode (
+    code_hash TEXT PRIMARY KEY,
+    code BLOB NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class TokenMetadata:
+    """Dados que não mudam depois do deploy (None = função ausente ou revertida)"""
+    address: str
+    name: Optional[str]
+    symbol: Optional[str]
+    decimals: Optional[int]
+    code_hash: str
+    code_size: int
+    first_seen_block: Optional[int] = None
+
+    @property
+    def is_contract(self) -> bool:
+        return self.code_size > 0
+
+
+def decode_string(data: bytes) -> Optional[str]:
+    """Decodifica retorno de name()/symbol(): string ABI ou bytes32 (tokens antigos)"""
+    if not data:
+        return None
+    try:
+        return decode(['string'], data)[0]
+    except Exception:
+        if len(data) == 32:
+            return data.rstrip(b'\x00').decode('utf-8', errors='ignore') or None
+        return None
+
+
+def decode_decimals(data: bytes) -> Optional[int]:
+    if len(data) < 32:
+        return None
+    value = int.from_bytes(data[:32], 'big')
+    return value if value <= 255 else None
+
+
+class TokenMetadataStore:
+    """Store de metadados: memória + SQLite, carregado por completo na inicialização"""
+
+    def __init__(self):
+        self.tokens: Dict[str, TokenMetadata] = {}
+        self._code: Dict[str, bytes] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._db: Optional[sqlite3.Connection] = None
+
+        # Estatísticas
+        self.hits = 0
+        self.misses = 0
+
+    def open(self, path: str = TOKEN_METADATA_DB) -> int:
+        """Abre (ou cria) o banco e carrega todos os tokens conhecidos em memória"""
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+        rows = self._db.execute(
+            "SELECT address, name, symbol, decimals, code_hash, code_size, first_seen_block FROM tokens"
+        ).fetchall()
+        for row in rows:
+            self.tokens[row[0]] = TokenMetadata(*row)
+        return len(rows)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def get(self, address: str) -> Optional[TokenMetadata]:
+        """Consulta local (sem RPC)"""
+        return self.tokens.get(address.lower())
+
+    def get_code(self, code_hash: str) -> Optional[bytes]:
+        """Bytecode pelo hash (clones compartilham a mesma entrada)"""
+        code = self._code.get(code_hash)
+        if code is None and self._db is not None:
+            row = self._db.execute("SELECT code FROM bytecode WHERE code_hash = ?", (code_hash,)).fetchone()
+            if row:
+                code = self._code[code_hash] = bytes(row[0])
+        return code
+
+    def _save(self, meta: TokenMetadata, code: bytes):
+        self.tokens[meta.address.lower()] = meta
+        self._code[meta.code_hash] = code
+
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR IGNORE INTO tokens VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (meta.address.lower(), meta.name, meta.symbol, meta.decimals,
+                 meta.code_hash, meta.code_size, meta.first_seen_block)
+            )
+            self._db.execute("INSERT OR IGNORE INTO bytecode VALUES (?, ?)", (meta.code_hash, code))
+            self._db.commit()
+
+    async def _load(self, web3: AsyncWeb3, address: str, block_number: Optional[int]) -> TokenMetadata:
+        """name/symbol/decimals em um aggregate3 e get_code em paralelo"""
+        calls = [(address, NAME_SELECTOR), (address, SYMBOL_SELECTOR), (address, DECIMALS_SELECTOR)]
+        results, code = await asyncio.gather(
+            Multicall3(web3).aggregate3(calls),
+            web3.eth.get_code(Web3.to_checksum_address(address))
+        )
+        (name_ok, name), (symbol_ok, symbol), (decimals_ok, decimals) = results
+        code = bytes(code)
+
+        meta = TokenMetadata(
+            address=Web3.to_checksum_address(address),
+            name=decode_string(name) if name_ok else None,
+            symbol=decode_string(symbol) if symbol_ok else None,
+            decimals=decode_decimals(decimals) if decimals_ok else None,
+            code_hash=Web3.keccak(code).hex(),
+            code_size=len(code),
+            first_seen_block=block_number if block_number is not None else RPC_CACHE.head
+        )
+
+        # Endereço sem código ainda pode receber um deploy (CREATE2): não memorizar
+        if meta.is_contract:
+            self._save(meta, code)
+        return meta
+
+    async def fetch(self, web3: AsyncWeb3, address: str, block_number: Optional[int] = None) -> TokenMetadata:
+        """Metadados do token: hit local ou leitura única no RPC (requisições concorrentes compartilhadas)"""
+        key = address.lower()
+        meta = self.tokens.get(key)
+        if meta is not None:
+            self.hits += 1
+            return meta
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            meta = await self._load(web3, address, block_number)
+            future.set_result(meta)
+            return meta
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Evita aviso de exceção não consumida
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def get_decimals(self, web3: AsyncWeb3, address: str, default: int = 18) -> int:
+        meta = await self.fetch(web3, address)
+        return meta.decimals if meta.decimals is not None else default
+
+    async def get_bytecode(self, web3: AsyncWeb3, address: str) -> bytes:
+        meta = await self.fetch(web3, address)
+        return self.get_code(meta.code_hash) or b''
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'tokens': len(self.tokens),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total * 100) if total else 0.0
+        }
+
+
+# Instância global compartilhada (aberta em SniperBot.initialize)
+TOKEN_METADATA = TokenMetadataStore()
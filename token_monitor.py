@@ -1,19 +1,58 @@
 import asyncio
-import websockets
 import json
 import time
 import random
 from typing import Dict, List, Optional, Callable
-from web3 import Web3
+from web3 import AsyncWeb3
 from config import *
+from log_stream import LogStream
+from event_decoders import POOL_CREATED_DECODERS, PoolCreated, decode_pool_created
+from pool_pricing import POOL_PRICER
+from v3_quoter import V3_QUOTER, FEE_TIER_SPACING
+from rpc_cache import RPC_CACHE
+from token_metadata import TOKEN_METADATA
+from tx_tracker import TX_TRACKER
+from fee_oracle import FEE_ORACLE
+from mev_watcher import MEV_WATCHER
+from rate_limiter import BASE_RPC_LIMITER, RateLimitPreempted, rpc_lane, LANE_ANALYSIS, LANE_DISCOVERY
+
+# Topics de criação de pares/pools (derivados do registro de decodificadores)
+PAIR_CREATED_TOPICS = sorted({topic for _, topic in POOL_CREATED_DECODERS})
+
+# Endereços das factories das DEXs
+FACTORY_ADDRESSES = [
+    UNISWAP_V3_FACTORY,
+    AERODROME_FACTORY,
+    BASESWAP_FACTORY
+]
+
+# Filtro único: qualquer factory (OR) x qualquer topic de criação (OR) em uma só chamada
+PAIR_CREATED_FILTER = {
+    'address': FACTORY_ADDRESSES,
+    'topics': [PAIR_CREATED_TOPICS]
+}
+
+# Quantidade de logs lembrados para evitar processar o mesmo par duas vezes (stream + backfill)
+SEEN_LOGS_LIMIT = 10000
 
 class TokenMonitor:
-    def __init__(self, web3: Web3, callback: Callable):
+    def __init__(self, web3: AsyncWeb3, callback: Callable):
         self.web3 = web3
         self.callback = callback
         self.monitored_tokens = {}
         self.running = False
         
+        # Análises de tokens rodam em paralelo (limitadas por semáforo)
+        self._analysis_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+        self._analysis_tasks = set()
+        
+        # Modo streaming (WebSocket)
+        self._log_stream = None
+        self._last_block = None
+        self._stream_tasks = set()
+        self._seen_logs = set()
+        self._transfer_scan = None  # Scan de transfers em andamento (no máximo um por vez)
+        
     def add_token(self, token_address: str, token_symbol: str = None):
         """Adiciona token para monitoramento"""
         self.monitored_tokens[token_address.lower()] = {
@@ -37,11 +76,20 @@ class TokenMonitor:
         """Monitora TODOS os novos tokens sendo criados - MODO AGRESSIVO"""
         print("🚀 Iniciando monitoramento AGRESSIVO de TODOS os tokens...")
         
-        last_block = self.web3.eth.block_number
+        if BASE_WS_URL:
+            await self._monitor_via_websocket()
+            return
+        
+        last_block = await self.web3.eth.block_number
         
         while self.running:
             try:
-                current_block = self.web3.eth.block_number
+                # Provedor em backoff de 429: scans cedem a vez para compras/vendas
+                if BASE_RPC_LIMITER.should_yield():
+                    await asyncio.sleep(1)
+                    continue
+                
+                current_block = await self.web3.eth.block_number
                 
                 if current_block > last_block:
                     # Escanear múltiplos blocos de uma vez para não perder nada
@@ -53,77 +101,184 @@ class TokenMonitor:
                 
                 await asyncio.sleep(1)  # Mais rápido - verificar a cada 1 segundo
                 
+            except RateLimitPreempted:
+                await asyncio.sleep(1)  # last_block mantido: a mesma faixa é escaneada de novo
             except Exception as e:
                 print(f"❌ Erro no monitoramento: {str(e)}")
                 await asyncio.sleep(10)  # Esperar mais tempo em caso de erro
     
+    async def _monitor_via_websocket(self):
+        """Monitora pares via eth_subscribe (logs + newHeads) sem polling"""
+        print("⚡ Modo streaming: assinando PairCreated e newHeads via WebSocket...")
+        
+        self._last_block = await self.web3.eth.block_number
+        self._log_stream = LogStream(
+            BASE_WS_URL,
+            PAIR_CREATED_FILTER,
+            on_log=self._on_stream_log,
+            on_head=self._on_stream_head,
+            on_connect=self._backfill_gap
+        )
+        await self._log_stream.run()
+    
+    async def _on_stream_log(self, log):
+        """Log de criação de par recebido pelo WebSocket"""
+        self._spawn_stream_task(self._dispatch_pair_event(log))
+    
+    async def _on_stream_head(self, head):
+        """Novo bloco recebido pelo WebSocket"""
+        if not self.running:
+            self._log_stream.running = False
+            return
+        
+        self._last_block = max(self._last_block or 0, head['number'])
+        RPC_CACHE.on_new_head(head['number'], head['hash'], head['parentHash'])
+        TX_TRACKER.notify_head(head['number'])
+        FEE_ORACLE.on_new_head(head['number'], head.get('baseFeePerGas'), head.get('gasUsed'), head.get('gasLimit'))
+        MEV_WATCHER.on_new_head(head['number'])
+        
+        # Reservas dos pools no bloco recém-chegado (preço das posições, nunca descartado)
+        self._spawn_stream_task(self._sync_pool_reserves(head['number'], head['number']))
+        
+        # Método alternativo de detecção (transfers): cede a vez durante backoff de 429 e, com
+        # um scan ainda esperando créditos ou rodando, o bloco é pulado (sem fila crescente atrás do head)
+        if not BASE_RPC_LIMITER.should_yield() and (self._transfer_scan is None or self._transfer_scan.done()):
+            self._transfer_scan = self._spawn_stream_task(self._scan_token_transfers(head['number'], head['number']))
+    
+    async def _backfill_gap(self):
+        """Após (re)conectar, busca via get_logs os blocos perdidos desde o último visto"""
+        current_block = await self.web3.eth.block_number
+        
+        if self._last_block is not None and current_block > self._last_block:
+            print(f"🔄 Backfill de blocos {self._last_block + 1} a {current_block}...")
+            while True:
+                try:
+                    await self._scan_blocks_for_new_pairs(self._last_block + 1, current_block)
+                    break
+                except RateLimitPreempted:
+                    await asyncio.sleep(1)  # Backoff de 429: a mesma faixa é repetida antes de ler o stream
+        
+        self._last_block = max(self._last_block or 0, current_block)
+    
+    def _spawn_stream_task(self, coro) -> asyncio.Task:
+        """Processa notificação em background para não atrasar a leitura do WebSocket"""
+        task = asyncio.create_task(coro)
+        self._stream_tasks.add(task)
+        task.add_done_callback(self._stream_tasks.discard)
+        return task
+    
+    def _is_duplicate_log(self, log) -> bool:
+        """Evita processar o mesmo log duas vezes (stream e backfill podem se sobrepor)"""
+        tx_hash = log.get('transactionHash')
+        if tx_hash is None:
+            return False
+        
+        key = (bytes(tx_hash), log.get('logIndex'))
+        if key in self._seen_logs:
+            return True
+        
+        if len(self._seen_logs) >= SEEN_LOGS_LIMIT:
+            self._seen_logs.clear()
+        self._seen_logs.add(key)
+        return False
+    
     async def _scan_blocks_for_new_pairs(self, from_block: int, to_block: int):
-        """Escaneia blocos em busca de novos pares"""
+        """Escaneia blocos em busca de novos pares (RateLimitPreempted propaga: faixa deve ser repetida)"""
         try:
             # Escanear logs de eventos reais para novos pares
             print(f"🔍 Escaneando blocos {from_block} a {to_block}...")
             
             # Buscar eventos de criação de pares
             await self._scan_pair_created_events(from_block, to_block)
+            
+            # Atualizar reservas dos pools conhecidos (preço local)
+            await self._sync_pool_reserves(from_block, to_block)
                 
+        except RateLimitPreempted:
+            raise
         except Exception as e:
             print(f"❌ Erro ao escanear blocos: {str(e)}")
     
+    async def _sync_pool_reserves(self, from_block: int, to_block: int):
+        """Aplica eventos Sync (V2) e Swap/Mint/Burn (V3) dos pools conhecidos nos cotadores locais"""
+        results = await asyncio.gather(
+            POOL_PRICER.sync_from_logs(self.web3, from_block, to_block),
+            V3_QUOTER.sync_from_logs(self.web3, from_block, to_block),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"⚠️ Erro ao sincronizar estado dos pools: {str(result)}")
+    
     async def _scan_pair_created_events(self, from_block: int, to_block: int):
-        """Escaneia eventos reais de criação de pares com múltiplos topics"""
+        """Escaneia eventos de criação de pares com um único get_logs por faixa de blocos"""
         try:
-            # Topics para diferentes tipos de eventos de criação de pares
-            pair_created_topics = [
-                '0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9',  # PairCreated padrão
-                '0x783cca1c0412dd0d695e784568c96da2e9c22ff989357a2e8b1d9b2b4e6b7118',  # Uniswap V3 PoolCreated
-                '0x91ccaa7a278130b65168c3a0c8d3bcae84cf5e43704342bd3ec0b59e59c036db',  # Aerodrome PairCreated
-                '0x8b73c3c69bb8fe3d512ecc4cf759cc79239f7b179b0ffacaa9a75d522b39400f'   # BaseSwap PairCreated
-            ]
-            
-            # Endereços das factories das DEXs
-            factory_addresses = [
-                UNISWAP_V3_FACTORY,
-                AERODROME_FACTORY, 
-                BASESWAP_FACTORY
-            ]
-            
-            # Escanear cada factory com cada topic
-            for factory in factory_addresses:
-                for topic in pair_created_topics:
-                    try:
-                        # Buscar logs de PairCreated
-                        logs = self.web3.eth.get_logs({
-                            'fromBlock': from_block,
-                            'toBlock': to_block,
-                            'address': factory,
-                            'topics': [topic]
-                        })
-                        
-                        for log in logs:
-                            await self._process_pair_created_log(log)
-                            
-                    except Exception as e:
-                        # Continuar mesmo se uma factory/topic falhar
-                        continue
+            # Todas as factories e topics no mesmo filtro, em faixas de GET_LOGS_BLOCK_RANGE blocos
+            for chunk_start in range(from_block, to_block + 1, GET_LOGS_BLOCK_RANGE):
+                chunk_end = min(chunk_start + GET_LOGS_BLOCK_RANGE - 1, to_block)
+                
+                for log in await self._get_pair_created_logs(chunk_start, chunk_end):
+                    await self._dispatch_pair_event(log)
             
             # Também escanear transfers de tokens novos (método alternativo)
             await self._scan_token_transfers(from_block, to_block)
                     
+        except RateLimitPreempted:
+            print(f"⏸️ Scan de pares adiado (RPC em backoff): blocos {from_block} a {to_block}")
+            raise
         except Exception as e:
             print(f"❌ Erro ao escanear eventos: {str(e)}")
     
+    async def _get_pair_created_logs(self, from_block: int, to_block: int) -> List:
+        """
+        get_logs combinado (créditos na faixa de descoberta); se o RPC recusar a faixa
+        (limite de resultados), divide ao meio
+        """
+        log_filter = {
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            **PAIR_CREATED_FILTER
+        }
+        await BASE_RPC_LIMITER.acquire('eth_getLogs', lane=LANE_DISCOVERY, params=[log_filter])
+        try:
+            return await self.web3.eth.get_logs(log_filter)
+        except Exception as e:
+            if to_block > from_block:
+                middle = (from_block + to_block) // 2
+                print(f"⚠️ get_logs {from_block}-{to_block} falhou ({str(e)[:60]}), dividindo faixa...")
+                return (await self._get_pair_created_logs(from_block, middle) +
+                        await self._get_pair_created_logs(middle + 1, to_block))
+            
+            print(f"❌ Erro no get_logs do bloco {from_block}: {str(e)}")
+            return []
+    
+    async def _dispatch_pair_event(self, log):
+        """Decodifica o log com o decodificador de (factory, assinatura do evento) e processa o pool"""
+        try:
+            if self._is_duplicate_log(log):
+                return
+            
+            pool = decode_pool_created(log)
+            if pool:
+                await self._process_pool_created(pool)
+                
+        except Exception as e:
+            print(f"❌ Erro ao decodificar log de criação de pool: {str(e)}")
+    
     async def _scan_token_transfers(self, from_block: int, to_block: int):
         """Escaneia transfers de tokens para detectar novos tokens"""
         try:
             # Topic para Transfer (método alternativo de detecção)
             transfer_topic = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
             
-            # Buscar transfers recentes
-            logs = self.web3.eth.get_logs({
+            # Buscar transfers recentes (créditos na faixa de descoberta)
+            log_filter = {
                 'fromBlock': from_block,
                 'toBlock': to_block,
                 'topics': [transfer_topic]
-            })
+            }
+            await BASE_RPC_LIMITER.acquire('eth_getLogs', lane=LANE_DISCOVERY, params=[log_filter])
+            logs = await self.web3.eth.get_logs(log_filter)
             
             # Processar apenas uma amostra para não sobrecarregar
             sample_logs = logs[:10] if len(logs) > 10 else logs
@@ -136,13 +291,30 @@ class TokenMonitor:
                         token_info = await self._get_token_info(token_address)
                         if token_info:
                             print(f"🔍 Token detectado via Transfer: {token_info['symbol']} ({token_address})")
-                            await self.callback(token_address, token_info, "MEDIUM")
+                            self._dispatch_token(token_address, token_info, "MEDIUM")
                 except Exception:
                     continue
                     
+        except RateLimitPreempted:
+            pass  # RPC em backoff: método alternativo fica para o próximo bloco
         except Exception as e:
             print(f"❌ Erro ao escanear transfers: {str(e)}")
     
+    def _dispatch_token(self, token_address: str, token_info: Dict, priority: str):
+        """Agenda análise do token sem bloquear o scan (vários tokens analisados em paralelo)"""
+        task = asyncio.create_task(self._run_callback(token_address, token_info, priority))
+        self._analysis_tasks.add(task)
+        task.add_done_callback(self._analysis_tasks.discard)
+    
+    async def _run_callback(self, token_address: str, token_info: Dict, priority: str):
+        """Executa o callback de análise respeitando o limite de concorrência"""
+        async with self._analysis_semaphore:
+            try:
+                with rpc_lane(LANE_ANALYSIS):  # Scans rodam na faixa de descoberta; análise tem prioridade maior
+                    await self.callback(token_address, token_info, priority)
+            except Exception as e:
+                print(f"❌ Erro na análise do token {token_address}: {e}")
+    
     async def _is_valid_new_token(self, token_address: str) -> bool:
         """Verifica se é um token novo e válido"""
         try:
@@ -155,9 +327,9 @@ class TokenMonitor:
             if token_address.lower() in known_tokens:
                 return False
             
-            # Verificar se é um contrato válido
-            code = self.web3.eth.get_code(token_address)
-            if len(code) < 100:  # Contrato muito pequeno
+            # Verificar se é um contrato válido (bytecode registrado no store de metadados)
+            metadata = await TOKEN_METADATA.fetch(self.web3, token_address)
+            if metadata.code_size < 100:  # Contrato muito pequeno
                 return False
             
             # Marcar como processado
@@ -170,46 +342,52 @@ class TokenMonitor:
         except Exception:
             return False
     
-    async def _process_pair_created_log(self, log):
-        """Processa log de par criado - DETECTA TODOS OS PARES"""
+    async def _process_pool_created(self, pool: PoolCreated):
+        """Processa pool criado - DETECTA TODOS OS PARES"""
         try:
-            # Extrair endereços dos tokens do log
-            if len(log['topics']) >= 3:
-                token0_raw = '0x' + log['topics'][1].hex()[26:]
-                token1_raw = '0x' + log['topics'][2].hex()[26:]
-                
-                # Converter para checksum address
-                token0 = self.web3.to_checksum_address(token0_raw)
-                token1 = self.web3.to_checksum_address(token1_raw)
-                
-                # MODO AGRESSIVO: Detectar TODOS os pares, não apenas WETH
-                tokens_to_analyze = []
-                
-                # Verificar se um dos tokens é WETH (prioridade alta)
-                if token0.lower() == WETH_ADDRESS.lower():
-                    tokens_to_analyze.append(('HIGH', token1))
-                elif token1.lower() == WETH_ADDRESS.lower():
-                    tokens_to_analyze.append(('HIGH', token0))
-                else:
-                    # Mesmo sem WETH, analisar ambos os tokens (prioridade média)
-                    tokens_to_analyze.append(('MEDIUM', token0))
-                    tokens_to_analyze.append(('MEDIUM', token1))
-                
-                # Processar todos os tokens detectados
-                for priority, token_address in tokens_to_analyze:
-                    try:
-                        # Obter informações do token
-                        token_info = await self._get_token_info(token_address)
-                        if token_info:
-                            priority_emoji = "🚀" if priority == "HIGH" else "📊"
-                            print(f"{priority_emoji} Novo par detectado [{priority}]: {token_info['symbol']} ({token_address})")
-                            await self.callback(token_address, token_info, priority)
-                    except Exception as e:
-                        print(f"❌ Erro ao processar token {token_address}: {e}")
-                        continue
-                        
+            token0 = pool.token0
+            token1 = pool.token1
+            
+            # Registrar o pool nos cotadores locais (estado inicial + eventos)
+            try:
+                if POOL_PRICER.supports(pool):
+                    await POOL_PRICER.load_pool(self.web3, pool)
+                elif pool.dex == 'uniswap_v3' and pool.fee in FEE_TIER_SPACING:
+                    state = V3_QUOTER.add_pool(pool.pool, pool.token0, pool.token1, pool.fee)
+                    await V3_QUOTER.load_pools(self.web3, [state])
+            except Exception as e:
+                print(f"⚠️ Erro ao carregar estado do pool {pool.pool}: {e}")
+            
+            # MODO AGRESSIVO: Detectar TODOS os pares, não apenas WETH
+            tokens_to_analyze = []
+            
+            # Verificar se um dos tokens é WETH (prioridade alta)
+            if token0.lower() == WETH_ADDRESS.lower():
+                tokens_to_analyze.append(('HIGH', token1))
+            elif token1.lower() == WETH_ADDRESS.lower():
+                tokens_to_analyze.append(('HIGH', token0))
+            else:
+                # Mesmo sem WETH, analisar ambos os tokens (prioridade média)
+                tokens_to_analyze.append(('MEDIUM', token0))
+                tokens_to_analyze.append(('MEDIUM', token1))
+            
+            # Processar todos os tokens detectados
+            for priority, token_address in tokens_to_analyze:
+                try:
+                    # Obter informações do token
+                    token_info = await self._get_token_info(token_address)
+                    if token_info:
+                        # Pool de origem (DEX, endereço, fee/stable) para leitura direta de estado
+                        token_info['pool'] = pool
+                        priority_emoji = "🚀" if priority == "HIGH" else "📊"
+                        print(f"{priority_emoji} Novo par detectado [{priority}]: {token_info['symbol']} ({token_address}) pool {pool.pool} na {pool.dex}")
+                        self._dispatch_token(token_address, token_info, priority)
+                except Exception as e:
+                    print(f"❌ Erro ao processar token {token_address}: {e}")
+                    continue
+                    
         except Exception as e:
-            print(f"❌ Erro ao processar log: {str(e)}")
+            print(f"❌ Erro ao processar pool: {str(e)}")
     
     async def _simulate_new_token_detection(self):
         """Simula detecção de novo token (apenas para demonstração)"""
@@ -263,30 +441,27 @@ class TokenMonitor:
         try:
             # ABI básica para verificar token ERC20
             erc20_abi = [
-                {"constant": True, "inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
                 {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}
             ]
             
             contract = self.web3.eth.contract(address=token_address, abi=erc20_abi)
+            metadata = await TOKEN_METADATA.fetch(self.web3, token_address)
             
             # Verificações MUITO básicas - apenas se responde às funções ERC20
             try:
-                symbol = contract.functions.symbol().call()
-                decimals = contract.functions.decimals().call()
-                total_supply = contract.functions.totalSupply().call()
-                
-                # Filtros mínimos - muito permissivos
-                if decimals > 0 and total_supply > 0:
-                    return True
+                if metadata.symbol is not None and metadata.decimals:
+                    total_supply = await contract.functions.totalSupply().call()
+                    
+                    # Filtros mínimos - muito permissivos
+                    if total_supply > 0:
+                        return True
                     
             except:
                 # Se falhar, tenta métodos alternativos
                 pass
             
             # Método alternativo - verifica se tem código no endereço
-            code = self.web3.eth.get_code(token_address)
-            if len(code) > 2:  # Tem código (não é EOA)
+            if metadata.code_size > 2:  # Tem código (não é EOA)
                 print(f"✅ Token aceito (método alternativo): {token_address}")
                 return True
             
@@ -310,34 +485,27 @@ class TokenMonitor:
         
         try:
             erc20_abi = [
-                {"constant": True, "inputs": [], "name": "name", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-                {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
                 {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}
             ]
             
             contract = self.web3.eth.contract(address=token_address, abi=erc20_abi)
             
-            # Tenta obter cada informação individualmente
-            try:
-                token_info['name'] = contract.functions.name().call()
-            except:
-                pass
-                
-            try:
-                token_info['symbol'] = contract.functions.symbol().call()
-            except:
-                pass
-                
-            try:
-                token_info['decimals'] = contract.functions.decimals().call()
-            except:
-                pass
-                
-            try:
-                token_info['total_supply'] = contract.functions.totalSupply().call()
-            except:
-                pass
+            # Campos imutáveis do store de metadados; só totalSupply é lido a cada vez
+            metadata, total_supply = await asyncio.gather(
+                TOKEN_METADATA.fetch(self.web3, token_address),
+                contract.functions.totalSupply().call(),
+                return_exceptions=True
+            )
+            
+            if not isinstance(metadata, Exception):
+                for field in ['name', 'symbol', 'decimals']:
+                    value = getattr(metadata, field)
+                    if value is not None:
+                        token_info[field] = value
+                token_info['code_hash'] = metadata.code_hash
+            
+            if not isinstance(total_supply, Exception):
+                token_info['total_supply'] = total_supply
             
             return token_info
             
@@ -428,6 +596,8 @@ class TokenMonitor:
     def stop_monitoring(self):
         """Para o monitoramento"""
         self.running = False
+        if self._log_stream:
+            self._log_stream.running = False
         print("⏹️ Monitor de tokens parado!")
     
     def get_monitored_tokens(self) -> Dict:
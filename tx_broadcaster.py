@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Broadcast de transações assinadas para vários endpoints em paralelo
+A mesma raw transaction vai para todos os RPCs configurados (inclusive endpoints privados/sequencer);
+respostas "already known" contam como aceitação e o primeiro endpoint a aceitar é reportado
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlparse
+from hexbytes import HexBytes
+from web3 import Web3
+
+from config import BASE_RPC_URLS, TX_BROADCAST_URLS, RPC_TIMEOUT
+from nonce_manager import is_nonce_error
+from rpc_client import create_http_provider
+
+# Respostas de nós que já receberam a mesma transação (de nós ou de outro endpoint do fan-out)
+ALREADY_KNOWN_ERRORS = ('already known', 'known transaction', 'alreadyknown', 'already imported',
+                        'transaction already exists')
+
+
+def endpoint_label(url: str) -> str:
+    """Apenas o host (URLs de provedores costumam carregar a API key no caminho)"""
+    return urlparse(url).netloc or url
+
+
+def is_already_known(error) -> bool:
+    message = str(error.get('message', error) if isinstance(error, dict) else error).lower()
+    return any(pattern in message for pattern in ALREADY_KNOWN_ERRORS)
+
+
+@dataclass
+class BroadcastResult:
+    """Desfecho do fan-out (listas completadas em segundo plano após o primeiro aceite)"""
+    tx_hash: HexBytes
+    first_endpoint: Optional[str] = None
+    first_latency: Optional[float] = None  # Segundos até o primeiro aceite
+    accepted: List[str] = field(default_factory=list)
+    already_known: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+class TxBroadcaster:
+    """Envia eth_sendRawTransaction para todos os endpoints e retorna no primeiro aceite"""
+
+    def __init__(self, urls: Optional[Sequence[str]] = None, providers: Optional[Sequence] = None):
+        self.urls = list(dict.fromkeys(urls if urls is not None else BASE_RPC_URLS + TX_BROADCAST_URLS))
+        self._providers = list(providers) if providers is not None else None
+        self._background: set = set()
+
+        # Estatísticas
+        self.broadcasts = 0
+        self.wins: Dict[str, int] = {}
+
+    async def _get_providers(self) -> List:
+        if self._providers is None:
+            self._providers = [await create_http_provider(url) for url in self.urls]
+        return self._providers
+
+    async def _submit(self, provider, raw_hex: str):
+        """(label, resposta JSON-RPC ou exceção, latência)"""
+        label = endpoint_label(str(getattr(provider, 'endpoint_uri', provider)))
+        start = time.monotonic()
+        try:
+            response = await asyncio.wait_for(provider.make_request('eth_sendRawTransaction', [raw_hex]), RPC_TIMEOUT)
+        except Exception as e:
+            response = e
+        return label, response, time.monotonic() - start
+
+    def _record(self, result: BroadcastResult, label: str, response, latency: float) -> bool:
+        """Classifica a resposta de um endpoint; True se ele aceitou (ou já conhecia) a transação"""
+        if isinstance(response, Exception):
+            result.errors[label] = str(response)[:120]
+            return False
+
+        error = response.get('error')
+        if error is None:
+            result.accepted.append(label)
+        elif is_already_known(error):
+            result.already_known.append(label)  # Duplicata do próprio fan-out: não é erro
+        else:
+            result.errors[label] = str(error.get('message', error) if isinstance(error, dict) else error)[:120]
+            return False
+
+        if result.first_endpoint is None:
+            result.first_endpoint, result.first_latency = label, latency
+            self.wins[label] = self.wins.get(label, 0) + 1
+        return True
+
+    async def broadcast(self, raw_transaction: bytes) -> BroadcastResult:
+        """
+        Envia a raw transaction para todos os endpoints em paralelo.
+        Retorna no primeiro aceite; os demais envios continuam em segundo plano (mais caminhos até o sequencer).
+        Se todos recusarem, levanta ValueError com o erro mais relevante (erro de nonce primeiro).
+        """
+        raw_hex = Web3.to_hex(raw_transaction)
+        result = BroadcastResult(tx_hash=HexBytes(Web3.keccak(hexstr=raw_hex)))
+        self.broadcasts += 1
+
+        pending = {asyncio.create_task(self._submit(provider, raw_hex)) for provider in await self._get_providers()}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            accepted = [self._record(result, *task.result()) for task in done]
+            if any(accepted):
+                break
+
+        if result.first_endpoint is None:
+            errors = list(result.errors.values())
+            nonce_errors = [error for error in errors if is_nonce_error(Exception(error))]
+            raise ValueError((nonce_errors or errors or ['nenhum endpoint de broadcast configurado'])[0])
+
+        print(f"📡 TX aceita primeiro por {result.first_endpoint} em {result.first_latency * 1000:.0f} ms")
+        if pending:
+            task = asyncio.create_task(self._drain(result, pending))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        return result
+
+    async def _drain(self, result: BroadcastResult, pending: set):
+        """Completa o relatório com as respostas dos endpoints mais lentos"""
+        for task in asyncio.as_completed(pending):
+            self._record(result, *(await task))
+
+    def get_stats(self) -> Dict:
+        return {
+            'endpoints': [endpoint_label(url) for url in self.urls],
+            'broadcasts': self.broadcasts,
+            'wins': dict(self.wins)
+        }
+
+
+# Instância global compartilhada (providers criados no primeiro envio, dentro do event loop)
+TX_BROADCASTER = TxBroadcaster()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Rastreador assíncrono de confirmação de transações
+Todas as transações pendentes verificadas com uma única busca de recibos por bloco;
+cada hash tem um future resolvido na inclusão, revert ou timeout
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from web3 import AsyncWeb3
+from web3.datastructures import AttributeDict
+from web3._utils.method_formatters import receipt_formatter
+
+from config import TRANSACTION_TIMEOUT, TX_POLL_INTERVAL
+
+MAX_CATCHUP_BLOCKS = 64   # Blocos atrasados processados por ciclo
+RESULTS_LIMIT = 256       # Resultados recentes mantidos para consultas repetidas
+
+
+def normalize_hash(tx_hash) -> str:
+    if isinstance(tx_hash, (bytes, bytearray)):
+        return '0x' + bytes(tx_hash).hex()
+    tx_hash = str(tx_hash).lower()
+    return tx_hash if tx_hash.startswith('0x') else '0x' + tx_hash
+
+
+@dataclass
+class TxResult:
+    """Desfecho de uma transação rastreada"""
+    tx_hash: str
+    status: str                      # 'confirmed', 'reverted' ou 'timeout'
+    block_number: Optional[int] = None
+    receipt: Optional[AttributeDict] = None
+
+    @property
+    def success(self) -> bool:
+        return self.status == 'confirmed'
+
+
+class TransactionTracker:
+    """Observa hashes pendentes a cada novo bloco sem bloquear o restante do bot"""
+
+    def __init__(self, poll_interval: float = TX_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.web3: Optional[AsyncWeb3] = None
+        self._pending: Dict[str, Tuple[asyncio.Future, float]] = {}
+        self._results: 'OrderedDict[str, TxResult]' = OrderedDict()
+        self._last_block: Optional[int] = None
+        self._head: Optional[int] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.supports_block_receipts = True
+
+        # Estatísticas
+        self.block_lookups = 0
+        self.confirmed = 0
+        self.reverted = 0
+        self.timeouts = 0
+
+    def track(self, web3: AsyncWeb3, tx_hash, timeout: float = TRANSACTION_TIMEOUT) -> asyncio.Future:
+        """Registra o hash e devolve um future com o TxResult (chamar logo após o envio)"""
+        key = normalize_hash(tx_hash)
+        loop = asyncio.get_running_loop()
+
+        if key in self._results:
+            future = loop.create_future()
+            future.set_result(self._results[key])
+            return future
+        if key in self._pending:
+            return self._pending[key][0]
+
+        self.web3 = web3
+        future = loop.create_future()
+        self._pending[key] = (future, time.monotonic() + timeout)
+        self._ensure_running()
+        return future
+
+    async def wait(self, web3: AsyncWeb3, tx_hash, timeout: float = TRANSACTION_TIMEOUT) -> TxResult:
+        """Aguarda o desfecho sem bloquear o event loop"""
+        return await asyncio.shield(self.track(web3, tx_hash, timeout))
+
+    def result(self, tx_hash) -> Optional[TxResult]:
+        return self._results.get(normalize_hash(tx_hash))
+
+    def notify_head(self, block_number: int):
+        """Novo bloco vindo do WebSocket: processa imediatamente em vez de esperar o polling"""
+        self._head = max(self._head or 0, block_number)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def _resolve(self, key: str, result: TxResult):
+        entry = self._pending.pop(key, None)
+        if entry is not None and not entry[0].done():
+            entry[0].set_result(result)
+
+        self._results[key] = result
+        while len(self._results) > RESULTS_LIMIT:
+            self._results.popitem(last=False)
+
+        if result.status == 'confirmed':
+            self.confirmed += 1
+        elif result.status == 'reverted':
+            self.reverted += 1
+        else:
+            self.timeouts += 1
+
+    async def _run(self):
+        """Loop ativo apenas enquanto houver transações pendentes"""
+        while self._pending:
+            try:
+                head = await self.web3.eth.block_number
+                self._head = max(self._head or 0, head)
+
+                if self._last_block is None:
+                    self._last_block = self._head - 1  # Inclui o bloco atual (tx pode já estar nele)
+                self._last_block = max(self._last_block, self._head - MAX_CATCHUP_BLOCKS)
+
+                while self._pending and self._last_block < self._head:
+                    if not await self.process_block(self._last_block + 1):
+                        break  # Endpoint atrasado ainda sem o bloco: tenta o mesmo bloco na próxima volta
+                    self._last_block += 1
+            except Exception as e:
+                print(f"⚠️ Erro no rastreador de transações: {str(e)[:80]}")
+
+            self._expire(time.monotonic())
+            if not self._pending:
+                break
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+        # Próximo track() retoma a partir do head atual
+        self._last_block = None
+
+    def _expire(self, now: float):
+        for key, (future, deadline) in list(self._pending.items()):
+            if now >= deadline:
+                self._resolve(key, TxResult(key, 'timeout'))
+
+    async def _block_receipts(self, block_number: int) -> Optional[List[AttributeDict]]:
+        """
+        Recibos do bloco em uma chamada (eth_getBlockReceipts) ou só dos hashes rastreados presentes.
+        None = bloco ainda desconhecido pelo endpoint (null no lugar da lista)
+        """
+        if self.supports_block_receipts:
+            try:
+                raw = await self.web3.manager.coro_request('eth_getBlockReceipts', [hex(block_number)])
+                if raw is None:
+                    return None
+                return [AttributeDict.recursive(receipt_formatter(receipt)) for receipt in raw]
+            except Exception as e:
+                if 'method' not in str(e).lower():
+                    raise
+                self.supports_block_receipts = False  # Nó sem suporte: usar fallback daqui em diante
+
+        block = await self.web3.eth.get_block(block_number, full_transactions=False)
+        included = [tx for tx in block['transactions'] if normalize_hash(tx) in self._pending]
+        return list(await asyncio.gather(*[self.web3.eth.get_transaction_receipt(tx) for tx in included]))
+
+    async def process_block(self, block_number: int) -> bool:
+        """
+        Uma busca de recibos por bloco resolve todas as transações rastreadas incluídas nele.
+        False = bloco ainda indisponível no endpoint (não processado)
+        """
+        if not self._pending:
+            return True
+
+        self.block_lookups += 1
+        receipts = await self._block_receipts(block_number)
+        if receipts is None:
+            return False
+        for receipt in receipts:
+            key = normalize_hash(receipt['transactionHash'])
+            if key in self._pending:
+                status = 'confirmed' if receipt['status'] == 1 else 'reverted'
+                self._resolve(key, TxResult(key, status, receipt['blockNumber'], receipt))
+        return True
+
+    def get_stats(self) -> Dict:
+        return {
+            'pending': len(self._pending),
+            'block_lookups': self.block_lookups,
+            'confirmed': self.confirmed,
+            'reverted': self.reverted,
+            'timeouts': self.timeouts
+        }
+
+
+# Instância global compartilhada
+TX_TRACKER = TransactionTracker()
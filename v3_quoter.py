@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Cotador local Uniswap V3
+Estado dos pools (slot0, liquidez, ticks inicializados) em cache por fee tier e
+simulação de swap tick a tick com a mesma matemática inteira do contrato
+"""
+
+import math
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from eth_abi import encode
+from web3 import Web3, AsyncWeb3
+
+from config import UNISWAP_V3_FACTORY, MULTICALL3_ADDRESS, V3_TICK_WORD_RADIUS, MAX_TRACKED_POOLS
+from multicall import Multicall3
+from pool_pricing import get_logs_by_address
+
+# Constantes do TickMath
+Q96 = 1 << 96
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+# Fee tier (centésimos de bip) -> tickSpacing
+FEE_TIER_SPACING = {100: 1, 500: 10, 3000: 60, 10000: 200}
+
+# Seletores
+GET_POOL_SELECTOR = bytes.fromhex('1698ee82')       # getPool(address,address,uint24)
+SLOT0_SELECTOR = bytes.fromhex('3850c7bd')          # slot0()
+LIQUIDITY_SELECTOR = bytes.fromhex('1a686502')      # liquidity()
+TICK_BITMAP_SELECTOR = bytes.fromhex('5339c296')    # tickBitmap(int16)
+TICKS_SELECTOR = bytes.fromhex('f30dba93')          # ticks(int24)
+GET_BLOCK_NUMBER_SELECTOR = bytes.fromhex('42cbb15c')  # Multicall3.getBlockNumber()
+
+# Eventos que alteram o estado do pool
+SWAP_TOPIC = '0xc42079f94a6350d7e6235f29174924f928cc2ac818eb64fed8004e115fbcca67'
+MINT_TOPIC = '0x7a53080ba414158be7ec69b987b5fb7d07dee101fe85488f0853ae16239d0bde'
+BURN_TOPIC = '0x0c396cd989a39f4459b5fa1aed6a9a8dcdbc45908acfd67e028cd568da98982c'
+INITIALIZE_TOPIC = '0x98636036cb66a9c19a37435efc1e90142190214e8abeb821bdba3f2990dd4c95'
+V3_STATE_TOPICS = [SWAP_TOPIC, MINT_TOPIC, BURN_TOPIC, INITIALIZE_TOPIC]
+
+_UINT256_MAX = (1 << 256) - 1
+_UINT160_MAX = (1 << 160) - 1
+_LOADED_AT_BLOCK_END = 1 << 32  # logIndex "infinito": estado lido reflete o bloco inteiro
+
+
+# ===== Matemática (FullMath / TickMath / SqrtPriceMath / SwapMath) =====
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    return a * b // denominator
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    result, remainder = divmod(a * b, denominator)
+    return result + 1 if remainder else result
+
+
+def div_rounding_up(a: int, b: int) -> int:
+    result, remainder = divmod(a, b)
+    return result + 1 if remainder else result
+
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """sqrt(1.0001^tick) * 2^96 (TickMath.getSqrtRatioAtTick)"""
+    abs_tick = abs(tick)
+    if abs_tick > MAX_TICK:
+        raise ValueError("tick fora do intervalo")
+
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 0x100000000000000000000000000000000
+    if abs_tick & 0x2: ratio = (ratio * 0xfff97272373d413259a46990580e213a) >> 128
+    if abs_tick & 0x4: ratio = (ratio * 0xfff2e50f5f656932ef12357cf3c7fdcc) >> 128
+    if abs_tick & 0x8: ratio = (ratio * 0xffe5caca7e10e4e61c3624eaa0941cd0) >> 128
+    if abs_tick & 0x10: ratio = (ratio * 0xffcb9843d60f6159c9db58835c926644) >> 128
+    if abs_tick & 0x20: ratio = (ratio * 0xff973b41fa98c081472e6896dfb254c0) >> 128
+    if abs_tick & 0x40: ratio = (ratio * 0xff2ea16466c96a3843ec78b326b52861) >> 128
+    if abs_tick & 0x80: ratio = (ratio * 0xfe5dee046a99a2a811c461f1969c3053) >> 128
+    if abs_tick & 0x100: ratio = (ratio * 0xfcbe86c7900a88aedcffc83b479aa3a4) >> 128
+    if abs_tick & 0x200: ratio = (ratio * 0xf987a7253ac413176f2b074cf7815e54) >> 128
+    if abs_tick & 0x400: ratio = (ratio * 0xf3392b0822b70005940c7a398e4b70f3) >> 128
+    if abs_tick & 0x800: ratio = (ratio * 0xe7159475a2c29b7443b29c7fa6e889d9) >> 128
+    if abs_tick & 0x1000: ratio = (ratio * 0xd097f3bdfd2022b8845ad8f792aa5825) >> 128
+    if abs_tick & 0x2000: ratio = (ratio * 0xa9f746462d870fdf8a65dc1f90e061e5) >> 128
+    if abs_tick & 0x4000: ratio = (ratio * 0x70d869a156d2a1b890bb3df62baf32f7) >> 128
+    if abs_tick & 0x8000: ratio = (ratio * 0x31be135f97d08fd981231505542fcfa6) >> 128
+    if abs_tick & 0x10000: ratio = (ratio * 0x9aa508b5b7a84e1c677de54f3e99bc9) >> 128
+    if abs_tick & 0x20000: ratio = (ratio * 0x5d6af8dedb81196699c329225ee604) >> 128
+    if abs_tick & 0x40000: ratio = (ratio * 0x2216e584f5fa1ea926041bedfe98) >> 128
+    if abs_tick & 0x80000: ratio = (ratio * 0x48a170391f7dc42444e8fa2) >> 128
+
+    if tick > 0:
+        ratio = _UINT256_MAX // ratio
+
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """Maior tick cujo sqrtRatio é <= sqrt_price_x96 (TickMath.getTickAtSqrtRatio)"""
+    price = (sqrt_price_x96 / Q96) ** 2
+    tick = max(MIN_TICK, min(MAX_TICK, math.floor(math.log(price) / math.log(1.0001))))
+
+    # Estimativa em float; ajuste exato com a função inversa
+    while tick > MIN_TICK and get_sqrt_ratio_at_tick(tick) > sqrt_price_x96:
+        tick -= 1
+    while tick < MAX_TICK and get_sqrt_ratio_at_tick(tick + 1) <= sqrt_price_x96:
+        tick += 1
+    return tick
+
+
+def get_amount0_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_b - sqrt_a
+    if round_up:
+        return div_rounding_up(mul_div_rounding_up(numerator1, numerator2, sqrt_b), sqrt_a)
+    return mul_div(numerator1, numerator2, sqrt_b) // sqrt_a
+
+
+def get_amount1_delta(sqrt_a: int, sqrt_b: int, liquidity: int, round_up: bool) -> int:
+    if sqrt_a > sqrt_b:
+        sqrt_a, sqrt_b = sqrt_b, sqrt_a
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_b - sqrt_a, Q96)
+    return mul_div(liquidity, sqrt_b - sqrt_a, Q96)
+
+
+def _next_sqrt_price_from_amount0_rounding_up(sqrt_price: int, liquidity: int, amount: int) -> int:
+    if amount == 0:
+        return sqrt_price
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price
+    # Mesmo ramo do contrato: sem overflow de 256 bits usa a fórmula precisa
+    if product <= _UINT256_MAX and numerator1 + product <= _UINT256_MAX:
+        return mul_div_rounding_up(numerator1, sqrt_price, numerator1 + product)
+    return div_rounding_up(numerator1, numerator1 // sqrt_price + amount)
+
+
+def _next_sqrt_price_from_amount1_rounding_down(sqrt_price: int, liquidity: int, amount: int) -> int:
+    if amount <= _UINT160_MAX:
+        quotient = (amount << 96) // liquidity
+    else:
+        quotient = mul_div(amount, Q96, liquidity)
+    return sqrt_price + quotient
+
+
+def get_next_sqrt_price_from_input(sqrt_price: int, liquidity: int, amount_in: int, zero_for_one: bool) -> int:
+    if zero_for_one:
+        return _next_sqrt_price_from_amount0_rounding_up(sqrt_price, liquidity, amount_in)
+    return _next_sqrt_price_from_amount1_rounding_down(sqrt_price, liquidity, amount_in)
+
+
+def compute_swap_step(sqrt_current: int, sqrt_target: int, liquidity: int,
+                      amount_remaining: int, fee_pips: int) -> Tuple[int, int, int, int]:
+    """SwapMath.computeSwapStep para exact input: (sqrtNext, amountIn, amountOut, feeAmount)"""
+    zero_for_one = sqrt_current >= sqrt_target
+
+    amount_remaining_less_fee = mul_div(amount_remaining, 1_000_000 - fee_pips, 1_000_000)
+    if zero_for_one:
+        amount_in = get_amount0_delta(sqrt_target, sqrt_current, liquidity, True)
+    else:
+        amount_in = get_amount1_delta(sqrt_current, sqrt_target, liquidity, True)
+
+    if amount_remaining_less_fee >= amount_in:
+        sqrt_next = sqrt_target
+    else:
+        sqrt_next = get_next_sqrt_price_from_input(sqrt_current, liquidity, amount_remaining_less_fee, zero_for_one)
+
+    reached_target = sqrt_next == sqrt_target
+    if zero_for_one:
+        if not reached_target:
+            amount_in = get_amount0_delta(sqrt_next, sqrt_current, liquidity, True)
+        amount_out = get_amount1_delta(sqrt_next, sqrt_current, liquidity, False)
+    else:
+        if not reached_target:
+            amount_in = get_amount1_delta(sqrt_current, sqrt_next, liquidity, True)
+        amount_out = get_amount0_delta(sqrt_current, sqrt_next, liquidity, False)
+
+    if not reached_target:
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee_pips, 1_000_000 - fee_pips)
+
+    return sqrt_next, amount_in, amount_out, fee_amount
+
+
+# ===== Estado do pool =====
+
+def _word(data: bytes, index: int, signed: bool = False) -> int:
+    return int.from_bytes(data[32 * index:32 * (index + 1)], 'big', signed=signed)
+
+
+@dataclass
+class V3Quote:
+    """Cotação V3 calculada localmente"""
+    amount_out: int
+    fee: int
+    pool: str
+
+
+@dataclass
+class V3PoolState:
+    """Estado em cache de um pool V3 (apenas as palavras do tickBitmap carregadas)"""
+    address: str
+    token0: str
+    token1: str
+    fee: int
+    sqrt_price_x96: int = 0
+    tick: int = 0
+    liquidity: int = 0
+    ticks: Dict[int, Tuple[int, int]] = field(default_factory=dict)  # tick -> (liquidityGross, liquidityNet)
+    initialized_ticks: List[int] = field(default_factory=list)       # ticks inicializados, ordenados
+    word_range: Optional[Tuple[int, int]] = None                      # palavras do bitmap carregadas
+    updated_at: Tuple[int, int] = (0, 0)
+
+    @property
+    def tick_spacing(self) -> int:
+        return FEE_TIER_SPACING[self.fee]
+
+    def _word_loaded(self, word: int) -> bool:
+        return self.word_range is not None and self.word_range[0] <= word <= self.word_range[1]
+
+    def next_initialized_tick_within_one_word(self, tick: int, lte: bool) -> Optional[Tuple[int, bool]]:
+        """TickBitmap.nextInitializedTickWithinOneWord; None se a palavra não está em cache"""
+        spacing = self.tick_spacing
+        compressed = tick // spacing
+
+        if lte:
+            word = compressed >> 8
+            if not self._word_loaded(word):
+                return None
+            lowest = (word << 8) * spacing
+            index = bisect_right(self.initialized_ticks, compressed * spacing) - 1
+            if index >= 0 and self.initialized_ticks[index] >= lowest:
+                return self.initialized_ticks[index], True
+            return lowest, False
+
+        compressed += 1
+        word = compressed >> 8
+        if not self._word_loaded(word):
+            return None
+        highest = ((word << 8) + 255) * spacing
+        index = bisect_left(self.initialized_ticks, compressed * spacing)
+        if index < len(self.initialized_ticks) and self.initialized_ticks[index] <= highest:
+            return self.initialized_ticks[index], True
+        return highest, False
+
+    def quote_exact_input(self, token_in: str, amount_in: int) -> Optional[int]:
+        """Simula swap exact input percorrendo os ticks; None se sair da janela em cache"""
+        if self.sqrt_price_x96 == 0 or amount_in <= 0:
+            return None
+
+        zero_for_one = token_in.lower() == self.token0.lower()
+        price_limit = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+        remaining = amount_in
+        amount_out = 0
+        sqrt_price = self.sqrt_price_x96
+        tick = self.tick
+        liquidity = self.liquidity
+
+        while remaining != 0 and sqrt_price != price_limit:
+            step = self.next_initialized_tick_within_one_word(tick, zero_for_one)
+            if step is None:
+                return None  # Trade grande demais para o estado em cache
+
+            tick_next, initialized = step
+            tick_next = max(MIN_TICK, min(MAX_TICK, tick_next))
+            sqrt_next = get_sqrt_ratio_at_tick(tick_next)
+
+            if zero_for_one:
+                sqrt_target = price_limit if sqrt_next < price_limit else sqrt_next
+            else:
+                sqrt_target = price_limit if sqrt_next > price_limit else sqrt_next
+
+            sqrt_start = sqrt_price
+            sqrt_price, step_in, step_out, fee_amount = compute_swap_step(
+                sqrt_price, sqrt_target, liquidity, remaining, self.fee
+            )
+            remaining -= step_in + fee_amount
+            amount_out += step_out
+
+            if sqrt_price == sqrt_next:
+                if initialized:
+                    liquidity_net = self.ticks[tick_next][1]
+                    liquidity += -liquidity_net if zero_for_one else liquidity_net
+                tick = tick_next - 1 if zero_for_one else tick_next
+            elif sqrt_price != sqrt_start:
+                tick = get_tick_at_sqrt_ratio(sqrt_price)
+
+        return amount_out
+
+    def _update_tick(self, tick: int, liquidity_delta: int, upper: bool):
+        """Aplica Mint/Burn a um tick dentro da janela em cache"""
+        if not self._word_loaded((tick // self.tick_spacing) >> 8):
+            return
+
+        gross, net = self.ticks.get(tick, (0, 0))
+        gross += liquidity_delta
+        net += -liquidity_delta if upper else liquidity_delta
+
+        if gross > 0:
+            if tick not in self.ticks:
+                insort(self.initialized_ticks, tick)
+            self.ticks[tick] = (gross, net)
+        elif tick in self.ticks:
+            del self.ticks[tick]
+            self.initialized_ticks.remove(tick)
+
+    def apply_log(self, log) -> bool:
+        """Atualiza o estado a partir de Swap/Mint/Burn/Initialize"""
+        position = (log['blockNumber'], log['logIndex'])
+        if position <= self.updated_at:
+            return False
+
+        topic0 = log['topics'][0].hex()
+        data = bytes(log['data'])
+
+        if topic0 == SWAP_TOPIC:
+            self.sqrt_price_x96 = _word(data, 2)
+            self.liquidity = _word(data, 3)
+            self.tick = _word(data, 4, signed=True)
+        elif topic0 == INITIALIZE_TOPIC:
+            self.sqrt_price_x96 = _word(data, 0)
+            self.tick = _word(data, 1, signed=True)
+        elif topic0 in (MINT_TOPIC, BURN_TOPIC):
+            tick_lower = int.from_bytes(bytes(log['topics'][2]), 'big', signed=True)
+            tick_upper = int.from_bytes(bytes(log['topics'][3]), 'big', signed=True)
+            amount = _word(data, 1) if topic0 == MINT_TOPIC else _word(data, 0)
+            delta = amount if topic0 == MINT_TOPIC else -amount
+
+            self._update_tick(tick_lower, delta, upper=False)
+            self._update_tick(tick_upper, delta, upper=True)
+            if tick_lower <= self.tick < tick_upper:
+                self.liquidity += delta
+        else:
+            return False
+
+        self.updated_at = position
+        return True
+
+
+class V3Quoter:
+    """Cache de pools Uniswap V3 por par/fee tier (LRU limitado a MAX_TRACKED_POOLS) e cotação local"""
+
+    def __init__(self, max_pools: int = MAX_TRACKED_POOLS):
+        self.max_pools = max_pools
+        self.pools: Dict[str, V3PoolState] = OrderedDict()  # Menos usado primeiro
+        self._by_pair: Dict[Tuple[str, str], Dict[int, str]] = {}
+        self._warm_pairs = set()
+        self._pinned: Set[str] = set()  # Tokens com posição aberta: pools nunca saem do cache
+
+        # Estatísticas
+        self.evictions = 0
+
+    @staticmethod
+    def _sorted_tokens(token_a: str, token_b: str) -> Tuple[str, str]:
+        a, b = Web3.to_checksum_address(token_a), Web3.to_checksum_address(token_b)
+        return (a, b) if int(a, 16) < int(b, 16) else (b, a)
+
+    @staticmethod
+    def _pair_key(token_a: str, token_b: str) -> Tuple[str, str]:
+        a, b = token_a.lower(), token_b.lower()
+        return (a, b) if a < b else (b, a)
+
+    def is_warm(self, token_a: str, token_b: str) -> bool:
+        """True se todos os fee tiers do par já foram descobertos e carregados"""
+        return self._pair_key(token_a, token_b) in self._warm_pairs
+
+    def add_pool(self, address: str, token0: str, token1: str, fee: int) -> V3PoolState:
+        """Registra pool (idempotente)"""
+        key = address.lower()
+        if key not in self.pools:
+            self.pools[key] = V3PoolState(Web3.to_checksum_address(address), token0, token1, fee)
+            self._by_pair.setdefault(self._pair_key(token0, token1), {})[fee] = key
+            self._evict()
+        self.pools.move_to_end(key)
+        return self.pools[key]
+
+    def pin(self, token: str):
+        """Posição aberta: pools do token ficam no cache até unpin"""
+        self._pinned.add(token.lower())
+
+    def unpin(self, token: str):
+        self._pinned.discard(token.lower())
+        self._evict()
+
+    def _is_pinned(self, pool: V3PoolState) -> bool:
+        return pool.token0.lower() in self._pinned or pool.token1.lower() in self._pinned
+
+    def _touch(self, keys: Iterable[str]):
+        for key in keys:
+            self.pools.move_to_end(key)
+
+    def _evict(self):
+        """Remove os pools menos usados (exceto os de posições abertas) acima do limite"""
+        excess = len(self.pools) - self.max_pools
+        for key in [key for key, pool in self.pools.items() if not self._is_pinned(pool)][:max(excess, 0)]:
+            pool = self.pools.pop(key)
+            pair = self._pair_key(pool.token0, pool.token1)
+            del self._by_pair[pair][pool.fee]
+            if not self._by_pair[pair]:
+                del self._by_pair[pair]
+            self._warm_pairs.discard(pair)  # Par incompleto: próximo warm redescobre
+            self.evictions += 1
+
+    async def warm(self, web3: AsyncWeb3, token_a: str, token_b: str):
+        """Descobre os pools dos 4 fee tiers e carrega seu estado (3-4 chamadas no total)"""
+        token0, token1 = self._sorted_tokens(token_a, token_b)
+        multicall = Multicall3(web3)
+
+        fees = list(FEE_TIER_SPACING)
+        results = await multicall.aggregate3([
+            (UNISWAP_V3_FACTORY, GET_POOL_SELECTOR + encode(['address', 'address', 'uint24'], [token0, token1, fee]))
+            for fee in fees
+        ])
+
+        new_pools = []
+        for fee, (success, data) in zip(fees, results):
+            if success and len(data) >= 32 and _word(data, 0) != 0:
+                address = Web3.to_checksum_address(data[12:32])
+                if address.lower() not in self.pools:
+                    new_pools.append(self.add_pool(address, token0, token1, fee))
+
+        if new_pools:
+            await self.load_pools(web3, new_pools)
+        self._warm_pairs.add(self._pair_key(token0, token1))
+
+    async def load_pools(self, web3: AsyncWeb3, pools: List[V3PoolState]):
+        """Lê slot0, liquidez, palavras do tickBitmap ao redor do preço e os ticks inicializados"""
+        multicall = Multicall3(web3)
+
+        # 1) slot0 + liquidity de todos os pools (e o bloco da leitura)
+        calls = [(MULTICALL3_ADDRESS, GET_BLOCK_NUMBER_SELECTOR)]
+        for pool in pools:
+            calls += [(pool.address, SLOT0_SELECTOR), (pool.address, LIQUIDITY_SELECTOR)]
+        results = await multicall.aggregate3(calls)
+        block_number = _word(results[0][1], 0)
+
+        for i, pool in enumerate(pools):
+            (ok_slot0, slot0), (ok_liquidity, liquidity) = results[1 + 2 * i], results[2 + 2 * i]
+            if ok_slot0 and ok_liquidity:
+                pool.sqrt_price_x96 = _word(slot0, 0)
+                pool.tick = _word(slot0, 1, signed=True)
+                pool.liquidity = _word(liquidity, 0)
+
+        # 2) Palavras do tickBitmap em volta do tick atual
+        word_calls = []
+        for pool in pools:
+            center = (pool.tick // pool.tick_spacing) >> 8
+            pool.word_range = (center - V3_TICK_WORD_RADIUS, center + V3_TICK_WORD_RADIUS)
+            for word in range(pool.word_range[0], pool.word_range[1] + 1):
+                word_calls.append((pool, word))
+
+        results = await multicall.aggregate3([
+            (pool.address, TICK_BITMAP_SELECTOR + encode(['int16'], [word])) for pool, word in word_calls
+        ], block_identifier=block_number)
+
+        tick_calls = []
+        for (pool, word), (success, data) in zip(word_calls, results):
+            bitmap = _word(data, 0) if success and data else 0
+            while bitmap:
+                bit = (bitmap & -bitmap).bit_length() - 1
+                tick_calls.append((pool, ((word << 8) + bit) * pool.tick_spacing))
+                bitmap &= bitmap - 1
+
+        # 3) liquidityGross/liquidityNet dos ticks inicializados
+        if tick_calls:
+            results = await multicall.aggregate3([
+                (pool.address, TICKS_SELECTOR + encode(['int24'], [tick])) for pool, tick in tick_calls
+            ], block_identifier=block_number)
+
+            for (pool, tick), (success, data) in zip(tick_calls, results):
+                if success and len(data) >= 64:
+                    pool.ticks[tick] = (_word(data, 0), _word(data, 1, signed=True))
+
+        for pool in pools:
+            pool.initialized_ticks = sorted(pool.ticks)
+            pool.updated_at = (block_number, _LOADED_AT_BLOCK_END)
+
+    def quote(self, token_in: str, token_out: str, amount_in: int) -> Optional[V3Quote]:
+        """Melhor cotação entre os fee tiers em cache (zero chamadas RPC)"""
+        best = None
+        tiers = self._by_pair.get(self._pair_key(token_in, token_out), {})
+        self._touch(tiers.values())
+        for fee, key in tiers.items():
+            amount_out = self.pools[key].quote_exact_input(token_in, amount_in)
+            if amount_out and (best is None or amount_out > best.amount_out):
+                best = V3Quote(amount_out, fee, self.pools[key].address)
+        return best
+
+    def apply_log(self, log) -> bool:
+        pool = self.pools.get(log['address'].lower())
+        if pool is None or not log['topics']:
+            return False
+        return pool.apply_log(log)
+
+    async def sync_from_logs(self, web3: AsyncWeb3, from_block: int, to_block: int) -> int:
+        """Aplica Swap/Mint/Burn/Initialize dos pools em cache (lista de endereços em blocos)"""
+        if not self.pools:
+            return 0
+
+        logs = await get_logs_by_address(web3, [pool.address for pool in self.pools.values()], {
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': [V3_STATE_TOPICS]
+        })
+        return sum(1 for log in logs if self.apply_log(log))
+
+
+# Instância global compartilhada
+V3_QUOTER = V3Quoter()
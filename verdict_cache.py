@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Cache de verificações de segurança por template de bytecode
+Tokens meme da Base são clones byte a byte de poucos templates (só mudam immutables do construtor):
+as verificações que dependem só do código (contrato válido, seletores perigosos) são guardadas pelo
+hash do bytecode normalizado; estado do token (owner, taxas, compra/venda simuladas) é lido sempre.
+Um template só é bloqueado após honeypot confirmado em HONEYPOT_TEMPLATE_CONFIRMATIONS tokens distintos;
+famílias de clones (esqueleto de opcodes) são apenas informativas
+"""
+
+import copy
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+from web3 import Web3
+
+from config import SECURITY_VERDICT_TTL, HONEYPOT_TEMPLATE_CONFIRMATIONS
+from bytecode_selectors import normalize_bytecode, opcode_skeleton
+
+
+@dataclass
+class CloneFamily:
+    """Clones com a mesma lógica (esqueleto de opcodes), mesmo com constantes diferentes"""
+    fingerprint: str
+    templates: Set[str] = field(default_factory=set)  # Hashes normalizados vistos na família
+    members: Set[str] = field(default_factory=set)    # Tokens (endereços) vistos na família
+    first_seen: float = field(default_factory=time.time)
+
+
+@dataclass
+class CachedChecks:
+    checks: Dict
+    token: str  # Token cuja análise gerou as verificações
+    created: float = field(default_factory=time.monotonic)
+
+
+class SecurityVerdictCache:
+    """Verificações de bytecode e honeypots confirmados por hash normalizado; famílias por esqueleto de opcodes"""
+
+    def __init__(self, ttl: float = SECURITY_VERDICT_TTL, confirmations: int = HONEYPOT_TEMPLATE_CONFIRMATIONS):
+        self.ttl = ttl
+        self.confirmations = confirmations
+        self._fingerprints: Dict[str, Tuple[str, str]] = {}  # Hash bruto -> (hash normalizado, família)
+        self._checks: Dict[str, CachedChecks] = {}
+        self._honeypots: Dict[str, Set[str]] = {}  # Hash normalizado -> tokens com honeypot confirmado
+        self._flagged: Dict[str, str] = {}         # Hash normalizado -> motivo do bloqueio
+        self._families: Dict[str, CloneFamily] = {}
+
+        # Estatísticas
+        self.hits = 0
+        self.misses = 0
+        self.template_blocks = 0
+
+    def fingerprint(self, code_hash: str, code: bytes) -> Tuple[str, str]:
+        """(hash normalizado, impressão da família), calculados uma vez por bytecode bruto"""
+        cached = self._fingerprints.get(code_hash)
+        if cached is None:
+            cached = (Web3.keccak(normalize_bytecode(code)).hex(), Web3.keccak(opcode_skeleton(code)).hex())
+            self._fingerprints[code_hash] = cached
+        return cached
+
+    def family_of(self, code_hash: str, code: bytes) -> CloneFamily:
+        _, family_id = self.fingerprint(code_hash, code)
+        family = self._families.get(family_id)
+        if family is None:
+            family = self._families[family_id] = CloneFamily(family_id)
+        return family
+
+    def get(self, code_hash: str, code: bytes) -> Optional[Dict]:
+        """Verificações de bytecode válidas do template ou None; nunca faz RPC"""
+        normalized, _ = self.fingerprint(code_hash, code)
+        entry = self._checks.get(normalized)
+        if entry is None or time.monotonic() - entry.created > self.ttl:
+            return None
+        return entry.checks
+
+    def put(self, code_hash: str, code: bytes, token: str, checks: Dict):
+        normalized, _ = self.fingerprint(code_hash, code)
+        self._checks[normalized] = CachedChecks(copy.deepcopy(checks), token)
+
+    def flagged(self, code_hash: str, code: bytes) -> Optional[str]:
+        normalized, _ = self.fingerprint(code_hash, code)
+        return self._flagged.get(normalized)
+
+    def flag_template(self, code_hash: str, code: bytes, reason: str):
+        """Bloqueia o template normalizado (mesmo código, só immutables diferentes); a família não é afetada"""
+        normalized, _ = self.fingerprint(code_hash, code)
+        self._flagged[normalized] = reason
+
+    def confirm_honeypot(self, code_hash: str, code: bytes, token: str) -> Optional[str]:
+        """
+        Registra honeypot confirmado em um token; o template só é bloqueado com confirmações em tokens
+        distintos (um honeypot pode vir do estado do token, ex.: taxa alterada pelo owner, e não do código)
+        """
+        normalized, _ = self.fingerprint(code_hash, code)
+        tokens = self._honeypots.setdefault(normalized, set())
+        tokens.add(token.lower())
+        if len(tokens) >= self.confirmations and normalized not in self._flagged:
+            self._flagged[normalized] = f"honeypot confirmado em {len(tokens)} clones"
+        return self._flagged.get(normalized)
+
+    def _blocked_verdict(self, reason: str) -> Dict:
+        return {
+            'score': 0,
+            'issues': [f"Clone de template malicioso: {reason}"],
+            'warnings': [],
+            'is_safe': False,
+            'details': {}
+        }
+
+    def _answer(self, verdict: Dict, family: CloneFamily, source: str) -> Dict:
+        verdict['details']['clone_family'] = {
+            'fingerprint': family.fingerprint,
+            'members': len(family.members),
+            'templates': len(family.templates),
+            'source': source
+        }
+        return verdict
+
+    async def resolve(self, code_hash: str, code: bytes, token: str, analyze_code: Callable[[], Dict],
+                      analyze_token: Callable[[Dict], Awaitable[Dict]]) -> Dict:
+        """
+        Veredito do token: template bloqueado responde na hora; senão as verificações de bytecode vêm
+        do cache (ou de analyze_code, uma vez por template) e analyze_token roda sempre com elas
+        (estado e honeypot são do token, não do template)
+        """
+        normalized, _ = self.fingerprint(code_hash, code)
+        family = self.family_of(code_hash, code)
+        family.members.add(token.lower())
+        family.templates.add(normalized)
+
+        reason = self._flagged.get(normalized)
+        if reason:
+            self.template_blocks += 1
+            return self._answer(self._blocked_verdict(reason), family, 'template')
+
+        checks = self.get(code_hash, code)
+        source = 'cache'
+        if checks is None:
+            self.misses += 1
+            checks = analyze_code()
+            self.put(code_hash, code, token, checks)
+            source = 'analysis'
+        else:
+            self.hits += 1
+
+        verdict = await analyze_token(copy.deepcopy(checks))
+        if verdict.get('details', {}).get('is_honeypot'):
+            self.confirm_honeypot(code_hash, code, token)
+        return self._answer(verdict, family, source)
+
+    def get_stats(self) -> Dict:
+        return {
+            'templates': len(self._checks),
+            'families': len(self._families),
+            'flagged_templates': len(self._flagged),
+            'hits': self.hits,
+            'misses': self.misses,
+            'template_blocks': self.template_blocks
+        }
+
+
+# Instância global compartilhada
+VERDICT_CACHE = SecurityVerdictCache()